@@ -8,13 +8,18 @@ import pandas as pd
 from pathlib import Path
 import time
 import json
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional
 import plotly.express as px
 import plotly.graph_objects as go
 
+from src.artifacts import current_version
 from src.recommender import JobRecommender
 
+# Inputs longer than this many words (pasted resumes) use match_document
+DOCUMENT_MIN_WORDS = 60
+
 # Page config
 st.set_page_config(
     page_title="JobMatch - Find Your Perfect Job",
@@ -318,9 +323,62 @@ def load_recommender() -> JobRecommender:
     return recommender
 
 
+@st.cache_resource
+def reload_state() -> Dict:
+    """Index reload state shared by all sessions."""
+    return {"lock": threading.Lock(), "future": None, "version": None, "failed": None}
+
+
+def refresh_index(recommender: JobRecommender, force: bool = False) -> None:
+    """
+    Hot-swap the version published in models/CURRENT (see VectorStore.reload).
+
+    Checked on every run, so a version published by
+    ``python src/vectorize.py --version NAME`` is picked up without
+    restarting Streamlit. The new version loads in the background while
+    queries keep using the current one. A version that failed to load is
+    not retried until it is reloaded explicitly (``force``).
+    """
+    store = recommender.vector_store
+    state = reload_state()
+    with state["lock"]:
+        future = state["future"]
+        if future is not None:
+            if not future.done():
+                return
+            state["future"] = None
+            if future.exception() is not None:
+                state["failed"] = state["version"]
+                st.warning(
+                    f"⚠️ Index version {state['version']} failed to load, still "
+                    f"serving {store.artifact_version}: {future.exception()}"
+                )
+
+        published = current_version(store.models_root)
+        stale = published is not None and published != store.artifact_version
+        if force or (stale and published != state["failed"]):
+            state["version"] = published
+            state["failed"] = None
+            state["future"] = store.reload(published)
+
+
+def show_index_sidebar(recommender: JobRecommender):
+    """Loaded index version and a manual reload action."""
+    with st.sidebar:
+        version = recommender.vector_store.artifact_version
+        st.caption(f"Index version: {version or 'models/'}")
+        if st.button("🔄 Reload index"):
+            refresh_index(recommender, force=True)
+            st.info("Reloading the index in the background...")
+        elif reload_state()["future"] is not None:
+            st.caption("Loading a new index version...")
+
+
 @st.cache_data
-def get_top_locations(_recommender: JobRecommender, top_n: int = 50) -> List[str]:
-    """Get top N most common locations from job data."""
+def get_top_locations(
+    _recommender: JobRecommender, top_n: int = 50, version: Optional[str] = None
+) -> List[str]:
+    """Get top N most common locations from job data (cached per index version)."""
     job_data = _recommender.vector_store.job_data
     if "location" in job_data.columns:
         # Get top cities
@@ -638,7 +696,9 @@ def show_home_page(recommender: JobRecommender):
     col1, col2, col3 = st.columns(3)
 
     # Get top locations
-    top_locations = get_top_locations(recommender, top_n=50)
+    top_locations = get_top_locations(
+        recommender, top_n=50, version=recommender.vector_store.index_version
+    )
 
     with col1:
         location = st.selectbox(
@@ -716,11 +776,16 @@ def show_home_page(recommender: JobRecommender):
             # Search
             start_time = time.time()
             try:
-                results = recommender.get_recommendations(
-                    query=query,
-                    top_k=20,
-                    filters=filters if filters else None,
-                )
+                if len(query.split()) > DOCUMENT_MIN_WORDS:
+                    results = recommender.match_document(
+                        query, top_k=20, filters=filters if filters else None
+                    )
+                else:
+                    results = recommender.get_recommendations(
+                        query=query,
+                        top_k=20,
+                        filters=filters if filters else None,
+                    )
                 search_time = (time.time() - start_time) * 1000
 
                 # Log query
@@ -1208,6 +1273,8 @@ def main():
     except Exception as e:
         st.error(f"❌ Failed to load recommendation system: {str(e)}")
         st.stop()
+    refresh_index(recommender)
+    show_index_sidebar(recommender)
 
     # Page routing
     if st.session_state.page == "home":
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark compressed postings against raw doc id arrays.
+
+Builds the exact inverted index and its compressed form (delta-encoded,
+bit-packed doc ids, see src/compressed.py) from the TF-IDF artifacts and
+reports index and bundle size, full-index decode throughput and query
+latency on replayed queries from logs/query_history.json.
+
+Usage:
+    python scripts/bench_compressed.py
+    python scripts/bench_compressed.py --queries 1000 --strategies exhaustive
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.compressed import CompressedIndex
+from src.index_bundle import write_tfidf_bundle
+from src.index_eval import QUERY_LOG, replay_queries
+from src.scoring import InvertedIndex
+from src.vector_store import VectorStore
+
+
+def latency_ms(index, query_vecs, top_k, strategy):
+    """p50 / p95 latency in milliseconds of ``index.search``."""
+    samples = []
+    for query_vec in query_vecs:
+        start = time.perf_counter()
+        index.search(query_vec, top_k, strategy=strategy)
+        samples.append(time.perf_counter() - start)
+    samples = np.asarray(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Size, decode throughput and latency of compressed postings"
+    )
+    parser.add_argument("--models-dir", default="models", help="TF-IDF artifacts")
+    parser.add_argument(
+        "--query-log",
+        default=str(PROJECT_ROOT / QUERY_LOG),
+        help="Query history JSON (default: logs/query_history.json)",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=500, help="Queries to replay (default: 500)"
+    )
+    parser.add_argument("--top-k", type=int, default=20, help="Results per query")
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["exhaustive", "block_max"],
+        choices=["exhaustive", "wand", "block_max"],
+        help="Retrieval strategies to time",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Full decode passes (default: 5)"
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("COMPRESSED POSTINGS BENCHMARK")
+    print("=" * 70)
+
+    store = VectorStore(models_dir=args.models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_all()
+    raw = InvertedIndex(store.tfidf_matrix)
+    compressed = CompressedIndex(store.tfidf_matrix)
+    print(f"✓ {raw.nnz:,} postings over {raw.n_terms:,} terms")
+
+    # Size: in memory and as bundle files
+    print("\nSize (MB)")
+    print(f"  {'':<12} {'doc ids':>10} {'index':>10} {'bundle':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, index in (("raw", raw), ("compressed", compressed)):
+            path = Path(tmp) / f"{name}.bundle"
+            write_tfidf_bundle(
+                path,
+                store.tfidf_vectorizer,
+                store.tfidf_matrix,
+                store.sample_indices,
+                postings=name,
+            )
+            doc_bytes = getattr(index, "doc_id_bytes", None) or index.doc_ids.nbytes
+            print(
+                f"  {name:<12} {doc_bytes / 1024**2:>10.2f} "
+                f"{index.nbytes / 1024**2:>10.2f} "
+                f"{path.stat().st_size / 1024**2:>10.2f}"
+            )
+    print(f"  Bits per doc id: {compressed.doc_id_bytes * 8 / max(raw.nnz, 1):.2f}")
+
+    # Decode throughput over every block
+    assert np.array_equal(compressed.decode_all(), raw.doc_ids)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        compressed.decode_all()
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(
+        f"\nDecode: {raw.nnz / elapsed / 1e6:,.1f} M postings/s "
+        f"({elapsed * 1000:.1f} ms per full pass)"
+    )
+
+    # Query latency on replayed queries
+    queries = replay_queries(store, args.query_log, args.queries)
+    query_vecs = [store.vectorize_query(query) for query in queries]
+    print(f"\nLatency over {len(queries):,} queries, top-{args.top_k} (ms)")
+    print(f"  {'strategy':<12} {'format':<12} {'p50':>8} {'p95':>8}")
+    for strategy in args.strategies:
+        for name, index in (("raw", raw), ("compressed", compressed)):
+            p50, p95 = latency_ms(index, query_vecs, args.top_k, strategy)
+            print(f"  {strategy:<12} {name:<12} {p50:>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Sweep nprobe for cluster-pruned approximate search against exact TF-IDF.
+
+Loads the stored clusters (models/tfidf_clusters.bundle, written by
+src/vectorize.py) or builds them with --clusters, and reports recall@k /
+NDCG@k and p50/p95 latency of each nprobe setting on replayed queries from
+logs/query_history.json, topped up with job titles.
+
+Usage:
+    python scripts/compare_clusters.py
+    python scripts/compare_clusters.py --nprobe 4 8 16 32 --clusters 512
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.clusters import N_CLUSTERS
+from src.index_eval import QUERY_LOG, compare_indexes, replay_queries
+from src.vector_store import VectorStore
+
+
+class ProbedIndex:
+    """Cluster-pruned search at a fixed nprobe, for compare_indexes."""
+
+    def __init__(self, store: VectorStore, nprobe: int):
+        self.store = store
+        self.nprobe = nprobe
+        self.nbytes = store.inverted_index.nbytes + store.cluster_index.nbytes
+
+    def search(self, query_vec, top_k, pad=True):
+        return self.store.cluster_index.search(
+            self.store.inverted_index, query_vec, top_k, self.nprobe, pad
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recall and latency of cluster-pruned search per nprobe"
+    )
+    parser.add_argument("--models-dir", default="models", help="TF-IDF artifacts")
+    parser.add_argument(
+        "--query-log",
+        default=str(PROJECT_ROOT / QUERY_LOG),
+        help="Query history JSON (default: logs/query_history.json)",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=500, help="Queries to replay (default: 500)"
+    )
+    parser.add_argument(
+        "--k", type=int, nargs="+", default=[10, 20], help="Cutoffs (default: 10 20)"
+    )
+    parser.add_argument(
+        "--nprobe",
+        type=int,
+        nargs="+",
+        default=[4, 8, 16, 32, 64],
+        help="Cells probed per query",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=None,
+        help="Rebuild with this many cells instead of loading the stored ones",
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("CLUSTER-PRUNED SEARCH")
+    print("=" * 70)
+
+    store = VectorStore(models_dir=args.models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_all()
+    if args.clusters is not None or store.cluster_index is None:
+        store.build_clusters(args.clusters or N_CLUSTERS)
+    stats = store.cluster_index.stats()
+    print(
+        f"✓ {stats['cells']} cells, mean {stats['mean']:.0f} rows "
+        f"(max {stats['max']}, {stats['empty']} empty)"
+    )
+    queries = replay_queries(store, args.query_log, args.queries)
+    query_vecs = [store.vectorize_query(query) for query in queries]
+    print(f"✓ {len(queries):,} queries")
+
+    header = f"{'nprobe':>7} {'p50 ms':>8} {'p95 ms':>8}"
+    header += "".join(f" {'R@' + str(k):>7} {'NDCG@' + str(k):>8}" for k in args.k)
+    print("\n" + header)
+    print("-" * len(header))
+    for nprobe in args.nprobe:
+        report = compare_indexes(
+            store.inverted_index, ProbedIndex(store, nprobe), query_vecs, args.k
+        )
+        line = (
+            f"{nprobe:>7} {report['candidate_ms']['p50']:>8.3f} "
+            f"{report['candidate_ms']['p95']:>8.3f}"
+        )
+        line += "".join(
+            f" {report[f'recall@{k}']:>7.4f} {report[f'ndcg@{k}']:>8.4f}"
+            for k in args.k
+        )
+        print(line)
+    exact = report["reference_ms"]
+    print(f"{'exact':>7} {exact['p50']:>8.3f} {exact['p95']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
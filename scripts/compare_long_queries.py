@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare long-query mode with exact TF-IDF search.
+
+Uses sampled job descriptions as long queries (resume-sized inputs) and,
+for each term budget / weight share / re-rank depth, reports the kept
+query terms, p50/p95 latency and recall@k / NDCG@k against the exact
+top-k (see src/long_query.py).
+
+Usage:
+    python scripts/compare_long_queries.py
+    python scripts/compare_long_queries.py --max-terms 32 64 --share 0.8 0.9
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.index_eval import compare_indexes
+from src.long_query import (
+    LONG_QUERY_RERANK,
+    MAX_QUERY_TERMS,
+    WEIGHT_SHARE,
+    LongQueryPolicy,
+)
+from src.vector_store import VectorStore
+
+
+class PolicyIndex:
+    """Search adapter running a LongQueryPolicy over the loaded index."""
+
+    def __init__(self, policy: LongQueryPolicy, index):
+        self.policy = policy
+        self.index = index
+        self.nbytes = index.nbytes
+
+    def search(self, query_vec, top_k: int, pad: bool = True):
+        return self.policy.search(self.index, query_vec, top_k, pad)[:2]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency and recall@k of long-query mode vs exact search"
+    )
+    parser.add_argument("--models-dir", default="models", help="TF-IDF artifacts")
+    parser.add_argument(
+        "--queries", type=int, default=300, help="Job descriptions (default: 300)"
+    )
+    parser.add_argument(
+        "--k", type=int, nargs="+", default=[10, 20], help="Cutoffs (default: 10 20)"
+    )
+    parser.add_argument(
+        "--max-terms",
+        type=int,
+        nargs="+",
+        default=[MAX_QUERY_TERMS],
+        help=f"Query term budgets (default: {MAX_QUERY_TERMS})",
+    )
+    parser.add_argument(
+        "--share",
+        type=float,
+        nargs="+",
+        default=[WEIGHT_SHARE],
+        help=f"Squared weight shares kept (default: {WEIGHT_SHARE})",
+    )
+    parser.add_argument(
+        "--rerank",
+        type=int,
+        nargs="+",
+        default=[LONG_QUERY_RERANK],
+        help=f"Candidates re-scored exactly, 0 = none (default: {LONG_QUERY_RERANK})",
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("LONG-QUERY MODE")
+    print("=" * 70)
+
+    store = VectorStore(models_dir=args.models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_all()
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(store.sample_indices), args.queries, replace=False)
+    texts = store.job_data.loc[
+        [store.sample_indices[row] for row in rows], "clean_text"
+    ]
+    query_vecs = [store.vectorize_query(text, preprocess=False) for text in texts]
+    nnz = np.array([query_vec.nnz for query_vec in query_vecs])
+    print(f"✓ {len(query_vecs):,} queries, median {np.median(nnz):.0f} terms")
+
+    header = f"{'terms':>6} {'share':>6} {'rerank':>7} {'kept':>6} {'p50 ms':>7} {'p95 ms':>7}"
+    header += "".join(f" {'R@' + str(k):>7} {'NDCG@' + str(k):>8}" for k in args.k)
+    print("\n" + header)
+    print("-" * len(header))
+    for max_terms in args.max_terms:
+        for share in args.share:
+            for rerank in args.rerank:
+                policy = LongQueryPolicy(0, max_terms, share, rerank)
+                kept = np.mean([policy.prune(q).nnz for q in query_vecs])
+                report = compare_indexes(
+                    store.inverted_index,
+                    PolicyIndex(policy, store.inverted_index),
+                    query_vecs,
+                    args.k,
+                )
+                line = (
+                    f"{max_terms:>6} {share:>6.2f} {rerank:>7} {kept:>6.1f} "
+                    f"{report['candidate_ms']['p50']:>7.3f} "
+                    f"{report['candidate_ms']['p95']:>7.3f}"
+                )
+                line += "".join(
+                    f" {report[f'recall@{k}']:>7.4f} {report[f'ndcg@{k}']:>8.4f}"
+                    for k in args.k
+                )
+                print(line)
+    print(
+        f"{'exact':>6} {'':>6} {'':>7} {np.mean(nnz):>6.1f} "
+        f"{report['reference_ms']['p50']:>7.3f} {report['reference_ms']['p95']:>7.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compare dense LSA search with exact TF-IDF search.
+
+Fits a TruncatedSVD projection of the loaded TF-IDF matrix (see
+src/lsa.py) and, for float32 and int8 row storage, reports single-query
+and batched latency, memory and overlap@k (recall of the exact TF-IDF
+top-k) plus NDCG@k on replayed queries from logs/query_history.json,
+topped up with job titles.
+
+Usage:
+    python scripts/compare_lsa.py
+    python scripts/compare_lsa.py --dims 128 256 --codes int8
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scipy.sparse import vstack
+
+from src.index_eval import QUERY_LOG, compare_indexes, replay_queries
+from src.lsa import LSA_DIMS, LsaIndex, fit_projection
+from src.vector_store import VectorStore
+
+
+def batch_ms(index, query_matrix, top_k: int) -> float:
+    """Mean milliseconds per query of one search_batch call."""
+    start = time.perf_counter()
+    index.search_batch(query_matrix, top_k)
+    return (time.perf_counter() - start) * 1000 / query_matrix.shape[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency, memory and overlap@k of LSA vs exact TF-IDF"
+    )
+    parser.add_argument("--models-dir", default="models", help="TF-IDF artifacts")
+    parser.add_argument(
+        "--query-log",
+        default=str(PROJECT_ROOT / QUERY_LOG),
+        help="Query history JSON (default: logs/query_history.json)",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=500, help="Queries to replay (default: 500)"
+    )
+    parser.add_argument(
+        "--k", type=int, nargs="+", default=[10, 20], help="Cutoffs (default: 10 20)"
+    )
+    parser.add_argument(
+        "--dims",
+        type=int,
+        nargs="+",
+        default=[LSA_DIMS],
+        help=f"Latent dimensions (default: {LSA_DIMS})",
+    )
+    parser.add_argument(
+        "--codes",
+        nargs="+",
+        default=["float32", "int8"],
+        choices=["float32", "int8"],
+        help="Row storage to compare",
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("LSA DENSE SEARCH")
+    print("=" * 70)
+
+    store = VectorStore(models_dir=args.models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_all()
+    queries = replay_queries(store, args.query_log, args.queries)
+    query_vecs = [store.vectorize_query(query) for query in queries]
+    query_matrix = vstack(query_vecs).tocsr()
+    exact = store.inverted_index
+    exact_batch = batch_ms(exact, query_matrix, max(args.k))
+    print(f"✓ {len(queries):,} queries")
+
+    header = f"{'dims':>5} {'codes':>8} {'MB':>7} {'p50 ms':>7} {'batch':>7}"
+    header += "".join(f" {'R@' + str(k):>7} {'NDCG@' + str(k):>8}" for k in args.k)
+    print("\n" + header)
+    print("-" * len(header))
+    for dims in args.dims:
+        start = time.time()
+        projection, explained = fit_projection(store.tfidf_matrix, dims)
+        fit_s = time.time() - start
+        for codes in args.codes:
+            lsa = LsaIndex(projection, store.tfidf_matrix, codes, explained)
+            report = compare_indexes(exact, lsa, query_vecs, args.k)
+            line = (
+                f"{lsa.dims:>5} {codes:>8} {lsa.nbytes / 1024**2:>7.1f} "
+                f"{report['candidate_ms']['p50']:>7.3f} "
+                f"{batch_ms(lsa, query_matrix, max(args.k)):>7.3f}"
+            )
+            line += "".join(
+                f" {report[f'recall@{k}']:>7.4f} {report[f'ndcg@{k}']:>8.4f}"
+                for k in args.k
+            )
+            print(line)
+        print(f"{'':>5} fit {fit_s:.1f}s, {explained:.1%} of variance")
+    print(
+        f"{'exact':>14} {report['reference_bytes'] / 1024**2:>7.1f} "
+        f"{report['reference_ms']['p50']:>7.3f} {exact_batch:>7.3f}"
+    )
+    print("\nbatch = ms per query of one search_batch call; R@k = overlap@k")
+
+
+if __name__ == "__main__":
+    main()
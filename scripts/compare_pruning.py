@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Sweep static index pruning levels against the unpruned TF-IDF index.
+
+Prunes the loaded (unpruned) TF-IDF matrix to each keep fraction with the
+term- and document-centric policies of src/pruning.py, and reports index
+size and recall@k / NDCG@k on replayed queries from
+logs/query_history.json, topped up with job titles.
+
+Usage:
+    python scripts/compare_pruning.py
+    python scripts/compare_pruning.py --keep 0.3 0.5 0.7 --methods term
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.index_eval import QUERY_LOG, replay_queries
+from src.pruning import PRUNE_TOP_K, prune_matrix, pruning_report
+from src.vector_store import VectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Size and recall of statically pruned TF-IDF indexes"
+    )
+    parser.add_argument(
+        "--models-dir", default="models", help="Unpruned TF-IDF artifacts"
+    )
+    parser.add_argument(
+        "--query-log",
+        default=str(PROJECT_ROOT / QUERY_LOG),
+        help="Query history JSON (default: logs/query_history.json)",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=500, help="Queries to replay (default: 500)"
+    )
+    parser.add_argument(
+        "--k", type=int, nargs="+", default=[10, 20], help="Cutoffs (default: 10 20)"
+    )
+    parser.add_argument(
+        "--keep",
+        type=float,
+        nargs="+",
+        default=[0.2, 0.3, 0.5, 0.7],
+        help="Fractions of postings to keep",
+    )
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        default=["term", "document"],
+        choices=["term", "document"],
+        help="Pruning policies to compare",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=PRUNE_TOP_K,
+        help=f"Term-centric reference rank (default: {PRUNE_TOP_K})",
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STATIC INDEX PRUNING")
+    print("=" * 70)
+
+    store = VectorStore(models_dir=args.models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_all()
+    matrix = store.tfidf_matrix
+    queries = replay_queries(store, args.query_log, args.queries)
+    query_vecs = [store.vectorize_query(query) for query in queries]
+    print(f"✓ {len(queries):,} queries, {matrix.nnz:,} postings")
+
+    header = f"{'method':>9} {'keep':>6} {'postings':>11} {'MB':>8}"
+    header += "".join(f" {'R@' + str(k):>7} {'NDCG@' + str(k):>8}" for k in args.k)
+    print("\n" + header)
+    print("-" * len(header))
+    for method in args.methods:
+        for keep in args.keep:
+            pruned = prune_matrix(matrix, keep, method, args.top_k)
+            report = pruning_report(matrix, pruned, query_vecs, args.k)
+            line = (
+                f"{method:>9} {keep:>6.2f} {pruned.nnz:>11,} "
+                f"{report['candidate_bytes'] / 1024**2:>8.1f}"
+            )
+            line += "".join(
+                f" {report[f'recall@{k}']:>7.4f} {report[f'ndcg@{k}']:>8.4f}"
+                for k in args.k
+            )
+            print(line)
+    full_mb = report["reference_bytes"] / 1024**2
+    print(f"{'full':>9} {1:>6.2f} {matrix.nnz:>11,} {full_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compare the quantized TF-IDF index with the exact one.
+
+Replays logged queries (topped up with job titles) against the exact
+inverted index and against uint8 / float16 quantized indexes with exact
+re-ranking, and reports memory, latency and recall@k / NDCG@k.
+
+Usage:
+    python scripts/compare_quantized.py
+    python scripts/compare_quantized.py --queries 1000 --rerank 100 300
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.index_eval import QUERY_LOG, compare_indexes, replay_queries
+from src.quantized import RERANK_CANDIDATES, QuantizedIndex
+from src.vector_store import VectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory, latency and recall of the quantized TF-IDF index"
+    )
+    parser.add_argument("--models-dir", default="models", help="TF-IDF artifacts")
+    parser.add_argument(
+        "--query-log",
+        default=str(PROJECT_ROOT / QUERY_LOG),
+        help="Query history JSON (default: logs/query_history.json)",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=500, help="Queries to replay (default: 500)"
+    )
+    parser.add_argument(
+        "--k", type=int, nargs="+", default=[10, 20], help="Cutoffs (default: 10 20)"
+    )
+    parser.add_argument(
+        "--codes",
+        nargs="+",
+        default=["uint8", "float16"],
+        choices=["uint8", "float16"],
+        help="Code types to compare",
+    )
+    parser.add_argument(
+        "--rerank",
+        type=int,
+        nargs="+",
+        default=[RERANK_CANDIDATES],
+        help=f"Re-ranked candidates per query (default: {RERANK_CANDIDATES})",
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("QUANTIZED INDEX COMPARISON")
+    print("=" * 70)
+
+    store = VectorStore(models_dir=args.models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_all()
+    exact = store.inverted_index
+    queries = replay_queries(store, args.query_log, args.queries)
+    query_vecs = [store.vectorize_query(query) for query in queries]
+    print(f"✓ {len(queries):,} queries, {exact.nnz:,} postings")
+    print(f"  Exact index: {exact.nbytes / 1024**2:,.1f} MB")
+
+    header = f"{'codes':>8} {'rerank':>7} {'MB':>8} {'p50 ms':>8} {'p95 ms':>8}"
+    header += "".join(f" {'R@' + str(k):>7} {'NDCG@' + str(k):>8}" for k in args.k)
+    print("\n" + header)
+    print("-" * len(header))
+    for codes in args.codes:
+        for rerank in args.rerank:
+            quantized = QuantizedIndex(store.tfidf_matrix, codes, rerank)
+            report = compare_indexes(exact, quantized, query_vecs, args.k)
+            line = (
+                f"{codes:>8} {rerank:>7} {report['candidate_bytes'] / 1024**2:>8.1f} "
+                f"{report['candidate_ms']['p50']:>8.2f} "
+                f"{report['candidate_ms']['p95']:>8.2f}"
+            )
+            line += "".join(
+                f" {report[f'recall@{k}']:>7.4f} {report[f'ndcg@{k}']:>8.4f}"
+                for k in args.k
+            )
+            print(line)
+    print(
+        f"{'exact':>8} {'-':>7} {exact.nbytes / 1024**2:>8.1f} "
+        f"{report['reference_ms']['p50']:>8.2f} {report['reference_ms']['p95']:>8.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
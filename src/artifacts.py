@@ -0,0 +1,103 @@
+"""
+Artifact Versions Module
+
+Versioned artifact directories for hot reloads. Each build is written to
+``models/versions/<name>/`` (vectorizer, matrix, bundle, sample indices and
+optionally its own ``clean_jobs.parquet``), and ``models/CURRENT`` names the
+version to serve. Publishing a version only rewrites that pointer, so a
+running VectorStore can load the new directory while the old one is still
+being served.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+DATA_FILE = "clean_jobs.parquet"
+
+
+def version_dir(models_root: Path, name: str) -> Path:
+    """Directory holding the artifacts of one version."""
+    return Path(models_root) / VERSIONS_DIR / name
+
+
+def list_versions(models_root: Path) -> List[str]:
+    """Names of all version directories, oldest name first."""
+    versions = Path(models_root) / VERSIONS_DIR
+    if not versions.exists():
+        return []
+    return sorted(path.name for path in versions.iterdir() if path.is_dir())
+
+
+def current_version(models_root: Path) -> Optional[str]:
+    """Version named by the CURRENT pointer, or None for a flat models dir."""
+    pointer = Path(models_root) / CURRENT_FILE
+    if not pointer.exists():
+        return None
+    name = pointer.read_text(encoding="utf-8").strip()
+    return name or None
+
+
+def publish_version(models_root: Path, name: str) -> None:
+    """
+    Point CURRENT at a version (atomic rename).
+
+    Raises:
+        FileNotFoundError: If the version directory does not exist
+    """
+    if not version_dir(models_root, name).is_dir():
+        raise FileNotFoundError(f"No artifact version '{name}' in {models_root}")
+    pointer = Path(models_root) / CURRENT_FILE
+    tmp_path = pointer.with_suffix(".tmp")
+    tmp_path.write_text(name + "\n", encoding="utf-8")
+    os.replace(tmp_path, pointer)
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or a single writer.
+
+    Waiting writers block new readers, so a swap cannot be starved by a
+    steady stream of queries. Not reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
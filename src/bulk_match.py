@@ -0,0 +1,304 @@
+"""
+Offline Bulk Matching
+Match many documents (resumes, saved searches) against the whole job index
+
+Input documents are streamed from a file in chunks. Each chunk is vectorized
+and multiplied with the TF-IDF postings in memory-bounded blocks of rows,
+keeping only the per-row top-k (see InvertedIndex.search_batch), so the
+dense documents x jobs score matrix is never materialized. Chunks are spread
+over a process pool and results are appended to a Parquet file in input
+order.
+
+Usage:
+    python -m src.bulk_match resumes.csv matches.parquet --text-column text
+    python -m src.bulk_match searches.txt matches.parquet --top-k 20 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .vector_store import VectorStore
+
+# Memory held per stored non-zero by a loaded index (CSR matrix, postings
+# and block-max arrays)
+INDEX_BYTES_PER_NNZ = 24
+
+# Memory per score entry of a block product (float64 data, int32 indices
+# and scipy's temporaries)
+BYTES_PER_SCORE = 32
+
+OUTPUT_SCHEMA = pa.schema(
+    [
+        ("input_id", pa.string()),
+        ("rank", pa.int32()),
+        ("row", pa.int32()),
+        ("job_id", pa.int64()),
+        ("score", pa.float64()),
+    ]
+)
+
+# Per-process store, loaded once by _init_worker
+_STORE: Optional[VectorStore] = None
+
+
+def iter_documents(
+    input_path: Path,
+    chunk_size: int = 2000,
+    text_column: str = "text",
+    id_column: Optional[str] = None,
+) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Stream (ids, texts) chunks from a Parquet, CSV, JSONL or text file.
+
+    Text files hold one document per line. Without ``id_column`` the
+    document's position in the file is used as its id.
+    """
+    input_path = Path(input_path)
+    suffix = input_path.suffix.lower()
+    columns = [text_column] + ([id_column] if id_column else [])
+
+    if suffix == ".parquet":
+        batches = (
+            batch.to_pandas()
+            for batch in pq.ParquetFile(input_path).iter_batches(
+                batch_size=chunk_size, columns=columns
+            )
+        )
+    elif suffix == ".csv":
+        batches = pd.read_csv(input_path, usecols=columns, chunksize=chunk_size)
+    elif suffix in (".jsonl", ".ndjson"):
+        batches = pd.read_json(input_path, lines=True, chunksize=chunk_size)
+    else:
+        batches = _iter_lines(input_path, chunk_size, text_column)
+
+    position = 0
+    for batch in batches:
+        texts = batch[text_column].fillna("").astype(str).tolist()
+        if id_column:
+            ids = batch[id_column].astype(str).tolist()
+        else:
+            ids = [str(i) for i in range(position, position + len(texts))]
+        position += len(texts)
+        yield ids, texts
+
+
+def _iter_lines(
+    input_path: Path, chunk_size: int, text_column: str
+) -> Iterator[pd.DataFrame]:
+    """Chunk a text file with one document per line."""
+    with open(input_path, encoding="utf-8") as f:
+        lines = []
+        for line in f:
+            lines.append(line.rstrip("\n"))
+            if len(lines) == chunk_size:
+                yield pd.DataFrame({text_column: lines})
+                lines = []
+        if lines:
+            yield pd.DataFrame({text_column: lines})
+
+
+def estimate_index_bytes(models_dir: Path) -> int:
+    """Memory one process needs for the loaded index, from the matrix file."""
+    with np.load(Path(models_dir) / "tfidf_matrix.npz") as npz:
+        nnz = int(npz["indptr"][-1])
+    return nnz * INDEX_BYTES_PER_NNZ
+
+
+def plan_memory(index_bytes: int, memory_limit_mb: float, workers: int) -> int:
+    """
+    Largest block product each worker may hold under the memory ceiling.
+
+    Every worker loads its own copy of the index; what is left of its share
+    of the ceiling bounds the score entries of one block product.
+
+    Returns:
+        max_block_nnz for InvertedIndex.search_batch
+
+    Raises:
+        ValueError: If the ceiling cannot even hold the index copies
+    """
+    per_worker = memory_limit_mb * 1024**2 / workers - index_bytes
+    if per_worker < BYTES_PER_SCORE:
+        raise ValueError(
+            f"Memory limit of {memory_limit_mb:,.0f} MB is too low for {workers} "
+            f"workers with a {index_bytes / 1024**2:,.1f} MB index each."
+        )
+    return int(per_worker // BYTES_PER_SCORE)
+
+
+def _init_worker(models_dir: str) -> None:
+    """Load the vectorizer, matrix and row -> job mapping once per process."""
+    global _STORE
+    store = VectorStore(models_dir=models_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.load_tfidf()
+        store.load_sample_indices()
+    _STORE = store
+
+
+def _match_chunk(
+    ids: List[str], texts: List[str], top_k: int, max_block_nnz: int
+) -> Tuple[int, pa.Table]:
+    """Top-k jobs for one chunk: (documents matched, rows of OUTPUT_SCHEMA)."""
+    hits = _STORE.search_tfidf_batch(
+        texts, top_k, max_block_nnz=max_block_nnz, pad=False
+    )
+    counts = np.array([len(indices) for indices, _ in hits], dtype=np.int64)
+    rows = np.concatenate([indices for indices, _ in hits] + [np.empty(0, np.int32)])
+    scores = np.concatenate([row_scores for _, row_scores in hits] + [np.empty(0)])
+    ranks = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    job_ids = np.asarray(_STORE.sample_indices, dtype=np.int64)[rows]
+
+    return len(ids), pa.table(
+        {
+            "input_id": np.repeat(np.asarray(ids, dtype=object), counts),
+            "rank": ranks.astype(np.int32),
+            "row": rows.astype(np.int32),
+            "job_id": job_ids,
+            "score": scores.astype(np.float64),
+        },
+        schema=OUTPUT_SCHEMA,
+    )
+
+
+def match_file(
+    input_path: Path | str,
+    output_path: Path | str,
+    models_dir: Path | str = "models",
+    top_k: int = 10,
+    chunk_size: int = 2000,
+    workers: Optional[int] = None,
+    memory_limit_mb: float = 4096,
+    text_column: str = "text",
+    id_column: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Match every document of a file against the job index.
+
+    Args:
+        input_path: Parquet, CSV, JSONL or text file with the documents
+        output_path: Parquet file to write (input_id, rank, row, job_id, score)
+        models_dir: Directory with the TF-IDF artifacts
+        top_k: Number of jobs kept per document
+        chunk_size: Documents per chunk sent to a worker
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+        memory_limit_mb: Ceiling for all workers' index copies and products
+        text_column: Column holding the document text
+        id_column: Optional column holding document ids
+
+    Returns:
+        Dict with run statistics
+    """
+    workers = workers or os.cpu_count() or 1
+    models_dir = VectorStore(models_dir=models_dir).models_dir
+    max_block_nnz = plan_memory(
+        estimate_index_bytes(models_dir), memory_limit_mb, workers
+    )
+
+    start = time.time()
+    stats = {"documents": 0, "chunks": 0, "rows": 0}
+    chunks = iter_documents(input_path, chunk_size, text_column, id_column)
+
+    def write(result: Tuple[int, pa.Table]) -> None:
+        n_documents, table = result
+        writer.write_table(table)
+        stats["chunks"] += 1
+        stats["rows"] += table.num_rows
+        stats["documents"] += n_documents
+
+    with pq.ParquetWriter(str(output_path), OUTPUT_SCHEMA) as writer:
+        if workers == 1:
+            _init_worker(str(models_dir))
+            for ids, texts in chunks:
+                write(_match_chunk(ids, texts, top_k, max_block_nnz))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(str(models_dir),),
+            ) as pool:
+                # Bounded window of in-flight chunks keeps the input streaming
+                pending = deque()
+                for ids, texts in chunks:
+                    pending.append(
+                        pool.submit(_match_chunk, ids, texts, top_k, max_block_nnz)
+                    )
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+
+    elapsed = time.time() - start
+    stats.update(
+        {
+            "elapsed": elapsed,
+            "documents_per_second": stats["documents"] / elapsed if elapsed else 0.0,
+            "workers": workers,
+            "max_block_nnz": max_block_nnz,
+        }
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Match documents against the job index in bulk"
+    )
+    parser.add_argument("input", type=Path, help="Parquet/CSV/JSONL/text input")
+    parser.add_argument("output", type=Path, help="Output Parquet file")
+    parser.add_argument("--models-dir", default="models", help="TF-IDF artifacts")
+    parser.add_argument("--top-k", type=int, default=10, help="Jobs per document")
+    parser.add_argument(
+        "--chunk-size", type=int, default=2000, help="Documents per chunk"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--memory-limit-mb",
+        type=float,
+        default=4096,
+        help="Memory ceiling for all workers (default: 4096)",
+    )
+    parser.add_argument("--text-column", default="text", help="Document text column")
+    parser.add_argument("--id-column", default=None, help="Document id column")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("BULK MATCHING")
+    print("=" * 70)
+
+    stats = match_file(
+        args.input,
+        args.output,
+        models_dir=args.models_dir,
+        top_k=args.top_k,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        memory_limit_mb=args.memory_limit_mb,
+        text_column=args.text_column,
+        id_column=args.id_column,
+    )
+
+    print(f"✓ Matched {stats['documents']:,} documents in {stats['elapsed']:.1f}s")
+    print(f"  - Throughput: {stats['documents_per_second']:,.0f} documents/s")
+    print(f"  - Workers: {stats['workers']}, block budget: {stats['max_block_nnz']:,}")
+    print(f"  - Wrote {stats['rows']:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
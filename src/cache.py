@@ -0,0 +1,418 @@
+"""
+Result Cache Module
+
+Bounded, thread-safe cache for recommendation results. Streamlit reruns and
+popular queries hit the same (query, filters, top_k) repeatedly; serving
+them from memory skips cleaning, vectorization, scoring and DataFrame
+materialization.
+
+Entries are evicted least-recently-used when the entry or byte budget is
+exceeded, expire after a TTL, and are dropped wholesale when the loaded
+index version changes.
+
+A second, semantic tier keys on the TF-IDF query vector instead of the
+query string, so requests that only differ in casing, punctuation or word
+order (identical vectors), or by a low-weight extra word (cosine above a
+threshold), reuse an earlier candidate list.
+
+DocumentCache keeps analyzed documents instead of results: the vector of
+a pasted resume, keyed on a hash of its text, is reused when the same
+document is matched again with other filters.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+from scipy.sparse import csr_matrix, spmatrix
+
+from .filters import is_active
+from .scoring import InvertedIndex
+
+
+def canonical_filters(filters: Optional[Dict[str, Any]]) -> str:
+    """
+    Canonical, hashable form of a filter dict.
+
+    Inactive entries (empty strings, False, None salary bounds) are dropped
+    and list values are sorted, since they are OR-ed regardless of order.
+    String values are kept verbatim: "LA " and "LA" match differently.
+    """
+    canonical = {}
+    for key, value in (filters or {}).items():
+        if not is_active(key, value):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = sorted(str(v) for v in value)
+        canonical[key] = value
+    return json.dumps(canonical, sort_keys=True, default=str)
+
+
+class ResultCache:
+    """
+    LRU + TTL cache keyed on (normalized query, canonical filters, top_k).
+
+    All operations hold a lock, so one instance can be shared by every
+    Streamlit session using the ``st.cache_resource`` recommender.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: Optional[int] = 64 * 1024**2,
+        ttl: Optional[float] = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize ResultCache.
+
+        Args:
+            max_entries: Maximum number of cached results (0 disables)
+            max_bytes: Maximum total size of cached DataFrames (None = no limit)
+            ttl: Seconds an entry stays valid (None = no expiry)
+            clock: Time source, injectable for tests
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[pd.DataFrame, float, int]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        normalized_query: str, filters: Optional[Dict[str, Any]], top_k: int
+    ) -> Tuple[str, str, int]:
+        """Build the cache key for a request."""
+        return normalized_query, canonical_filters(filters), int(top_k)
+
+    def _check_version(self, version: Optional[str]) -> None:
+        """Drop everything when the index version changed (lock held)."""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove one entry (lock held)."""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(
+        self, key: Hashable, version: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from :meth:`make_key`
+            version: Current index version; a change invalidates the cache
+
+        Returns:
+            A copy of the cached DataFrame, or None on a miss
+        """
+        results = self._lookup(key, version)
+        if results is None:
+            return None
+
+        hit = results.copy()
+        hit.attrs = dict(results.attrs, cache="hit")
+        return hit
+
+    def _lookup(self, key: Hashable, version: Optional[str]) -> Any:
+        """Live stored value for ``key`` or None, counting the lookup."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at, _ = entry
+            if self.ttl is not None and self._clock() - stored_at > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(
+        self, key: Hashable, results: pd.DataFrame, version: Optional[str] = None
+    ) -> None:
+        """
+        Store a result, evicting least-recently-used entries over budget.
+
+        Args:
+            key: Key from :meth:`make_key`
+            results: Result DataFrame (a copy is stored)
+            version: Index version the result was computed against
+        """
+        if self.max_entries <= 0:
+            return
+
+        stored = results.copy()
+        stored.attrs = dict(results.attrs)
+        size = int(stored.memory_usage(index=True, deep=True).sum())
+        self._insert(key, stored, size, version)
+
+    def _insert(
+        self, key: Hashable, value: Any, size: int, version: Optional[str]
+    ) -> None:
+        """Store a value of ``size`` bytes and evict over budget."""
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, self._clock(), size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class SemanticCache(ResultCache):
+    """
+    Near-duplicate tier keyed on the L2-normalized TF-IDF query vector.
+
+    A lookup first tries the exact vector, then the most similar cached
+    vector with the same filters and top_k whose cosine similarity reaches
+    ``threshold``. Near hits return the cached candidate list; callers
+    re-score it with the new vector.
+    """
+
+    def __init__(self, threshold: float = 0.95, **kwargs: Any):
+        """
+        Initialize SemanticCache.
+
+        Args:
+            threshold: Minimum cosine similarity for a near-duplicate hit
+                (1.0 only reuses identical vectors)
+            **kwargs: Budget, TTL and clock, as for ResultCache
+        """
+        super().__init__(**kwargs)
+        self.threshold = threshold
+        self._vectors: Dict[Hashable, Dict[int, float]] = {}
+        self.near_hits = 0
+
+    @staticmethod
+    def vector_terms(query_vec: spmatrix) -> Dict[int, float]:
+        """Sparse query vector as a {term: weight} dict."""
+        terms, weights = InvertedIndex.query_terms(query_vec)
+        return dict(zip(terms.tolist(), weights.tolist()))
+
+    @staticmethod
+    def make_vector_key(
+        query_vec: spmatrix, filters: Optional[Dict[str, Any]], top_k: int
+    ) -> Tuple[str, str, int]:
+        """Build the cache key for a vectorized request."""
+        terms, weights = InvertedIndex.query_terms(query_vec)
+        digest = hashlib.sha1(terms.tobytes() + weights.tobytes()).hexdigest()
+        return digest, canonical_filters(filters), int(top_k)
+
+    def _check_version(self, version: Optional[str]) -> None:
+        if version != self._version:
+            self._vectors.clear()
+        super()._check_version(version)
+
+    def _drop(self, key: Hashable) -> None:
+        super()._drop(key)
+        self._vectors.pop(key, None)
+
+    def _nearest(
+        self, key: Tuple[str, str, int], terms: Dict[int, float]
+    ) -> Tuple[Optional[Hashable], float]:
+        """Most similar live entry for the same filters and top_k (lock held)."""
+        best_key, best_similarity = None, 0.0
+        now = self._clock()
+        for other, other_terms in self._vectors.items():
+            if other[1:] != key[1:]:
+                continue
+            if self.ttl is not None and now - self._entries[other][1] > self.ttl:
+                continue
+            # Both vectors are L2-normalized, so the dot product is the cosine
+            small, large = sorted((terms, other_terms), key=len)
+            similarity = sum(w * large.get(t, 0.0) for t, w in small.items())
+            if similarity > best_similarity:
+                best_key, best_similarity = other, similarity
+        return best_key, best_similarity
+
+    def lookup(
+        self,
+        query_vec: spmatrix,
+        filters: Optional[Dict[str, Any]],
+        top_k: int,
+        version: Optional[str] = None,
+    ) -> Optional[Tuple[pd.DataFrame, float]]:
+        """
+        Find a cached result for an identical or near-duplicate vector.
+
+        Args:
+            query_vec: 1 x n_terms L2-normalized query vector
+            filters: Filter dict of the request
+            top_k: Number of results requested
+            version: Current index version; a change invalidates the cache
+
+        Returns:
+            Tuple of (cached results copy, cosine similarity), where the
+            similarity is exactly 1.0 for an identical vector, or None
+        """
+        key = self.make_vector_key(query_vec, filters, top_k)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and (
+                self.ttl is not None and self._clock() - entry[1] > self.ttl
+            ):
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is not None:
+                similarity = 1.0
+                self.hits += 1
+            else:
+                terms = self.vector_terms(query_vec)
+                key, similarity = self._nearest(key, terms) if terms else (None, 0)
+                if key is None or similarity < self.threshold:
+                    self.misses += 1
+                    return None
+                entry = self._entries[key]
+                self.near_hits += 1
+            self._entries.move_to_end(key)
+
+        results = entry[0]
+        hit = results.copy()
+        hit.attrs = dict(results.attrs, cache="semantic")
+        return hit, similarity
+
+    def store(
+        self,
+        query_vec: spmatrix,
+        filters: Optional[Dict[str, Any]],
+        top_k: int,
+        results: pd.DataFrame,
+        version: Optional[str] = None,
+    ) -> None:
+        """
+        Cache the results computed for a query vector.
+
+        Args:
+            query_vec: 1 x n_terms L2-normalized query vector
+            filters: Filter dict of the request
+            top_k: Number of results requested
+            results: Result DataFrame (a copy is stored)
+            version: Index version the result was computed against
+        """
+        key = self.make_vector_key(query_vec, filters, top_k)
+        terms = self.vector_terms(query_vec)
+        self.put(key, results, version)
+        with self._lock:
+            if key in self._entries:
+                self._vectors[key] = terms
+
+    def stats(self) -> Dict[str, Any]:
+        """Exact-vector and near-duplicate hit counters, reported separately."""
+        stats = super().stats()
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            stats.update(
+                {
+                    "near_hits": self.near_hits,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "near_hit_rate": self.near_hits / lookups if lookups else 0.0,
+                }
+            )
+        return stats
+
+
+class DocumentCache(ResultCache):
+    """
+    Analyzed documents (pasted resumes) keyed on a hash of their text.
+
+    Holds the TF-IDF vector of each document, so re-running a document
+    with other filters or another top_k skips cleaning and vectorization.
+    Budget, TTL and version handling are those of ResultCache.
+    """
+
+    @staticmethod
+    def make_document_key(text: str) -> str:
+        """Content hash of a raw document."""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Optional[csr_matrix]:
+        """
+        Look up a document vector.
+
+        Args:
+            key: Key from :meth:`make_document_key`
+            version: Current index version; a change invalidates the cache
+
+        Returns:
+            The cached 1 x n_terms vector (shared, do not modify), or None
+        """
+        return self._lookup(key, version)
+
+    def put(
+        self, key: Hashable, query_vec: spmatrix, version: Optional[str] = None
+    ) -> None:
+        """
+        Store a document vector.
+
+        Args:
+            key: Key from :meth:`make_document_key`
+            query_vec: 1 x n_terms TF-IDF vector of the document
+            version: Index version (vectorizer) the vector was computed with
+        """
+        if self.max_entries <= 0:
+            return
+
+        stored = csr_matrix(query_vec, copy=True)
+        size = stored.data.nbytes + stored.indices.nbytes + stored.indptr.nbytes
+        self._insert(key, stored, size, version)
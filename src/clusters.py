@@ -0,0 +1,273 @@
+"""
+Cluster-Pruned Search Module
+
+Approximate search over an IVF (inverted file) partition of the TF-IDF
+rows. At build time the L2-normalized rows are grouped into a few hundred
+cells by spherical k-means (cosine assignment, centroids re-normalized
+every iteration). The centroids and the rows of each cell are stored.
+
+At query time the query is compared with every centroid and only the rows
+of the ``nprobe`` most similar cells are scored, exactly, by the regular
+index. ``nprobe`` is the speed/recall dial: probing every cell gives the
+exact result. Rows added after the clusters were built (live ingest) are
+always scored, so new postings are never missed.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .index_bundle import read_bundle, write_bundle
+from .scoring import InvertedIndex, _concat_ranges
+
+CLUSTERS_NAME = "tfidf_clusters.bundle"
+
+# Cells built by vectorize.py and probed per approximate query by default
+N_CLUSTERS = 256
+NPROBE = 16
+
+# Rows sampled to fit the centroids (all rows are then assigned)
+FIT_SAMPLE = 20_000
+
+# Cost of scoring one row non-zero row-major, and fixed cost of walking one
+# query term's postings, both relative to one posting of the masked path
+SUBSET_COST = 0.05
+TERM_COST = 300.0
+
+# Rows compared with the centroids per dense similarity block
+_ASSIGN_BATCH = 8192
+
+
+def _normalize(centroids: np.ndarray) -> np.ndarray:
+    """L2-normalize centroid rows in place (empty rows stay zero)."""
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    np.divide(centroids, norms, out=centroids, where=norms > 0)
+    return centroids
+
+
+def assign_cells(
+    matrix: spmatrix, centroids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Most similar centroid of every row.
+
+    Returns:
+        Tuple of (cell ids, cosine similarity to the chosen centroid)
+    """
+    matrix = csr_matrix(matrix)
+    cells = np.empty(matrix.shape[0], dtype=np.int32)
+    best = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], _ASSIGN_BATCH):
+        sims = np.asarray(matrix[start : start + _ASSIGN_BATCH] @ centroids.T)
+        cells[start : start + len(sims)] = sims.argmax(axis=1)
+        best[start : start + len(sims)] = sims.max(axis=1)
+    return cells, best
+
+
+def spherical_kmeans(
+    matrix: spmatrix,
+    n_clusters: int = N_CLUSTERS,
+    n_iter: int = 10,
+    sample: int = FIT_SAMPLE,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    Fit unit-length centroids to the rows of a normalized sparse matrix.
+
+    Empty cells are re-seeded with the rows farthest from their centroid.
+
+    Args:
+        matrix: (n_docs, n_terms) TF-IDF matrix with L2-normalized rows
+        n_clusters: Number of cells (capped at the number of fitted rows)
+        n_iter: Assignment / update rounds
+        sample: Rows used for fitting (0 = all)
+        seed: Seed for sampling and initialization
+
+    Returns:
+        (n_clusters, n_terms) float32 centroids
+    """
+    rng = np.random.default_rng(seed)
+    matrix = csr_matrix(matrix, dtype=np.float32)
+    if sample and sample < matrix.shape[0]:
+        matrix = matrix[np.sort(rng.choice(matrix.shape[0], sample, replace=False))]
+    n_clusters = min(n_clusters, matrix.shape[0])
+
+    seeds = rng.choice(matrix.shape[0], n_clusters, replace=False)
+    centroids = _normalize(matrix[seeds].toarray())
+    for _ in range(n_iter):
+        cells, best = assign_cells(matrix, centroids)
+        members = csr_matrix(
+            (
+                np.ones(matrix.shape[0], dtype=np.float32),
+                (cells, np.arange(matrix.shape[0])),
+            ),
+            shape=(n_clusters, matrix.shape[0]),
+        )
+        centroids = _normalize(np.asarray((members @ matrix).todense()))
+
+        empty = np.flatnonzero(np.bincount(cells, minlength=n_clusters) == 0)
+        if len(empty):
+            farthest = np.argsort(best, kind="stable")[: len(empty)]
+            centroids[empty] = _normalize(matrix[farthest].toarray())
+    return centroids.astype(np.float32)
+
+
+class ClusterIndex:
+    """
+    Centroids and per-cell row lists of an IVF partition of the matrix rows.
+
+    ``cell_rows[cell_indptr[c]:cell_indptr[c + 1]]`` are the rows of cell
+    ``c``, ascending.
+    """
+
+    def __init__(self, centroids: np.ndarray, cells: np.ndarray):
+        """
+        Initialize ClusterIndex.
+
+        Args:
+            centroids: (n_clusters, n_terms) unit-length centroids
+            cells: Cell id of every matrix row
+        """
+        self.centroids = centroids
+        self.n_docs = len(cells)
+        order = np.argsort(cells, kind="stable")
+        self.cell_rows = order.astype(np.int32)
+        self.cell_indptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(cells, minlength=len(centroids)))]
+        ).astype(np.int64)
+
+    @classmethod
+    def build(
+        cls, matrix: spmatrix, n_clusters: int = N_CLUSTERS, **kwargs
+    ) -> "ClusterIndex":
+        """Fit centroids (see spherical_kmeans) and assign every row."""
+        centroids = spherical_kmeans(matrix, n_clusters, **kwargs)
+        cells, _ = assign_cells(matrix, centroids)
+        return cls(centroids, cells)
+
+    @property
+    def n_clusters(self) -> int:
+        """Number of cells."""
+        return len(self.centroids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the centroids and row lists."""
+        return self.centroids.nbytes + self.cell_rows.nbytes + self.cell_indptr.nbytes
+
+    def save(self, path: Path | str) -> None:
+        """Write the clusters as a memory-mappable bundle."""
+        write_bundle(
+            path,
+            {
+                "centroids": self.centroids,
+                "cell_rows": self.cell_rows,
+                "cell_indptr": self.cell_indptr,
+            },
+            {"n_clusters": self.n_clusters, "n_docs": self.n_docs},
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "ClusterIndex":
+        """Map clusters written by :meth:`save` (no copies)."""
+        arrays, metadata = read_bundle(path)
+        index = cls.__new__(cls)
+        index.centroids = arrays["centroids"]
+        index.cell_rows = arrays["cell_rows"]
+        index.cell_indptr = arrays["cell_indptr"]
+        index.n_docs = metadata["n_docs"]
+        return index
+
+    def probe(self, query_vec: spmatrix, nprobe: int = NPROBE) -> np.ndarray:
+        """
+        The ``nprobe`` cells whose centroids are most similar to the query.
+
+        Returns:
+            Cell ids, most similar first
+        """
+        query_vec = csr_matrix(query_vec)
+        sims = self.centroids[:, query_vec.indices] @ query_vec.data
+        nprobe = min(nprobe, self.n_clusters)
+        if nprobe < self.n_clusters:
+            top = np.argpartition(-sims, nprobe - 1)[:nprobe]
+        else:
+            top = np.arange(self.n_clusters)
+        return top[np.argsort(-sims[top], kind="stable")]
+
+    def rows(self, cells: np.ndarray) -> np.ndarray:
+        """Rows of the given cells, ascending."""
+        starts, ends = self.cell_indptr[cells], self.cell_indptr[cells + 1]
+        return np.sort(self.cell_rows[_concat_ranges(starts, ends)])
+
+    def probe_mask(self, query_vec: spmatrix, nprobe: int, n_docs: int) -> np.ndarray:
+        """
+        Row mask of the probed cells over ``n_docs`` rows.
+
+        Rows at or beyond the clustered ``n_docs`` (added later) are
+        always eligible.
+        """
+        mask = np.zeros(n_docs, dtype=bool)
+        mask[self.rows(self.probe(query_vec, nprobe))] = True
+        mask[self.n_docs :] = True
+        return mask
+
+    def search(
+        self,
+        index,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        nprobe: int = NPROBE,
+        pad: bool = True,
+        mask: Optional[np.ndarray] = None,
+        pool=None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-K: score only the rows of the probed cells.
+
+        The probed rows are scored exactly by ``index``, row-major or over
+        the postings with the probed rows as a mask, whichever the cost
+        model (``SUBSET_COST``, ``TERM_COST``) estimates as cheaper.
+
+        Args:
+            index: Scoring index (InvertedIndex interface) over the rows
+            query_vec: 1 x n_terms sparse query vector
+            top_k: Number of results to return
+            nprobe: Cells to score (the speed/recall dial)
+            pad: Fill up to ``top_k`` with zero-score probed rows
+            mask: Optional boolean row mask (filters, deletes)
+            pool: Optional ScoringPool for the postings path
+
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        probed = self.probe_mask(query_vec, nprobe, index.n_docs)
+        if mask is not None:
+            probed &= mask
+
+        terms, _ = InvertedIndex.query_terms(query_vec)
+        rows_cost = index.rows_nnz(np.flatnonzero(probed)) * SUBSET_COST
+        postings_cost = index.postings_length(terms) + TERM_COST * len(terms)
+        cheaper = rows_cost < postings_cost
+        return index.search(
+            query_vec,
+            top_k,
+            pad=pad,
+            strategy="subset" if cheaper else "auto",
+            mask=probed,
+            pool=pool,
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """Cell size distribution."""
+        sizes = np.diff(self.cell_indptr)
+        return {
+            "cells": self.n_clusters,
+            "rows": int(sizes.sum()),
+            "mean": float(sizes.mean()) if len(sizes) else 0.0,
+            "max": int(sizes.max()) if len(sizes) else 0,
+            "empty": int((sizes == 0).sum()),
+        }
@@ -0,0 +1,305 @@
+"""
+Compressed Postings Module
+
+Inverted index whose document ids are stored compressed. Each posting list
+is cut into blocks of ``PACK_SIZE`` postings. Inside a block, doc ids are
+delta-encoded (gap minus one) and bit-packed with the smallest bit width
+that holds the block's largest gap. One skip entry per block records its
+first and last doc id, byte offset, bit width and first posting, so a
+scan can jump straight to the blocks covering a doc-id range.
+
+Decoding works a block at a time and is fully vectorized: every gap is
+read as one unaligned 64-bit little-endian window, shifted and masked, and
+the gaps of each block are prefix-summed onto its first doc id. Weights stay float32
+and the block-max arrays are unchanged, so scores and rankings are
+bit-identical to :class:`~src.scoring.InvertedIndex` for every strategy.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Literal, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .scoring import BLOCK_SIZE, DocRange, InvertedIndex
+
+PostingsFormat = Literal["raw", "compressed"]
+
+# Postings per bit-packed block (one skip entry each)
+PACK_SIZE = 128
+
+# Bytes read per packed value (zero padding keeps the last window in bounds)
+_WINDOW = 8
+
+
+def pack_postings(
+    indptr: np.ndarray, doc_ids: np.ndarray, pack_size: int = PACK_SIZE
+) -> Dict[str, np.ndarray]:
+    """
+    Delta-encode and bit-pack sorted posting lists.
+
+    Args:
+        indptr: (n_terms + 1) posting offsets of each term
+        doc_ids: Doc ids, ascending inside each term's slice
+        pack_size: Postings per packed block
+
+    Returns:
+        Dict of arrays: ``packed`` (uint8 stream), per-block skip entries
+        ``block_first`` / ``block_last`` (doc ids), ``block_bytes`` (byte
+        offsets), ``block_widths`` (bits per gap) and ``block_starts``
+        (first posting), plus ``term_blocks`` (blocks of each term)
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    docs = np.asarray(doc_ids, dtype=np.int64)
+    lengths = np.diff(indptr)
+    n_term_blocks = -(-lengths // pack_size)
+    term_blocks = np.concatenate([[0], np.cumsum(n_term_blocks)]).astype(np.int64)
+
+    # First posting of every block: term start plus multiples of pack_size
+    block_term = np.repeat(np.arange(len(lengths)), n_term_blocks)
+    block_rank = np.arange(int(term_blocks[-1])) - term_blocks[block_term]
+    starts = indptr[block_term] + block_rank * pack_size
+    block_starts = np.append(starts, len(docs)).astype(np.int64)
+    counts = np.diff(block_starts)
+
+    gaps = np.zeros(len(docs), dtype=np.int64)
+    gaps[1:] = docs[1:] - docs[:-1] - 1
+    gaps[starts] = 0
+
+    if len(docs):
+        largest = np.maximum.reduceat(gaps, starts)
+    else:
+        largest = np.empty(0, dtype=np.int64)
+    widths = np.frexp(largest.astype(np.float64))[1].astype(np.uint8)
+    block_bytes = np.concatenate([[0], np.cumsum(-(-(counts * widths) // 8))]).astype(
+        np.int64
+    )
+
+    # Bit position of every gap, then set its bits one bit plane at a time
+    block_of = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(len(docs)) - block_starts[block_of]
+    width_of = widths[block_of].astype(np.int64)
+    positions = block_bytes[block_of] * 8 + within * width_of
+    bits = np.zeros(int(block_bytes[-1]) * 8, dtype=np.uint8)
+    for bit in range(int(widths.max()) if len(widths) else 0):
+        used = width_of > bit
+        bits[positions[used] + bit] = (gaps[used] >> bit) & 1
+    packed = np.concatenate(
+        [np.packbits(bits, bitorder="little"), np.zeros(_WINDOW, dtype=np.uint8)]
+    )
+
+    return {
+        "packed": packed,
+        "block_first": docs[starts].astype(np.int32),
+        "block_last": docs[block_starts[1:] - 1].astype(np.int32),
+        "block_bytes": block_bytes,
+        "block_widths": widths,
+        "block_starts": block_starts,
+        "term_blocks": term_blocks,
+    }
+
+
+def unpack_blocks(arrays: Dict[str, np.ndarray], blocks: np.ndarray) -> np.ndarray:
+    """
+    Decode the doc ids of packed blocks.
+
+    Args:
+        arrays: Output of :func:`pack_postings`
+        blocks: Block ids to decode
+
+    Returns:
+        int32 doc ids of the blocks, concatenated in the given block order
+    """
+    blocks = np.asarray(blocks, dtype=np.int64)
+    block_starts = arrays["block_starts"]
+    counts = block_starts[blocks + 1] - block_starts[blocks]
+    if len(blocks) == 0 or counts.sum() == 0:
+        return np.empty(0, dtype=np.int32)
+
+    # Per-block values are spread with repeat (sequential) rather than gathered
+    out_starts = np.cumsum(counts) - counts
+    widths = arrays["block_widths"][blocks].astype(np.int64)
+    positions = np.repeat(
+        arrays["block_bytes"][blocks] * 8 - out_starts * widths, counts
+    )
+    widths = np.repeat(widths, counts)
+    positions += np.arange(len(positions)) * widths
+
+    # Overlapping uint64 view with a one-byte stride: one gather per gap
+    packed = arrays["packed"]
+    words = np.ndarray(
+        shape=(len(packed) - _WINDOW + 1,),
+        dtype="<u8",
+        buffer=packed,
+        strides=(1,),
+    )
+    window = words[positions >> 3]
+    window >>= (positions & 7).astype(np.uint64)
+    window &= (np.uint64(1) << widths.astype(np.uint64)) - np.uint64(1)
+
+    # Prefix-sum gap + 1 per block, anchored on the block's first doc id
+    steps = window.astype(np.int64) + 1
+    steps[out_starts] = 0
+    docs = np.cumsum(steps)
+    docs += np.repeat(arrays["block_first"][blocks] - docs[out_starts], counts)
+    return docs.astype(np.int32)
+
+
+class CompressedIndex(InvertedIndex):
+    """
+    InvertedIndex with delta-encoded, bit-packed doc ids.
+
+    Drop-in replacement for :class:`~src.scoring.InvertedIndex`: posting
+    lists are decoded block-at-a-time where the exact index slices its
+    ``doc_ids`` array, and results are identical for every strategy.
+    """
+
+    def __init__(
+        self,
+        doc_matrix: spmatrix,
+        block_size: int = BLOCK_SIZE,
+        pack_size: int = PACK_SIZE,
+    ):
+        """
+        Build the inverted index and compress its doc ids.
+
+        Args:
+            doc_matrix: (n_docs, n_terms) TF-IDF matrix with L2-normalized rows
+            block_size: Number of doc ids per block-max entry
+            pack_size: Postings per bit-packed block
+        """
+        super().__init__(doc_matrix, block_size)
+        self.pack_size = pack_size
+        self.packed = pack_postings(self.indptr, self.doc_ids, pack_size)
+        del self.doc_ids
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Packed postings and impact arrays, for storage (see from_arrays)."""
+        arrays = {
+            "indptr": self.indptr,
+            "weights": self.weights,
+            "block_max_data": self.block_max.data,
+            "block_max_indices": self.block_max.indices,
+            "block_max_indptr": self.block_max.indptr,
+            "block_offsets": self.block_offsets,
+            "term_max": self.term_max,
+        }
+        arrays.update({f"packed_{name}": a for name, a in self.packed.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(
+        cls,
+        doc_matrix: csr_matrix,
+        arrays: Dict[str, np.ndarray],
+        block_size: int = BLOCK_SIZE,
+        pack_size: int = PACK_SIZE,
+    ) -> "CompressedIndex":
+        """
+        Wrap stored arrays (e.g. memory-mapped) without decoding or copying.
+
+        Args:
+            doc_matrix: Row-sorted CSR matrix the arrays were built from
+            arrays: Output of :meth:`to_arrays`
+            block_size: Block size the arrays were built with
+            pack_size: Postings per packed block the arrays were built with
+        """
+        index = cls.__new__(cls)
+        index.doc_matrix = doc_matrix
+        index.n_docs, index.n_terms = doc_matrix.shape
+        index.indptr = arrays["indptr"]
+        index.weights = arrays["weights"]
+        index.block_size = block_size
+        index.n_blocks = -(-index.n_docs // block_size)
+        index._wrap_impacts(arrays)
+        index.packed = {
+            name[len("packed_") :]: array
+            for name, array in arrays.items()
+            if name.startswith("packed_")
+        }
+        index.pack_size = pack_size
+        return index
+
+    @property
+    def doc_id_bytes(self) -> int:
+        """Memory used by the packed doc ids and their skip entries."""
+        return sum(array.nbytes for array in self.packed.values())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the postings and impact arrays."""
+        return (
+            self.indptr.nbytes
+            + self.doc_id_bytes
+            + self.weights.nbytes
+            + self.block_max.data.nbytes
+            + self.block_max.indices.nbytes
+            + self.block_max.indptr.nbytes
+            + self.block_offsets.nbytes
+            + self.term_max.nbytes
+        )
+
+    def term_blocks(
+        self, term: int, doc_range: Optional[DocRange] = None
+    ) -> np.ndarray:
+        """Packed blocks of a term, limited by skip entries to ``doc_range``."""
+        lo = int(self.packed["term_blocks"][term])
+        hi = int(self.packed["term_blocks"][term + 1])
+        if doc_range is not None and hi > lo:
+            # Skip blocks ending before the range and those starting after it
+            lo += int(np.searchsorted(self.packed["block_last"][lo:hi], doc_range[0]))
+            hi = lo + int(
+                np.searchsorted(self.packed["block_first"][lo:hi], doc_range[1])
+            )
+        return np.arange(lo, max(lo, hi))
+
+    def postings(
+        self, term: int, doc_range: Optional[DocRange] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decode (doc_ids, weights) for a single term.
+
+        With a ``doc_range`` only the blocks overlapping it are decoded.
+        """
+        blocks = self.term_blocks(term, doc_range)
+        docs = unpack_blocks(self.packed, blocks)
+        if len(blocks):
+            start = self.packed["block_starts"][blocks[0]]
+            weights = self.weights[start : start + len(docs)]
+        else:
+            weights = self.weights[:0]
+        if doc_range is not None:
+            lo, hi = np.searchsorted(docs, doc_range)
+            docs, weights = docs[lo:hi], weights[lo:hi]
+        return docs, weights
+
+    def docs_at(self, positions: np.ndarray) -> np.ndarray:
+        """Doc ids of the given posting positions (decodes their blocks)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int32)
+        block_starts = self.packed["block_starts"]
+        block_of = np.searchsorted(block_starts, positions, side="right") - 1
+        # One decode per run of equal blocks (a single run each when sorted)
+        new_run = np.ones(len(block_of), dtype=bool)
+        new_run[1:] = block_of[1:] != block_of[:-1]
+        blocks = block_of[new_run]
+        rank = np.cumsum(new_run) - 1
+        counts = block_starts[blocks + 1] - block_starts[blocks]
+        out_starts = np.cumsum(counts) - counts
+        docs = unpack_blocks(self.packed, blocks)
+        return docs[out_starts[rank] + positions - block_starts[block_of]]
+
+    def decode_all(self) -> np.ndarray:
+        """Doc ids of every posting, in posting order."""
+        return unpack_blocks(self.packed, np.arange(len(self.packed["block_first"])))
+
+    @property
+    def postings_matrix(self) -> csr_matrix:
+        """The postings as an (n_terms, n_docs) CSR matrix (decoded)."""
+        return csr_matrix(
+            (self.weights, self.decode_all(), self.indptr),
+            shape=(self.n_terms, self.n_docs),
+            copy=False,
+        )
@@ -0,0 +1,442 @@
+"""
+Filter Index Module
+
+Pre-computed per-value bitmaps over the indexed job rows. Filters passed to
+JobRecommender are evaluated against the (small) dictionary of distinct
+column values, the bitmaps of the matching values are OR-ed, and the
+per-filter masks are AND-ed, so scoring only runs over eligible rows.
+
+Matching mirrors ``JobRecommender._apply_filters`` (case-insensitive regex
+``contains`` for location / experience / industries / skills, exact
+lowercase match for work type, ``== 1`` for remote, inclusive salary range).
+Industries and skills hold comma-separated lists; like ``_apply_filters``,
+a pattern is matched against the whole string, so bitmaps and post-filters
+agree on patterns spanning items or anchored at the start. Location values ("City, ST") cover both city and state filters.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Filter key -> job_data column
+FILTER_COLUMNS = {
+    "location": "location",
+    "work_type": "formatted_work_type",
+    "experience_level": "formatted_experience_level",
+    "remote_allowed": "remote_allowed",
+    "industries": "industries",
+    "skills": "skills",
+}
+
+SALARY_COLUMN = "salary_median"
+
+# Listing age filter, answered by the (time-partitioned) index rather than
+# by bitmaps (see VectorStore.recent)
+RECENCY_FILTER = "posted_within_days"
+
+
+def _as_list(value: Any) -> List[str]:
+    """Normalize a str or list filter value to a list of strings."""
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def is_active(key: str, value: Any) -> bool:
+    """Whether a filter entry restricts results (same rules as _apply_filters)."""
+    if key in ("min_salary", "max_salary"):
+        return value is not None
+    return bool(value)
+
+
+class ColumnBitmaps:
+    """
+    Dictionary-encoded column with one compact bitmap per distinct value.
+
+    Each value picks the smaller of two containers (as in Roaring bitmaps):
+    a packed bit array of ``n_docs / 8`` bytes for frequent values, or a
+    sorted int32 array of row ids for rare ones.
+    """
+
+    def __init__(self, column: pd.Series):
+        """
+        Build bitmaps for a column.
+
+        Args:
+            column: Column values, one per indexed row
+        """
+        self.n_docs = len(column)
+        rows = np.arange(self.n_docs, dtype=np.int32)
+        codes, uniques = pd.factorize(column, use_na_sentinel=True)
+
+        # Forward index (row -> value code) lets later predicates probe only
+        # the rows that survived earlier ones
+        self.codes = codes.astype(np.int32)
+
+        valid = codes >= 0
+        codes, rows = codes[valid], rows[valid]
+
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        self.values = np.asarray(uniques, dtype=object)
+        self.counts = np.bincount(codes, minlength=len(uniques))
+
+        bitmap_bytes = -(-self.n_docs // 8)
+        bounds = np.concatenate([[0], np.cumsum(self.counts)])
+        self._containers: List[np.ndarray] = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            value_rows = rows[start:end]
+            if value_rows.nbytes > bitmap_bytes:
+                bits = np.zeros(self.n_docs, dtype=bool)
+                bits[value_rows] = True
+                self._containers.append(np.packbits(bits))
+            else:
+                self._containers.append(value_rows)
+
+    def with_rows(self, column: pd.Series) -> "ColumnBitmaps":
+        """
+        Copy of the bitmaps with ``column`` appended as new rows.
+
+        Only the containers of values held by the new rows are rebuilt and
+        unseen values extend the dictionary, so the cost depends on the
+        new rows rather than the indexed ones. Packed bitmaps of other
+        values are shared: ``mask`` zero-fills bits past their end.
+
+        Args:
+            column: Column values of the new rows
+
+        Returns:
+            Bitmaps over ``n_docs + len(column)`` rows, equal to a rebuild
+        """
+        rows = np.arange(len(column), dtype=np.int32)
+        values = column.reset_index(drop=True)
+        codes = pd.Index(self.values).get_indexer(values)
+        unseen = (codes < 0) & values.notna().to_numpy()
+        new_codes, uniques = pd.factorize(values[unseen])
+        codes[unseen] = new_codes + len(self.values)
+
+        out = copy.copy(self)
+        out.n_docs = self.n_docs + len(column)
+        out.values = np.concatenate([self.values, np.asarray(uniques, dtype=object)])
+        out.codes = np.concatenate([self.codes, codes.astype(np.int32)])
+
+        valid = codes >= 0
+        codes, rows = codes[valid], rows[valid] + self.n_docs
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        counts = np.bincount(codes, minlength=len(out.values))
+        out.counts = counts.copy()
+        out.counts[: len(self.counts)] += self.counts
+
+        out._containers = list(self._containers)
+        out._containers += [np.empty(0, dtype=np.int32)] * len(uniques)
+        bitmap_bytes = -(-out.n_docs // 8)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        for code in np.flatnonzero(counts):
+            value_rows = rows[bounds[code] : bounds[code + 1]]
+            container = out._containers[code]
+            if container.dtype != np.uint8:
+                value_rows = np.concatenate([container, value_rows])
+                if value_rows.nbytes <= bitmap_bytes:
+                    out._containers[code] = value_rows
+                    continue
+                container = np.empty(0, dtype=np.uint8)
+            # Set the new rows' bits (big-endian, as np.packbits) in a copy
+            bits = np.zeros(bitmap_bytes, dtype=np.uint8)
+            bits[: len(container)] = container
+            np.bitwise_or.at(
+                bits, value_rows >> 3, (0x80 >> (value_rows & 7)).astype(np.uint8)
+            )
+            out._containers[code] = bits
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the containers and forward codes."""
+        return sum(c.nbytes for c in self._containers) + self.codes.nbytes
+
+    def probe(self, matched: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Test only the given rows against the matched values.
+
+        Returns:
+            Boolean array aligned with ``rows``
+        """
+        # Code -1 (missing value) lands on the trailing False
+        return np.append(matched, False)[self.codes[rows]]
+
+    def mask(self, matched: np.ndarray) -> np.ndarray:
+        """
+        OR the bitmaps of the matched dictionary values.
+
+        Args:
+            matched: Boolean array aligned with ``values``
+
+        Returns:
+            Boolean row mask of length n_docs
+        """
+        out = np.zeros(self.n_docs, dtype=bool)
+        sparse = []
+        for i in np.flatnonzero(matched):
+            container = self._containers[i]
+            if container.dtype == np.uint8:
+                # Bitmaps packed before rows were appended are zero-filled
+                out |= np.unpackbits(container, count=self.n_docs).view(bool)
+            else:
+                sparse.append(container)
+        if sparse:
+            out[np.concatenate(sparse)] = True
+        return out
+
+    def contains(self, patterns: List[str]) -> np.ndarray:
+        """Values matching any pattern (case-insensitive regex contains)."""
+        return (
+            pd.Series(self.values, dtype=object)
+            .str.contains("|".join(patterns), case=False, na=False, regex=True)
+            .to_numpy(dtype=bool)
+        )
+
+    def equals_lower(self, targets: List[str]) -> np.ndarray:
+        """Values equal to any target, ignoring case."""
+        lowered = pd.Series(self.values, dtype=object).astype(str).str.lower()
+        return lowered.isin([t.lower() for t in targets]).to_numpy(dtype=bool)
+
+
+class SalaryIndex:
+    """Row ids sorted by salary for range predicates."""
+
+    def __init__(self, column: pd.Series):
+        salaries = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+        self.n_docs = len(salaries)
+        rows = np.flatnonzero(~np.isnan(salaries))
+        order = np.argsort(salaries[rows], kind="stable")
+        self.rows = rows[order].astype(np.int32)
+        self.sorted_values = salaries[rows][order]
+        self.values = salaries
+
+    def with_rows(self, column: pd.Series) -> "SalaryIndex":
+        """Copy of the index with ``column`` appended as new rows."""
+        salaries = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(salaries))
+        order = np.argsort(salaries[rows], kind="stable")
+        values = salaries[rows][order]
+
+        # New rows sort after indexed rows of equal salary, as in a rebuild
+        at = np.searchsorted(self.sorted_values, values, side="right")
+        out = copy.copy(self)
+        out.n_docs = self.n_docs + len(salaries)
+        out.rows = np.insert(
+            self.rows, at, (rows[order] + self.n_docs).astype(np.int32)
+        )
+        out.sorted_values = np.insert(self.sorted_values, at, values)
+        out.values = np.concatenate([self.values, salaries])
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes + self.sorted_values.nbytes + self.values.nbytes
+
+    def _range(
+        self, min_salary: Optional[float], max_salary: Optional[float]
+    ) -> Tuple[int, int]:
+        lo = 0
+        hi = len(self.sorted_values)
+        if min_salary is not None:
+            lo = np.searchsorted(self.sorted_values, min_salary, side="left")
+        if max_salary is not None:
+            hi = np.searchsorted(self.sorted_values, max_salary, side="right")
+        return int(lo), int(max(lo, hi))
+
+    def count(
+        self, min_salary: Optional[float] = None, max_salary: Optional[float] = None
+    ) -> int:
+        """Exact number of rows inside the range."""
+        lo, hi = self._range(min_salary, max_salary)
+        return hi - lo
+
+    def mask(
+        self, min_salary: Optional[float] = None, max_salary: Optional[float] = None
+    ) -> np.ndarray:
+        """Rows with a known salary inside the inclusive range."""
+        lo, hi = self._range(min_salary, max_salary)
+        out = np.zeros(self.n_docs, dtype=bool)
+        out[self.rows[lo:hi]] = True
+        return out
+
+    def probe(
+        self,
+        rows: np.ndarray,
+        min_salary: Optional[float] = None,
+        max_salary: Optional[float] = None,
+    ) -> np.ndarray:
+        """Test only the given rows against the range (NaN never passes)."""
+        values = self.values[rows]
+        keep = ~np.isnan(values)
+        if min_salary is not None:
+            keep &= values >= min_salary
+        if max_salary is not None:
+            keep &= values <= max_salary
+        return keep
+
+
+class FilterIndex:
+    """
+    Bitmap indexes for every filterable column of the indexed rows.
+
+    Row ``i`` corresponds to row ``i`` of the TF-IDF matrix, i.e. to
+    ``job_data.loc[sample_indices[i]]``.
+    """
+
+    def __init__(self, rows: pd.DataFrame):
+        """
+        Build the filter index.
+
+        Args:
+            rows: Job data aligned with the TF-IDF matrix rows
+        """
+        self.n_docs = len(rows)
+        self.columns: Dict[str, ColumnBitmaps] = {}
+        for key, column in FILTER_COLUMNS.items():
+            if column in rows.columns:
+                self.columns[key] = ColumnBitmaps(rows[column])
+
+        self.salary: Optional[SalaryIndex] = None
+        if SALARY_COLUMN in rows.columns:
+            self.salary = SalaryIndex(rows[SALARY_COLUMN])
+
+    def with_rows(self, rows: pd.DataFrame) -> "FilterIndex":
+        """
+        Copy of the index with ``rows`` appended (see add_jobs).
+
+        Equal to rebuilding over the indexed rows followed by ``rows``,
+        but only the new rows are encoded. Columns the new rows lack are
+        treated as missing values.
+
+        Args:
+            rows: Job data of the new TF-IDF rows, in row order
+
+        Returns:
+            Filter index over ``n_docs + len(rows)`` rows
+        """
+
+        def column(name: str) -> pd.Series:
+            if name in rows.columns:
+                return rows[name]
+            return pd.Series(np.nan, index=rows.index, dtype=object)
+
+        out = copy.copy(self)
+        out.n_docs = self.n_docs + len(rows)
+        out.columns = {
+            key: bitmaps.with_rows(column(FILTER_COLUMNS[key]))
+            for key, bitmaps in self.columns.items()
+        }
+        if self.salary is not None:
+            out.salary = self.salary.with_rows(column(SALARY_COLUMN))
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by all bitmaps."""
+        total = sum(c.nbytes for c in self.columns.values())
+        return total + (self.salary.nbytes if self.salary is not None else 0)
+
+    def supports(self, key: str) -> bool:
+        """Whether a filter key can be answered from the index."""
+        if key in ("min_salary", "max_salary"):
+            return self.salary is not None
+        return key in self.columns
+
+    def dictionary_size(self, key: str) -> int:
+        """Number of distinct values a predicate is evaluated against."""
+        if key in ("min_salary", "max_salary"):
+            return 1
+        return len(self.columns[key].values)
+
+    def match(self, key: str, value: Any) -> Optional[np.ndarray]:
+        """
+        Evaluate a filter entry against the column dictionary.
+
+        Returns:
+            Boolean array aligned with the column's distinct values, or
+            None for salary ranges (answered from the sorted salaries)
+        """
+        if key in ("min_salary", "max_salary"):
+            return None
+
+        column = self.columns[key]
+        if key == "remote_allowed":
+            return (
+                pd.to_numeric(
+                    pd.Series(column.values, dtype=object), errors="coerce"
+                ).to_numpy()
+                == 1
+            )
+        if key == "work_type":
+            return column.equals_lower(_as_list(value))
+        return column.contains(_as_list(value))
+
+    def count(self, key: str, value: Any, matched: Optional[np.ndarray] = None) -> int:
+        """Exact number of rows passing a filter entry."""
+        if key in ("min_salary", "max_salary"):
+            return self.salary.count(**{key: value})
+        if matched is None:
+            matched = self.match(key, value)
+        return int(self.columns[key].counts[matched].sum())
+
+    def predicate_mask(
+        self, key: str, value: Any, matched: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Row mask for a single (supported, active) filter entry."""
+        if key in ("min_salary", "max_salary"):
+            return self.salary.mask(**{key: value})
+        if matched is None:
+            matched = self.match(key, value)
+        return self.columns[key].mask(matched)
+
+    def probe(
+        self,
+        key: str,
+        value: Any,
+        rows: np.ndarray,
+        matched: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Test only ``rows`` against a filter entry.
+
+        Returns:
+            Boolean array aligned with ``rows``
+        """
+        if key in ("min_salary", "max_salary"):
+            return self.salary.probe(rows, **{key: value})
+        if matched is None:
+            matched = self.match(key, value)
+        return self.columns[key].probe(matched, rows)
+
+    def evaluate(
+        self, filters: Dict[str, Any]
+    ) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Intersect the bitmaps of all supported filters.
+
+        Args:
+            filters: Filter dict as accepted by get_recommendations
+
+        Returns:
+            Tuple of (mask, residual) where mask is None when no filter
+            applied and residual holds active filters the index cannot answer
+        """
+        mask: Optional[np.ndarray] = None
+        residual: Dict[str, Any] = {}
+        for key, value in filters.items():
+            if not is_active(key, value):
+                continue
+            if not self.supports(key):
+                residual[key] = value
+                continue
+            predicate = self.predicate_mask(key, value)
+            mask = predicate if mask is None else mask & predicate
+        return mask, residual
@@ -0,0 +1,259 @@
+"""
+Index Bundle Module
+
+Versioned single-file format for the TF-IDF index. The vectorizer's
+vocabulary, idf and analyzer settings (see QueryVectorizer), the CSR arrays of the matrix, the postings and
+block-max arrays of the inverted index and the row -> job mapping are
+stored as raw, 64-byte aligned arrays behind a small JSON header. Postings
+doc ids are stored either raw or bit-packed (see src/compressed.py).
+
+Opening a bundle maps the file with ``numpy.memmap`` and wraps the arrays
+without copying them, so loading is independent of the index size and
+processes on the same host share the page cache instead of each holding
+a private copy.
+
+Layout::
+
+    magic (8 bytes) | version (uint32) | header length (uint32) | JSON header
+    | padding | array 0 | padding | array 1 | ...
+
+Array offsets in the header are relative to the first aligned byte after
+the header.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .compressed import PACK_SIZE, CompressedIndex, PostingsFormat
+from .query_vectorizer import QueryVectorizer
+from .scoring import InvertedIndex
+
+BUNDLE_NAME = "tfidf_index.bundle"
+BUNDLE_MAGIC = b"DSRSIDX\x00"
+BUNDLE_VERSION = 2
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(
+    path: Path | str, arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]
+) -> None:
+    """
+    Write named arrays and JSON metadata to a bundle file.
+
+    The file is written next to ``path`` and renamed into place, so readers
+    never map a partially written bundle.
+
+    Args:
+        path: Destination file
+        arrays: Arrays to store (written in C order, native little-endian)
+        metadata: JSON-serializable metadata
+    """
+    path = Path(path)
+    table = {}
+    offset = 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.byteorder == ">":
+            array = array.astype(array.dtype.newbyteorder("<"))
+        contiguous[name] = array
+        table[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({"arrays": table, "metadata": metadata}, sort_keys=True).encode(
+        "utf-8"
+    )
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header)))
+        f.write(header)
+        for name, array in contiguous.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def read_bundle(path: Path | str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Map a bundle file.
+
+    Returns:
+        Tuple of (arrays, metadata); arrays are read-only views of one
+        ``numpy.memmap`` of the file
+
+    Raises:
+        ValueError: If the file is not a bundle or has an unknown version
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not an index bundle.")
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not an index bundle.")
+        if version != BUNDLE_VERSION:
+            raise ValueError(
+                f"{path} has bundle version {version}, expected {BUNDLE_VERSION}. "
+                "Re-run src/vectorize.py to rebuild it."
+            )
+        header = json.loads(f.read(header_length).decode("utf-8"))
+
+    data_start = _aligned(_PREAMBLE.size + header_length)
+    mapped = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = data_start + spec["offset"]
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = (
+            mapped[start : start + count * dtype.itemsize]
+            .view(dtype)
+            .reshape(spec["shape"])
+        )
+    return arrays, header["metadata"]
+
+
+def _encode_terms(terms: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate UTF-8 terms into (bytes, offsets) arrays."""
+    encoded = [term.encode("utf-8") for term in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(term) for term in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_terms(term_bytes: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Inverse of the vocabulary encoding; terms in feature-index order."""
+    raw = term_bytes.tobytes()
+    return [
+        raw[start:end].decode("utf-8")
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+
+
+def write_tfidf_bundle(
+    path: Path | str,
+    vectorizer,
+    tfidf_matrix: spmatrix,
+    sample_indices: Sequence[int],
+    postings: PostingsFormat = "raw",
+) -> None:
+    """
+    Write the fitted vectorizer, TF-IDF matrix and inverted index as a bundle.
+
+    Args:
+        path: Destination file (conventionally ``models/tfidf_index.bundle``)
+        vectorizer: Fitted TfidfVectorizer (or QueryVectorizer)
+        tfidf_matrix: (n_docs, n_terms) TF-IDF matrix
+        sample_indices: job_data index label of every matrix row
+        postings: "raw" doc id arrays or "compressed" (delta-encoded,
+            bit-packed blocks with skip entries)
+
+    Raises:
+        ValueError: If ``postings`` is not a known format
+    """
+    if postings not in ("raw", "compressed"):
+        raise ValueError(f"Unknown postings format: {postings!r}")
+    if not isinstance(vectorizer, QueryVectorizer):
+        vectorizer = QueryVectorizer.from_fitted(vectorizer)
+    index = (
+        CompressedIndex(tfidf_matrix)
+        if postings == "compressed"
+        else InvertedIndex(tfidf_matrix)
+    )
+    matrix = index.doc_matrix
+
+    # One index dtype for indices and indptr, so scipy wraps them uncopied
+    index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+    term_bytes, term_offsets = _encode_terms(vectorizer.get_feature_names_out())
+
+    arrays = {
+        "vocabulary_bytes": term_bytes,
+        "vocabulary_offsets": term_offsets,
+        "idf": (
+            vectorizer.idf_
+            if vectorizer.idf_ is not None
+            else np.empty(0, dtype=vectorizer.dtype)
+        ),
+        "matrix_data": matrix.data.astype(np.float32, copy=False),
+        "matrix_indices": matrix.indices.astype(index_dtype, copy=False),
+        "matrix_indptr": matrix.indptr.astype(index_dtype, copy=False),
+        "row_job_ids": np.asarray(sample_indices, dtype=np.int64),
+    }
+    arrays.update(
+        {f"postings_{name}": array for name, array in index.to_arrays().items()}
+    )
+    metadata = {
+        "shape": list(matrix.shape),
+        "block_size": index.block_size,
+        "postings_format": postings,
+        "pack_size": getattr(index, "pack_size", None),
+        "use_idf": vectorizer.idf_ is not None,
+        "vectorizer": vectorizer.get_params(),
+    }
+    write_bundle(path, arrays, metadata)
+
+
+def load_vectorizer(
+    arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]
+) -> QueryVectorizer:
+    """Rebuild the query vectorizer from bundled vocabulary, idf and settings."""
+    terms = decode_terms(arrays["vocabulary_bytes"], arrays["vocabulary_offsets"])
+    idf = np.array(arrays["idf"]) if metadata["use_idf"] else None
+    return QueryVectorizer(terms, idf, **metadata["vectorizer"])
+
+
+def load_tfidf_bundle(path: Path | str):
+    """
+    Open a TF-IDF bundle.
+
+    Returns:
+        Tuple of (vectorizer, tfidf_matrix, inverted_index, row_job_ids);
+        the matrix, postings and row -> job ids are memory-mapped. The
+        index is a CompressedIndex for bundles with compressed postings.
+    """
+    arrays, metadata = read_bundle(path)
+    matrix = csr_matrix(
+        (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]),
+        shape=tuple(metadata["shape"]),
+        copy=False,
+    )
+    matrix.has_sorted_indices = True
+
+    postings = {
+        name[len("postings_") :]: array
+        for name, array in arrays.items()
+        if name.startswith("postings_")
+    }
+    # Bundles written before compressed postings have no format entry
+    if metadata.get("postings_format", "raw") == "compressed":
+        index = CompressedIndex.from_arrays(
+            matrix,
+            postings,
+            metadata["block_size"],
+            metadata.get("pack_size", PACK_SIZE),
+        )
+    else:
+        index = InvertedIndex.from_arrays(matrix, postings, metadata["block_size"])
+    return load_vectorizer(arrays, metadata), matrix, index, arrays["row_job_ids"]
@@ -0,0 +1,175 @@
+"""
+Index Evaluation Module
+
+Compare an approximate index (quantized, pruned, ...) with the exact one on
+replayed queries: recall@k and NDCG@k of the approximate top-k against the
+exact top-k, query latency and index memory. Relevance for NDCG is the
+exact cosine score, so a substitute of equal score costs nothing.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import spmatrix
+
+QUERY_LOG = Path("logs") / "query_history.json"
+
+
+def load_query_log(path: Path | str = QUERY_LOG) -> List[str]:
+    """
+    Distinct non-empty queries of the app's query history, in log order.
+
+    Returns:
+        List of query strings (empty if the log does not exist)
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    queries = (str(entry.get("query") or "").strip() for entry in entries)
+    return list(dict.fromkeys(query for query in queries if query))
+
+
+def replay_queries(
+    store, path: Path | str = QUERY_LOG, n_queries: int = 500, seed: int = 0
+) -> List[str]:
+    """
+    Logged queries, topped up with sampled job titles to ``n_queries``.
+
+    The app's log holds few distinct queries; titles of indexed jobs are
+    realistic stand-ins for the rest.
+
+    Args:
+        store: VectorStore with job data and sample indices loaded
+        path: Query history JSON written by the app
+        n_queries: Number of queries wanted
+        seed: Seed for sampling titles
+    """
+    titles = None
+    if store.job_data is not None:
+        titles = store.job_rows(store.sample_indices)["title"]
+    return replay_titles(titles, path, n_queries, seed)
+
+
+def replay_titles(
+    titles: Optional[pd.Series],
+    path: Path | str = QUERY_LOG,
+    n_queries: int = 500,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Logged queries, topped up with titles sampled from ``titles``.
+
+    Same as replay_queries for callers without a VectorStore (e.g. the
+    build pipeline, which holds the sampled jobs as a DataFrame).
+    """
+    queries = load_query_log(path)[:n_queries]
+    missing = n_queries - len(queries)
+    if missing > 0 and titles is not None:
+        titles = titles.dropna()
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(len(titles), size=min(missing, len(titles)), replace=False)
+        queries += titles.iloc[np.sort(picks)].astype(str).tolist()
+    return queries
+
+
+def recall_at_k(expected: np.ndarray, actual: np.ndarray, k: int) -> float:
+    """Fraction of the exact top-k that the approximate top-k contains."""
+    expected = expected[:k]
+    if len(expected) == 0:
+        return 1.0
+    return len(np.intersect1d(expected, actual[:k])) / len(expected)
+
+
+def ndcg_at_k(ideal_scores: np.ndarray, actual_scores: np.ndarray, k: int) -> float:
+    """
+    NDCG@k with the exact scores as graded relevance.
+
+    Args:
+        ideal_scores: Exact scores of the exact top-k, descending
+        actual_scores: Exact scores of the approximate top-k, in its order
+        k: Cutoff
+
+    Returns:
+        DCG of the approximate ranking over DCG of the exact one
+    """
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal = float(np.dot(ideal_scores[:k], discounts[: len(ideal_scores[:k])]))
+    if ideal == 0.0:
+        return 1.0
+    actual = float(np.dot(actual_scores[:k], discounts[: len(actual_scores[:k])]))
+    return actual / ideal
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    samples_ms = np.asarray(samples) * 1000
+    return {
+        "mean": float(samples_ms.mean()) if len(samples_ms) else 0.0,
+        "p50": float(np.percentile(samples_ms, 50)) if len(samples_ms) else 0.0,
+        "p95": float(np.percentile(samples_ms, 95)) if len(samples_ms) else 0.0,
+    }
+
+
+def compare_indexes(
+    reference,
+    candidate,
+    query_vecs: Sequence[spmatrix],
+    ks: Sequence[int] = (10, 20),
+) -> Dict[str, Any]:
+    """
+    Quality and cost of ``candidate`` relative to ``reference``.
+
+    Args:
+        reference: Exact index (InvertedIndex interface)
+        candidate: Index under test (same interface)
+        query_vecs: Vectorized queries
+        ks: Cutoffs for recall and NDCG
+
+    Returns:
+        Dict with ``recall@k`` / ``ndcg@k`` means, latencies (ms) of both
+        indexes, and their memory in bytes
+    """
+    top_k = max(ks)
+    quality = {f"{name}@{k}": [] for k in ks for name in ("recall", "ndcg")}
+    reference_times, candidate_times = [], []
+
+    for query_vec in query_vecs:
+        start = time.perf_counter()
+        expected, ideal = reference.search(query_vec, top_k, pad=False)
+        reference_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual, _ = candidate.search(query_vec, top_k, pad=False)
+        candidate_times.append(time.perf_counter() - start)
+
+        if len(expected) == 0:
+            continue
+        # Gains are the exact scores of the candidate's hits
+        scored, scores = reference.score_subset(query_vec, np.sort(actual))
+        lookup = dict(zip(scored.tolist(), scores.tolist()))
+        gains = np.array([lookup.get(row, 0.0) for row in actual.tolist()])
+        for k in ks:
+            quality[f"recall@{k}"].append(recall_at_k(expected, actual, k))
+            quality[f"ndcg@{k}"].append(ndcg_at_k(ideal, gains, k))
+
+    report = {
+        name: float(np.mean(values)) if values else 1.0
+        for name, values in quality.items()
+    }
+    report.update(
+        {
+            "queries": len(query_vecs),
+            "reference_ms": _percentiles(reference_times),
+            "candidate_ms": _percentiles(candidate_times),
+            "reference_bytes": int(reference.nbytes),
+            "candidate_bytes": int(candidate.nbytes),
+        }
+    )
+    return report
@@ -0,0 +1,174 @@
+"""
+Long Query Module
+
+Faster scoring of long queries (pasted resumes, whole job descriptions).
+A query vector with hundreds of non-zeros walks the postings of every
+term, yet most of its score mass sits in a few high-weight terms.
+
+Queries with more than ``min_nnz`` non-zeros keep only their
+highest-weight terms, up to ``max_terms`` and/or until the kept terms
+hold ``weight_share`` of the query's squared weight (its L2 mass). The
+pruned query selects ``rerank`` candidates through the regular index,
+and the candidates are re-scored exactly with the full query (row-major
+dot products), so the returned scores are exact cosines. Only a
+document that the pruned query ranks below the candidate cut can be
+missed. ``rerank=0`` returns the pruned query's scores directly.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .scoring import Strategy, pad_with_unscored, select_top_k
+
+# Queries with more non-zeros than this use long-query mode
+LONG_QUERY_NNZ = 48
+
+# Query terms kept, and share of the query's squared weight they may hold
+MAX_QUERY_TERMS = 64
+WEIGHT_SHARE = 0.85
+
+# Candidates from the pruned query re-scored with the full query; whole
+# documents (JobRecommender.match_document) mix several topics and are
+# re-ranked deeper
+LONG_QUERY_RERANK = 200
+DOCUMENT_RERANK = 400
+
+
+def prune_query(
+    query_vec: spmatrix,
+    max_terms: Optional[int] = MAX_QUERY_TERMS,
+    weight_share: Optional[float] = None,
+) -> csr_matrix:
+    """
+    Keep a query's highest-weight terms.
+
+    Terms are taken by descending weight (ties by ascending term id) until
+    ``max_terms`` are kept or the kept terms reach ``weight_share`` of the
+    squared weight, whichever comes first. Weights are not re-normalized.
+
+    Args:
+        query_vec: 1 x n_terms sparse query vector
+        max_terms: Term budget (None = no budget)
+        weight_share: Share of squared weight to keep, in (0, 1]
+            (None = no share limit)
+
+    Returns:
+        1 x n_terms CSR vector with sorted indices
+
+    Raises:
+        ValueError: If ``weight_share`` is out of range
+    """
+    if weight_share is not None and not 0 < weight_share <= 1:
+        raise ValueError(f"weight_share must be in (0, 1], got {weight_share}")
+
+    query_vec = csr_matrix(query_vec)
+    terms, weights = query_vec.indices, query_vec.data
+    order = np.lexsort((terms, -np.abs(weights)))
+    keep = len(order)
+    if max_terms is not None:
+        keep = min(keep, max_terms)
+    if weight_share is not None and keep:
+        mass = np.cumsum(weights[order].astype(np.float64) ** 2)
+        keep = min(keep, int(np.searchsorted(mass, weight_share * mass[-1])) + 1)
+
+    kept = np.sort(order[:keep])
+    return csr_matrix(
+        (weights[kept], terms[kept], np.array([0, keep])),
+        shape=query_vec.shape,
+        dtype=query_vec.dtype,
+    )
+
+
+class LongQueryPolicy:
+    """
+    When and how long queries are pruned (see module docstring).
+
+    Shared by VectorStore.search_vector and QueryPlanner.execute; only
+    "auto" strategy searches are affected.
+    """
+
+    def __init__(
+        self,
+        min_nnz: int = LONG_QUERY_NNZ,
+        max_terms: Optional[int] = MAX_QUERY_TERMS,
+        weight_share: Optional[float] = WEIGHT_SHARE,
+        rerank: int = LONG_QUERY_RERANK,
+    ):
+        """
+        Initialize LongQueryPolicy.
+
+        Args:
+            min_nnz: Queries with more non-zeros are pruned
+            max_terms: Query terms kept (None = no budget)
+            weight_share: Share of squared query weight kept (None = no
+                share limit)
+            rerank: Candidates re-scored with the full query (0 = return
+                the pruned query's scores)
+
+        Raises:
+            ValueError: If neither limit is set
+        """
+        if max_terms is None and weight_share is None:
+            raise ValueError("Set max_terms, weight_share or both.")
+        self.min_nnz = min_nnz
+        self.max_terms = max_terms
+        self.weight_share = weight_share
+        self.rerank = rerank
+
+    def applies(self, query_vec: spmatrix) -> bool:
+        """Whether the query is long enough to be pruned."""
+        return query_vec.nnz > self.min_nnz
+
+    def prune(self, query_vec: spmatrix) -> csr_matrix:
+        """The query restricted to its kept terms (see prune_query)."""
+        return prune_query(query_vec, self.max_terms, self.weight_share)
+
+    def search(
+        self,
+        index,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        pool=None,
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Top-K of a long query: pruned candidate search, exact re-rank.
+
+        Args:
+            index: Scoring index (InvertedIndex interface)
+            query_vec: 1 x n_terms sparse query vector
+            top_k: Number of results to return
+            pad: Fill up to ``top_k`` with zero-score documents
+            strategy: Strategy of the candidate search
+            mask: Optional boolean row mask (filters, deletes)
+            pool: Optional ScoringPool for the candidate search
+
+        Returns:
+            Tuple of (indices, similarities, stats) where stats holds the
+            query terms before and after pruning and the candidates
+            re-scored
+        """
+        pruned = self.prune(query_vec)
+        depth = max(top_k, self.rerank)
+        indices, scores = index.search(
+            pruned, depth, pad=False, strategy=strategy, mask=mask, pool=pool
+        )
+        stats = {"terms": int(query_vec.nnz), "kept_terms": int(pruned.nnz)}
+        if self.rerank:
+            stats["reranked"] = len(indices)
+            candidates, exact = index.score_subset(query_vec, np.sort(indices))
+            indices, scores = select_top_k(candidates, exact, top_k)
+        else:
+            indices, scores = indices[:top_k], scores[:top_k]
+        if pad:
+            # Tombstoned and out-of-window rows never pad the results
+            indices, scores = pad_with_unscored(
+                indices, scores, top_k, index.n_docs, mask=index.eligible(mask)
+            )
+        return indices, scores, stats
@@ -0,0 +1,307 @@
+"""
+LSA Dense Search Module
+
+Dense semantic mode without downloaded models: a TruncatedSVD projection
+(latent semantic analysis) of the TF-IDF matrix, fitted at build time.
+Every TF-IDF row is projected to ``dims`` dimensions and L2-normalized,
+and the rows are stored as one contiguous float32 matrix, or as int8
+codes with one scale per dimension (4x smaller).
+
+A query is projected the same way (a gather of its terms' projection
+rows) and scored against all rows with a single matrix-vector product;
+batches of queries use one matrix-matrix product per block. Scores are
+cosines in the latent space, so results differ from exact TF-IDF by
+design: related terms match even without shared words.
+scripts/compare_lsa.py reports latency, memory and overlap@k against the
+exact index.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .index_bundle import read_bundle, write_bundle
+from .scoring import BATCH_MAX_NNZ, pad_with_unscored, select_top_k
+
+LSA_NAME = "tfidf_lsa.bundle"
+
+# Latent dimensions fitted by vectorize.py
+LSA_DIMS = 256
+
+LsaCodes = Literal["float32", "int8"]
+
+# Rows dequantized per int8 block (keeps the float32 temporary in cache)
+_INT8_BLOCK = 1024
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def fit_projection(
+    matrix: spmatrix, dims: int = LSA_DIMS, n_iter: int = 5, seed: int = 42
+) -> Tuple[np.ndarray, float]:
+    """
+    Fit a truncated SVD of the TF-IDF matrix.
+
+    Args:
+        matrix: (n_docs, n_terms) TF-IDF matrix
+        dims: Latent dimensions (capped below the number of terms)
+        n_iter: Randomized SVD power iterations
+        seed: Random state
+
+    Returns:
+        Tuple of ((n_terms, dims) float32 projection, explained variance
+        ratio)
+    """
+    # Build-time only: the query path does not import scikit-learn
+    from sklearn.decomposition import TruncatedSVD
+
+    dims = min(dims, matrix.shape[1] - 1)
+    svd = TruncatedSVD(dims, algorithm="randomized", n_iter=n_iter, random_state=seed)
+    svd.fit(matrix)
+    projection = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+    return projection, float(svd.explained_variance_ratio_.sum())
+
+
+class LsaIndex:
+    """
+    Latent-space row vectors scored by dense products.
+
+    ``vectors`` are the float32 rows or their int8 codes; row ``i`` is
+    ``vectors[i] * scales``. Rows added after the build (live ingest) are
+    projected into a small float32 ``tail``.
+    """
+
+    def __init__(
+        self,
+        projection: np.ndarray,
+        doc_matrix: spmatrix,
+        codes: LsaCodes = "float32",
+        explained_variance: float = 0.0,
+    ):
+        """
+        Project and encode the rows.
+
+        Args:
+            projection: (n_terms, dims) projection from fit_projection
+            doc_matrix: (n_docs, n_terms) TF-IDF matrix
+            codes: "float32" or "int8" row storage
+            explained_variance: Variance ratio kept by the projection
+
+        Raises:
+            ValueError: If ``codes`` is not supported
+        """
+        if codes not in ("float32", "int8"):
+            raise ValueError(f"Unsupported code type: {codes!r}")
+
+        self.projection = projection
+        self.code_type = codes
+        self.explained_variance = explained_variance
+        vectors = self.project(doc_matrix)
+        if codes == "int8":
+            peak = np.abs(vectors).max(axis=0)
+            self.scales = np.where(peak > 0, peak / 127, 1).astype(np.float32)
+            self.vectors = np.rint(vectors / self.scales).astype(np.int8)
+        else:
+            self.scales = np.ones(self.dims, dtype=np.float32)
+            self.vectors = vectors
+        self.tail = np.empty((0, self.dims), dtype=np.float32)
+
+    @classmethod
+    def build(
+        cls,
+        doc_matrix: spmatrix,
+        dims: int = LSA_DIMS,
+        codes: LsaCodes = "float32",
+        **kwargs,
+    ) -> "LsaIndex":
+        """Fit the projection (see fit_projection) and encode every row."""
+        projection, explained = fit_projection(doc_matrix, dims, **kwargs)
+        return cls(projection, doc_matrix, codes, explained)
+
+    @property
+    def dims(self) -> int:
+        """Latent dimensions."""
+        return self.projection.shape[1]
+
+    @property
+    def n_docs(self) -> int:
+        """Scored rows, including ingested ones."""
+        return len(self.vectors) + len(self.tail)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the projection and row vectors."""
+        return (
+            self.projection.nbytes
+            + self.vectors.nbytes
+            + self.scales.nbytes
+            + self.tail.nbytes
+        )
+
+    def project(self, matrix: spmatrix) -> np.ndarray:
+        """
+        L2-normalized latent vectors of TF-IDF rows (queries or documents).
+
+        Returns:
+            (n_rows, dims) float32 array
+        """
+        projected = np.asarray(csr_matrix(matrix) @ self.projection, dtype=np.float32)
+        return _normalize_rows(np.ascontiguousarray(projected))
+
+    def with_rows(self, doc_matrix: spmatrix) -> "LsaIndex":
+        """
+        A copy that also scores ``doc_matrix``'s rows (appended after the
+        existing ones). The stored vectors are shared, not copied.
+        """
+        extended = self.__class__.__new__(self.__class__)
+        extended.__dict__.update(self.__dict__)
+        extended.tail = np.concatenate([self.tail, self.project(doc_matrix)])
+        return extended
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Cosines of projected queries with every row.
+
+        Args:
+            queries: (n_queries, dims) output of :meth:`project`
+
+        Returns:
+            (n_queries, n_docs) float32 scores
+        """
+        weighted = queries * self.scales
+        if self.code_type == "int8":
+            head = np.empty((len(queries), len(self.vectors)), dtype=np.float32)
+            for start in range(0, len(self.vectors), _INT8_BLOCK):
+                block = self.vectors[start : start + _INT8_BLOCK].astype(np.float32)
+                head[:, start : start + len(block)] = weighted @ block.T
+        else:
+            head = weighted @ self.vectors.T
+        if len(self.tail) == 0:
+            return head
+        return np.concatenate([head, queries @ self.tail.T], axis=1)
+
+    def _top_k(
+        self,
+        query: np.ndarray,
+        scores: np.ndarray,
+        top_k: int,
+        pad: bool,
+        mask: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-K of one query's scores over the eligible rows."""
+        if mask is not None:
+            mask = mask[: self.n_docs]
+        if not query.any():
+            ids, row_scores = np.empty(0, dtype=np.int64), np.empty(0)
+        elif mask is None:
+            ids, row_scores = select_top_k(np.arange(self.n_docs), scores, top_k)
+        else:
+            eligible = np.flatnonzero(mask)
+            ids, row_scores = select_top_k(eligible, scores[eligible], top_k)
+        row_scores = row_scores.astype(np.float64)
+        if pad:
+            return pad_with_unscored(ids, row_scores, top_k, self.n_docs, mask)
+        return ids, row_scores
+
+    def search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K rows by latent-space cosine (one matrix-vector product).
+
+        Args:
+            query_vec: 1 x n_terms TF-IDF query vector
+            top_k: Number of results to return
+            pad: Fill up to ``top_k`` with zero-score rows when the query
+                has no known terms
+            mask: Optional boolean row mask (filters, deletes)
+
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        query = self.project(query_vec)
+        scores = self.similarities(query)[0]
+        return self._top_k(query[0], scores, top_k, pad, mask)
+
+    def search_batch(
+        self,
+        query_matrix: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Top-K for many queries with one matrix product per block.
+
+        Args:
+            query_matrix: (n_queries, n_terms) TF-IDF query vectors
+            top_k: Number of results per query
+            pad: As in :meth:`search`
+            max_block_nnz: Upper bound on scores held per block
+            mask: Optional boolean row mask shared by all queries
+
+        Returns:
+            List of (indices, similarities) tuples, one per query row
+        """
+        queries = self.project(query_matrix)
+        block = max(1, max_block_nnz // max(1, self.n_docs))
+        results = []
+        for start in range(0, len(queries), block):
+            chunk = queries[start : start + block]
+            for query, scores in zip(chunk, self.similarities(chunk)):
+                results.append(self._top_k(query, scores, top_k, pad, mask))
+        return results
+
+    def save(self, path: Path | str) -> None:
+        """Write the projection and row vectors as a memory-mappable bundle."""
+        write_bundle(
+            path,
+            {
+                "projection": self.projection,
+                "vectors": self.vectors,
+                "scales": self.scales,
+            },
+            {
+                "dims": self.dims,
+                "codes": self.code_type,
+                "n_docs": len(self.vectors),
+                "explained_variance": self.explained_variance,
+            },
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "LsaIndex":
+        """Map an index written by :meth:`save` (no copies)."""
+        arrays, metadata = read_bundle(path)
+        index = cls.__new__(cls)
+        index.projection = arrays["projection"]
+        index.vectors = arrays["vectors"]
+        index.scales = arrays["scales"]
+        index.code_type = metadata["codes"]
+        index.explained_variance = metadata["explained_variance"]
+        index.tail = np.empty((0, index.dims), dtype=np.float32)
+        return index
+
+    def stats(self) -> Dict[str, float]:
+        """Dimensions, storage and explained variance."""
+        return {
+            "dims": self.dims,
+            "codes": self.code_type,
+            "rows": self.n_docs,
+            "mb": self.nbytes / 1024**2,
+            "explained_variance": self.explained_variance,
+        }
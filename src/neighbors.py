@@ -0,0 +1,168 @@
+"""
+Nearest-Neighbor Table Module
+
+Offline job-to-job top-k table for "similar jobs". Every indexed row is
+used as a query against the whole index (its stored TF-IDF row, so the
+job text is never re-vectorized), in blocks of rows scored with one
+sparse matrix product each (see InvertedIndex.search_batch). With a
+ScoringPool the blocks run on its threads, since scipy's sparse products
+release the GIL. The k best other rows and their scores are stored as
+two compact (n_docs, k) arrays, so serving a row's neighbors is an O(k)
+lookup.
+
+Rows added after the build (live ingest) and requests for more than k
+neighbors are answered on demand from the stored row (see
+VectorStore.similar_rows).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .index_bundle import read_bundle, write_bundle
+from .scoring import BATCH_MAX_NNZ, ScoringPool
+
+NEIGHBORS_NAME = "tfidf_neighbors.bundle"
+
+# Neighbors stored per row (the app shows up to 20)
+NEIGHBORS_K = 20
+
+# Rows used as queries per build step
+BUILD_BLOCK_ROWS = 4096
+
+
+class NeighborTable:
+    """
+    Top-k neighbors of every row, best first.
+
+    ``ids[row]`` are row ids (-1 past the row's last neighbor) and
+    ``scores[row]`` their float32 cosines. A row is never its own neighbor.
+    """
+
+    def __init__(self, ids: np.ndarray, scores: np.ndarray):
+        """
+        Initialize NeighborTable.
+
+        Args:
+            ids: (n_docs, k) int32 neighbor rows, -1 padded
+            scores: (n_docs, k) float32 scores aligned with ``ids``
+        """
+        self.ids = ids
+        self.scores = scores
+
+    @classmethod
+    def build(
+        cls,
+        index,
+        doc_matrix: spmatrix,
+        k: int = NEIGHBORS_K,
+        block_rows: int = BUILD_BLOCK_ROWS,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+        pool: Optional[ScoringPool] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> "NeighborTable":
+        """
+        Score every row against the index and keep its k best other rows.
+
+        Args:
+            index: Scoring index (InvertedIndex interface) over the rows
+            doc_matrix: (n_docs, n_terms) TF-IDF rows indexed by ``index``
+            k: Neighbors kept per row
+            block_rows: Rows used as queries per step
+            max_block_nnz: Memory bound of the sparse products in flight
+                (split between the pool's workers)
+            pool: Optional ScoringPool scoring blocks concurrently
+            progress: Optional callback(rows_done, n_docs) after each step
+
+        Returns:
+            NeighborTable over the rows of ``doc_matrix``
+        """
+        doc_matrix = csr_matrix(doc_matrix)
+        n_docs = doc_matrix.shape[0]
+        ids = np.full((n_docs, k), -1, dtype=np.int32)
+        scores = np.zeros((n_docs, k), dtype=np.float32)
+
+        workers = pool.workers if pool is not None else 1
+        block_nnz = max(1, max_block_nnz // workers)
+
+        def fill(start: int) -> None:
+            # Blocks write disjoint rows of the output arrays
+            block = doc_matrix[start : start + block_rows]
+            hits = index.search_batch(block, k + 1, pad=False, max_block_nnz=block_nnz)
+            for row, (neighbors, row_scores) in enumerate(hits, start):
+                keep = neighbors != row
+                neighbors, row_scores = neighbors[keep][:k], row_scores[keep][:k]
+                ids[row, : len(neighbors)] = neighbors
+                scores[row, : len(neighbors)] = row_scores
+
+        starts = list(range(0, n_docs, block_rows))
+        for wave in range(0, len(starts), workers):
+            batch = starts[wave : wave + workers]
+            if pool is not None:
+                pool.map(fill, batch)
+            else:
+                fill(batch[0])
+            if progress is not None:
+                progress(min(batch[-1] + block_rows, n_docs), n_docs)
+        return cls(ids, scores)
+
+    @property
+    def n_docs(self) -> int:
+        """Rows covered by the table."""
+        return self.ids.shape[0]
+
+    @property
+    def k(self) -> int:
+        """Neighbors stored per row."""
+        return self.ids.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the table."""
+        return self.ids.nbytes + self.scores.nbytes
+
+    def lookup(
+        self, row: int, top_k: int, mask: Optional[np.ndarray] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stored neighbors of ``row``, restricted to eligible rows.
+
+        Args:
+            row: Row id
+            top_k: Number of neighbors wanted
+            mask: Optional boolean row mask (deletes, filters)
+
+        Returns:
+            Tuple of (indices, similarities), or None when the table cannot
+            answer exactly: the row was added after the build, or more
+            neighbors are needed than the table holds for it
+        """
+        if row >= self.n_docs or top_k > self.k:
+            return None
+        ids, scores = self.ids[row], self.scores[row]
+        valid = ids >= 0
+        complete = not valid[-1]
+        if mask is not None:
+            valid &= mask[np.maximum(ids, 0)]
+        ids, scores = ids[valid], scores[valid]
+        if len(ids) < top_k and not complete:
+            return None
+        return ids[:top_k].astype(np.int64), scores[:top_k].astype(np.float64)
+
+    def save(self, path: Path | str) -> None:
+        """Write the table as a memory-mappable bundle."""
+        write_bundle(
+            path,
+            {"ids": self.ids, "scores": self.scores},
+            {"n_docs": self.n_docs, "k": self.k},
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "NeighborTable":
+        """Map a table written by :meth:`save` (no copies)."""
+        arrays, _ = read_bundle(path)
+        return cls(arrays["ids"], arrays["scores"])
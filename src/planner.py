@@ -0,0 +1,445 @@
+"""
+Filter Query Planner
+
+Decides, per request, how a filtered TF-IDF query is executed:
+
+- predicates are ordered by estimated cost and selectivity, taken from the
+  per-value counts precomputed by FilterIndex, so the most restrictive
+  cheap predicate runs first and later ones only probe surviving rows;
+- a predicate whose dictionary is expensive to scan (e.g. thousands of
+  locations) is instead applied to ranked candidate windows when the
+  learned pass rate says few candidates are needed (FilterPassRates);
+- scoring either walks the postings of the query terms and masks the
+  candidates ("postfilter"), or scores only the eligible rows directly
+  ("prefilter"), whichever touches fewer non-zeros; long queries on
+  postfilter plans are pruned to their top terms and re-ranked exactly
+  (see long_query.py).
+
+Every plan records its estimated and actual costs for inspection.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import spmatrix
+
+from .filters import FilterIndex, is_active
+from .long_query import LongQueryPolicy
+from .scoring import InvertedIndex, ScoringPool
+
+# Cost units are "one posting / non-zero touched"
+DICTIONARY_COST = 20.0  # testing one distinct value (regex or equality)
+MASK_COST = 0.125  # per row to materialize and AND one packed bitmap
+PROBE_COST = 1.0  # per surviving row probed through the forward index
+
+ROW_FILTER_COST = 120.0  # per candidate row materialized and post-filtered
+
+# Post-filter pass-rate learning (see FilterPassRates)
+PRIOR_PASS_RATE = 1 / 12  # the old fixed top_k * 12 over-fetch
+PRIOR_WEIGHT = 24  # pseudo-candidates backing the prior
+MAX_MULTIPLIER = 200.0
+SAVE_EVERY = 20  # updates between writes of the JSON file
+
+# Candidate windows for post-filters: the first window is sized from the
+# learned pass rate (with slack) and grows geometrically until top_k pass
+DEEPENING_SLACK = 1.25
+DEEPENING_GROWTH = 2
+DEEPENING_MAX_ROWS = 4000  # beyond this, finish with bitmaps instead
+
+
+class QueryPlanner:
+    """
+    Cost-based planner for filtered queries.
+
+    Uses the FilterIndex for selectivity estimates and the InvertedIndex
+    for scoring costs (postings lengths and average row length).
+    """
+
+    def __init__(
+        self,
+        filter_index: FilterIndex,
+        inverted_index: InvertedIndex,
+        pool: Optional[ScoringPool] = None,
+        long_query: Optional[LongQueryPolicy] = None,
+    ):
+        """
+        Initialize QueryPlanner.
+
+        Args:
+            filter_index: Bitmap indexes over the indexed rows
+            inverted_index: Scoring engine over the same rows
+            pool: Optional ScoringPool for intra-query parallel search
+            long_query: Optional pruning of long queries on postfilter plans
+        """
+        self.filter_index = filter_index
+        self.inverted_index = inverted_index
+        self.pool = pool
+        self.long_query = long_query
+        self.n_docs = inverted_index.n_docs
+        self.avg_row_nnz = inverted_index.nnz / max(1, self.n_docs)
+
+    def _order_predicates(self, predicates: List[Dict[str, Any]]) -> None:
+        """
+        Sort predicates by rank = cost / (1 - selectivity), ascending.
+
+        This is the classic optimal order for independent, short-circuiting
+        filters: cheap predicates that remove many rows go first.
+        """
+
+        def rank(predicate: Dict[str, Any]) -> float:
+            removed = 1.0 - predicate["selectivity"]
+            return predicate["dictionary_cost"] / removed if removed > 0 else np.inf
+
+        predicates.sort(key=rank)
+
+    def plan(
+        self,
+        filters: Dict[str, Any],
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pass_rates: Optional["FilterPassRates"] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build an execution plan for a filtered query.
+
+        Args:
+            filters: Filter dict as accepted by get_recommendations
+            query_vec: Vectorized query (1 x n_terms)
+            top_k: Number of results wanted
+            pass_rates: Learned post-filter pass rates; when given, costly
+                dictionary scans may be replaced by windowed post-filtering
+
+        Returns:
+            Plan dict with the chosen ``strategy``, ordered bitmap
+            ``predicates``, ``residual`` filters left for post-filtering and
+            ``estimated`` costs; ``actual`` is filled in by :meth:`execute`
+        """
+        predicates: List[Dict[str, Any]] = []
+        postfilters: List[Dict[str, Any]] = []
+        residual: Dict[str, Any] = {}
+        supported: List[Tuple[str, Any, float]] = []
+        for key, value in (filters or {}).items():
+            if not is_active(key, value):
+                continue
+            if not self.filter_index.supports(key):
+                residual[key] = value
+                postfilters.append({"filter": key, "value": value, "cost": None})
+                continue
+            dictionary_cost = self.filter_index.dictionary_size(key) * DICTIONARY_COST
+            supported.append((key, value, dictionary_cost))
+
+        # Defer the costliest dictionary scans to windowed post-filtering.
+        # All residual filters share one window, sized from the pass rate of
+        # their combination (the key _deepen learns), so the largest set
+        # whose window is cheaper than each scan it replaces is deferred.
+        supported.sort(key=lambda item: -item[2])
+        deferred, window_cost = 0, None
+        for count in range(len(supported) if pass_rates is not None else 0, 0, -1):
+            combination = dict(residual)
+            combination.update((k, v) for k, v, _ in supported[:count])
+            multiplier = pass_rates.multiplier(FilterPassRates.key(combination))
+            cost = top_k * multiplier * DEEPENING_SLACK * ROW_FILTER_COST
+            if cost < supported[count - 1][2]:
+                deferred, window_cost = count, cost
+                break
+        for key, value, _ in supported[:deferred]:
+            residual[key] = value
+            postfilters.append({"filter": key, "value": value, "cost": window_cost})
+
+        for key, value, dictionary_cost in supported[deferred:]:
+            matched = self.filter_index.match(key, value)
+            rows = self.filter_index.count(key, value, matched)
+            predicates.append(
+                {
+                    "filter": key,
+                    "value": value,
+                    "estimated_rows": rows,
+                    "selectivity": rows / max(1, self.n_docs),
+                    "dictionary_cost": dictionary_cost,
+                    "_matched": matched,
+                }
+            )
+        self._order_predicates(predicates)
+
+        # Independence assumption for the combined selectivity
+        survivors = float(self.n_docs)
+        filter_cost = 0.0
+        for i, predicate in enumerate(predicates):
+            row_cost = self.n_docs * MASK_COST if i == 0 else survivors * PROBE_COST
+            predicate["cost"] = predicate["dictionary_cost"] + row_cost
+            filter_cost += predicate["cost"]
+            survivors *= predicate["selectivity"]
+
+        terms, _ = self.inverted_index.query_terms(query_vec)
+        postfilter_cost = float(self.inverted_index.postings_length(terms))
+        prefilter_cost = survivors * self.avg_row_nnz
+
+        if not predicates and not residual:
+            strategy = "unfiltered"
+        elif predicates and prefilter_cost < postfilter_cost:
+            strategy = "prefilter"
+        else:
+            strategy = "postfilter"
+
+        return {
+            "strategy": strategy,
+            "predicates": predicates,
+            "postfilters": postfilters,
+            "residual": residual,
+            "estimated": {
+                "eligible_rows": int(round(survivors)),
+                "filter_cost": filter_cost,
+                "prefilter_cost": prefilter_cost,
+                "postfilter_cost": postfilter_cost,
+            },
+            "actual": {},
+        }
+
+    def filter_rows(self, plan: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Evaluate the plan's predicates in order.
+
+        The first predicate materializes its bitmap; later ones probe only
+        the surviving rows when the column has a forward index. Evaluation
+        stops as soon as no row survives.
+
+        Returns:
+            Boolean row mask, or None when the plan has no predicates
+        """
+        mask: Optional[np.ndarray] = None
+        cost = 0.0
+        evaluated = 0
+        for predicate in plan["predicates"]:
+            key, value = predicate["filter"], predicate["value"]
+            matched = predicate.pop("_matched", None)
+            cost += predicate["dictionary_cost"]
+            evaluated += 1
+
+            if mask is None:
+                mask = self.filter_index.predicate_mask(key, value, matched)
+                cost += self.n_docs * MASK_COST
+            else:
+                rows = np.flatnonzero(mask)
+                keep = None
+                if len(rows) * PROBE_COST < self.n_docs * MASK_COST:
+                    keep = self.filter_index.probe(key, value, rows, matched)
+                if keep is None:
+                    mask &= self.filter_index.predicate_mask(key, value, matched)
+                    cost += self.n_docs * MASK_COST
+                else:
+                    mask[rows[~keep]] = False
+                    cost += len(rows) * PROBE_COST
+
+            if not mask.any():
+                break
+
+        # Drop dictionary matches of predicates skipped by the early exit
+        for predicate in plan["predicates"]:
+            predicate.pop("_matched", None)
+
+        plan["actual"]["predicates_evaluated"] = evaluated
+        plan["actual"]["filter_cost"] = cost
+        return mask
+
+    def _record(
+        self,
+        plan: Dict[str, Any],
+        query_vec: spmatrix,
+        mask: Optional[np.ndarray],
+        timings: Tuple[float, float, float],
+    ) -> None:
+        """Store actual eligible rows, scoring cost and timings in the plan."""
+        if plan["strategy"] == "prefilter":
+            score_cost = self.inverted_index.rows_nnz(np.flatnonzero(mask))
+        else:
+            terms, _ = self.inverted_index.query_terms(query_vec)
+            score_cost = self.inverted_index.postings_length(terms)
+
+        start, filtered, done = timings
+        plan["actual"].update(
+            {
+                "eligible_rows": (
+                    self.n_docs if mask is None else int(np.count_nonzero(mask))
+                ),
+                "score_cost": float(score_cost),
+                "filter_ms": (filtered - start) * 1000,
+                "score_ms": (done - filtered) * 1000,
+            }
+        )
+
+    def execute(
+        self,
+        plan: Dict[str, Any],
+        query_vec: spmatrix,
+        top_k: int,
+        long_query: Optional[LongQueryPolicy] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run a plan: evaluate predicates, then score with the chosen strategy.
+
+        Args:
+            plan: Plan returned by :meth:`plan` (updated in place)
+            query_vec: Vectorized query
+            top_k: Number of results to return
+            long_query: Long-query policy for this call (default: the
+                planner's)
+
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        if long_query is None:
+            long_query = self.long_query
+        start = time.perf_counter()
+        mask = self.filter_rows(plan)
+        filtered = time.perf_counter()
+
+        if plan["strategy"] == "prefilter":
+            indices, scores = self.inverted_index.search(
+                query_vec, top_k, strategy="subset", mask=mask, pool=self.pool
+            )
+        elif long_query is not None and long_query.applies(query_vec):
+            indices, scores, plan["actual"]["long_query"] = long_query.search(
+                self.inverted_index, query_vec, top_k, mask=mask, pool=self.pool
+            )
+        else:
+            indices, scores = self.inverted_index.search(
+                query_vec, top_k, mask=mask, pool=self.pool
+            )
+
+        self._record(plan, query_vec, mask, (start, filtered, time.perf_counter()))
+        return indices, scores
+
+    def score_candidates(
+        self, plan: Dict[str, Any], query_vec: spmatrix
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Run a plan but keep every eligible candidate's score.
+
+        Used when residual filters must be applied to ranked windows: the
+        scores are computed once and windows are cut from them.
+
+        Returns:
+            Tuple of (candidate ids, scores, eligibility mask or None)
+        """
+        start = time.perf_counter()
+        mask = self.filter_rows(plan)
+        filtered = time.perf_counter()
+
+        if plan["strategy"] == "prefilter":
+            candidates, scores = self.inverted_index.score_subset(
+                query_vec, np.flatnonzero(mask)
+            )
+        else:
+            candidates, scores = self.inverted_index.score(query_vec, mask=mask)
+
+        self._record(plan, query_vec, mask, (start, filtered, time.perf_counter()))
+        return candidates, scores, mask
+
+
+class FilterPassRates:
+    """
+    Learned pass rates of post-filters, per filter combination.
+
+    The rate for a combination of residual filter keys is the fraction of
+    ranked candidates that survived ``_apply_filters``, smoothed towards
+    the old fixed 1/12 over-fetch so unseen combinations start there.
+    Counts are persisted as JSON and shared by all sessions of a process.
+    """
+
+    def __init__(self, path: Optional[Path | str] = None):
+        """
+        Initialize FilterPassRates.
+
+        Args:
+            path: JSON file to load from and persist to (None = memory only)
+        """
+        self.path = Path(path) if path is not None else None
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.load()
+
+    @staticmethod
+    def key(filters: Dict[str, Any]) -> str:
+        """Canonical name of a filter combination (sorted active keys)."""
+        return "+".join(sorted(k for k, v in filters.items() if is_active(k, v)))
+
+    def pass_rate(self, key: str) -> float:
+        """Smoothed fraction of candidates passing the combination."""
+        with self._lock:
+            stats = self.counts.get(key, {"seen": 0, "passed": 0})
+        return (stats["passed"] + PRIOR_PASS_RATE * PRIOR_WEIGHT) / (
+            stats["seen"] + PRIOR_WEIGHT
+        )
+
+    def multiplier(self, key: str) -> float:
+        """Candidates to fetch per wanted result."""
+        return float(np.clip(1.0 / self.pass_rate(key), 1.0, MAX_MULTIPLIER))
+
+    def update(self, key: str, seen: int, passed: int) -> None:
+        """Record one post-filtered window and persist periodically."""
+        with self._lock:
+            stats = self.counts.setdefault(key, {"seen": 0, "passed": 0})
+            stats["seen"] += int(seen)
+            stats["passed"] += int(passed)
+            self._pending += 1
+            flush = self._pending >= SAVE_EVERY
+        if flush:
+            self.save()
+
+    def load(self) -> None:
+        """Load persisted counts; a missing or unreadable file counts as empty."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                counts = json.load(f)
+            if not isinstance(counts, dict):
+                raise ValueError("expected a JSON object")
+        except (OSError, ValueError) as err:
+            print(f"⚠️ Ignoring unreadable filter pass rates {self.path}: {err}")
+            return
+        with self._lock:
+            self.counts = counts
+
+    def save(self) -> None:
+        """
+        Atomically write the counts to ``path``.
+
+        Runs on the query thread every SAVE_EVERY updates, so write errors
+        are reported and the counts kept in memory for the next attempt.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            snapshot = json.dumps(self.counts, indent=2, sort_keys=True)
+            self._pending = 0
+        tmp_path = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique per writer: concurrent saves never share a temp file
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.path.parent,
+                prefix=self.path.name + ".",
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                tmp_path = f.name
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            print(f"⚠️ Could not save filter pass rates to {self.path}: {err}")
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
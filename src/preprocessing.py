@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import re
 import unicodedata
-from typing import Iterable, Optional, Tuple
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
 
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
 _WORD_PATTERN = re.compile(r"[^a-z0-9\s]+")
 _HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
@@ -343,6 +345,9 @@ def build_vectorizer(
     corpus: Iterable[str], *, max_features: int = 5000
 ) -> Tuple[TfidfVectorizer, object]:
     """Fit a TF-IDF vectorizer on the provided corpus."""
+    # Imported here so the query path never loads scikit-learn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     corpus_list = list(corpus)
     has_content = any(isinstance(text, str) and text.strip() for text in corpus_list)
     if not has_content:
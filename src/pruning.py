@@ -0,0 +1,128 @@
+"""
+Static Index Pruning Module
+
+Build-time removal of low-impact postings from the TF-IDF matrix, so the
+stored matrix, inverted index and bundle shrink to a target size. Most of
+the 5,000 features (and their bigrams) have long tails of tiny weights
+that almost never reach a top-20 result.
+
+Two policies are offered:
+
+- ``"term"`` (term-centric, after Carmel et al.): a posting's impact is
+  its weight relative to the ``top_k``-th largest weight of its term. One
+  global impact threshold is chosen so that ``keep`` of all postings
+  survive. The best ``top_k`` postings of every term survive whenever the
+  target size allows it.
+- ``"document"`` (document-centric): every row keeps its highest-weight
+  ``keep`` fraction of terms (at least one).
+
+Surviving weights are not re-normalized, so a pruned score never exceeds
+the exact cosine. ``pruning_report`` measures recall@k / NDCG@k of the
+pruned index against the unpruned one (see src/index_eval.py).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Literal, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .index_eval import compare_indexes
+from .scoring import InvertedIndex
+
+PruneMethod = Literal["term", "document"]
+
+# Results per term protected by term-centric pruning (the app shows 20)
+PRUNE_TOP_K = 20
+
+
+def _ranks(groups: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Rank of every entry inside its group by descending weight (0 = best)."""
+    order = np.lexsort((-weights, groups))
+    sorted_groups = groups[order]
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order)) - group_start
+    return ranks
+
+
+def prune_matrix(
+    matrix: spmatrix,
+    keep: float,
+    method: PruneMethod = "term",
+    top_k: int = PRUNE_TOP_K,
+) -> csr_matrix:
+    """
+    Drop low-impact postings to about ``keep`` of the matrix's non-zeros.
+
+    Args:
+        matrix: (n_docs, n_terms) TF-IDF matrix with L2-normalized rows
+        keep: Fraction of postings to keep, in (0, 1]
+        method: "term" (relative to each term's top-k weight) or
+            "document" (each row's strongest terms)
+        top_k: Term-centric reference rank (ignored for "document")
+
+    Returns:
+        Pruned CSR matrix of the same shape and dtype
+
+    Raises:
+        ValueError: If ``keep`` or ``method`` is out of range
+    """
+    if not 0 < keep <= 1:
+        raise ValueError(f"keep must be in (0, 1], got {keep}")
+    if method not in ("term", "document"):
+        raise ValueError(f"Unknown pruning method: {method!r}")
+
+    coo = csr_matrix(matrix).tocoo()
+    rows, cols, weights = coo.row, coo.col, coo.data
+    if keep == 1 or coo.nnz == 0:
+        return csr_matrix(matrix, copy=True)
+
+    if method == "document":
+        row_nnz = np.bincount(rows, minlength=coo.shape[0])
+        quota = np.maximum(1, np.ceil(keep * row_nnz)).astype(np.int64)
+        survive = _ranks(rows, weights) < quota[rows]
+    else:
+        ranks = _ranks(cols, weights)
+        term_nnz = np.bincount(cols, minlength=coo.shape[1])
+        # Weight at rank min(top_k, postings) - 1 of each term
+        reference = np.zeros(coo.shape[1], dtype=np.float64)
+        at_reference = ranks == np.minimum(top_k, term_nnz[cols]) - 1
+        reference[cols[at_reference]] = weights[at_reference]
+        impact = weights / reference[cols]
+
+        target = max(1, int(round(keep * coo.nnz)))
+        threshold = np.partition(impact, coo.nnz - target)[coo.nnz - target]
+        survive = impact >= threshold
+
+    pruned = csr_matrix(
+        (weights[survive], (rows[survive], cols[survive])),
+        shape=coo.shape,
+        dtype=matrix.dtype,
+    )
+    pruned.sort_indices()
+    return pruned
+
+
+def pruning_report(
+    full_matrix: spmatrix,
+    pruned_matrix: spmatrix,
+    query_vecs: Sequence[spmatrix],
+    ks: Sequence[int] = (10, 20),
+) -> Dict[str, Any]:
+    """
+    Quality and size of a pruned matrix relative to the unpruned one.
+
+    Returns:
+        compare_indexes report (recall@k, NDCG@k, latencies, index bytes)
+        plus the posting counts of both matrices
+    """
+    report = compare_indexes(
+        InvertedIndex(full_matrix), InvertedIndex(pruned_matrix), query_vecs, ks
+    )
+    report["reference_postings"] = int(full_matrix.nnz)
+    report["candidate_postings"] = int(pruned_matrix.nnz)
+    return report
@@ -0,0 +1,238 @@
+"""
+Quantized Index Module
+
+Compact term -> postings index for candidate generation. Posting weights
+are stored as uint8 codes with one scale per term (or as float16), so a
+posting takes 5 or 6 bytes instead of the exact index's 8 bytes plus its
+block-max arrays. Queries accumulate approximate scores over the codes.
+Only the best ``rerank`` candidates are then re-scored exactly against
+the full-precision rows with row-major dot products.
+
+Whenever a query matches at most ``rerank`` rows, the result equals the
+exact index's result. For broader queries it can differ only where
+quantization error pushes a true top-K row below the re-rank cut; the
+comparison script (scripts/compare_quantized.py) measures how often.
+"""
+
+from __future__ import annotations
+
+from typing import List, Literal, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .scoring import (
+    BATCH_MAX_NNZ,
+    InvertedIndex,
+    ScoringPool,
+    Strategy,
+    pad_with_unscored,
+    select_top_k,
+)
+
+# Candidates re-scored exactly per query
+RERANK_CANDIDATES = 300
+
+CodeType = Literal["uint8", "float16"]
+
+
+class QuantizedIndex:
+    """
+    Inverted index with quantized weights and exact re-ranking.
+
+    Offers the InvertedIndex interface used by VectorStore, QueryPlanner
+    and JobRecommender. Full-precision rows (``doc_matrix``) are kept by
+    reference for re-ranking and for :meth:`score_subset`.
+    """
+
+    def __init__(
+        self,
+        doc_matrix: spmatrix,
+        codes: CodeType = "uint8",
+        rerank: int = RERANK_CANDIDATES,
+    ):
+        """
+        Build the quantized index.
+
+        Args:
+            doc_matrix: (n_docs, n_terms) TF-IDF matrix with L2-normalized rows
+            codes: "uint8" (per-term linear scale) or "float16"
+            rerank: Candidates re-scored exactly per query
+
+        Raises:
+            ValueError: If ``codes`` is not supported
+        """
+        if codes not in ("uint8", "float16"):
+            raise ValueError(f"Unsupported code type: {codes!r}")
+
+        self.doc_matrix = csr_matrix(doc_matrix)
+        self.doc_matrix.sort_indices()
+        csc = self.doc_matrix.tocsc()
+        csc.sort_indices()
+
+        self.n_docs, self.n_terms = csc.shape
+        self.code_type = codes
+        self.rerank = rerank
+        self.indptr = csc.indptr.astype(np.int64, copy=False)
+        self.doc_ids = csc.indices.astype(np.int32, copy=False)
+        weights = csc.data.astype(np.float32, copy=False)
+
+        if codes == "float16":
+            self.scales = np.ones(self.n_terms, dtype=np.float32)
+            self.codes = weights.astype(np.float16)
+        else:
+            lengths = np.diff(self.indptr)
+            term_max = np.zeros(self.n_terms, dtype=np.float32)
+            nonempty = lengths > 0
+            if self.nnz:
+                term_max[nonempty] = np.maximum.reduceat(
+                    weights, self.indptr[:-1][nonempty]
+                )
+            self.scales = term_max / 255
+            posting_scales = np.repeat(self.scales, lengths)
+            self.codes = np.rint(
+                np.divide(
+                    weights,
+                    posting_scales,
+                    out=np.zeros_like(weights),
+                    where=posting_scales > 0,
+                )
+            ).astype(np.uint8)
+
+    @property
+    def nnz(self) -> int:
+        """Total number of postings."""
+        return int(self.indptr[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the quantized postings (rows are shared)."""
+        return (
+            self.indptr.nbytes
+            + self.doc_ids.nbytes
+            + self.codes.nbytes
+            + self.scales.nbytes
+        )
+
+    query_terms = staticmethod(InvertedIndex.query_terms)
+
+    def eligible(self, mask: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Rows that may be returned under an optional row mask."""
+        return mask
+
+    def postings_length(self, terms: np.ndarray) -> int:
+        """Number of postings touched when scoring the given terms."""
+        terms = np.asarray(terms, dtype=np.int64)
+        return int((self.indptr[terms + 1] - self.indptr[terms]).sum())
+
+    def rows_nnz(self, rows: np.ndarray) -> int:
+        """Non-zeros touched when re-scoring the given rows."""
+        indptr = self.doc_matrix.indptr
+        return int((indptr[rows + 1] - indptr[rows]).sum())
+
+    score_subset = InvertedIndex.score_subset
+
+    def approximate(
+        self, query_vec: spmatrix, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate scores from the quantized postings (float32).
+
+        Returns:
+            Tuple of (doc_ids, approximate scores) for every (eligible)
+            document sharing at least one term with the query, doc ids
+            ascending
+        """
+        terms, q_weights = self.query_terms(query_vec)
+        if len(terms) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        acc = np.zeros(self.n_docs, dtype=np.float32)
+        touched = []
+        for term, q_weight in zip(terms, q_weights):
+            lo, hi = self.indptr[term], self.indptr[term + 1]
+            docs, codes = self.doc_ids[lo:hi], self.codes[lo:hi]
+            if mask is not None:
+                keep = mask[docs]
+                docs, codes = docs[keep], codes[keep]
+            acc[docs] += codes * np.float32(self.scales[term] * q_weight)
+            touched.append(docs)
+
+        candidates = (
+            touched[0] if len(touched) == 1 else np.unique(np.concatenate(touched))
+        )
+        return candidates, acc[candidates]
+
+    def score(
+        self, query_vec: spmatrix, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact scores of every eligible row sharing a term with the query.
+
+        The matching rows come from the quantized postings; their scores
+        from the full-precision rows.
+
+        Returns:
+            Tuple of (doc_ids, scores), doc ids ascending
+        """
+        candidates, _ = self.approximate(query_vec, mask)
+        return self.score_subset(query_vec, candidates)
+
+    def search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        pool: Optional[ScoringPool] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K from approximate candidates re-ranked exactly.
+
+        Args:
+            query_vec: 1 x n_terms sparse query vector (L2-normalized)
+            top_k: Number of results to return
+            pad: Fill up to ``top_k`` with zero-score documents
+            strategy: "subset" scores the mask's rows exactly; every other
+                strategy uses quantized candidate generation
+            mask: Optional boolean row mask; only eligible rows are returned
+            pool: Accepted for interface compatibility (unused)
+
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        if strategy == "subset":
+            if mask is None:
+                raise ValueError("The 'subset' strategy requires a mask.")
+            candidates = np.flatnonzero(mask)
+        else:
+            candidates, approx = self.approximate(query_vec, mask)
+            candidates, _ = select_top_k(candidates, approx, max(self.rerank, top_k))
+            candidates = np.sort(candidates)
+
+        indices, scores = select_top_k(*self.score_subset(query_vec, candidates), top_k)
+        if pad:
+            indices, scores = pad_with_unscored(
+                indices, scores, top_k, self.n_docs, mask=mask
+            )
+        return indices, scores
+
+    def search_batch(
+        self,
+        query_matrix: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Top-K for every row of a query matrix (see :meth:`search`).
+
+        Queries are answered one by one; ``max_block_nnz`` is accepted for
+        interface compatibility.
+        """
+        query_matrix = csr_matrix(query_matrix)
+        return [
+            self.search(query_matrix[i], top_k, pad=pad)
+            for i in range(query_matrix.shape[0])
+        ]
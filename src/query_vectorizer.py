@@ -0,0 +1,234 @@
+"""
+Query Vectorizer Module
+
+NumPy/SciPy re-implementation of a fitted TfidfVectorizer's ``transform``
+for the query path. Given the exported vocabulary, idf and analyzer
+settings it produces bit-identical vectors (word analyzer with lowercasing,
+accent stripping, token pattern, stop words and n-grams; raw, binary or
+sublinear tf; idf weighting; L2/L1 normalization), so serving queries does
+not need to import scikit-learn. Fitting stays in the build scripts.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def _strip_accents_unicode(text: str) -> str:
+    """Same as sklearn's strip_accents_unicode."""
+    normalized = unicodedata.normalize("NFKD", text)
+    if normalized == text:
+        return text
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(text: str) -> str:
+    """Same as sklearn's strip_accents_ascii."""
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode()
+
+
+_ACCENT_FUNCTIONS: Dict[Optional[str], Optional[Callable[[str], str]]] = {
+    None: None,
+    "unicode": _strip_accents_unicode,
+    "ascii": _strip_accents_ascii,
+}
+
+
+class QueryVectorizer:
+    """
+    Transform-only TF-IDF vectorizer built from exported arrays.
+
+    Attributes mirror the fitted sklearn estimator where the rest of the
+    code relies on them (``vocabulary_``, ``idf_``, ``transform``).
+    """
+
+    def __init__(
+        self,
+        vocabulary: Sequence[str],
+        idf: Optional[np.ndarray],
+        *,
+        stop_words: Optional[Iterable[str]] = None,
+        ngram_range: Tuple[int, int] = (1, 1),
+        lowercase: bool = True,
+        token_pattern: str = r"(?u)\b\w\w+\b",
+        strip_accents: Optional[str] = None,
+        norm: Optional[str] = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        dtype: Any = np.float64,
+    ):
+        """
+        Initialize QueryVectorizer.
+
+        Args:
+            vocabulary: Terms in feature-index order
+            idf: Inverse document frequencies (None when use_idf was False)
+            stop_words: Resolved stop word list (not the name "english")
+            ngram_range: (min_n, max_n) word n-gram range
+            lowercase: Lowercase text before tokenizing
+            token_pattern: Regex selecting tokens
+            strip_accents: None, "unicode" or "ascii"
+            norm: "l2", "l1" or None
+            sublinear_tf: Use 1 + log(tf)
+            binary: Use presence instead of counts
+            dtype: Output dtype
+        """
+        if strip_accents not in _ACCENT_FUNCTIONS:
+            raise ValueError(f"Unsupported strip_accents: {strip_accents!r}")
+        if norm not in ("l2", "l1", None):
+            raise ValueError(f"Unsupported norm: {norm!r}")
+
+        self.vocabulary_ = {term: i for i, term in enumerate(vocabulary)}
+        self.dtype = np.dtype(dtype)
+        self.idf_ = None if idf is None else np.asarray(idf)
+        self.stop_words = frozenset(stop_words) if stop_words is not None else None
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.strip_accents = strip_accents
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+
+        self._token_regex = re.compile(token_pattern)
+        if self._token_regex.groups > 1:
+            raise ValueError("token_pattern must have at most one capturing group.")
+        self._accent_function = _ACCENT_FUNCTIONS[strip_accents]
+
+    @classmethod
+    def from_fitted(cls, vectorizer) -> "QueryVectorizer":
+        """Copy vocabulary, idf and analyzer settings of a fitted TfidfVectorizer."""
+        if vectorizer.analyzer != "word":
+            raise ValueError("Only the 'word' analyzer is supported.")
+        if vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+            raise ValueError("Custom tokenizers and preprocessors are not supported.")
+
+        terms = [None] * len(vectorizer.vocabulary_)
+        for term, i in vectorizer.vocabulary_.items():
+            terms[i] = term
+        return cls(
+            terms,
+            vectorizer.idf_ if vectorizer.use_idf else None,
+            stop_words=vectorizer.get_stop_words(),
+            ngram_range=vectorizer.ngram_range,
+            lowercase=vectorizer.lowercase,
+            token_pattern=vectorizer.token_pattern,
+            strip_accents=vectorizer.strip_accents,
+            norm=vectorizer.norm,
+            sublinear_tf=vectorizer.sublinear_tf,
+            binary=vectorizer.binary,
+            dtype=vectorizer.dtype,
+        )
+
+    def get_params(self) -> Dict[str, Any]:
+        """JSON-serializable analyzer settings (see __init__)."""
+        return {
+            "stop_words": sorted(self.stop_words) if self.stop_words else None,
+            "ngram_range": list(self.ngram_range),
+            "lowercase": self.lowercase,
+            "token_pattern": self.token_pattern,
+            "strip_accents": self.strip_accents,
+            "norm": self.norm,
+            "sublinear_tf": self.sublinear_tf,
+            "binary": self.binary,
+            "dtype": self.dtype.name,
+        }
+
+    def get_feature_names_out(self) -> np.ndarray:
+        """Terms in feature-index order."""
+        terms = np.empty(len(self.vocabulary_), dtype=object)
+        for term, i in self.vocabulary_.items():
+            terms[i] = term
+        return terms
+
+    def analyze(self, document: str) -> List[str]:
+        """Split a document into the terms the vectorizer counts."""
+        if self.lowercase:
+            document = document.lower()
+        if self._accent_function is not None:
+            document = self._accent_function(document)
+
+        tokens = self._token_regex.findall(document)
+        if self.stop_words is not None:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            terms.extend(
+                " ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)
+            )
+        return terms
+
+    def transform(self, raw_documents: Iterable[str]) -> csr_matrix:
+        """
+        Vectorize documents exactly like the fitted TfidfVectorizer.
+
+        Args:
+            raw_documents: Iterable of strings
+
+        Returns:
+            (n_documents, n_features) CSR matrix with sorted indices
+        """
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected.")
+
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[int] = []
+        for document in raw_documents:
+            row = Counter(
+                j
+                for j in map(self.vocabulary_.get, self.analyze(document))
+                if j is not None
+            )
+            for j in sorted(row):
+                indices.append(j)
+                counts.append(row[j])
+            indptr.append(len(indices))
+
+        indptr = np.asarray(indptr, dtype=np.int32)
+        indices = np.asarray(indices, dtype=np.int32)
+        data = np.asarray(counts, dtype=self.dtype)
+
+        # Same operation order and precision as TfidfTransformer.transform
+        if self.binary:
+            data.fill(1)
+        if self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        if self.idf_ is not None:
+            data *= self.idf_[indices]
+        if self.norm is not None:
+            self._normalize(data, indptr)
+
+        return csr_matrix(
+            (data, indices, indptr), shape=(len(indptr) - 1, len(self.vocabulary_))
+        )
+
+    def _normalize(self, data: np.ndarray, indptr: np.ndarray) -> None:
+        """
+        Row-normalize in place like sklearn's Cython kernels.
+
+        Squares (or absolute values) are taken in the data dtype and summed
+        sequentially in float64; each value is divided in float64.
+        """
+        for start, end in zip(indptr[:-1].tolist(), indptr[1:].tolist()):
+            if start == end:
+                continue
+            row = data[start:end]
+            if self.norm == "l2":
+                total = np.sqrt(np.cumsum((row * row).astype(np.float64))[-1])
+            else:
+                total = np.cumsum(np.abs(row).astype(np.float64))[-1]
+            if total == 0.0:
+                continue
+            data[start:end] = row.astype(np.float64) / total
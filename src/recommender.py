@@ -7,13 +7,246 @@ for similarity search and applies filters to refine results.
 
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any, Literal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Literal, Sequence, Tuple
 
 import pandas as pd
 import numpy as np
+from scipy.sparse import spmatrix
 
+from .cache import DocumentCache, ResultCache, SemanticCache
+from .filters import RECENCY_FILTER
+from .long_query import DOCUMENT_RERANK, LongQueryPolicy
 from .vector_store import VectorStore
+from .planner import (
+    DEEPENING_GROWTH,
+    DEEPENING_MAX_ROWS,
+    DEEPENING_SLACK,
+    FilterPassRates,
+)
 from .preprocessing import clean_text
+from .scoring import Strategy, pad_with_unscored, select_top_k
+from .shard_server import recv_message, send_message
+
+# Seconds a shard server may take to answer before it is left out
+SHARD_TIMEOUT = 1.0
+
+
+class ShardClient:
+    """Persistent connection to one shard server (see src/shard_server.py)."""
+
+    def __init__(self, address: str, timeout: float = SHARD_TIMEOUT):
+        """
+        Initialize ShardClient and fetch the shard's row range.
+
+        Args:
+            address: ``host:port`` of the shard server
+            timeout: Socket timeout in seconds
+
+        Raises:
+            OSError: If the server cannot be reached
+        """
+        self.address = address
+        host, port = address.rsplit(":", 1)
+        self._endpoint = (host, int(port))
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+
+        info, _ = self.request({"method": "info"})
+        self.row_start = int(info["row_start"])
+        self.n_docs = int(info["n_docs"])
+        self.n_terms = int(info["n_terms"])
+
+    def request(
+        self, header: Dict[str, Any], arrays: Optional[Dict[str, np.ndarray]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Send one request and wait for its reply.
+
+        A connection that failed or timed out is dropped, so a late reply
+        can never be read as the answer to the next request.
+
+        Raises:
+            RuntimeError: If the server reported an error
+            OSError: On connection failures and timeouts
+            EOFError: If the server closed the connection
+        """
+        with self.lock:
+            try:
+                if self._sock is None:
+                    self._sock = socket.create_connection(self._endpoint, self.timeout)
+                send_message(self._sock, header, arrays)
+                reply, reply_arrays = recv_message(self._sock)
+            except (OSError, EOFError, ValueError):
+                self.close()
+                raise
+        if reply.get("status") != "ok":
+            raise RuntimeError(f"Shard {self.address}: {reply.get('error')}")
+        return reply, reply_arrays
+
+    def close(self) -> None:
+        """Drop the connection (reopened by the next request)."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class ShardCoordinator:
+    """
+    Scatter-gather search over shard servers on one or more hosts.
+
+    Queries are sent to every shard concurrently. Shards that miss the
+    per-shard deadline, or fail, are left out: the merged result is then
+    partial and flagged as degraded instead of failing the request.
+    """
+
+    def __init__(self, addresses: Sequence[str], timeout: float = SHARD_TIMEOUT):
+        """
+        Initialize ShardCoordinator.
+
+        Args:
+            addresses: ``host:port`` of every shard server
+            timeout: Per-shard deadline in seconds
+
+        Raises:
+            ValueError: If the shards do not tile one contiguous row range
+        """
+        self.timeout = timeout
+        self.clients = sorted(
+            (ShardClient(address, timeout) for address in addresses),
+            key=lambda client: client.row_start,
+        )
+        position = 0
+        for client in self.clients:
+            if client.row_start != position:
+                raise ValueError(
+                    f"Shard {client.address} starts at row {client.row_start:,}, "
+                    f"expected {position:,}."
+                )
+            position += client.n_docs
+        self.n_docs = position
+        self._executor = ThreadPoolExecutor(
+            max_workers=4 * len(self.clients), thread_name_prefix="shard-client"
+        )
+
+    def _scatter(
+        self,
+        header: Dict[str, Any],
+        query_vec: spmatrix,
+        mask: Optional[np.ndarray],
+    ) -> Tuple[List[Tuple[ShardClient, Dict[str, Any], Dict]], List[str]]:
+        """
+        Send a request to every shard with eligible rows and gather replies.
+
+        Returns:
+            Tuple of (replies of the shards that answered in time, addresses
+            of the shards that did not)
+        """
+        query_vec = query_vec.tocsr()
+        arrays = {
+            "query_indices": query_vec.indices.astype(np.int32),
+            "query_data": query_vec.data,
+        }
+        futures = {}
+        for client in self.clients:
+            shard_arrays = dict(arrays)
+            if mask is not None:
+                local = mask[client.row_start : client.row_start + client.n_docs]
+                if not local.any():
+                    continue
+                shard_arrays["mask"] = np.packbits(local)
+            futures[self._executor.submit(client.request, header, shard_arrays)] = (
+                client
+            )
+
+        done, _ = wait(futures, timeout=self.timeout)
+        replies, missing = [], []
+        for future, client in futures.items():
+            if future in done and future.exception() is None:
+                replies.append((client, *future.result()))
+            else:
+                missing.append(client.address)
+        return replies, missing
+
+    def _merge(
+        self, replies: List[Tuple[ShardClient, Dict[str, Any], Dict]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-shard (local ids, scores) as global ids, ascending."""
+        ids, scores = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.float64)]
+        for client, _, arrays in sorted(replies, key=lambda r: r[0].row_start):
+            ids.append(arrays["indices"].astype(np.int64) + client.row_start)
+            scores.append(arrays["scores"])
+        return np.concatenate(ids), np.concatenate(scores)
+
+    def _status(self, missing: List[str]) -> Dict[str, Any]:
+        """Degraded flag and the shards left out of a result."""
+        return {
+            "degraded": bool(missing),
+            "missing_shards": missing,
+            "shards": len(self.clients),
+        }
+
+    def _available(
+        self, mask: Optional[np.ndarray], missing: List[str]
+    ) -> Optional[np.ndarray]:
+        """Row mask without the rows of shards that did not answer."""
+        if not missing:
+            return mask
+        available = np.ones(self.n_docs, dtype=bool) if mask is None else mask.copy()
+        for client in self.clients:
+            if client.address in missing:
+                available[client.row_start : client.row_start + client.n_docs] = False
+        return available
+
+    def search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Top-K over all shards that answer within the deadline.
+
+        Returns:
+            Tuple of (indices, similarities, status) where status holds
+            ``degraded``, ``missing_shards`` and the merged filter-match
+            counts (``eligible``, ``matched``) of the shards that answered
+        """
+        header = {"method": "search", "top_k": int(top_k), "strategy": strategy}
+        replies, missing = self._scatter(header, query_vec, mask)
+        indices, scores = select_top_k(*self._merge(replies), top_k)
+        indices, scores = pad_with_unscored(
+            indices, scores, top_k, self.n_docs, mask=self._available(mask, missing)
+        )
+        status = self._status(missing)
+        status["eligible"] = sum(reply["eligible"] for _, reply, _ in replies)
+        status["matched"] = sum(reply["matched"] for _, reply, _ in replies)
+        return indices, scores, status
+
+    def score(
+        self, query_vec: spmatrix, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Scores of every eligible row sharing a term with the query.
+
+        Returns:
+            Tuple of (row ids ascending, scores, eligibility mask without
+            the missing shards' rows, status)
+        """
+        replies, missing = self._scatter({"method": "score"}, query_vec, mask)
+        candidates, scores = self._merge(replies)
+        return candidates, scores, self._available(mask, missing), self._status(missing)
+
+    def close(self) -> None:
+        """Close all shard connections."""
+        self._executor.shutdown(wait=False)
+        for client in self.clients:
+            client.close()
 
 
 class JobRecommender:
@@ -29,6 +262,16 @@ class JobRecommender:
         models_dir: str = "models",
         data_dir: str = "data/processed",
         auto_load: bool = True,
+        pass_rates_path: Optional[str] = None,
+        cache_size: int = 256,
+        cache_ttl: Optional[float] = 600.0,
+        semantic_threshold: Optional[float] = 0.95,
+        partition_days: Optional[float] = None,
+        expire_postings: bool = False,
+        search_workers: Optional[int] = 1,
+        shard_addresses: Optional[Sequence[str]] = None,
+        shard_timeout: float = SHARD_TIMEOUT,
+        document_cache_size: int = 64,
     ):
         """
         Initialize JobRecommender.
@@ -37,12 +280,55 @@ class JobRecommender:
             models_dir: Directory containing saved models
             data_dir: Directory containing processed data
             auto_load: Whether to automatically load all components
+            pass_rates_path: JSON file for learned post-filter pass rates
+                (default: logs/filter_pass_rates.json in the project root)
+            cache_size: Maximum number of cached results (0 disables caching)
+            cache_ttl: Seconds a cached result stays valid (None = forever)
+            semantic_threshold: Cosine similarity above which a cached
+                near-duplicate query vector is reused (None disables the
+                semantic tier, 1.0 only reuses identical vectors)
+            partition_days: Partition the index by listing time into periods
+                of this many days (see VectorStore.enable_segments)
+            expire_postings: Hide jobs past their expiry date
+            search_workers: Threads scoring one query concurrently
+                (1 = single-threaded, None = one per CPU)
+            shard_addresses: ``host:port`` of shard servers to score on
+                (see src/shard_server.py); the local store then only plans
+                queries and supplies job data
+            shard_timeout: Per-shard deadline in seconds; late shards are
+                left out and the results flagged as degraded
+            document_cache_size: Maximum number of analyzed documents kept
+                for match_document (0 disables)
         """
-        self.vector_store = VectorStore(models_dir, data_dir)
+        self.vector_store = VectorStore(
+            models_dir, data_dir, search_workers=search_workers
+        )
+
+        if pass_rates_path is None:
+            project_root = Path(self.vector_store.models_root).parent
+            pass_rates_path = project_root / "logs" / "filter_pass_rates.json"
+        self.pass_rates = FilterPassRates(pass_rates_path)
+        self.shards: Optional[ShardCoordinator] = None
+        if shard_addresses:
+            self.shards = ShardCoordinator(shard_addresses, shard_timeout)
+        self.result_cache = ResultCache(max_entries=cache_size, ttl=cache_ttl)
+        self.semantic_cache = SemanticCache(
+            threshold=semantic_threshold if semantic_threshold is not None else 1.0,
+            max_entries=cache_size if semantic_threshold is not None else 0,
+            ttl=cache_ttl,
+        )
+        self.document_cache = DocumentCache(
+            max_entries=document_cache_size, max_bytes=None, ttl=cache_ttl
+        )
+        self.document_query = LongQueryPolicy(rerank=DOCUMENT_RERANK)
 
         if auto_load:
             print("Initializing JobRecommender...")
             self.vector_store.load_all()
+            if partition_days is not None or expire_postings:
+                self.vector_store.enable_segments(
+                    partition_days=partition_days, expire=expire_postings
+                )
             print("✓ JobRecommender ready!\n")
 
     def get_recommendations(
@@ -50,6 +336,8 @@ class JobRecommender:
         query: str,
         top_k: int = 10,
         filters: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        lsa: bool = False,
     ) -> pd.DataFrame:
         """
         Get job recommendations based on query and filters.
@@ -66,27 +354,307 @@ class JobRecommender:
                 - max_salary: float - Maximum salary
                 - industries: str or List[str] - Industry names
                 - skills: str or List[str] - Required skills
+                - posted_within_days: float - Listed within the last N days
+            nprobe: Approximate mode for unfiltered queries: score only the
+                rows of the ``nprobe`` closest cluster cells (see
+                src/clusters.py); ignored when filters are given
+            lsa: Dense mode for unfiltered queries: rank by cosine in the
+                LSA latent space (see src/lsa.py); ignored when filters are
+                given
 
         Returns:
-            DataFrame with recommended jobs, sorted by relevance
+            DataFrame with recommended jobs, sorted by relevance. The
+            executed query plan (strategy, predicate order, estimated and
+            actual costs) is available as ``results.attrs["plan"]`` and
+            ``results.attrs["cache"]`` is "miss", "hit" (same cleaned query)
+            or "semantic" (same or near-duplicate query vector). With shard
+            servers, ``results.attrs["degraded"]`` is True when a shard
+            missed its deadline and the results are partial (those are
+            never cached). ``results.attrs["approximate"]`` is True for
+            cluster-pruned and LSA results, which are not cached either.
+        """
+        # Pin the loaded index version, so a concurrent reload cannot swap
+        # arrays out from under this query
+        with self.vector_store.acquire() as store:
+            return self._recommend(store, query, top_k, filters, nprobe, lsa)
+
+    def match_document(
+        self,
+        text: str,
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
         """
-        # Get initial candidates (fetch more for filtering)
-        # With 50k indexed jobs, we can use lower multiplier than with 10k
-        if filters and len(filters) > 0:
-            # Fetch 10-15x more to ensure enough candidates after filtering
-            # Reduced from 20x since we have 5x more coverage (50k vs 10k)
-            fetch_k = top_k * 12
+        Match a whole document, e.g. a pasted resume, against the jobs.
+
+        The document is cleaned and vectorized once; its vector is cached
+        under a hash of the text, so matching it again with other filters
+        or another top_k only plans and scores. Long documents keep their
+        highest-weight terms to select candidates, which are re-ranked
+        exactly with the full vector (see src/long_query.py).
+
+        Args:
+            text: Document text
+            top_k: Number of recommendations to return
+            filters: Optional filters dict (see get_recommendations)
+
+        Returns:
+            DataFrame with recommended jobs, sorted by relevance, with the
+            executed plan in ``results.attrs["plan"]``. The results are not
+            cached; ``results.attrs["document_cache"]`` is "hit" when the
+            document vector was reused, else "miss".
+        """
+        key = self.document_cache.make_document_key(text)
+        with self.vector_store.acquire() as store:
+            query_vec = self.document_cache.get(key, store.index_version)
+            cached = query_vec is not None
+            if not cached:
+                query_vec = store.vectorize_query(text)
+                self.document_cache.put(key, query_vec, store.index_version)
+
+            results = self._search(
+                store, query_vec, top_k, filters, long_query=self.document_query
+            )
+        results.attrs["document_cache"] = "hit" if cached else "miss"
+        return results
+
+    def _recommend(
+        self,
+        store: VectorStore,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        nprobe: Optional[int] = None,
+        lsa: bool = False,
+    ) -> pd.DataFrame:
+        """get_recommendations against one pinned index version."""
+        normalized = clean_text(query)
+        if lsa and not filters and self.shards is None:
+            # A different ranking model: the TF-IDF result caches do not apply
+            query_vec = store.vectorize_query(normalized, preprocess=False)
+            return self._approximate(store, query_vec, top_k, lsa=True)
+
+        # Serve repeated requests from the result cache
+        cache_key = self.result_cache.make_key(normalized, filters, top_k)
+        version = store.index_version
+        cached = self.result_cache.get(cache_key, version)
+        if cached is not None:
+            return cached
+
+        # Then from a cached query with the same or a near-duplicate vector
+        query_vec = store.vectorize_query(normalized, preprocess=False)
+        near = self.semantic_cache.lookup(query_vec, filters, top_k, version)
+        if near is not None:
+            results, similarity = near
+            if similarity < 1.0:
+                # Re-ranked from another query's candidates: not exact, so
+                # never stored as this query's exact entry
+                return self._rescore(store, results, query_vec)
+            self.result_cache.put(cache_key, results, version)
+            return results
+
+        # Approximate browse: exact cached results above are still preferred
+        if nprobe is not None and not filters and self.shards is None:
+            return self._approximate(store, query_vec, top_k, nprobe=nprobe)
+
+        results = self._search(store, query_vec, top_k, filters)
+        if not results.attrs["degraded"]:
+            self.result_cache.put(cache_key, results, version)
+            self.semantic_cache.store(query_vec, filters, top_k, results, version)
+        return results
+
+    def _search(
+        self,
+        store: VectorStore,
+        query_vec: spmatrix,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        long_query: Optional[LongQueryPolicy] = None,
+    ) -> pd.DataFrame:
+        """Plan and score a vectorized query (no caching)."""
+        # Recency is answered by the index: older partitions are skipped
+        bitmap_filters = dict(filters or {})
+        days = bitmap_filters.pop(RECENCY_FILTER, None)
+        if days is not None:
+            store = store.recent(days)
+
+        # Plan the query: predicate order and pre- vs post-filter scoring
+        planner = store.get_planner()
+        plan = planner.plan(
+            bitmap_filters, query_vec, top_k=top_k, pass_rates=self.pass_rates
+        )
+        residual = plan["residual"]
+        status = None
+        if self.shards is not None:
+            # Shard servers only know their rows: the store's recency view,
+            # tombstones and expiry travel in the row mask
+            rows = store.inverted_index.eligible(planner.filter_rows(plan))
+
+        if residual:
+            # Filters the index cannot answer: score once, post-filter windows
+            if self.shards is None:
+                candidates, scores, mask = planner.score_candidates(plan, query_vec)
+            else:
+                candidates, scores, mask, status = self.shards.score(query_vec, rows)
+            results = self._deepen(
+                store, candidates, scores, mask, residual, top_k, plan
+            )
+        elif self.shards is None:
+            indices, scores = planner.execute(plan, query_vec, top_k, long_query)
+            results = store.results_frame(indices, scores)
         else:
-            fetch_k = top_k
+            strategy = "subset" if plan["strategy"] == "prefilter" else "auto"
+            indices, scores, status = self.shards.search(
+                query_vec, top_k, strategy, rows
+            )
+            results = store.results_frame(indices, scores)
+
+        # Return top-K, with the executed plan attached for inspection
+        results = results.head(top_k)
+        results.attrs["plan"] = plan
+        results.attrs["cache"] = "miss"
+        results.attrs["degraded"] = status is not None and status["degraded"]
+        if status is not None:
+            results.attrs["shards"] = status
+        return results
+
+    @staticmethod
+    def _approximate(
+        store: VectorStore, query_vec, top_k: int, **mode: Any
+    ) -> pd.DataFrame:
+        """Unfiltered cluster-pruned or LSA search (never cached)."""
+        indices, scores = store.search_vector(query_vec, top_k, **mode)
+        results = store.results_frame(indices, scores)
+        results.attrs.update(plan=None, cache="miss", degraded=False, approximate=True)
+        return results
 
-        results = self.vector_store.search(query, top_k=fetch_k)
+    def _rescore(
+        self, store: VectorStore, results: pd.DataFrame, query_vec
+    ) -> pd.DataFrame:
+        """
+        Re-rank a near-duplicate query's cached candidates for this query.
 
-        # Apply filters
-        if filters:
-            results = self._apply_filters(results, filters)
+        Only the cached rows are scored (exactly, with the new vector), so
+        jobs outside that candidate list cannot appear in the result.
+        """
+        rows = store.row_positions(results.index)
+        scored, new_scores = store.inverted_index.score_subset(query_vec, rows)
+        scores = (
+            pd.Series(new_scores, index=scored).reindex(rows, fill_value=0.0).to_numpy()
+        )
 
-        # Return top-K
-        return results.head(top_k)
+        order = np.lexsort((rows, -scores))
+        reranked = results.iloc[order].copy()
+        reranked["similarity_score"] = scores[order]
+        reranked["rank"] = range(1, len(reranked) + 1)
+        reranked.attrs = dict(results.attrs)
+        return reranked
+
+    def _deepen(
+        self,
+        store: VectorStore,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        mask: Optional[np.ndarray],
+        residual: Dict[str, Any],
+        top_k: int,
+        plan: Dict[str, Any],
+    ) -> pd.DataFrame:
+        """
+        Post-filter ranked candidates in geometrically growing windows.
+
+        The first window is sized from the learned pass rate of this filter
+        combination; it doubles only while fewer than ``top_k`` rows have
+        passed. Windows are cut from the scores computed once, and only the
+        rows new to each window are materialized and filtered. If the window
+        outgrows DEEPENING_MAX_ROWS and the bitmap index can answer the
+        residual filters, the remainder is resolved with bitmaps instead.
+
+        Args:
+            store: Pinned index version (see VectorStore.acquire)
+            candidates: Scored candidate row ids
+            scores: Scores aligned with ``candidates``
+            mask: Rows eligible under the indexed filters (None = all)
+            residual: Filters to apply with _apply_filters
+            top_k: Number of results wanted
+            plan: Query plan; deepening stats are added to ``plan["actual"]``
+
+        Returns:
+            Filtered DataFrame with at most ``top_k`` rows
+        """
+        key = FilterPassRates.key(residual)
+        n_docs = store.inverted_index.n_docs
+        # Deleted rows (segmented index) must not be used as padding
+        mask = store.inverted_index.eligible(mask)
+        available = n_docs if mask is None else int(np.count_nonzero(mask))
+        multiplier = self.pass_rates.multiplier(key)
+        window = int(np.ceil(top_k * multiplier * DEEPENING_SLACK))
+
+        filter_index = store.filter_index
+        can_fallback = filter_index is not None and all(
+            filter_index.supports(k) for k in residual
+        )
+
+        batches = []
+        examined = passed = windows = 0
+        fallback = False
+        while True:
+            window = min(window, available)
+            indices, window_scores = select_top_k(candidates, scores, window)
+            indices, window_scores = pad_with_unscored(
+                indices, window_scores, window, n_docs, mask
+            )
+            windows += 1
+
+            # Windows share a deterministic order, so only the tail is new
+            if len(indices) > examined:
+                batch = store.results_frame(
+                    indices[examined:], window_scores[examined:]
+                )
+                batch = self._apply_filters(batch, residual)
+                batches.append(batch)
+                passed += len(batch)
+            examined = len(indices)
+
+            if passed >= top_k or examined >= available:
+                break
+            window *= DEEPENING_GROWTH
+            if window > DEEPENING_MAX_ROWS and can_fallback:
+                fallback = True
+                break
+
+        self.pass_rates.update(key, examined, passed)
+        plan["actual"].update(
+            {
+                "pass_rate_key": key,
+                "initial_multiplier": multiplier,
+                "candidates_examined": examined,
+                "windows": windows,
+                "fallback": "bitmap" if fallback else None,
+            }
+        )
+
+        if fallback:
+            # Too few candidates pass: resolve the residual filters exactly
+            residual_mask, _ = filter_index.evaluate(residual)
+            if mask is not None:
+                residual_mask &= mask
+            keep = residual_mask[candidates]
+            indices, window_scores = select_top_k(candidates[keep], scores[keep], top_k)
+            indices, window_scores = pad_with_unscored(
+                indices, window_scores, top_k, n_docs, residual_mask
+            )
+            return store.results_frame(indices, window_scores)
+
+        if not batches:
+            return store.results_frame(indices[:0], window_scores[:0])
+        results = pd.concat(batches).head(top_k)
+        results["rank"] = range(1, len(results) + 1)
+        return results
+
+    def save_pass_rates(self) -> None:
+        """Persist the learned post-filter pass rates."""
+        self.pass_rates.save()
 
     def _apply_filters(
         self, results: pd.DataFrame, filters: Dict[str, Any]
@@ -194,31 +762,33 @@ class JobRecommender:
         """
         Find jobs similar to a given job.
 
+        Indexed jobs are served from the precomputed neighbor table when
+        available, else by searching with the job's stored TF-IDF row (see
+        VectorStore.similar_rows). Only jobs outside the index are
+        vectorized from their text.
+
         Args:
             job_id: ID of the reference job
             top_k: Number of similar jobs to return
 
         Returns:
             DataFrame with similar jobs
-        """
-        # Get the job
-        job = self.vector_store.job_data[self.vector_store.job_data.index == job_id]
-
-        if job.empty:
-            raise ValueError(f"Job ID {job_id} not found")
-
-        # Use job's clean_text as query
-        query = job.iloc[0]["clean_text"]
 
-        # Search
-        results = self.get_recommendations(
-            query=query, top_k=top_k + 1  # +1 to exclude the job itself
-        )
-
-        # Exclude the original job
-        results = results[results.index != job_id]
-
-        return results.head(top_k)
+        Raises:
+            ValueError: If the job is unknown
+        """
+        with self.vector_store.acquire() as store:
+            row = int(store.row_positions([job_id])[0])
+            if row >= 0:
+                indices, scores = store.similar_rows(row, top_k)
+                return store.results_frame(indices, scores)
+
+            if job_id not in store.job_data.index:
+                raise ValueError(f"Job ID {job_id} not found")
+            text = store.job_data.loc[[job_id], "clean_text"].iloc[0]
+            query_vec = store.vectorize_query(text, preprocess=False)
+            indices, scores = store.search_vector(query_vec, top_k)
+            return store.results_frame(indices, scores)
 
     def batch_recommend(
         self,
@@ -232,14 +802,29 @@ class JobRecommender:
             queries: List of search queries
             top_k: Number of recommendations per query
 
+        Queries are scored together with one sparse matrix product per
+        memory-bounded block (see VectorStore.search_tfidf_batch), which is
+        much faster than one get_recommendations call per query.
+
         Returns:
             Dict mapping queries to their results
         """
+        unique_queries = list(dict.fromkeys(queries))
         results = {}
-        for query in queries:
-            results[query] = self.get_recommendations(query=query, top_k=top_k)
+        with self.vector_store.acquire() as store:
+            hits = store.search_tfidf_batch(unique_queries, top_k)
+            for query, (indices, scores) in zip(unique_queries, hits):
+                results[query] = store.results_frame(indices, scores)
         return results
 
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters of the result cache tiers and the document cache."""
+        return {
+            "exact": self.result_cache.stats(),
+            "semantic": self.semantic_cache.stats(),
+            "document": self.document_cache.stats(),
+        }
+
     def describe(self) -> str:
         """Get description of the recommender system."""
         stats = []
@@ -0,0 +1,698 @@
+"""
+Scoring Engine for TF-IDF Retrieval
+
+This module holds a term-oriented (inverted) view of the L2-normalized
+TF-IDF matrix. Because rows are already normalized, the cosine similarity
+between a query and a job is a plain dot product, so scores can be
+accumulated term-at-a-time over the postings of the query terms only.
+
+For small top-K the index can also prune safely: documents are grouped
+into fixed doc-id blocks, and per-term / per-block maximum weights give an
+upper bound for every block. Blocks are scored best-bound first and the
+search stops once no remaining block can beat the current K-th score
+(a vectorized, block-at-a-time form of WAND / Block-Max WAND).
+
+Large queries can also be split into block-aligned doc-id ranges that are
+searched concurrently on a ScoringPool. Postings are sorted by doc id, so
+each range is a zero-copy slice of every posting list, and NumPy's
+indexing and arithmetic kernels release the GIL while they run.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+Strategy = Literal["auto", "exhaustive", "wand", "block_max", "subset"]
+
+# Default number of consecutive doc ids that share one block-max entry
+BLOCK_SIZE = 64
+
+# Pruned search only pays off while the heap threshold rises quickly
+PRUNING_MAX_K = 100
+
+# Upper bound on score entries materialized at once by batched scoring
+BATCH_MAX_NNZ = 1 << 24
+
+# Postings a query must touch before its row ranges are scored in parallel
+PARALLEL_MIN_POSTINGS = 200_000
+
+# Relative slack on upper bounds so float rounding can never prune a winner
+_BOUND_SLACK = 1e-6
+
+DocRange = Tuple[int, int]
+
+
+def _concat_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(s, e)`` for every (s, e) pair, vectorized."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+def select_top_k(
+    ids: np.ndarray, scores: np.ndarray, top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the top-K entries by partial selection.
+
+    Ties are broken by ascending id so that every retrieval strategy
+    returns exactly the same ranking for the same scores.
+
+    Args:
+        ids: Candidate document ids
+        scores: Scores aligned with ``ids``
+        top_k: Number of entries to keep
+
+    Returns:
+        Tuple of (ids, scores) sorted by descending score
+    """
+    if top_k <= 0 or len(ids) == 0:
+        return ids[:0], scores[:0]
+
+    if top_k < len(ids):
+        # Keep everything tied with the K-th score, then order the survivors
+        kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        keep = np.flatnonzero(scores >= kth)
+        ids, scores = ids[keep], scores[keep]
+
+    order = np.lexsort((ids, -scores))[:top_k]
+    return ids[order], scores[order]
+
+
+def pad_with_unscored(
+    ids: np.ndarray,
+    scores: np.ndarray,
+    top_k: int,
+    n_docs: int,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fill a short result list with zero-score documents (lowest ids first).
+
+    Brute-force scoring always returned ``min(top_k, n_docs)`` rows; this
+    keeps that contract when fewer documents share a term with the query.
+    With a ``mask`` only eligible documents are used for padding.
+    """
+    eligible = n_docs if mask is None else int(np.count_nonzero(mask))
+    need = min(top_k, eligible) - len(ids)
+    if need <= 0:
+        return ids, scores
+
+    # Among the first len(ids) + need eligible ids at least `need` are unscored
+    if mask is None:
+        pool = np.arange(min(n_docs, len(ids) + need))
+    else:
+        pool = np.flatnonzero(mask)[: len(ids) + need]
+    extra = np.setdiff1d(pool, ids, assume_unique=True)[:need]
+    return (
+        np.concatenate([ids, extra]).astype(ids.dtype, copy=False),
+        np.concatenate([scores, np.zeros(len(extra), dtype=scores.dtype)]),
+    )
+
+
+class ScoringPool:
+    """
+    Thread pool that searches row ranges of one query concurrently.
+
+    Queries touching fewer than ``min_postings`` postings stay on the
+    calling thread: below that, dispatch and merging cost more than the
+    scoring they spread out.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        min_postings: int = PARALLEL_MIN_POSTINGS,
+    ):
+        """
+        Initialize ScoringPool.
+
+        Args:
+            workers: Threads per query (default: one per CPU)
+            min_postings: Crossover below which queries are not split
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_postings = min_postings
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="scoring"
+        )
+
+    def ranges(
+        self, index: "InvertedIndex", query_vec: spmatrix
+    ) -> Optional[List[DocRange]]:
+        """
+        Block-aligned doc-id ranges to search concurrently.
+
+        Returns:
+            One range per worker, or None when the query should not be split
+        """
+        if self.workers <= 1 or index.n_blocks < 2:
+            return None
+        terms, _ = index.query_terms(query_vec)
+        if index.postings_length(terms) < self.min_postings:
+            return None
+
+        per_range = -(-index.n_blocks // self.workers) * index.block_size
+        edges = list(range(0, index.n_docs, per_range)) + [index.n_docs]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def map(self, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        """Run ``fn`` over ``items`` on the pool, results in input order."""
+        return list(self._executor.map(fn, items))
+
+    def close(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=True)
+
+
+class InvertedIndex:
+    """
+    Term -> postings view of a row-normalized TF-IDF matrix.
+
+    Postings are stored as three flat arrays (CSC layout): ``indptr`` gives
+    the slice of ``doc_ids``/``weights`` that belongs to each term, and doc
+    ids inside a slice are sorted ascending.
+    """
+
+    def __init__(self, doc_matrix: spmatrix, block_size: int = BLOCK_SIZE):
+        """
+        Build the inverted index.
+
+        Args:
+            doc_matrix: (n_docs, n_terms) TF-IDF matrix with L2-normalized rows
+            block_size: Number of doc ids per block-max entry
+        """
+        # Row-major view kept by reference for scoring small row subsets
+        self.doc_matrix = csr_matrix(doc_matrix)
+        self.doc_matrix.sort_indices()
+
+        csc = doc_matrix.tocsc()
+        csc.sort_indices()
+
+        self.n_docs, self.n_terms = csc.shape
+        self.indptr = csc.indptr.astype(np.int64, copy=False)
+        self.doc_ids = csc.indices.astype(np.int32, copy=False)
+        self.weights = csc.data.astype(np.float32, copy=False)
+
+        self.block_size = block_size
+        self.n_blocks = -(-self.n_docs // block_size)
+        self._build_impacts()
+
+    def _build_impacts(self) -> None:
+        """
+        Compute per-term and per-(term, block) maximum weights.
+
+        ``block_max`` is an (n_terms, n_blocks) CSR matrix; entry j of its
+        data covers postings ``block_offsets[j]:block_offsets[j + 1]``, so
+        the postings of one term inside one block can be sliced directly.
+        """
+        term_of = np.repeat(
+            np.arange(self.n_terms, dtype=np.int64), np.diff(self.indptr)
+        )
+        block_of = self.doc_ids.astype(np.int64) // self.block_size
+
+        # Postings are sorted by (term, doc), so (term, block) groups are runs
+        new_group = np.ones(self.nnz, dtype=bool)
+        new_group[1:] = (term_of[1:] != term_of[:-1]) | (block_of[1:] != block_of[:-1])
+        starts = np.flatnonzero(new_group)
+
+        if self.nnz:
+            group_max = np.maximum.reduceat(self.weights, starts)
+        else:
+            group_max = np.empty(0, dtype=np.float32)
+
+        groups_per_term = np.bincount(term_of[starts], minlength=self.n_terms)
+        self.block_max = csr_matrix(
+            (
+                group_max,
+                block_of[starts].astype(np.int32),
+                np.concatenate([[0], np.cumsum(groups_per_term)]),
+            ),
+            shape=(self.n_terms, self.n_blocks),
+        )
+        self.block_offsets = np.append(starts, self.nnz).astype(np.int64)
+
+        self.term_max = np.zeros(self.n_terms, dtype=np.float32)
+        nonempty = groups_per_term > 0
+        self.term_max[nonempty] = np.maximum.reduceat(
+            group_max, self.block_max.indptr[:-1][nonempty]
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Postings and impact arrays, for storage (see from_arrays)."""
+        return {
+            "indptr": self.indptr,
+            "doc_ids": self.doc_ids,
+            "weights": self.weights,
+            "block_max_data": self.block_max.data,
+            "block_max_indices": self.block_max.indices,
+            "block_max_indptr": self.block_max.indptr,
+            "block_offsets": self.block_offsets,
+            "term_max": self.term_max,
+        }
+
+    @classmethod
+    def from_arrays(
+        cls,
+        doc_matrix: csr_matrix,
+        arrays: Dict[str, np.ndarray],
+        block_size: int = BLOCK_SIZE,
+    ) -> "InvertedIndex":
+        """
+        Wrap stored arrays (e.g. memory-mapped) without rebuilding or copying.
+
+        Args:
+            doc_matrix: Row-sorted CSR matrix the arrays were built from
+            arrays: Output of :meth:`to_arrays`
+            block_size: Block size the arrays were built with
+        """
+        index = cls.__new__(cls)
+        index.doc_matrix = doc_matrix
+        index.n_docs, index.n_terms = doc_matrix.shape
+        index.indptr = arrays["indptr"]
+        index.doc_ids = arrays["doc_ids"]
+        index.weights = arrays["weights"]
+        index.block_size = block_size
+        index.n_blocks = -(-index.n_docs // block_size)
+        index._wrap_impacts(arrays)
+        return index
+
+    def _wrap_impacts(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Attach stored block-max / term-max arrays (see to_arrays)."""
+        self.block_max = csr_matrix(
+            (
+                arrays["block_max_data"],
+                arrays["block_max_indices"],
+                arrays["block_max_indptr"],
+            ),
+            shape=(self.n_terms, self.n_blocks),
+            copy=False,
+        )
+        self.block_offsets = arrays["block_offsets"]
+        self.term_max = arrays["term_max"]
+
+    @property
+    def nnz(self) -> int:
+        """Total number of postings."""
+        return int(self.indptr[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the postings and impact arrays."""
+        return (
+            self.indptr.nbytes
+            + self.doc_ids.nbytes
+            + self.weights.nbytes
+            + self.block_max.data.nbytes
+            + self.block_max.indices.nbytes
+            + self.block_max.indptr.nbytes
+            + self.block_offsets.nbytes
+            + self.term_max.nbytes
+        )
+
+    def eligible(self, mask: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Rows that may be returned under an optional row mask (no deletes here)."""
+        return mask
+
+    def postings(
+        self, term: int, doc_range: Optional[DocRange] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (doc_ids, weights) for a single term.
+
+        With a ``doc_range`` only the postings inside it are returned
+        (sliced, not copied).
+        """
+        start, end = self.indptr[term], self.indptr[term + 1]
+        docs, weights = self.doc_ids[start:end], self.weights[start:end]
+        if doc_range is not None:
+            lo, hi = np.searchsorted(docs, doc_range)
+            docs, weights = docs[lo:hi], weights[lo:hi]
+        return docs, weights
+
+    def docs_at(self, positions: np.ndarray) -> np.ndarray:
+        """Doc ids of the given posting positions."""
+        return self.doc_ids[positions]
+
+    def postings_length(self, terms: np.ndarray) -> int:
+        """Number of postings touched when scoring the given terms."""
+        terms = np.asarray(terms, dtype=np.int64)
+        return int((self.indptr[terms + 1] - self.indptr[terms]).sum())
+
+    @staticmethod
+    def query_terms(query_vec: spmatrix) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract (terms, weights) from a 1 x n_terms query vector.
+
+        Terms are returned in ascending order and weights as float64 so
+        that accumulation order and precision are the same everywhere.
+        """
+        query_vec = csr_matrix(query_vec)
+        terms = query_vec.indices.astype(np.int64)
+        weights = query_vec.data.astype(np.float64)
+        order = np.argsort(terms, kind="stable")
+        nonzero = weights[order] != 0
+        return terms[order][nonzero], weights[order][nonzero]
+
+    def score(
+        self,
+        query_vec: spmatrix,
+        mask: Optional[np.ndarray] = None,
+        doc_range: Optional[DocRange] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Accumulate scores term-at-a-time over the query's postings.
+
+        Args:
+            query_vec: 1 x n_terms sparse query vector (L2-normalized)
+            mask: Optional boolean row mask; other rows are never scored
+            doc_range: Optional (start, end) doc ids; only postings inside
+                are visited (sliced, not copied)
+
+        Returns:
+            Tuple of (doc_ids, scores) for every document sharing at least
+            one term with the query, doc ids ascending
+        """
+        terms, q_weights = self.query_terms(query_vec)
+        if len(terms) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+
+        start, end = (0, self.n_docs) if doc_range is None else doc_range
+        # np.zeros is backed by calloc, so untouched pages are never written
+        acc = np.zeros(end - start, dtype=np.float64)
+        touched = []
+        for term, q_weight in zip(terms, q_weights):
+            docs, weights = self.postings(term, doc_range)
+            if mask is not None:
+                keep = mask[docs]
+                docs, weights = docs[keep], weights[keep]
+            acc[docs - start if start else docs] += weights * q_weight
+            touched.append(docs)
+
+        candidates = (
+            touched[0] if len(touched) == 1 else np.unique(np.concatenate(touched))
+        )
+        return candidates, acc[candidates - start if start else candidates]
+
+    @property
+    def postings_matrix(self) -> csr_matrix:
+        """The postings as an (n_terms, n_docs) CSR matrix (no copy)."""
+        return csr_matrix(
+            (self.weights, self.doc_ids, self.indptr),
+            shape=(self.n_terms, self.n_docs),
+            copy=False,
+        )
+
+    def search_batch(
+        self,
+        query_matrix: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Top-K for many queries with one sparse matrix product per block.
+
+        Queries are grouped into row blocks whose touched postings stay under
+        ``max_block_nnz``, each block is multiplied with the postings matrix,
+        and top-K is selected per result row. Each query accumulates its
+        terms in ascending order in float64, so results equal :meth:`search`.
+
+        Args:
+            query_matrix: (n_queries, n_terms) sparse query vectors
+            top_k: Number of results per query
+            pad: Fill up to ``top_k`` with zero-score documents
+            max_block_nnz: Memory bound on score entries per block
+
+        Returns:
+            List of (indices, similarities) tuples, one per query
+        """
+        queries = csr_matrix(query_matrix, dtype=np.float64)
+        queries.sort_indices()
+        postings = self.postings_matrix
+
+        # Postings touched per query bound the non-zeros of its score row
+        lengths = np.diff(self.indptr)
+        row_cost = np.add.reduceat(
+            np.append(lengths[queries.indices], 0), queries.indptr[:-1]
+        )
+        row_cost[np.diff(queries.indptr) == 0] = 0
+
+        results = []
+        start = 0
+        while start < queries.shape[0]:
+            end = start + 1
+            block_cost = row_cost[start]
+            while (
+                end < queries.shape[0] and block_cost + row_cost[end] <= max_block_nnz
+            ):
+                block_cost += row_cost[end]
+                end += 1
+
+            scores = queries[start:end] @ postings
+            for row in range(end - start):
+                lo, hi = scores.indptr[row], scores.indptr[row + 1]
+                indices, row_scores = select_top_k(
+                    scores.indices[lo:hi].astype(np.int32), scores.data[lo:hi], top_k
+                )
+                if pad:
+                    indices, row_scores = pad_with_unscored(
+                        indices, row_scores, top_k, self.n_docs
+                    )
+                results.append((indices, row_scores))
+            start = end
+
+        return results
+
+    def score_subset(
+        self, query_vec: spmatrix, rows: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score only the given rows with row-major dot products.
+
+        Cost is proportional to the non-zeros of those rows, which beats
+        walking the postings when a pre-filter leaves few eligible rows.
+        Each row sums its terms in ascending order in float64, so scores
+        are bit-identical to :meth:`score`.
+
+        Returns:
+            Tuple of (doc_ids, scores) for rows with a positive score
+        """
+        terms, q_weights = self.query_terms(query_vec)
+        rows = np.asarray(rows, dtype=np.int32)
+        if len(terms) == 0 or len(rows) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+
+        dense_query = np.zeros(self.n_terms, dtype=np.float64)
+        dense_query[terms] = q_weights
+        scores = np.asarray(self.doc_matrix[rows] @ dense_query).ravel()
+        keep = scores > 0
+        return rows[keep], scores[keep]
+
+    def rows_nnz(self, rows: np.ndarray) -> int:
+        """Non-zeros touched when scoring the given rows."""
+        indptr = self.doc_matrix.indptr
+        return int((indptr[rows + 1] - indptr[rows]).sum())
+
+    def _block_entries(
+        self, terms: np.ndarray, q_weights: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Block-max entries of the query terms, in ascending term order.
+
+        Returns:
+            Tuple of (entries, blocks, q_weights) where ``entries`` index
+            ``block_max.data`` / ``block_offsets`` and ``q_weights`` repeats
+            the query weight of the owning term
+        """
+        starts = self.block_max.indptr[terms]
+        ends = self.block_max.indptr[terms + 1]
+        entries = _concat_ranges(starts, ends)
+        return (
+            entries,
+            self.block_max.indices[entries],
+            np.repeat(q_weights, ends - starts),
+        )
+
+    def block_bounds(
+        self,
+        terms: np.ndarray,
+        q_weights: np.ndarray,
+        bound: Literal["wand", "block_max"] = "block_max",
+    ) -> np.ndarray:
+        """
+        Upper bound of the score of any document in each block.
+
+        ``"wand"`` uses the per-term maximum weight for every block the term
+        occurs in; ``"block_max"`` uses the (tighter) per-block maximum.
+        """
+        entries, blocks, entry_q = self._block_entries(terms, q_weights)
+        if bound == "wand":
+            impacts = np.repeat(
+                self.term_max[terms], np.diff(self.block_max.indptr)[terms]
+            )
+        else:
+            impacts = self.block_max.data[entries]
+        bounds = np.bincount(blocks, weights=impacts * entry_q, minlength=self.n_blocks)
+        return bounds * (1 + _BOUND_SLACK)
+
+    def pruned_search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        bound: Literal["wand", "block_max"] = "block_max",
+        mask: Optional[np.ndarray] = None,
+        doc_range: Optional[DocRange] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Safe early-termination top-K search.
+
+        Blocks are visited in decreasing upper-bound order, in geometrically
+        growing batches. Each document is scored exactly (all query terms,
+        ascending term order, float64), so scores are bit-identical to
+        :meth:`score`. The search stops as soon as the best remaining bound
+        is strictly below the current K-th score, which makes the result
+        identical to exhaustive scoring, ties included. With a ``mask``,
+        blocks without eligible rows are never visited; with a block-aligned
+        ``doc_range`` only the blocks inside it are.
+
+        Returns:
+            Tuple of (indices, similarities, stats) where stats counts the
+            blocks and postings actually scored
+        """
+        terms, q_weights = self.query_terms(query_vec)
+        stats = {"blocks_total": self.n_blocks, "blocks_scored": 0, "postings": 0}
+        best_ids = np.empty(0, dtype=np.int32)
+        best_scores = np.empty(0, dtype=np.float64)
+        if len(terms) == 0 or top_k <= 0:
+            return best_ids, best_scores, stats
+
+        entries, entry_blocks, entry_q = self._block_entries(terms, q_weights)
+        bounds = self.block_bounds(terms, q_weights, bound)
+        if mask is not None:
+            has_eligible = np.bincount(
+                np.flatnonzero(mask) // self.block_size, minlength=self.n_blocks
+            )
+            bounds[has_eligible == 0] = 0
+        if doc_range is not None:
+            bounds[: doc_range[0] // self.block_size] = 0
+            bounds[-(-doc_range[1] // self.block_size) :] = 0
+        order = np.flatnonzero(bounds > 0)
+        order = order[np.argsort(-bounds[order], kind="stable")]
+
+        acc = np.zeros(self.n_docs, dtype=np.float64)
+        selected = np.zeros(self.n_blocks, dtype=bool)
+        batch = max(8, -(-top_k // self.block_size))
+        pos = 0
+        while pos < len(order):
+            blocks = order[pos : pos + batch]
+            if len(best_ids) == top_k:
+                blocks = blocks[bounds[blocks] >= best_scores[-1]]
+                if len(blocks) == 0:
+                    break
+            pos += len(blocks)
+            batch *= 2
+
+            # Postings of every query term inside the chosen blocks, in term
+            # order, so each document accumulates exactly as in score()
+            selected[:] = False
+            selected[blocks] = True
+            keep = selected[entry_blocks]
+            hits = entries[keep]
+            lengths = self.block_offsets[hits + 1] - self.block_offsets[hits]
+            idx = _concat_ranges(self.block_offsets[hits], self.block_offsets[hits + 1])
+            docs = self.docs_at(idx)
+            contrib = self.weights[idx] * np.repeat(entry_q[keep], lengths)
+            if mask is not None:
+                eligible = mask[docs]
+                docs, contrib = docs[eligible], contrib[eligible]
+            np.add.at(acc, docs, contrib)
+            stats["blocks_scored"] += len(blocks)
+            stats["postings"] += len(idx)
+
+            docs = np.unique(docs)
+            best_ids, best_scores = select_top_k(
+                np.concatenate([best_ids, docs]),
+                np.concatenate([best_scores, acc[docs]]),
+                top_k,
+            )
+
+        return best_ids, best_scores, stats
+
+    def search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        doc_range: Optional[DocRange] = None,
+        pool: Optional[ScoringPool] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the top-K documents for a query vector.
+
+        Args:
+            query_vec: 1 x n_terms sparse query vector
+            top_k: Number of results to return
+            pad: Fill up to ``top_k`` with zero-score documents
+            strategy: ``"exhaustive"`` scores every posting of the query
+                terms; ``"wand"`` / ``"block_max"`` prune blocks that cannot
+                reach the top-K; ``"subset"`` scores only the ``mask`` rows;
+                ``"auto"`` prunes when ``top_k`` is small
+            mask: Optional boolean row mask (pre-filter); only eligible rows
+                are scored and returned
+            doc_range: Optional block-aligned (start, end) doc ids to search
+            pool: Optional ScoringPool; large queries are split into row
+                ranges searched concurrently, each keeping its own top-K
+
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        if strategy == "auto":
+            strategy = "block_max" if top_k <= PRUNING_MAX_K else "exhaustive"
+
+        ranges = None
+        if pool is not None and doc_range is None:
+            ranges = pool.ranges(self, query_vec)
+
+        if ranges is not None:
+            parts = pool.map(
+                lambda part: self.search(
+                    query_vec, top_k, False, strategy, mask, doc_range=part
+                ),
+                ranges,
+            )
+            indices, scores = select_top_k(
+                np.concatenate([ids for ids, _ in parts]),
+                np.concatenate([part_scores for _, part_scores in parts]),
+                top_k,
+            )
+        elif strategy == "subset":
+            if mask is None:
+                raise ValueError("The 'subset' strategy requires a mask.")
+            start, end = (0, self.n_docs) if doc_range is None else doc_range
+            rows = np.flatnonzero(mask[start:end]) + start
+            candidates, scores = self.score_subset(query_vec, rows)
+            indices, scores = select_top_k(candidates, scores, top_k)
+        elif strategy == "exhaustive":
+            candidates, scores = self.score(query_vec, mask=mask, doc_range=doc_range)
+            indices, scores = select_top_k(candidates, scores, top_k)
+        else:
+            indices, scores, _ = self.pruned_search(
+                query_vec, top_k, bound=strategy, mask=mask, doc_range=doc_range
+            )
+
+        if pad:
+            indices, scores = pad_with_unscored(
+                indices, scores, top_k, self.n_docs, mask=mask
+            )
+        return indices, scores
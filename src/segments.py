@@ -0,0 +1,722 @@
+"""
+Segmented Index Module
+
+Near-real-time ingest for the TF-IDF index. Instead of one inverted index
+rebuilt by vectorize.py, the index is a list of immutable segments (each an
+InvertedIndex over some rows) plus a small in-memory write segment that
+new postings are appended to. Once the write segment holds enough rows it
+is sealed into an immutable segment.
+
+Row ids are global and append-only: the loaded index keeps rows
+``0..n-1`` and every new posting gets the next id, so the row -> job
+mapping and the filter bitmaps only ever grow at the end. Deletes set a
+bit in a tombstone bitmap; deleted rows are skipped by every search and
+physically dropped when their segment is merged. A background merge
+policy compacts small segments (tiers of similar size) and rewrites
+segments that are mostly deleted.
+
+Searches fan out across segments and merge the per-segment top-K. Each
+row is scored exactly as in a single InvertedIndex and ties are broken by
+global row id, so results do not depend on how rows are segmented.
+
+With listing times (epoch milliseconds, as ``listed_time`` / ``expiry`` in
+the raw postings) the loaded rows can be split into one segment per
+listing period, and merges never mix periods. Every segment knows its
+listing time range, so a "posted within N days" view skips whole older
+partitions and only checks rows of the partition straddling the cutoff.
+Rows past their expiry are folded into the tombstone bitmap when a view is
+published, so scoring excludes them at no extra cost; eviction tombstones
+them for good, and merges then drop them without a rebuild.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix, vstack
+
+from .scoring import (
+    BATCH_MAX_NNZ,
+    BLOCK_SIZE,
+    InvertedIndex,
+    ScoringPool,
+    Strategy,
+    pad_with_unscored,
+    select_top_k,
+)
+
+# Rows buffered in the write segment before it is sealed
+FLUSH_ROWS = 1000
+
+# Segments of one size tier that trigger a merge
+MERGE_FACTOR = 8
+
+# Fraction of deleted rows at which a segment is rewritten on its own
+EXPUNGE_RATIO = 0.5
+
+# Listing and expiry times are epoch milliseconds
+DAY_MS = 86_400_000
+
+
+def now_ms() -> float:
+    """Current time in epoch milliseconds."""
+    return time.time() * 1000.0
+
+
+class Segment:
+    """Immutable InvertedIndex over an ascending set of global row ids."""
+
+    def __init__(
+        self,
+        doc_ids: np.ndarray,
+        index: InvertedIndex,
+        listed: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialize Segment.
+
+        Args:
+            doc_ids: Global row id of every local row, ascending
+            index: Inverted index over the segment's rows
+            listed: Listing time of every local row (NaN = unknown)
+        """
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self.index = index
+        self.start = int(self.doc_ids[0]) if len(self.doc_ids) else 0
+        last = int(self.doc_ids[-1]) if len(self.doc_ids) else -1
+        self.contiguous = last - self.start + 1 == len(self.doc_ids)
+
+        # Listing time range; unknown times count as older than any cutoff
+        self.listed_min, self.listed_max = -np.inf, np.inf
+        if listed is not None and len(listed):
+            known = np.where(np.isnan(listed), -np.inf, listed)
+            self.listed_min, self.listed_max = float(known.min()), float(known.max())
+
+    @classmethod
+    def build(
+        cls,
+        doc_ids: np.ndarray,
+        doc_matrix: spmatrix,
+        block_size: int = BLOCK_SIZE,
+        listed: Optional[np.ndarray] = None,
+    ) -> "Segment":
+        """Index the rows of ``doc_matrix`` under the given global ids."""
+        return cls(doc_ids, InvertedIndex(doc_matrix, block_size), listed)
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_ids)
+
+    def local(self, values: np.ndarray) -> np.ndarray:
+        """Restrict a per-global-row array to this segment's rows."""
+        if self.contiguous:
+            return values[self.start : self.start + self.n_docs]
+        return values[self.doc_ids]
+
+    def assign(self, target: np.ndarray, values: Any) -> None:
+        """Write values into a per-global-row array at this segment's rows."""
+        if self.contiguous:
+            target[self.start : self.start + self.n_docs] = values
+        else:
+            target[self.doc_ids] = values
+
+    def locate(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find global rows inside this segment.
+
+        Returns:
+            Tuple of (boolean selector over ``rows``, local row ids)
+        """
+        if self.contiguous:
+            local = rows.astype(np.int64) - self.start
+            inside = (local >= 0) & (local < self.n_docs)
+            return inside, local[inside]
+        pos = np.searchsorted(self.doc_ids, rows)
+        pos[pos == self.n_docs] = 0
+        inside = self.doc_ids[pos] == rows
+        return inside, pos[inside]
+
+
+class SegmentedIndex:
+    """
+    Point-in-time view of a segmented index.
+
+    Offers the InvertedIndex interface used by VectorStore, QueryPlanner
+    and JobRecommender over global row ids. Masks are global; tombstoned
+    rows are never scored, returned or used as padding. A view never
+    changes: ingest and merges publish a new one (see SegmentWriter.reader).
+    """
+
+    def __init__(
+        self,
+        segments: Sequence[Segment],
+        n_docs: int,
+        deleted: Optional[np.ndarray] = None,
+        listed: Optional[np.ndarray] = None,
+        n_terms: Optional[int] = None,
+    ):
+        """
+        Initialize SegmentedIndex.
+
+        Args:
+            segments: Segments covering every live row exactly once
+            n_docs: Size of the global row id space
+            deleted: Tombstone bitmap of length ``n_docs`` (None = no deletes)
+            listed: Listing time of every global row (enables :meth:`since`)
+            n_terms: Vocabulary size (default: taken from the first segment)
+        """
+        self.segments = list(segments)
+        self.n_docs = n_docs
+        self.n_terms = n_terms if n_terms is not None else segments[0].index.n_terms
+        self.listed = listed
+        self.live = None
+        if deleted is not None and deleted.any():
+            self.live = ~deleted
+        self._has_deletes = [
+            self.live is not None and not segment.local(self.live).all()
+            for segment in self.segments
+        ]
+
+    @property
+    def nnz(self) -> int:
+        """Total number of postings (deleted rows included until merged)."""
+        return sum(segment.index.nnz for segment in self.segments)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the postings and impact arrays of all segments."""
+        return sum(segment.index.nbytes for segment in self.segments)
+
+    @property
+    def n_deleted(self) -> int:
+        """Number of tombstoned rows."""
+        return 0 if self.live is None else int(self.n_docs - self.live.sum())
+
+    query_terms = staticmethod(InvertedIndex.query_terms)
+
+    def since(self, cutoff: float) -> "SegmentedIndex":
+        """
+        View restricted to rows listed at or after ``cutoff`` (epoch ms).
+
+        Segments listed entirely before the cutoff are dropped without
+        looking at their rows; only segments straddling it are checked row
+        by row. Rows with an unknown listing time are excluded.
+
+        Raises:
+            ValueError: If the index has no listing times
+        """
+        if self.listed is None:
+            raise ValueError("Listing times are not indexed.")
+
+        recent = np.zeros(self.n_docs, dtype=bool)
+        segments = []
+        for segment in self.segments:
+            if segment.listed_max < cutoff:
+                continue
+            segments.append(segment)
+            if segment.listed_min >= cutoff:
+                segment.assign(recent, True)
+            else:
+                segment.assign(recent, segment.local(self.listed) >= cutoff)
+
+        live = recent if self.live is None else recent & self.live
+        return SegmentedIndex(segments, self.n_docs, ~live, self.listed, self.n_terms)
+
+    def eligible(self, mask: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Rows that may be returned under an optional row mask."""
+        if self.live is None:
+            return mask
+        return self.live if mask is None else mask & self.live
+
+    def _segment_masks(
+        self, mask: Optional[np.ndarray]
+    ) -> Iterator[Tuple[Segment, Optional[np.ndarray]]]:
+        """Segments with eligible rows, each with its local mask (or None)."""
+        for segment, has_deletes in zip(self.segments, self._has_deletes):
+            local = None if mask is None else segment.local(mask)
+            if has_deletes:
+                live = segment.local(self.live)
+                local = live if local is None else local & live
+            if local is not None and not local.any():
+                continue
+            yield segment, local
+
+    def postings_length(self, terms: np.ndarray) -> int:
+        """Number of postings touched when scoring the given terms."""
+        return sum(segment.index.postings_length(terms) for segment in self.segments)
+
+    def rows_nnz(self, rows: np.ndarray) -> int:
+        """Non-zeros touched when scoring the given rows."""
+        rows = np.asarray(rows)
+        total = 0
+        for segment in self.segments:
+            _, local = segment.locate(rows)
+            total += segment.index.rows_nnz(local)
+        return total
+
+    def row_vector(self, row: int) -> spmatrix:
+        """
+        Stored TF-IDF row of a global row id (1 x n_terms).
+
+        Raises:
+            ValueError: If no segment holds the row (merged away after a
+                delete, or never indexed)
+        """
+        rows = np.array([row], dtype=np.int64)
+        for segment in self.segments:
+            inside, local = segment.locate(rows)
+            if inside[0]:
+                return segment.index.doc_matrix[int(local[0])]
+        raise ValueError(f"Row {row} is not indexed")
+
+    def score(
+        self, query_vec: spmatrix, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores of every eligible row sharing a term with the query.
+
+        Returns:
+            Tuple of (row ids, scores), row ids ascending
+        """
+        ids, scores = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.float64)]
+        for segment, local_mask in self._segment_masks(mask):
+            candidates, segment_scores = segment.index.score(query_vec, mask=local_mask)
+            ids.append(segment.doc_ids[candidates])
+            scores.append(segment_scores)
+        return self._sorted(ids, scores)
+
+    def score_subset(
+        self, query_vec: spmatrix, rows: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score only the given (non-deleted) rows with row-major dot products.
+
+        Returns:
+            Tuple of (row ids, scores) for rows with a positive score,
+            row ids ascending
+        """
+        rows = np.asarray(rows, dtype=np.int32)
+        if self.live is not None:
+            rows = rows[self.live[rows]]
+        ids, scores = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.float64)]
+        for segment in self.segments:
+            inside, local = segment.locate(rows)
+            if not inside.any():
+                continue
+            candidates, segment_scores = segment.index.score_subset(query_vec, local)
+            ids.append(segment.doc_ids[candidates])
+            scores.append(segment_scores)
+        return self._sorted(ids, scores)
+
+    @staticmethod
+    def _sorted(
+        ids: List[np.ndarray], scores: List[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        order = np.argsort(ids, kind="stable")
+        return ids[order], scores[order]
+
+    def search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        pool: Optional[ScoringPool] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K over all segments (see InvertedIndex.search for arguments).
+
+        Every segment returns its own exact top-K with the same strategy;
+        the global top-K is selected from their union. With a ``pool``,
+        large segments split their own row ranges across it.
+        """
+        if strategy == "subset" and mask is None:
+            raise ValueError("The 'subset' strategy requires a mask.")
+
+        ids, scores = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.float64)]
+        for segment, local_mask in self._segment_masks(mask):
+            indices, segment_scores = segment.index.search(
+                query_vec,
+                top_k,
+                pad=False,
+                strategy=strategy,
+                mask=local_mask,
+                pool=pool,
+            )
+            ids.append(segment.doc_ids[indices])
+            scores.append(segment_scores)
+        indices, scores = select_top_k(
+            np.concatenate(ids), np.concatenate(scores), top_k
+        )
+
+        if pad:
+            indices, scores = pad_with_unscored(
+                indices, scores, top_k, self.n_docs, mask=self.eligible(mask)
+            )
+        return indices, scores
+
+    def search_batch(
+        self,
+        query_matrix: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Batched top-K over all segments (see InvertedIndex.search_batch).
+
+        Batched products take no mask, so a segment with tombstones is
+        asked for ``top_k`` plus its number of deleted rows, which always
+        leaves ``top_k`` live rows after the deleted ones are dropped.
+        """
+        n_queries = query_matrix.shape[0]
+        ids = [[np.empty(0, dtype=np.int32)] for _ in range(n_queries)]
+        scores = [[np.empty(0, dtype=np.float64)] for _ in range(n_queries)]
+        for segment, local_live in self._segment_masks(None):
+            n_deleted = 0 if local_live is None else int((~local_live).sum())
+            hits = segment.index.search_batch(
+                query_matrix, top_k + n_deleted, pad=False, max_block_nnz=max_block_nnz
+            )
+            for i, (indices, segment_scores) in enumerate(hits):
+                if local_live is not None:
+                    keep = local_live[indices]
+                    indices, segment_scores = indices[keep], segment_scores[keep]
+                ids[i].append(segment.doc_ids[indices])
+                scores[i].append(segment_scores)
+
+        eligible = self.eligible()
+        results = []
+        for query_ids, query_scores in zip(ids, scores):
+            indices, row_scores = select_top_k(
+                np.concatenate(query_ids), np.concatenate(query_scores), top_k
+            )
+            if pad:
+                indices, row_scores = pad_with_unscored(
+                    indices, row_scores, top_k, self.n_docs, mask=eligible
+                )
+            results.append((indices, row_scores))
+        return results
+
+
+class SegmentWriter:
+    """
+    Mutable side of a segmented index: ingest, deletes and merges.
+
+    Thread-safe. Changes become visible to searches through a new
+    :meth:`reader`; merges run on a background thread and call ``on_merge``
+    when a merged segment has replaced its sources.
+    """
+
+    def __init__(
+        self,
+        base: InvertedIndex,
+        flush_rows: int = FLUSH_ROWS,
+        merge_factor: int = MERGE_FACTOR,
+        on_merge: Optional[Callable[[], None]] = None,
+        listed: Optional[np.ndarray] = None,
+        expiry: Optional[np.ndarray] = None,
+        partition_days: Optional[float] = None,
+    ):
+        """
+        Initialize SegmentWriter.
+
+        Args:
+            base: Index of the loaded rows; becomes the first segment(s)
+            flush_rows: Rows buffered before the write segment is sealed
+            merge_factor: Segments of one size tier that trigger a merge
+            on_merge: Called (from the merge thread) after each merge
+            listed: Listing time (epoch ms, NaN = unknown) of the base rows
+            expiry: Expiry time (epoch ms, NaN = never) of the base rows
+            partition_days: Split the base rows into one segment per listing
+                period of this many days (requires ``listed``)
+        """
+        self.n_terms = base.n_terms
+        self.block_size = base.block_size
+        self.flush_rows = flush_rows
+        self.merge_factor = merge_factor
+        self.on_merge = on_merge
+
+        self.n_docs = base.n_docs
+        self.deleted = np.zeros(base.n_docs, dtype=bool)
+        self.listed = None if listed is None else np.asarray(listed, dtype=np.float64)
+        self.expiry = None if expiry is None else np.asarray(expiry, dtype=np.float64)
+        self.partition_ms = None
+        if partition_days is not None and self.listed is not None:
+            self.partition_ms = partition_days * DAY_MS
+        self.segments: List[Segment] = self._partition(base)
+        self.merges = 0
+
+        self._buffer: List[csr_matrix] = []
+        self._buffer_start = self.n_docs
+        self._write_segment: Optional[Segment] = None
+        self._lock = threading.Lock()
+        self._merger: Optional[ThreadPoolExecutor] = None
+        self._merging: Optional[Future] = None
+
+    def _partition(self, base: InvertedIndex) -> List[Segment]:
+        """One segment per listing period of the base rows (or just one)."""
+        rows = np.arange(base.n_docs, dtype=np.int32)
+        if self.partition_ms is None:
+            return [Segment(rows, base, self._listed(rows))]
+
+        periods = self._period(self.listed)
+        if len(np.unique(periods)) <= 1:
+            return [Segment(rows, base, self._listed(rows))]
+        order = np.argsort(periods, kind="stable")
+        bounds = np.flatnonzero(np.diff(periods[order])) + 1
+        return [
+            Segment.build(
+                part, base.doc_matrix[part], self.block_size, self._listed(part)
+            )
+            for part in np.split(rows[order], bounds)
+        ]
+
+    def _period(self, listed: np.ndarray) -> np.ndarray:
+        """Listing period of each time; unknown times share period -1."""
+        periods = np.full(len(listed), -1, dtype=np.int64)
+        known = ~np.isnan(listed)
+        periods[known] = np.floor(listed[known] / self.partition_ms)
+        return periods
+
+    def _listed(self, rows: np.ndarray) -> Optional[np.ndarray]:
+        return None if self.listed is None else self.listed[rows]
+
+    def add(
+        self,
+        vectors: spmatrix,
+        listed: Optional[Sequence[float]] = None,
+        expiry: Optional[Sequence[float]] = None,
+    ) -> np.ndarray:
+        """
+        Append rows to the write segment.
+
+        Args:
+            vectors: (n_new, n_terms) L2-normalized TF-IDF rows
+            listed: Listing times of the new rows (epoch ms, NaN = unknown)
+            expiry: Expiry times of the new rows (epoch ms, NaN = never)
+
+        Returns:
+            Global row ids assigned to the new rows
+        """
+        vectors = csr_matrix(vectors)
+        if vectors.shape[1] != self.n_terms:
+            raise ValueError(
+                f"Expected {self.n_terms} features, got {vectors.shape[1]}."
+            )
+
+        with self._lock:
+            rows = np.arange(
+                self.n_docs, self.n_docs + vectors.shape[0], dtype=np.int32
+            )
+            self.n_docs += vectors.shape[0]
+            self.deleted = np.append(self.deleted, np.zeros(len(rows), dtype=bool))
+            if self.listed is not None:
+                self.listed = np.append(self.listed, _times(listed, len(rows)))
+            if self.expiry is not None:
+                self.expiry = np.append(self.expiry, _times(expiry, len(rows)))
+            self._buffer.append(vectors)
+            self._write_segment = None
+            if self.n_docs - self._buffer_start >= self.flush_rows:
+                self._flush()
+        return rows
+
+    def delete(self, rows: Sequence[int]) -> int:
+        """
+        Tombstone rows.
+
+        Returns:
+            Number of rows that were not deleted before
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            rows = rows[(rows >= 0) & (rows < self.n_docs)]
+            rows = np.unique(rows[~self.deleted[rows]])
+            self.deleted[rows] = True
+            if len(rows):
+                self._schedule_merge()
+        return len(rows)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """
+        Tombstone every row whose expiry has passed.
+
+        Mostly expired segments are then rewritten by the merge policy,
+        which drops the rows for good.
+
+        Returns:
+            Number of rows evicted
+        """
+        if self.expiry is None:
+            return 0
+        now = now_ms() if now is None else now
+        with self._lock:
+            expired = np.flatnonzero(self.expiry <= now)
+        return self.delete(expired)
+
+    def flush(self) -> None:
+        """Seal the write segment into an immutable segment."""
+        with self._lock:
+            self._flush()
+
+    def _buffered_segment(self) -> Optional[Segment]:
+        """Index over the buffered rows, built once per change (lock held)."""
+        if not self._buffer:
+            return None
+        if self._write_segment is None:
+            rows = np.arange(self._buffer_start, self.n_docs, dtype=np.int32)
+            self._write_segment = Segment.build(
+                rows,
+                vstack(self._buffer, format="csr"),
+                self.block_size,
+                self._listed(rows),
+            )
+        return self._write_segment
+
+    def _flush(self) -> None:
+        segment = self._buffered_segment()
+        if segment is None:
+            return
+        self.segments = self.segments + [segment]
+        self._buffer = []
+        self._buffer_start = self.n_docs
+        self._write_segment = None
+        self._schedule_merge()
+
+    def reader(self, now: Optional[float] = None) -> SegmentedIndex:
+        """
+        Point-in-time view of all segments, write segment included.
+
+        Args:
+            now: Rows whose expiry is at or before this time (epoch ms,
+                default: the current time) are excluded like deleted rows
+        """
+        with self._lock:
+            segments = list(self.segments)
+            buffered = self._buffered_segment()
+            if buffered is not None:
+                segments.append(buffered)
+            excluded = self.deleted.copy()
+            if self.expiry is not None:
+                excluded |= self.expiry <= (now_ms() if now is None else now)
+            return SegmentedIndex(
+                segments, self.n_docs, excluded, self.listed, self.n_terms
+            )
+
+    def _pick_merge(self) -> Optional[List[Segment]]:
+        """
+        Segments to merge next, or None (lock held).
+
+        A segment that is mostly deleted is rewritten alone. Otherwise
+        segments are grouped into size tiers (powers of ``merge_factor``
+        times ``flush_rows`` live rows), per listing period when the index
+        is partitioned, and the smallest tier holding ``merge_factor``
+        segments is merged.
+        """
+        tiers: Dict[Tuple[int, int], List[Segment]] = {}
+        for segment in self.segments:
+            deleted = int(segment.local(self.deleted).sum())
+            if deleted and deleted >= EXPUNGE_RATIO * segment.n_docs:
+                return [segment]
+            live = max(1, segment.n_docs - deleted)
+            tier = max(0, int(math.log(live / self.flush_rows, self.merge_factor)))
+            period = 0
+            if self.partition_ms is not None and np.isfinite(segment.listed_max):
+                period = int(segment.listed_max // self.partition_ms)
+            tiers.setdefault((tier, period), []).append(segment)
+
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= self.merge_factor:
+                return tiers[tier][: self.merge_factor]
+        return None
+
+    def _schedule_merge(self) -> None:
+        """Start a background merge if the policy picks one (lock held)."""
+        if self._merging is not None:
+            return
+        candidates = self._pick_merge()
+        if candidates is None:
+            return
+        if self._merger is None:
+            self._merger = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="segment-merge"
+            )
+        self._merging = self._merger.submit(self._merge, candidates)
+
+    def _merge(self, candidates: List[Segment]) -> Optional[Segment]:
+        """Merge segments, dropping deleted rows, then swap the result in."""
+        try:
+            with self._lock:
+                deleted = self.deleted.copy()
+
+            doc_ids = np.concatenate([segment.doc_ids for segment in candidates])
+            matrix = vstack(
+                [segment.index.doc_matrix for segment in candidates], format="csr"
+            )
+            keep = np.flatnonzero(~deleted[doc_ids])
+            keep = keep[np.argsort(doc_ids[keep], kind="stable")]
+            merged = None
+            if len(keep):
+                merged = Segment.build(
+                    doc_ids[keep],
+                    matrix[keep],
+                    self.block_size,
+                    self._listed(doc_ids[keep]),
+                )
+
+            with self._lock:
+                self.segments = [
+                    segment
+                    for segment in self.segments
+                    if not any(segment is source for source in candidates)
+                ] + ([merged] if merged is not None else [])
+                self.merges += 1
+        finally:
+            with self._lock:
+                self._merging = None
+                self._schedule_merge()
+
+        if self.on_merge is not None:
+            self.on_merge()
+        return merged
+
+    def wait_for_merges(self) -> None:
+        """Block until no merge is running or scheduled."""
+        while True:
+            with self._lock:
+                pending = self._merging
+            if pending is None:
+                return
+            pending.result()
+
+    def close(self) -> None:
+        """Finish running merges and stop the merge thread."""
+        self.wait_for_merges()
+        if self._merger is not None:
+            self._merger.shutdown(wait=True)
+            self._merger = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Segment sizes, buffered and deleted rows, and merges run."""
+        with self._lock:
+            return {
+                "segments": len(self.segments),
+                "segment_rows": [segment.n_docs for segment in self.segments],
+                "buffered_rows": self.n_docs - self._buffer_start,
+                "rows": self.n_docs,
+                "deleted": int(self.deleted.sum()),
+                "merges": self.merges,
+            }
+
+
+def _times(values: Optional[Sequence[float]], n: int) -> np.ndarray:
+    """Timestamps as float64 (all NaN when not given)."""
+    if values is None:
+        return np.full(n, np.nan)
+    return np.asarray(values, dtype=np.float64)
@@ -0,0 +1,234 @@
+"""
+Shard Server
+Serve one index shard over a small TCP protocol
+
+A shard server memory-maps a shard bundle written by write_shards (see
+src/shards.py) and answers search and score requests for its rows, so a
+ShardCoordinator (see src/recommender.py) can fan queries out over several
+hosts.
+
+Every message is a frame: a 4-byte big-endian length, a JSON header of that
+length, then the raw bytes of the arrays listed in the header's
+``"arrays"`` entry (``[name, dtype, shape]`` triples, in order). No pickles
+cross the wire. A connection carries any number of request/reply pairs.
+
+Usage:
+    python -m src.shard_server models/shards/shard-000.bundle --port 9101
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import socketserver
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .shards import load_shard, search_counted
+
+_LENGTH = struct.Struct(">I")
+
+# Upper bounds on a header and on a frame's array bytes, so a stray client
+# cannot make us allocate GBs (a 10M-row mask or score reply is ~100 MB)
+MAX_HEADER_BYTES = 1 << 20
+MAX_PAYLOAD_BYTES = 1 << 30
+
+Message = Tuple[Dict[str, Any], Dict[str, np.ndarray]]
+
+
+def _recv_exact(sock: socket.socket, n_bytes: int) -> bytearray:
+    """Read exactly ``n_bytes``; raises EOFError if the peer closes first."""
+    buffer = bytearray(n_bytes)
+    view = memoryview(buffer)
+    received = 0
+    while received < n_bytes:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise EOFError("Connection closed by peer.")
+        received += count
+    return buffer
+
+
+def send_message(
+    sock: socket.socket,
+    header: Dict[str, Any],
+    arrays: Optional[Dict[str, np.ndarray]] = None,
+) -> None:
+    """Send one frame: JSON header followed by the arrays' raw bytes."""
+    arrays = {
+        name: np.ascontiguousarray(array) for name, array in (arrays or {}).items()
+    }
+    header = dict(
+        header,
+        arrays=[[name, a.dtype.str, list(a.shape)] for name, a in arrays.items()],
+    )
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded)
+    for array in arrays.values():
+        sock.sendall(array.tobytes())
+
+
+def recv_message(sock: socket.socket) -> Message:
+    """
+    Receive one frame.
+
+    Returns:
+        Tuple of (header, arrays)
+
+    Raises:
+        EOFError: If the peer closed the connection
+        ValueError: If the frame is malformed
+    """
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    if length > MAX_HEADER_BYTES:
+        raise ValueError(f"Header of {length:,} bytes exceeds the limit.")
+    header = json.loads(_recv_exact(sock, length).decode("utf-8"))
+
+    # Validate every array spec and the total size before reading any bytes
+    specs = []
+    payload = 0
+    for name, dtype, shape in header.pop("arrays", []):
+        dtype = np.dtype(dtype)
+        if dtype.hasobject:
+            raise ValueError(f"Array {name} has an object dtype.")
+        shape = tuple(int(dim) for dim in shape)
+        if any(dim < 0 for dim in shape):
+            raise ValueError(f"Array {name} has a negative dimension.")
+        n_bytes = dtype.itemsize
+        for dim in shape:
+            n_bytes *= dim
+        payload += n_bytes
+        if payload > MAX_PAYLOAD_BYTES:
+            raise ValueError(f"Arrays of {payload:,}+ bytes exceed the limit.")
+        specs.append((name, dtype, shape, n_bytes))
+
+    arrays = {}
+    for name, dtype, shape, n_bytes in specs:
+        raw = _recv_exact(sock, n_bytes)
+        arrays[name] = np.frombuffer(raw, dtype=dtype).reshape(shape)
+    return header, arrays
+
+
+class ShardServer(socketserver.ThreadingTCPServer):
+    """TCP server answering requests for one memory-mapped shard."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, path: Path | str, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize ShardServer and bind its socket.
+
+        Args:
+            path: Shard bundle file (see write_shards)
+            host: Interface to listen on
+            port: TCP port (0 picks a free one; see ``address``)
+        """
+        self.path = Path(path)
+        self.index, self.row_start = load_shard(self.path)
+        super().__init__((host, port), _ShardHandler)
+
+    @property
+    def address(self) -> str:
+        """``host:port`` the server is listening on."""
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def answer(self, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Message:
+        """
+        Handle one request.
+
+        Methods:
+            info: Shard row range and vocabulary size
+            search: Unpadded top-K with filter-match counts
+            score: Every eligible row sharing a term with the query
+
+        Raises:
+            ValueError: If the method is unknown
+        """
+        method = header.get("method")
+        if method == "info":
+            return {
+                "status": "ok",
+                "row_start": self.row_start,
+                "n_docs": self.index.n_docs,
+                "n_terms": self.index.n_terms,
+            }, {}
+
+        query_vec = csr_matrix(
+            (
+                arrays["query_data"],
+                arrays["query_indices"],
+                [0, len(arrays["query_indices"])],
+            ),
+            shape=(1, self.index.n_terms),
+        )
+        mask = None
+        if "mask" in arrays:
+            mask = np.unpackbits(arrays["mask"], count=self.index.n_docs).astype(bool)
+
+        if method == "search":
+            indices, scores, eligible, matched = search_counted(
+                self.index,
+                query_vec,
+                int(header["top_k"]),
+                header.get("strategy", "auto"),
+                mask,
+            )
+            reply = {"status": "ok", "eligible": eligible, "matched": matched}
+        elif method == "score":
+            indices, scores = self.index.score(query_vec, mask=mask)
+            reply = {"status": "ok"}
+        else:
+            raise ValueError(f"Unknown method: {method!r}")
+        return reply, {"indices": indices, "scores": scores}
+
+
+class _ShardHandler(socketserver.BaseRequestHandler):
+    """Serve request/reply pairs on one connection until the client closes."""
+
+    def handle(self) -> None:
+        while True:
+            try:
+                header, arrays = recv_message(self.request)
+            except (EOFError, ValueError, ConnectionError, OSError):
+                return
+            try:
+                reply = self.server.answer(header, arrays)
+            except Exception as error:
+                message = f"{type(error).__name__}: {error}"
+                reply = ({"status": "error", "error": message}, {})
+            try:
+                send_message(self.request, *reply)
+            except (ConnectionError, OSError):
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one index shard over TCP")
+    parser.add_argument("shard", type=Path, help="Shard bundle (see write_shards)")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address")
+    parser.add_argument("--port", type=int, default=9101, help="TCP port")
+    args = parser.parse_args()
+
+    server = ShardServer(args.shard, args.host, args.port)
+    print(
+        f"✓ Serving {args.shard.name} (rows {server.row_start:,}-"
+        f"{server.row_start + server.index.n_docs - 1:,}) on {server.address}",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
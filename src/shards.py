@@ -0,0 +1,511 @@
+"""
+Sharded Index Module
+
+Scatter-gather search over row shards served by worker processes. The
+TF-IDF rows are split into contiguous shards, each written as an index
+bundle (see index_bundle). Every shard is served by its own worker process,
+which memory-maps the shard file. The coordinator (ShardedIndex) broadcasts
+the query vector and merges the per-shard top-K.
+
+Each shard scores its rows exactly like the unsharded index, in ascending
+term order and in float64. Each shard also returns its own exact top-K,
+so the merged results are identical to those of one InvertedIndex, ties
+included. A worker that dies is restarted and the request is sent again.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, spmatrix
+
+from .index_bundle import read_bundle, write_bundle
+from .scoring import (
+    BATCH_MAX_NNZ,
+    BLOCK_SIZE,
+    InvertedIndex,
+    ScoringPool,
+    Strategy,
+    pad_with_unscored,
+    select_top_k,
+)
+
+SHARDS_DIR = "shards"
+SHARD_PATTERN = "shard-{:03d}.bundle"
+
+# Seconds between liveness checks while waiting for a worker's reply
+POLL_INTERVAL = 0.5
+
+
+def write_shards(
+    directory: Path | str,
+    doc_matrix: spmatrix,
+    n_shards: int,
+    block_size: int = BLOCK_SIZE,
+) -> List[Path]:
+    """
+    Split the rows into contiguous shards and write one bundle per shard.
+
+    Args:
+        directory: Output directory (created if needed)
+        doc_matrix: (n_docs, n_terms) TF-IDF matrix
+        n_shards: Number of shards
+        block_size: Block size of each shard's impact arrays
+
+    Returns:
+        Shard file paths, in row order
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    matrix = csr_matrix(doc_matrix)
+    n_docs = matrix.shape[0]
+    n_shards = max(1, min(n_shards, n_docs))
+    bounds = np.linspace(0, n_docs, n_shards + 1).astype(np.int64)
+
+    paths = []
+    for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        index = InvertedIndex(matrix[start:end], block_size)
+        arrays = {
+            "matrix_data": index.doc_matrix.data,
+            "matrix_indices": index.doc_matrix.indices,
+            "matrix_indptr": index.doc_matrix.indptr,
+        }
+        arrays.update(
+            {f"postings_{name}": array for name, array in index.to_arrays().items()}
+        )
+        metadata = {
+            "shape": list(index.doc_matrix.shape),
+            "block_size": block_size,
+            "row_start": int(start),
+        }
+        path = directory / SHARD_PATTERN.format(i)
+        write_bundle(path, arrays, metadata)
+        paths.append(path)
+    return paths
+
+
+def load_shard(path: Path | str) -> Tuple[InvertedIndex, int]:
+    """
+    Memory-map a shard bundle.
+
+    Returns:
+        Tuple of (index over the shard's local rows, first global row id)
+    """
+    arrays, metadata = read_bundle(path)
+    matrix = csr_matrix(
+        (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]),
+        shape=tuple(metadata["shape"]),
+        copy=False,
+    )
+    matrix.has_sorted_indices = True
+    postings = {
+        name[len("postings_") :]: array
+        for name, array in arrays.items()
+        if name.startswith("postings_")
+    }
+    index = InvertedIndex.from_arrays(matrix, postings, metadata["block_size"])
+    return index, metadata["row_start"]
+
+
+def count_matches(
+    index: InvertedIndex, query_vec: spmatrix, mask: Optional[np.ndarray] = None
+) -> int:
+    """Number of (eligible) rows sharing at least one term with the query."""
+    terms, _ = index.query_terms(query_vec)
+    hit = np.zeros(index.n_docs, dtype=bool)
+    for term in terms:
+        hit[index.postings(term)[0]] = True
+    if mask is not None:
+        hit &= mask
+    return int(np.count_nonzero(hit))
+
+
+def search_counted(
+    index: InvertedIndex,
+    query_vec: spmatrix,
+    top_k: int,
+    strategy: Strategy = "auto",
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Unpadded top-K plus filter-match counts of one shard.
+
+    Returns:
+        Tuple of (indices, scores, eligible rows, eligible rows matching
+        at least one query term)
+    """
+    indices, scores = index.search(query_vec, top_k, False, strategy, mask)
+    eligible = index.n_docs if mask is None else int(np.count_nonzero(mask))
+    return indices, scores, eligible, count_matches(index, query_vec, mask)
+
+
+# Requests answered by module functions rather than InvertedIndex methods
+_SHARD_FUNCTIONS = {"search_counted": search_counted}
+
+
+def _serve_shard(path: str, conn: Connection) -> None:
+    """
+    Worker loop: answer ``(method, args)`` requests until EOF or None.
+
+    Methods are InvertedIndex methods or names in ``_SHARD_FUNCTIONS``.
+    Replies are ``("ok", result)`` or ``("error", message)``.
+    """
+    index, _ = load_shard(path)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, args = request
+        try:
+            if method in _SHARD_FUNCTIONS:
+                result = _SHARD_FUNCTIONS[method](index, *args)
+            else:
+                result = getattr(index, method)(*args)
+            conn.send(("ok", result))
+        except Exception as error:
+            conn.send(("error", f"{type(error).__name__}: {error}"))
+    conn.close()
+
+
+class ShardWorker:
+    """One shard's worker process and the pipe to it."""
+
+    def __init__(self, path: Path | str, row_start: int, n_docs: int, context):
+        """
+        Initialize ShardWorker and start its process.
+
+        Args:
+            path: Shard bundle file
+            row_start: First global row id of the shard
+            n_docs: Rows in the shard
+            context: multiprocessing context used to start processes
+        """
+        self.path = Path(path)
+        self.row_start = row_start
+        self.n_docs = n_docs
+        self.restarts = 0
+        self.lock = threading.Lock()
+        self._context = context
+        self._start()
+
+    def _start(self) -> None:
+        conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_serve_shard,
+            args=(str(self.path), child_conn),
+            name=self.path.stem,
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = conn
+
+    def restart(self) -> None:
+        """Replace a dead (or unresponsive) worker process."""
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.restarts += 1
+        self._start()
+
+    def local(self, mask: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Slice of a global row mask covering this shard."""
+        if mask is None:
+            return None
+        return mask[self.row_start : self.row_start + self.n_docs]
+
+    def send(self, request: Tuple[str, tuple]) -> None:
+        """Send a request, restarting the worker if its pipe is broken."""
+        try:
+            self.conn.send(request)
+        except (BrokenPipeError, ConnectionError, OSError):
+            self.restart()
+            self.conn.send(request)
+
+    def receive(self, request: Tuple[str, tuple]) -> Any:
+        """
+        Wait for the reply to ``request``.
+
+        If the worker died meanwhile it is restarted and the request is sent
+        once more.
+
+        Raises:
+            RuntimeError: If the request failed in the worker, or the worker
+                died twice on it
+        """
+        for attempt in range(2):
+            try:
+                while not self.conn.poll(POLL_INTERVAL):
+                    if not self.process.is_alive():
+                        raise EOFError
+                status, result = self.conn.recv()
+                break
+            except (EOFError, ConnectionError, OSError):
+                if attempt:
+                    raise RuntimeError(
+                        f"Shard worker for {self.path.name} died twice on a request."
+                    )
+                self.restart()
+                self.conn.send(request)
+        if status == "error":
+            raise RuntimeError(f"Shard {self.path.name}: {result}")
+        return result
+
+    def close(self) -> None:
+        """Ask the worker to exit and wait for it."""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, ConnectionError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ShardedIndex:
+    """
+    Coordinator of a sharded index.
+
+    Offers the InvertedIndex interface used by VectorStore, QueryPlanner
+    and JobRecommender over global row ids. Postings live only in the
+    worker processes. The coordinator keeps the term and row lengths for
+    cost estimates.
+    """
+
+    def __init__(self, paths: Sequence[Path | str], start_method: str = "spawn"):
+        """
+        Initialize ShardedIndex and start one worker per shard.
+
+        Args:
+            paths: Shard bundles in row order (see write_shards)
+            start_method: multiprocessing start method of the workers
+        """
+        context = multiprocessing.get_context(start_method)
+        self.start_method = start_method
+        self.workers: List[ShardWorker] = []
+        term_lengths = None
+        row_lengths = []
+        for path in paths:
+            arrays, metadata = read_bundle(path)
+            n_docs, self.n_terms = metadata["shape"]
+            lengths = np.diff(arrays["postings_indptr"]).astype(np.int64)
+            term_lengths = lengths if term_lengths is None else term_lengths + lengths
+            row_lengths.append(np.diff(arrays["matrix_indptr"]).astype(np.int32))
+            self.workers.append(
+                ShardWorker(path, metadata["row_start"], n_docs, context)
+            )
+
+        self.n_docs = sum(worker.n_docs for worker in self.workers)
+        self.term_lengths = term_lengths
+        self.row_lengths = np.concatenate(row_lengths)
+        self.block_size = metadata["block_size"]
+
+    @property
+    def nnz(self) -> int:
+        """Total number of postings over all shards."""
+        return int(self.term_lengths.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the coordinator (postings stay in the workers)."""
+        return self.term_lengths.nbytes + self.row_lengths.nbytes
+
+    query_terms = staticmethod(InvertedIndex.query_terms)
+
+    def eligible(self, mask: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Rows that may be returned under an optional row mask."""
+        return mask
+
+    def postings_length(self, terms: np.ndarray) -> int:
+        """Number of postings touched when scoring the given terms."""
+        return int(self.term_lengths[np.asarray(terms, dtype=np.int64)].sum())
+
+    def rows_nnz(self, rows: np.ndarray) -> int:
+        """Non-zeros touched when scoring the given rows."""
+        return int(self.row_lengths[rows].sum())
+
+    def _scatter(self, requests: Sequence[Optional[Tuple[str, tuple]]]) -> List[Any]:
+        """
+        Send one request per shard (None skips a shard), then gather replies.
+
+        Worker locks are always taken in shard order, so concurrent queries
+        cannot deadlock; the shards work on a request concurrently.
+        """
+        sent = []
+        try:
+            for worker, request in zip(self.workers, requests):
+                if request is None:
+                    continue
+                worker.lock.acquire()
+                sent.append((worker, request))
+                worker.send(request)
+            replies = {}
+            for worker, request in sent:
+                replies[id(worker)] = worker.receive(request)
+        finally:
+            for worker, _ in sent:
+                worker.lock.release()
+        return [replies.get(id(worker)) for worker in self.workers]
+
+    def _masked_requests(
+        self, method: str, mask: Optional[np.ndarray], *args: Any
+    ) -> List[Optional[Tuple[str, tuple]]]:
+        """Per-shard requests with the local mask last (None: no eligible rows)."""
+        requests = []
+        for worker in self.workers:
+            local = worker.local(mask)
+            if local is not None and not local.any():
+                requests.append(None)
+            else:
+                requests.append((method, args + (local,)))
+        return requests
+
+    def _gather_rows(
+        self, replies: List[Optional[Tuple[np.ndarray, np.ndarray]]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Concatenate per-shard (local ids, scores) as global ids, ascending."""
+        ids, scores = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.float64)]
+        for worker, reply in zip(self.workers, replies):
+            if reply is None:
+                continue
+            ids.append(reply[0] + worker.row_start)
+            scores.append(reply[1])
+        return np.concatenate(ids), np.concatenate(scores)
+
+    def score(
+        self, query_vec: spmatrix, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores of every eligible row sharing a term with the query.
+
+        Returns:
+            Tuple of (row ids, scores), row ids ascending
+        """
+        return self._gather_rows(
+            self._scatter(self._masked_requests("score", mask, query_vec))
+        )
+
+    def score_subset(
+        self, query_vec: spmatrix, rows: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score only the given rows with row-major dot products.
+
+        Returns:
+            Tuple of (row ids, scores) for rows with a positive score,
+            row ids ascending
+        """
+        rows = np.sort(np.asarray(rows, dtype=np.int32))
+        requests = []
+        for worker in self.workers:
+            lo, hi = np.searchsorted(
+                rows, [worker.row_start, worker.row_start + worker.n_docs]
+            )
+            requests.append(
+                ("score_subset", (query_vec, rows[lo:hi] - worker.row_start))
+                if hi > lo
+                else None
+            )
+        return self._gather_rows(self._scatter(requests))
+
+    def search(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        pool: Optional[ScoringPool] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K over all shards (see InvertedIndex.search for arguments).
+
+        Every shard returns its own exact top-K with the same strategy; the
+        global top-K is selected from their union. ``pool`` is accepted for
+        interface compatibility; shards already search concurrently.
+        """
+        if strategy == "subset" and mask is None:
+            raise ValueError("The 'subset' strategy requires a mask.")
+
+        replies = self._scatter(
+            self._masked_requests("search", mask, query_vec, top_k, False, strategy)
+        )
+        indices, scores = select_top_k(*self._gather_rows(replies), top_k)
+        if pad:
+            indices, scores = pad_with_unscored(
+                indices, scores, top_k, self.n_docs, mask=mask
+            )
+        return indices, scores
+
+    def search_counted(
+        self,
+        query_vec: spmatrix,
+        top_k: int = 10,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+        """
+        Unpadded top-K and merged filter-match counts in one broadcast.
+
+        Returns:
+            Tuple of (indices, similarities, counts) where counts holds the
+            ``eligible`` rows and the eligible rows ``matched`` by a query
+            term, summed over the shards
+        """
+        replies = self._scatter(
+            self._masked_requests("search_counted", mask, query_vec, top_k, strategy)
+        )
+        indices, scores = select_top_k(*self._gather_rows(replies), top_k)
+        counts = {"eligible": 0, "matched": 0}
+        for reply in replies:
+            if reply is not None:
+                counts["eligible"] += reply[2]
+                counts["matched"] += reply[3]
+        return indices, scores, counts
+
+    def search_batch(
+        self,
+        query_matrix: spmatrix,
+        top_k: int = 10,
+        pad: bool = True,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Batched top-K over all shards (see InvertedIndex.search_batch)."""
+        request = ("search_batch", (query_matrix, top_k, False, max_block_nnz))
+        replies = self._scatter([request] * len(self.workers))
+
+        results = []
+        for i in range(query_matrix.shape[0]):
+            indices, scores = select_top_k(
+                *self._gather_rows([hits[i] for hits in replies]), top_k
+            )
+            if pad:
+                indices, scores = pad_with_unscored(indices, scores, top_k, self.n_docs)
+            results.append((indices, scores))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Shard sizes, worker pids and restart counts."""
+        return {
+            "shards": len(self.workers),
+            "shard_rows": [worker.n_docs for worker in self.workers],
+            "pids": [worker.process.pid for worker in self.workers],
+            "restarts": sum(worker.restarts for worker in self.workers),
+        }
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        for worker in self.workers:
+            with worker.lock:
+                worker.close()
@@ -2,22 +2,111 @@
 Vector Store Module for Job Recommendation System
 
 This module handles loading and managing vectorized job data,
-using TF-IDF matrices for keyword-based similarity search.
+using TF-IDF matrices for keyword-based similarity search. Queries are
+vectorized by QueryVectorizer, so scikit-learn is only imported when the
+legacy pickled vectorizer is loaded (the index bundle does not need it).
 """
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import pickle
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, Optional, Literal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Tuple,
+    Optional,
+    Sequence,
+)
 
 import numpy as np
 import pandas as pd
 from scipy.sparse import load_npz, csr_matrix
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
+from .artifacts import (
+    DATA_FILE,
+    ReadWriteLock,
+    current_version,
+    version_dir,
+)
+from .clusters import CLUSTERS_NAME, N_CLUSTERS, ClusterIndex
+from .filters import FilterIndex
+from .index_bundle import BUNDLE_NAME, load_tfidf_bundle
+from .long_query import LONG_QUERY_NNZ, LongQueryPolicy
+from .lsa import LSA_DIMS, LSA_NAME, LsaCodes, LsaIndex
+from .neighbors import NEIGHBORS_K, NEIGHBORS_NAME, NeighborTable
+from .planner import QueryPlanner
 from .preprocessing import clean_text
+from .query_vectorizer import QueryVectorizer
+from .scoring import (
+    BATCH_MAX_NNZ,
+    PARALLEL_MIN_POSTINGS,
+    InvertedIndex,
+    ScoringPool,
+    Strategy,
+)
+from .quantized import RERANK_CANDIDATES, CodeType, QuantizedIndex
+from .segments import (
+    DAY_MS,
+    FLUSH_ROWS,
+    MERGE_FACTOR,
+    Segment,
+    SegmentedIndex,
+    SegmentWriter,
+    now_ms,
+)
+from .shards import SHARDS_DIR, ShardedIndex, write_shards
+
+# Posting timestamp columns (epoch ms); a relisted job counts from listed_time
+LISTED_COLUMNS = ("listed_time", "original_listed_time")
+EXPIRY_COLUMN = "expiry"
+
+
+def combined_text(jobs: pd.DataFrame) -> pd.Series:
+    """Indexed text of each job: cleaned title, description and skills."""
+    parts = [
+        (
+            jobs[column].fillna("")
+            if column in jobs.columns
+            else pd.Series("", index=jobs.index)
+        )
+        for column in ("title_clean", "description_clean", "skills_desc_clean")
+    ]
+    return (parts[0] + " " + parts[1] + " " + parts[2]).str.strip()
+
+
+def listing_times(
+    jobs: pd.DataFrame,
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Listing and expiry times of job rows.
+
+    Returns:
+        Tuple of (listed, expiry) float64 epoch-millisecond arrays with NaN
+        for unknown values; None when the columns are missing
+    """
+    listed = None
+    for column in LISTED_COLUMNS:
+        if column in jobs.columns:
+            values = pd.to_numeric(jobs[column], errors="coerce").to_numpy(np.float64)
+            listed = (
+                values if listed is None else np.where(np.isnan(listed), values, listed)
+            )
+
+    expiry = None
+    if EXPIRY_COLUMN in jobs.columns:
+        expiry = pd.to_numeric(jobs[EXPIRY_COLUMN], errors="coerce").to_numpy(
+            np.float64
+        )
+    return listed, expiry
 
 
 class VectorStore:
@@ -27,15 +116,48 @@ class VectorStore:
     Uses TF-IDF for keyword-based recommendation.
     """
 
+    # Loaded state swapped by reload() and shared by query snapshots
+    _STATE = (
+        "models_dir",
+        "data_dir",
+        "artifact_version",
+        "tfidf_vectorizer",
+        "tfidf_matrix",
+        "inverted_index",
+        "cluster_index",
+        "lsa_index",
+        "neighbor_table",
+        "job_data",
+        "ingested_jobs",
+        "sample_indices",
+        "filter_index",
+        "planner",
+        "segment_writer",
+        "_row_lookup",
+        "_time_lookup",
+    )
+
     def __init__(
-        self, models_dir: Path | str = "models", data_dir: Path | str = "data/processed"
+        self,
+        models_dir: Path | str = "models",
+        data_dir: Path | str = "data/processed",
+        search_workers: Optional[int] = 1,
+        parallel_min_postings: int = PARALLEL_MIN_POSTINGS,
+        long_query_nnz: Optional[int] = LONG_QUERY_NNZ,
     ):
         """
         Initialize VectorStore.
 
         Args:
-            models_dir: Directory containing saved models and vectors
+            models_dir: Directory containing saved models and vectors; if it
+                holds a CURRENT pointer, the named version directory is used
             data_dir: Directory containing processed data files
+            search_workers: Threads scoring row ranges of one query
+                (1 = single-threaded, None = one per CPU)
+            parallel_min_postings: Queries touching fewer postings stay
+                single-threaded
+            long_query_nnz: Queries with more terms are pruned to their
+                top terms and re-ranked exactly (None = never)
         """
 
         # Find project root (directory containing both 'models' and 'data' folders)
@@ -60,43 +182,435 @@ class VectorStore:
         if not self.data_dir.is_absolute():
             self.data_dir = project_root / data_dir
 
+        # Versioned layout: models/CURRENT names models/versions/<name>/,
+        # which may carry its own clean_jobs.parquet
+        self.models_root = self.models_dir
+        self.base_data_dir = self.data_dir
+        self.artifact_version = current_version(self.models_root)
+        if self.artifact_version is not None:
+            self.models_dir = version_dir(self.models_root, self.artifact_version)
+            if (self.models_dir / DATA_FILE).exists():
+                self.data_dir = self.models_dir
+
         # Initialize empty attributes
-        self.tfidf_vectorizer: Optional[TfidfVectorizer] = None
+        self.tfidf_vectorizer: Optional[QueryVectorizer] = None
         self.tfidf_matrix: Optional[csr_matrix] = None
+        self.inverted_index: Optional[InvertedIndex | SegmentedIndex | ShardedIndex] = (
+            None
+        )
+        self.cluster_index: Optional[ClusterIndex] = None
+        self.lsa_index: Optional[LsaIndex] = None
+        self.neighbor_table: Optional[NeighborTable] = None
         self.job_data: Optional[pd.DataFrame] = None
-        self.sample_indices: Optional[List[int]] = None
+        # Jobs added by add_jobs since job_data was last extended
+        self.ingested_jobs: Optional[pd.DataFrame] = None
+        self.sample_indices: Optional[Sequence[int]] = None
+        self.filter_index: Optional[FilterIndex] = None
+        self.planner: Optional[QueryPlanner] = None
+        self.segment_writer: Optional[SegmentWriter] = None
+
+        # Intra-query parallelism; shared by snapshots and kept across reloads
+        self.scoring_pool: Optional[ScoringPool] = None
+        if search_workers != 1:
+            self.scoring_pool = ScoringPool(search_workers, parallel_min_postings)
+
+        # Long-query mode for "auto" searches; shared like the pool
+        self.long_query: Optional[LongQueryPolicy] = None
+        if long_query_nnz is not None:
+            self.long_query = LongQueryPolicy(long_query_nnz)
+
+        # Changes whenever loaded artifacts or derived indexes change, so
+        # result caches keyed on it never serve results from an old index
+        self.index_version: Optional[str] = None
+        self._generation = 0
+        self._row_lookup: Optional[Tuple[Any, pd.Index, np.ndarray]] = None
+        self._time_lookup: Optional[Tuple[Any, SegmentedIndex]] = None
+
+        # Epoch-millisecond clock for expiry and recency (replaceable for
+        # replaying a historical snapshot)
+        self.clock: Callable[[], float] = now_ms
+
+        # Hot reload: queries pin refcounted snapshots of the loaded state
+        self._guard = ReadWriteLock()
+        self._refs_lock = threading.Lock()
+        self._snapshot: Optional[VectorStore] = None
+        self._refs = 0
+        self._retired = False
+        self.retired_snapshots: List[VectorStore] = []
+        self._reloader: Optional[ThreadPoolExecutor] = None
+        # Shard workers / segment writers replaced by a reload, closed once
+        # no pinned snapshot uses them
+        self._pending_close: List[ShardedIndex | SegmentWriter] = []
+
+        # Serializes ingest (add_jobs / delete_jobs) and merge publication
+        self._ingest_lock = threading.Lock()
+        self._evictor: Optional[Tuple[threading.Thread, threading.Event]] = None
+
+    def _artifact_paths(self) -> List[Path]:
+        """Files the loaded index is built from."""
+        return [
+            self.models_dir / "tfidf_vectorizer.pkl",
+            self.models_dir / "tfidf_matrix.npz",
+            self.models_dir / "sample_indices.pkl",
+            self.models_dir / BUNDLE_NAME,
+            self.models_dir / CLUSTERS_NAME,
+            self.models_dir / LSA_NAME,
+            self.models_dir / NEIGHBORS_NAME,
+            self.data_dir / "clean_jobs.parquet",
+        ]
+
+    def _bump_version(self) -> None:
+        """Record that the loaded index changed."""
+        self._generation += 1
+        stamps = []
+        for path in self._artifact_paths():
+            if path.exists():
+                stat = path.stat()
+                stamps.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+        digest = hashlib.sha1("|".join(stamps).encode()).hexdigest()[:12]
+        self.index_version = f"{digest}-{self._generation}"
+
+    @contextmanager
+    def acquire(self) -> Iterator[VectorStore]:
+        """
+        Pin the loaded index version for the duration of a query.
+
+        Yields a snapshot that shares the loaded arrays. A reload() swaps in
+        a new version without touching pinned snapshots; a replaced snapshot
+        is released once the last query using it is done.
+        """
+        with self._guard.read():
+            with self._refs_lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.index_version != self.index_version:
+                    if snapshot is not None:
+                        self._retire(snapshot)
+                    snapshot = copy.copy(self)
+                    snapshot._snapshot = None
+                    snapshot._refs = 0
+                    snapshot._retired = False
+                    self._snapshot = snapshot
+                snapshot._refs += 1
+        try:
+            yield snapshot
+        finally:
+            closable = []
+            with self._refs_lock:
+                snapshot._refs -= 1
+                if snapshot._retired and snapshot._refs == 0:
+                    self.retired_snapshots.remove(snapshot)
+                    snapshot._release()
+                    closable = self._unused_closable()
+            self._close_later(closable)
+
+    def _retire(self, snapshot: VectorStore) -> None:
+        """Mark a replaced snapshot; release it now if unused (refs lock held)."""
+        snapshot._retired = True
+        if snapshot._refs == 0:
+            snapshot._release()
+        else:
+            self.retired_snapshots.append(snapshot)
+
+    def _release(self) -> None:
+        """Drop this snapshot's references to the loaded state."""
+        for attr in self._STATE[3:]:
+            setattr(self, attr, None)
+
+    def _unused_closable(self) -> List[ShardedIndex | SegmentWriter]:
+        """Pop replaced resources no pinned snapshot uses (refs lock held)."""
+        in_use = {
+            id(getattr(snapshot, attr))
+            for snapshot in self.retired_snapshots
+            for attr in ("inverted_index", "segment_writer")
+        }
+        unused = [r for r in self._pending_close if id(r) not in in_use]
+        self._pending_close = [r for r in self._pending_close if id(r) in in_use]
+        return unused
+
+    def _close_later(self, resources: List[ShardedIndex | SegmentWriter]) -> None:
+        """Close replaced resources on the reload thread, off the query path."""
+        for resource in resources:
+            self._reloader.submit(resource.close)
+
+    def reload(self, version: Optional[str] = None) -> Future:
+        """
+        Load an artifact version in the background, then swap it in.
+
+        Queries keep using the current version while the new one loads; the
+        swap itself happens under the write guard and only exchanges
+        references. Reloads run one at a time.
+
+        A sharded store is re-sharded (same shard count) and a segmented
+        one re-segmented (same partitioning and expiry) over the new
+        version before the swap. The replaced shard workers and segment
+        writer are closed once no pinned snapshot uses them. Postings
+        ingested since the last load are not carried over.
+
+        Args:
+            version: Version directory name (default: re-read models/CURRENT)
+
+        Returns:
+            Future resolving to the loaded version name (None for a flat
+            models dir); on failure it holds the exception and the current
+            version keeps serving
+        """
+        if self._reloader is None:
+            self._reloader = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="index-reload"
+            )
+        return self._reloader.submit(self._reload, version)
+
+    def _reload(self, version: Optional[str]) -> Optional[str]:
+        name = version or current_version(self.models_root)
+        directory = version_dir(self.models_root, name) if name else self.models_root
+        data_dir = directory if (directory / DATA_FILE).exists() else self.base_data_dir
+
+        staged = VectorStore(models_dir=directory, data_dir=data_dir)
+        staged.clock = self.clock
+        staged.load_all()
+
+        # Keep the serving layout: shard or segment the new version likewise
+        sharded, writer = self.inverted_index, self.segment_writer
+        if isinstance(sharded, ShardedIndex):
+            staged.enable_shards(
+                len(sharded.workers), start_method=sharded.start_method
+            )
+        elif writer is not None:
+            staged.enable_segments(
+                writer.flush_rows,
+                writer.merge_factor,
+                partition_days=(
+                    None
+                    if writer.partition_ms is None
+                    else writer.partition_ms / DAY_MS
+                ),
+                expire=writer.expiry is not None,
+            )
+
+        with self._ingest_lock, self._guard.write():
+            replaced = [self.inverted_index, self.segment_writer]
+            for attr in self._STATE:
+                setattr(self, attr, getattr(staged, attr))
+            self.artifact_version = name
+            self._bump_version()
+            new_writer = self.segment_writer
+            if new_writer is not None:
+                new_writer.on_merge = lambda: self._refresh_segments(new_writer)
+            with self._refs_lock:
+                if self._snapshot is not None:
+                    self._retire(self._snapshot)
+                    self._snapshot = None
+                self._pending_close += [
+                    r for r in replaced if isinstance(r, (ShardedIndex, SegmentWriter))
+                ]
+                closable = self._unused_closable()
+        self._close_later(closable)
+        print(f"✓ Swapped in index version {name or directory.name}")
+        return name
 
     def load_tfidf(self) -> None:
         """Load TF-IDF vectorizer and matrix."""
         print("Loading TF-IDF vectorizer...")
         vectorizer_path = self.models_dir / "tfidf_vectorizer.pkl"
         with open(vectorizer_path, "rb") as f:
-            self.tfidf_vectorizer = pickle.load(f)
+            # Unpickling imports sklearn; queries then run without it
+            self.tfidf_vectorizer = QueryVectorizer.from_fitted(pickle.load(f))
 
         print("Loading TF-IDF matrix...")
         matrix_path = self.models_dir / "tfidf_matrix.npz"
-        self.tfidf_matrix = load_npz(matrix_path)
+        self.tfidf_matrix = load_npz(matrix_path).tocsr()
 
         print(f"✓ TF-IDF loaded: {self.tfidf_matrix.shape} matrix")
+        self.build_index()
+
+    def load_bundle(self, path: Optional[Path | str] = None) -> None:
+        """
+        Memory-map the TF-IDF index bundle written by vectorize.py.
+
+        Replaces load_tfidf + load_sample_indices: the matrix, postings and
+        row -> job mapping are mapped rather than read, so startup does not
+        depend on the index size and processes share the page cache.
+
+        Args:
+            path: Bundle file (default: models/tfidf_index.bundle)
+        """
+        path = Path(path) if path is not None else self.models_dir / BUNDLE_NAME
+        print(f"Mapping index bundle {path.name}...")
+        (
+            self.tfidf_vectorizer,
+            self.tfidf_matrix,
+            self.inverted_index,
+            self.sample_indices,
+        ) = load_tfidf_bundle(path)
+
+        print(
+            f"✓ Index bundle mapped: {self.tfidf_matrix.shape} matrix, "
+            f"{self.inverted_index.nnz:,} postings"
+        )
+        self._bump_version()
+
+    def build_index(self) -> InvertedIndex:
+        """Build the term -> postings index used for scoring."""
+        if self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+
+        self.inverted_index = InvertedIndex(self.tfidf_matrix)
+        print(
+            f"✓ Inverted index built: {self.inverted_index.nnz:,} postings, "
+            f"{self.inverted_index.nbytes / 1024**2:.1f} MB"
+        )
+        self._bump_version()
+        return self.inverted_index
+
+    def quantize_index(
+        self, codes: CodeType = "uint8", rerank: int = RERANK_CANDIDATES
+    ) -> QuantizedIndex:
+        """
+        Replace the scoring index with a compact quantized one.
+
+        Candidates come from uint8/float16 postings; the best ``rerank`` of
+        them are re-scored exactly against the TF-IDF rows (see
+        src/quantized.py; scripts/compare_quantized.py reports recall).
+
+        Args:
+            codes: "uint8" or "float16" posting weights
+            rerank: Candidates re-scored exactly per query
+        """
+        if self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+
+        self.inverted_index = QuantizedIndex(self.tfidf_matrix, codes, rerank)
+        print(
+            f"✓ Quantized index built ({codes}): {self.inverted_index.nnz:,} "
+            f"postings, {self.inverted_index.nbytes / 1024**2:.1f} MB"
+        )
+        self._bump_version()
+        return self.inverted_index
+
+    def build_clusters(self, n_clusters: int = N_CLUSTERS) -> ClusterIndex:
+        """
+        Partition the TF-IDF rows into cells for approximate search.
+
+        Fits spherical k-means centroids (see src/clusters.py); queries
+        with ``nprobe`` then score only the rows of the closest cells.
+        ``vectorize.py --clusters N`` stores them so they can be loaded.
+
+        Args:
+            n_clusters: Number of cells
+        """
+        if self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+
+        self.cluster_index = ClusterIndex.build(self.tfidf_matrix, n_clusters)
+        print(
+            f"✓ Cluster index built: {self.cluster_index.n_clusters} cells, "
+            f"{self.cluster_index.nbytes / 1024**2:.1f} MB"
+        )
+        self._bump_version()
+        return self.cluster_index
+
+    def load_clusters(self, path: Optional[Path | str] = None) -> None:
+        """
+        Memory-map the cluster centroids and cell row lists.
+
+        Args:
+            path: Clusters file (default: models/tfidf_clusters.bundle)
+        """
+        path = Path(path) if path is not None else self.models_dir / CLUSTERS_NAME
+        self.cluster_index = ClusterIndex.load(path)
+        print(f"✓ Cluster index mapped: {self.cluster_index.n_clusters} cells")
+        self._bump_version()
+
+    def build_lsa(self, dims: int = LSA_DIMS, codes: LsaCodes = "float32") -> LsaIndex:
+        """
+        Fit the LSA projection for dense (``lsa=True``) search.
+
+        Fits a truncated SVD of the TF-IDF rows and stores the projected
+        rows (see src/lsa.py). ``vectorize.py --lsa-dims N`` stores the
+        result so it can be loaded.
+
+        Args:
+            dims: Latent dimensions
+            codes: "float32" or "int8" row storage
+        """
+        if self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+
+        self.lsa_index = LsaIndex.build(self.tfidf_matrix, dims, codes)
+        print(
+            f"✓ LSA index built: {self.lsa_index.dims} dims ({codes}), "
+            f"{self.lsa_index.nbytes / 1024**2:.1f} MB"
+        )
+        self._bump_version()
+        return self.lsa_index
+
+    def load_lsa(self, path: Optional[Path | str] = None) -> None:
+        """
+        Memory-map the LSA projection and row vectors.
+
+        Args:
+            path: LSA file (default: models/tfidf_lsa.bundle)
+        """
+        path = Path(path) if path is not None else self.models_dir / LSA_NAME
+        self.lsa_index = LsaIndex.load(path)
+        print(
+            f"✓ LSA index mapped: {self.lsa_index.dims} dims "
+            f"({self.lsa_index.code_type})"
+        )
+        self._bump_version()
+
+    def build_neighbors(self, k: int = NEIGHBORS_K) -> NeighborTable:
+        """
+        Precompute the top-k similar rows of every indexed row.
+
+        Each stored TF-IDF row is scored against the index in blocks (see
+        src/neighbors.py); similar_rows then answers from the table.
+        ``vectorize.py --neighbors K`` stores the table so it can be loaded.
+
+        Args:
+            k: Neighbors stored per row
+        """
+        if self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+        if self.inverted_index is None:
+            self.build_index()
+
+        self.neighbor_table = NeighborTable.build(
+            self.inverted_index, self.tfidf_matrix, k, pool=self.scoring_pool
+        )
+        print(
+            f"✓ Neighbor table built: {self.neighbor_table.k} per row, "
+            f"{self.neighbor_table.nbytes / 1024**2:.1f} MB"
+        )
+        self._bump_version()
+        return self.neighbor_table
+
+    def load_neighbors(self, path: Optional[Path | str] = None) -> None:
+        """
+        Memory-map the precomputed neighbor table.
+
+        Args:
+            path: Table file (default: models/tfidf_neighbors.bundle)
+        """
+        path = Path(path) if path is not None else self.models_dir / NEIGHBORS_NAME
+        self.neighbor_table = NeighborTable.load(path)
+        print(f"✓ Neighbor table mapped: {self.neighbor_table.k} per row")
+        self._bump_version()
 
     def load_job_data(self) -> None:
         """Load processed job data."""
         print("Loading job data...")
         data_path = self.data_dir / "clean_jobs.parquet"
         self.job_data = pd.read_parquet(data_path)
+        self.ingested_jobs = None
 
         # Create clean_text if not exists
         if "clean_text" not in self.job_data.columns:
             print("Creating clean_text column...")
-            self.job_data["clean_text"] = (
-                self.job_data["title_clean"].fillna("")
-                + " "
-                + self.job_data["description_clean"].fillna("")
-                + " "
-                + self.job_data["skills_desc_clean"].fillna("")
-            ).str.strip()
+            self.job_data["clean_text"] = combined_text(self.job_data)
 
         print(f"✓ Job data loaded: {len(self.job_data):,} jobs")
+        self._bump_version()
 
     def load_sample_indices(self) -> None:
         """Load indices of sampled jobs used for training."""
@@ -106,27 +620,410 @@ class VectorStore:
             self.sample_indices = pickle.load(f)
 
         print(f"✓ Sample indices loaded: {len(self.sample_indices):,} indices")
+        self._bump_version()
+
+    def build_filter_index(self) -> FilterIndex:
+        """Build per-value filter bitmaps aligned with the TF-IDF rows."""
+        if self.job_data is None or self.sample_indices is None:
+            raise ValueError(
+                "Job data and sample indices must be loaded before the filter index."
+            )
+
+        self.filter_index = FilterIndex(self.job_rows(self.sample_indices))
+        print(
+            f"✓ Filter index built: {len(self.filter_index.columns)} columns, "
+            f"{self.filter_index.nbytes / 1024**2:.1f} MB"
+        )
+        self._bump_version()
+        return self.filter_index
+
+    def enable_segments(
+        self,
+        flush_rows: int = FLUSH_ROWS,
+        merge_factor: int = MERGE_FACTOR,
+        partition_days: Optional[float] = None,
+        expire: bool = False,
+    ) -> SegmentWriter:
+        """
+        Switch to a segmented index so postings can be added and deleted live.
+
+        The loaded index becomes the first immutable segment (or one segment
+        per listing period). Called implicitly, with defaults, by add_jobs /
+        delete_jobs.
+
+        Args:
+            flush_rows: Rows buffered in the write segment before sealing
+            merge_factor: Segments of one size tier that trigger a merge
+            partition_days: Partition rows by listing time into periods of
+                this many days, so recency filters skip older partitions
+            expire: Hide jobs past their ``expiry`` (see evict_expired); off
+                by default because a static snapshot of postings would be
+                entirely expired against the current clock
+
+        Returns:
+            The segment writer
+        """
+        if self.segment_writer is None:
+            if self.inverted_index is None:
+                self.build_index()
+            if isinstance(self.inverted_index, ShardedIndex):
+                raise ValueError("A sharded index cannot take live ingest.")
+            listed = expiry = None
+            if self.job_data is not None and self.sample_indices is not None:
+                listed, expiry = listing_times(self.job_rows(self.sample_indices))
+            writer = SegmentWriter(
+                self.inverted_index,
+                flush_rows,
+                merge_factor,
+                listed=listed,
+                expiry=expiry if expire else None,
+                partition_days=partition_days,
+            )
+            writer.on_merge = lambda: self._refresh_segments(writer)
+            self.segment_writer = writer
+            self._publish_segments()
+        return self.segment_writer
+
+    def enable_shards(
+        self,
+        n_shards: int,
+        directory: Optional[Path | str] = None,
+        start_method: str = "spawn",
+    ) -> ShardedIndex:
+        """
+        Serve the index from ``n_shards`` worker processes.
+
+        The TF-IDF rows are split into contiguous shards, each written as a
+        bundle and memory-mapped by its own worker. Queries are broadcast
+        and the per-shard top-K merged, with results identical to the
+        unsharded index; dead workers are restarted. Call close_shards()
+        to stop the workers.
+
+        Args:
+            n_shards: Number of row shards (and worker processes)
+            directory: Where to write the shard files (default:
+                ``<models_dir>/shards``)
+            start_method: multiprocessing start method of the workers
+
+        Returns:
+            The sharded index
+
+        Raises:
+            ValueError: If TF-IDF is not loaded or the index is segmented
+        """
+        if self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+        if self.segment_writer is not None:
+            raise ValueError("A segmented index cannot be sharded.")
+
+        directory = Path(directory) if directory else self.models_dir / SHARDS_DIR
+        print(f"Writing {n_shards} index shards to {directory}...")
+        paths = write_shards(directory, self.tfidf_matrix, n_shards)
+        index = ShardedIndex(paths, start_method=start_method)
+
+        # Same rows and scores: cached results stay valid
+        previous = self.inverted_index
+        with self._guard.write():
+            self.inverted_index = index
+            with self._refs_lock:
+                if self._snapshot is not None:
+                    self._retire(self._snapshot)
+                    self._snapshot = None
+        if isinstance(previous, ShardedIndex):
+            previous.close()
+        print(f"✓ {len(index.workers)} shard workers started")
+        return index
+
+    def close_shards(self) -> None:
+        """Stop the shard workers and go back to an in-process index."""
+        index = self.inverted_index
+        if isinstance(index, ShardedIndex):
+            self.build_index()
+            index.close()
+
+    def add_jobs(self, jobs: pd.DataFrame) -> np.ndarray:
+        """
+        Index new or updated postings without rebuilding the index.
+
+        Text is cleaned with ``clean_text`` and transformed against the
+        frozen vocabulary; the rows go to the in-memory write segment and
+        are searchable as soon as this returns. A job id that is already
+        indexed is replaced: its old row is tombstoned.
+
+        Only the new rows are encoded: they are appended to the filter
+        bitmaps and kept in ``ingested_jobs``, which is folded into
+        job_data once it holds a write segment's worth of rows.
+
+        Args:
+            jobs: Job rows indexed by job id, with ``clean_text`` or raw
+                ``title`` / ``description`` / ``skills_desc`` columns
+
+        Returns:
+            TF-IDF row ids assigned to the jobs
+        """
+        if (
+            self.tfidf_vectorizer is None
+            or self.job_data is None
+            or self.sample_indices is None
+        ):
+            raise ValueError("Job data and TF-IDF must be loaded before adding jobs.")
+
+        jobs = jobs.copy()
+        for field in ("title", "description", "skills_desc"):
+            if field in jobs.columns and f"{field}_clean" not in jobs.columns:
+                jobs[f"{field}_clean"] = jobs[field].map(clean_text)
+        if "clean_text" in jobs.columns:
+            jobs["clean_text"] = jobs["clean_text"].map(clean_text)
+        else:
+            jobs["clean_text"] = combined_text(jobs)
+        vectors = self.tfidf_vectorizer.transform(jobs["clean_text"].tolist())
+
+        with self._ingest_lock:
+            writer = self.enable_segments()
+            replaced = self.row_positions(jobs.index)
+            job_data, ingested = self.job_data, jobs
+            if self.ingested_jobs is not None:
+                ingested = pd.concat(
+                    [self.ingested_jobs.drop(index=jobs.index, errors="ignore"), jobs]
+                )
+            if len(ingested) >= writer.flush_rows:
+                job_data = pd.concat(
+                    [job_data.drop(index=ingested.index, errors="ignore"), ingested]
+                )
+                ingested = None
+            sample_indices = np.concatenate(
+                [
+                    np.asarray(self.sample_indices, dtype=np.int64),
+                    jobs.index.to_numpy(dtype=np.int64),
+                ]
+            )
+            filter_index = None
+            if self.filter_index is not None:
+                filter_index = self.filter_index.with_rows(jobs)
+            lsa_index = None
+            if self.lsa_index is not None:
+                lsa_index = self.lsa_index.with_rows(vectors)
+
+            listed, expiry = listing_times(jobs)
+            rows = writer.add(vectors, listed, expiry)
+            writer.delete(replaced[replaced >= 0])
+            self._publish_segments(
+                job_data=job_data,
+                ingested_jobs=ingested,
+                sample_indices=sample_indices,
+                filter_index=filter_index,
+                lsa_index=lsa_index,
+            )
+
+        stats = writer.stats()
+        print(
+            f"✓ Indexed {len(rows):,} postings "
+            f"({stats['segments']} segments, {stats['buffered_rows']:,} buffered)"
+        )
+        return rows
+
+    def delete_jobs(self, job_ids: Sequence[Any]) -> int:
+        """
+        Remove postings from search results (tombstones).
+
+        The rows stay in job_data and the matrix until their segment is
+        merged; searches skip them immediately.
+
+        Returns:
+            Number of postings deleted
+        """
+        with self._ingest_lock:
+            writer = self.enable_segments()
+            rows = self.row_positions(job_ids)
+            deleted = writer.delete(rows[rows >= 0])
+            if deleted:
+                self._publish_segments()
+        return deleted
+
+    def _publish_segments(self, bump: bool = True, **state: Any) -> None:
+        """Swap in the writer's current view (and ingest state) for new queries."""
+        index = self.segment_writer.reader(now=self.clock())
+        with self._guard.write():
+            # Rows that expired since the last view change results too
+            bump = bump or getattr(self.inverted_index, "n_deleted", 0) != (
+                index.n_deleted
+            )
+            for attr, value in state.items():
+                setattr(self, attr, value)
+            self.inverted_index = index
+            if bump:
+                self._bump_version()
+            with self._refs_lock:
+                if self._snapshot is not None:
+                    self._retire(self._snapshot)
+                    self._snapshot = None
+
+    def _refresh_segments(self, writer: SegmentWriter) -> None:
+        """Publish a merged view; results are unchanged, so caches stay valid."""
+        with self._ingest_lock:
+            # A reload may have replaced the writer while it was merging
+            if writer is self.segment_writer:
+                self._publish_segments(bump=False)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """
+        Tombstone jobs whose expiry has passed (see enable_segments).
+
+        Evicted rows are dropped physically when the merge policy rewrites
+        their mostly expired segments, so no rebuild is needed.
+
+        Args:
+            now: Epoch milliseconds (default: ``self.clock()``)
+
+        Returns:
+            Number of jobs evicted
+        """
+        writer = self.segment_writer
+        if writer is None or writer.expiry is None:
+            return 0
+        with self._ingest_lock:
+            evicted = writer.evict_expired(self.clock() if now is None else now)
+            if evicted:
+                self._publish_segments()
+        if evicted:
+            print(f"✓ Evicted {evicted:,} expired postings")
+        return evicted
+
+    def start_eviction(self, interval: float = 3600.0) -> None:
+        """Run evict_expired every ``interval`` seconds on a daemon thread."""
+        if self._evictor is not None:
+            return
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.evict_expired()
+                except Exception as exc:
+                    print(f"Expiry eviction failed: {exc}")
+
+        thread = threading.Thread(target=run, name="expiry-eviction", daemon=True)
+        thread.start()
+        self._evictor = (thread, stop)
+
+    def stop_eviction(self) -> None:
+        """Stop the eviction thread started by start_eviction."""
+        if self._evictor is not None:
+            thread, stop = self._evictor
+            stop.set()
+            thread.join()
+            self._evictor = None
+
+    def recent(self, days: float, now: Optional[float] = None) -> VectorStore:
+        """
+        View of this store restricted to jobs listed within the last ``days``.
+
+        With a partitioned index (enable_segments(partition_days=...))
+        partitions listed entirely before the cutoff are skipped without
+        touching their rows. The view shares all loaded state and is meant
+        for a single query.
+
+        Args:
+            days: Maximum listing age in days
+            now: Epoch milliseconds (default: ``self.clock()``)
+
+        Raises:
+            ValueError: If job data has no listing time columns
+        """
+        cutoff = (self.clock() if now is None else now) - days * DAY_MS
+        index = self.inverted_index
+        if not isinstance(index, SegmentedIndex):
+            index = self._time_index()
+
+        view = copy.copy(self)
+        view.inverted_index = index.since(cutoff)
+        view.planner = None
+        return view
+
+    def _time_index(self) -> SegmentedIndex:
+        """Single-segment view of an unsegmented index, with listing times."""
+        if self.inverted_index is None:
+            self.build_index()
+        key = (self.inverted_index, self.sample_indices)
+        if self._time_lookup is None or any(
+            a is not b for a, b in zip(self._time_lookup[0], key)
+        ):
+            listed, _ = listing_times(self.job_rows(self.sample_indices))
+            if listed is None:
+                raise ValueError("Job data has no listing time columns.")
+            rows = np.arange(self.inverted_index.n_docs, dtype=np.int32)
+            segment = Segment(rows, self.inverted_index, listed)
+            self._time_lookup = (
+                key,
+                SegmentedIndex([segment], len(rows), listed=listed),
+            )
+        return self._time_lookup[1]
+
+    def filter_mask(
+        self, filters: Dict[str, Any]
+    ) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Evaluate filters against the filter index.
+
+        Args:
+            filters: Filter dict as accepted by JobRecommender
+
+        Returns:
+            Tuple of (row mask or None, filters the index cannot answer)
+        """
+        if self.filter_index is None:
+            self.build_filter_index()
+        return self.filter_index.evaluate(filters)
 
     def load_all(self) -> None:
         """Load all components (convenience method)."""
         self.load_job_data()
-        self.load_sample_indices()
-        self.load_tfidf()
+        if (self.models_dir / BUNDLE_NAME).exists():
+            self.load_bundle()
+        else:
+            self.load_sample_indices()
+            self.load_tfidf()
+        if (self.models_dir / CLUSTERS_NAME).exists():
+            self.load_clusters()
+        if (self.models_dir / LSA_NAME).exists():
+            self.load_lsa()
+        if (self.models_dir / NEIGHBORS_NAME).exists():
+            self.load_neighbors()
+        self.build_filter_index()
+        self.get_planner()
         print("\n✓ All components loaded successfully!")
 
-    def search_tfidf(
-        self, query: str, top_k: int = 10, preprocess: bool = True
-    ) -> Tuple[np.ndarray, np.ndarray]:
+    def get_planner(self) -> QueryPlanner:
+        """Return the filter query planner, building indexes if needed."""
+        if self.inverted_index is None:
+            self.build_index()
+        if self.filter_index is None:
+            self.build_filter_index()
+        if (
+            self.planner is None
+            or self.planner.inverted_index is not self.inverted_index
+            or self.planner.filter_index is not self.filter_index
+            or self.planner.pool is not self.scoring_pool
+            or self.planner.long_query is not self.long_query
+        ):
+            self.planner = QueryPlanner(
+                self.filter_index,
+                self.inverted_index,
+                pool=self.scoring_pool,
+                long_query=self.long_query,
+            )
+        return self.planner
+
+    def vectorize_query(self, query: str, preprocess: bool = True) -> csr_matrix:
         """
-        Search using TF-IDF vectorization.
+        Turn query text into a 1 x n_terms TF-IDF vector.
 
         Args:
             query: Search query text
-            top_k: Number of results to return
             preprocess: Whether to clean the query text
 
         Returns:
-            Tuple of (indices, similarities) arrays
+            L2-normalized sparse query vector
         """
         if self.tfidf_vectorizer is None or self.tfidf_matrix is None:
             raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
@@ -135,23 +1032,157 @@ class VectorStore:
         if preprocess:
             query = clean_text(query)
 
-        # Vectorize query
-        query_vec = self.tfidf_vectorizer.transform([query])
+        # Vectorize query (rows and query are L2-normalized: dot == cosine)
+        return self.tfidf_vectorizer.transform([query])
 
-        # Compute similarities
-        similarities = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
+    def search_vector(
+        self,
+        query_vec: csr_matrix,
+        top_k: int = 10,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None,
+        lsa: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score an already vectorized query (see search_tfidf for arguments).
 
-        # Get top-K indices
-        top_indices = similarities.argsort()[::-1][:top_k]
-        top_scores = similarities[top_indices]
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        if self.inverted_index is None:
+            self.build_index()
+
+        if lsa:
+            if self.lsa_index is None:
+                raise ValueError("LSA not loaded. Call load_lsa() or build_lsa().")
+            return self.lsa_index.search(
+                query_vec, top_k, mask=self.inverted_index.eligible(mask)
+            )
+
+        if nprobe is not None:
+            if self.cluster_index is None:
+                raise ValueError(
+                    "Clusters not loaded. Call load_clusters() or build_clusters()."
+                )
+            return self.cluster_index.search(
+                self.inverted_index,
+                query_vec,
+                top_k,
+                nprobe,
+                mask=mask,
+                pool=self.scoring_pool,
+            )
 
-        return top_indices, top_scores
+        if (
+            strategy == "auto"
+            and self.long_query is not None
+            and self.long_query.applies(query_vec)
+        ):
+            indices, scores, _ = self.long_query.search(
+                self.inverted_index,
+                query_vec,
+                top_k,
+                mask=mask,
+                pool=self.scoring_pool,
+            )
+            return indices, scores
+
+        # Accumulate over the query terms' postings and select top-K
+        return self.inverted_index.search(
+            query_vec, top_k, strategy=strategy, mask=mask, pool=self.scoring_pool
+        )
+
+    def search_tfidf(
+        self,
+        query: str,
+        top_k: int = 10,
+        preprocess: bool = True,
+        strategy: Strategy = "auto",
+        mask: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None,
+        lsa: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search using TF-IDF vectorization.
+
+        Args:
+            query: Search query text
+            top_k: Number of results to return
+            preprocess: Whether to clean the query text
+            strategy: Retrieval strategy ("auto", "exhaustive", "wand",
+                "block_max", "subset"); all return identical results, except
+                that "auto" prunes long queries (see long_query.py)
+            mask: Optional boolean mask over indexed rows; only eligible
+                rows are scored (see filter_mask)
+            nprobe: Approximate mode: score only the rows of the ``nprobe``
+                closest cluster cells (None = exact search)
+            lsa: Dense mode: rank by cosine in the LSA latent space
+
+        Returns:
+            Tuple of (indices, similarities) arrays
+        """
+        query_vec = self.vectorize_query(query, preprocess)
+        return self.search_vector(
+            query_vec, top_k, strategy=strategy, mask=mask, nprobe=nprobe, lsa=lsa
+        )
+
+    def search_tfidf_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        preprocess: bool = True,
+        max_block_nnz: int = BATCH_MAX_NNZ,
+        pad: bool = True,
+        lsa: bool = False,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Search many queries at once.
+
+        All queries are vectorized in one transform call and scored with
+        sparse matrix products over memory-bounded blocks of queries.
+
+        Args:
+            queries: Search query texts
+            top_k: Number of results per query
+            preprocess: Whether to clean the query texts
+            max_block_nnz: Upper bound on score entries held per block
+            pad: Fill up to ``top_k`` with zero-score documents
+            lsa: Dense mode: one matrix product per block of queries
+
+        Returns:
+            List of (indices, similarities) tuples aligned with ``queries``
+        """
+        if self.tfidf_vectorizer is None or self.tfidf_matrix is None:
+            raise ValueError("TF-IDF not loaded. Call load_tfidf() first.")
+        if self.inverted_index is None:
+            self.build_index()
+
+        if preprocess:
+            queries = [clean_text(query) for query in queries]
+        query_matrix = self.tfidf_vectorizer.transform(list(queries))
+        if lsa:
+            if self.lsa_index is None:
+                raise ValueError("LSA not loaded. Call load_lsa() or build_lsa().")
+            return self.lsa_index.search_batch(
+                query_matrix,
+                top_k,
+                pad=pad,
+                max_block_nnz=max_block_nnz,
+                mask=self.inverted_index.eligible(),
+            )
+        return self.inverted_index.search_batch(
+            query_matrix, top_k, pad=pad, max_block_nnz=max_block_nnz
+        )
 
     def search(
         self,
         query: str,
         top_k: int = 10,
         preprocess: bool = True,
+        mask: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None,
+        lsa: bool = False,
     ) -> pd.DataFrame:
         """
         Search for similar jobs using TF-IDF.
@@ -160,6 +1191,9 @@ class VectorStore:
             query: Search query text
             top_k: Number of results to return
             preprocess: Whether to clean the query text
+            mask: Optional boolean mask over indexed rows (pre-filter)
+            nprobe: Cluster cells to score (None = exact search)
+            lsa: Rank by LSA latent-space cosine instead
 
         Returns:
             DataFrame with search results and metadata
@@ -173,13 +1207,113 @@ class VectorStore:
             )
 
         # Perform TF-IDF search
-        indices, scores = self.search_tfidf(query, top_k, preprocess)
+        indices, scores = self.search_tfidf(
+            query, top_k, preprocess, mask=mask, nprobe=nprobe, lsa=lsa
+        )
+
+        return self.results_frame(indices, scores)
+
+    def similar_rows(self, row: int, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows most similar to an indexed row, excluding the row itself.
+
+        Served from the neighbor table in O(k) when it holds the row and
+        enough live neighbors. Otherwise (rows added after the build,
+        ``top_k`` above the table's k, neighbors since deleted) the row's
+        stored TF-IDF vector is searched directly. Table neighbors only
+        include rows indexed when the table was built.
 
+        Args:
+            row: TF-IDF row id (see row_positions)
+            top_k: Number of similar rows
+
+        Returns:
+            Tuple of (indices, similarities) arrays of rows with a
+            positive score
+        """
+        if self.inverted_index is None:
+            self.build_index()
+
+        eligible = self.inverted_index.eligible()
+        if self.neighbor_table is not None:
+            hits = self.neighbor_table.lookup(row, top_k, eligible)
+            if hits is not None:
+                return hits
+
+        if row < self.tfidf_matrix.shape[0]:
+            row_vec = self.tfidf_matrix[row]
+        else:
+            row_vec = self.inverted_index.row_vector(row)
+        mask = np.ones(self.inverted_index.n_docs, dtype=bool)
+        if eligible is not None:
+            mask &= eligible
+        mask[row] = False
+        return self.inverted_index.search(
+            row_vec, top_k, pad=False, mask=mask, pool=self.scoring_pool
+        )
+
+    def row_positions(self, job_ids: Sequence[Any]) -> np.ndarray:
+        """
+        Map job_data index labels back to TF-IDF matrix rows.
+
+        Args:
+            job_ids: Index labels, e.g. the index of a results DataFrame
+
+        Returns:
+            Row indices (-1 for jobs that are not indexed)
+        """
+        # Rebuilt whenever sample_indices is replaced; a job re-added by
+        # add_jobs maps to its newest row
+        if self._row_lookup is None or self._row_lookup[0] is not self.sample_indices:
+            labels = pd.Index(self.sample_indices)
+            rows = np.arange(len(labels))
+            if not labels.is_unique:
+                newest = ~labels.duplicated(keep="last")
+                labels, rows = labels[newest], rows[newest]
+            self._row_lookup = (self.sample_indices, labels, rows)
+        _, labels, rows = self._row_lookup
+        positions = labels.get_indexer(job_ids)
+        return np.where(positions >= 0, rows[positions], -1)
+
+    def job_rows(self, job_ids: Sequence[Any]) -> pd.DataFrame:
+        """
+        Job data rows by index label, including jobs added by add_jobs.
+
+        Args:
+            job_ids: Index labels (repeats allowed)
+
+        Returns:
+            Rows in ``job_ids`` order; an added job's newest version wins
+        """
+        if self.ingested_jobs is None:
+            return self.job_data.loc[job_ids]
+        labels = pd.Index(job_ids)
+        added = labels.isin(self.ingested_jobs.index)
+        rows = pd.concat(
+            [
+                self.job_data.loc[labels[~added]],
+                self.ingested_jobs.loc[labels[added]],
+            ]
+        )
+        order = np.concatenate([np.flatnonzero(~added), np.flatnonzero(added)])
+        return rows.iloc[np.argsort(order, kind="stable")]
+
+    def results_frame(self, indices: np.ndarray, scores: np.ndarray) -> pd.DataFrame:
+        """
+        Materialize search hits as a ranked DataFrame of job rows.
+
+        Args:
+            indices: Row indices into the TF-IDF matrix
+            scores: Similarity scores aligned with ``indices``
+
+        Returns:
+            DataFrame with search results and metadata
+        """
         # Map sample indices to original dataset
         original_indices = [self.sample_indices[i] for i in indices]
 
         # Get job data
-        results = self.job_data.loc[original_indices].copy()
+        results = self.job_rows(original_indices).copy()
         results["similarity_score"] = scores
         results["rank"] = range(1, len(results) + 1)
 
@@ -5,10 +5,18 @@ Generate TF-IDF vectors for job recommendations
 Usage:
     python src/vectorize.py --sample 10000  # Use 10k sample
     python src/vectorize.py --full           # Encode all jobs (slower)
+    python src/vectorize.py --version 2025-01-15  # Hot-reloadable version
+    python src/vectorize.py --postings compressed  # Bit-packed postings
+    python src/vectorize.py --prune 0.5            # Keep 50% of postings
+    python src/vectorize.py --clusters 0           # Skip IVF clusters
+    python src/vectorize.py --lsa-codes int8       # 4x smaller LSA vectors
+    python src/vectorize.py --neighbors 0          # Skip similar-jobs table
 """
 
 from pathlib import Path
 import argparse
+import shutil
+import sys
 import time
 import pickle
 import warnings
@@ -18,6 +26,20 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from scipy.sparse import save_npz
 
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.artifacts import DATA_FILE, publish_version, version_dir
+from src.clusters import CLUSTERS_NAME, N_CLUSTERS, ClusterIndex
+from src.index_bundle import BUNDLE_NAME, write_tfidf_bundle
+from src.index_eval import QUERY_LOG, replay_titles
+from src.lsa import LSA_DIMS, LSA_NAME, LsaIndex
+from src.neighbors import NEIGHBORS_K, NEIGHBORS_NAME, NeighborTable
+from src.preprocessing import clean_text
+from src.pruning import PRUNE_TOP_K, prune_matrix, pruning_report
+from src.scoring import InvertedIndex, ScoringPool
+
 warnings.filterwarnings("ignore")
 
 
@@ -70,6 +92,42 @@ def create_tfidf_vectors(texts, models_dir: Path):
     return tfidf, tfidf_matrix
 
 
+def prune_tfidf_vectors(
+    df,
+    tfidf,
+    tfidf_matrix,
+    models_dir: Path,
+    keep: float,
+    method: str,
+    n_queries: int,
+):
+    """Prune low-impact postings and report quality against the full index"""
+    print(f"\n[+] Pruning postings ({method}-centric, keep {keep:.0%})...")
+    start = time.time()
+    pruned = prune_matrix(tfidf_matrix, keep, method, PRUNE_TOP_K)
+    print(f"  ✓ Completed in {time.time() - start:.2f}s")
+    print(f"  - Postings: {tfidf_matrix.nnz:,} -> {pruned.nnz:,}")
+
+    title = df["title"] if "title" in df.columns else None
+    queries = replay_titles(title, PROJECT_ROOT / QUERY_LOG, n_queries)
+    query_vecs = [tfidf.transform([clean_text(query)]) for query in queries]
+    report = pruning_report(tfidf_matrix, pruned, query_vecs)
+    print(f"  - Replayed queries: {report['queries']:,}")
+    print(
+        f"  - Index: {report['reference_bytes'] / 1024**2:.1f} MB -> "
+        f"{report['candidate_bytes'] / 1024**2:.1f} MB"
+    )
+    for k in (10, 20):
+        print(
+            f"  - recall@{k}: {report[f'recall@{k}']:.4f}  "
+            f"NDCG@{k}: {report[f'ndcg@{k}']:.4f}"
+        )
+
+    save_npz(models_dir / "tfidf_matrix.npz", pruned)
+    print(f"  ✓ Saved pruned matrix to {models_dir}")
+    return pruned
+
+
 def main():
     parser = argparse.ArgumentParser(description="Vectorize jobs for recommendation")
     parser.add_argument(
@@ -81,13 +139,74 @@ def main():
     parser.add_argument(
         "--full", action="store_true", help="Use full dataset (same as --sample 0)"
     )
+    parser.add_argument(
+        "--version",
+        default=None,
+        help="Write to models/versions/NAME (with a copy of the job data) and "
+        "publish it as models/CURRENT for VectorStore.reload()",
+    )
+    parser.add_argument(
+        "--postings",
+        choices=["raw", "compressed"],
+        default="raw",
+        help="Storage format of the bundle's postings: raw doc id arrays or "
+        "delta-encoded, bit-packed blocks (default: raw)",
+    )
+    parser.add_argument(
+        "--prune",
+        type=float,
+        default=1.0,
+        help="Fraction of postings to keep after static pruning "
+        "(default: 1.0, no pruning)",
+    )
+    parser.add_argument(
+        "--prune-method",
+        choices=["term", "document"],
+        default="term",
+        help="Drop low-impact postings per term or per document (default: term)",
+    )
+    parser.add_argument(
+        "--prune-queries",
+        type=int,
+        default=500,
+        help="Replayed queries for the pruning quality report (default: 500)",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=0,
+        help="Spherical k-means cells for approximate (nprobe) search, "
+        f"e.g. {N_CLUSTERS} (default: 0, not built)",
+    )
+    parser.add_argument(
+        "--lsa-dims",
+        type=int,
+        default=0,
+        help=f"TruncatedSVD dimensions for dense LSA search, e.g. {LSA_DIMS} "
+        "(default: 0, not built)",
+    )
+    parser.add_argument(
+        "--lsa-codes",
+        choices=["float32", "int8"],
+        default="float32",
+        help="Storage of the LSA row vectors (default: float32)",
+    )
+    parser.add_argument(
+        "--neighbors",
+        type=int,
+        default=0,
+        help=f"Similar jobs precomputed per job, e.g. {NEIGHBORS_K} "
+        "(default: 0, not built)",
+    )
     args = parser.parse_args()
 
     # Paths
     project_root = Path(__file__).parent.parent
     data_path = project_root / "data" / "processed" / "clean_jobs.parquet"
     models_dir = project_root / "models"
-    models_dir.mkdir(exist_ok=True)
+    if args.version:
+        models_dir = version_dir(models_dir, args.version)
+    models_dir.mkdir(parents=True, exist_ok=True)
 
     # Sample size
     sample_size = None if args.full else (args.sample if args.sample > 0 else None)
@@ -102,6 +221,16 @@ def main():
 
     # Create TF-IDF vectors
     tfidf, tfidf_matrix = create_tfidf_vectors(texts, models_dir)
+    if args.prune < 1.0:
+        tfidf_matrix = prune_tfidf_vectors(
+            df,
+            tfidf,
+            tfidf_matrix,
+            models_dir,
+            args.prune,
+            args.prune_method,
+            args.prune_queries,
+        )
 
     # Save metadata
     sample_indices = df.index.tolist()
@@ -109,6 +238,70 @@ def main():
         pickle.dump(sample_indices, f)
     print(f"\n✓ Saved sample indices ({len(sample_indices):,} jobs)")
 
+    # Memory-mappable bundle of everything the query runtime needs
+    write_tfidf_bundle(
+        models_dir / BUNDLE_NAME,
+        tfidf,
+        tfidf_matrix,
+        sample_indices,
+        postings=args.postings,
+    )
+    bundle_size = (models_dir / BUNDLE_NAME).stat().st_size
+    print(
+        f"✓ Saved index bundle ({bundle_size / 1024**2:.1f} MB, "
+        f"{args.postings} postings)"
+    )
+
+    # Cells for cluster-pruned approximate search
+    if args.clusters > 0:
+        start = time.time()
+        clusters = ClusterIndex.build(tfidf_matrix, args.clusters)
+        clusters.save(models_dir / CLUSTERS_NAME)
+        stats = clusters.stats()
+        print(
+            f"✓ Saved {stats['cells']} clusters in {time.time() - start:.1f}s "
+            f"(mean {stats['mean']:.0f} rows, max {stats['max']:,} rows per cell)"
+        )
+
+    # Latent vectors for dense (LSA) search
+    if args.lsa_dims > 0:
+        start = time.time()
+        lsa = LsaIndex.build(tfidf_matrix, args.lsa_dims, args.lsa_codes)
+        lsa.save(models_dir / LSA_NAME)
+        print(
+            f"✓ Saved {lsa.dims}-dim LSA vectors ({args.lsa_codes}) in "
+            f"{time.time() - start:.1f}s ({lsa.nbytes / 1024**2:.1f} MB, "
+            f"{lsa.explained_variance:.1%} of variance)"
+        )
+
+    # All-pairs top-k table for "similar jobs"
+    if args.neighbors > 0:
+        start = time.time()
+
+        def progress(done, total):
+            print(f"\r  - Neighbors: {done:,}/{total:,} rows", end="", flush=True)
+
+        pool = ScoringPool()
+        table = NeighborTable.build(
+            InvertedIndex(tfidf_matrix),
+            tfidf_matrix,
+            args.neighbors,
+            pool=pool,
+            progress=progress,
+        )
+        pool.close()
+        table.save(models_dir / NEIGHBORS_NAME)
+        print(
+            f"\n✓ Saved {table.k} neighbors per job in {time.time() - start:.1f}s "
+            f"({table.nbytes / 1024**2:.1f} MB)"
+        )
+
+    if args.version:
+        # Self-contained version: sample indices refer to this exact data
+        shutil.copy2(data_path, models_dir / DATA_FILE)
+        publish_version(project_root / "models", args.version)
+        print(f"✓ Published version {args.version} as models/CURRENT")
+
     # Summary
     print("\n" + "=" * 70)
     print("SUMMARY")
@@ -122,6 +315,13 @@ def main():
     print("  - tfidf_vectorizer.pkl")
     print("  - tfidf_matrix.npz")
     print("  - sample_indices.pkl")
+    print(f"  - {BUNDLE_NAME}")
+    if args.clusters > 0:
+        print(f"  - {CLUSTERS_NAME}")
+    if args.lsa_dims > 0:
+        print(f"  - {LSA_NAME}")
+    if args.neighbors > 0:
+        print(f"  - {NEIGHBORS_NAME}")
 
     print("\n✅ Vectorization Complete - Ready for Recommendation Engine")
     print("=" * 70)
@@ -0,0 +1,119 @@
+"""
+Shared fixtures for tests that do not need the trained artifacts.
+
+The synthetic corpus mimics the production vectorizer settings
+(English stop words, 1-2 grams, float32, L2 norm) on a few thousand
+randomly generated job texts.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+WORDS = (
+    "python java sql data engineer analyst developer senior junior manager "
+    "sales nurse teacher remote cloud aws azure backend frontend react "
+    "marketing finance accounting design product support customer health "
+    "care warehouse driver logistics security network machine learning "
+    "research scientist intern retail store operations project"
+).split()
+
+
+@pytest.fixture(scope="session")
+def tfidf_corpus():
+    """Fit a small TF-IDF model; returns (vectorizer, matrix, texts)."""
+    rng = np.random.default_rng(7)
+    texts = [" ".join(rng.choice(WORDS, size=rng.integers(5, 40))) for _ in range(3000)]
+    vectorizer = TfidfVectorizer(
+        ngram_range=(1, 2),
+        min_df=2,
+        stop_words="english",
+        lowercase=True,
+        dtype=np.float32,
+    )
+    matrix = vectorizer.fit_transform(texts).tocsr()
+    return vectorizer, matrix, texts
+
+
+@pytest.fixture(scope="session")
+def synthetic_jobs(tfidf_corpus):
+    """Job metadata aligned with the synthetic corpus rows."""
+    _, _, texts = tfidf_corpus
+    rng = np.random.default_rng(11)
+    n = len(texts)
+    salary = rng.uniform(30000, 200000, size=n).round(-3)
+    salary[rng.random(n) < 0.6] = np.nan
+    return pd.DataFrame(
+        {
+            "title": [t.split()[0].title() + " " + t.split()[1] for t in texts],
+            "company_name_x": rng.choice(["Acme", "Globex", "Initech"], size=n),
+            "location": rng.choice(
+                ["New York, NY", "Los Angeles, CA", "Austin, TX", "United States"],
+                size=n,
+            ),
+            "formatted_work_type": rng.choice(
+                ["Full-time", "Part-time", "Contract", "Internship"],
+                size=n,
+                p=[0.7, 0.1, 0.15, 0.05],
+            ),
+            "formatted_experience_level": rng.choice(
+                ["Entry level", "Mid-Senior level", "Director", None], size=n
+            ),
+            "remote_allowed": rng.choice([1.0, np.nan], size=n, p=[0.15, 0.85]),
+            "industries": rng.choice(
+                [
+                    "Hospitals and Health Care",
+                    "Software Development, IT Services",
+                    "Retail",
+                    None,
+                ],
+                size=n,
+            ),
+            "skills": rng.choice(
+                [
+                    "Information Technology, Engineering",
+                    "Sales",
+                    "Health Care " "Provider",
+                    None,
+                ],
+                size=n,
+            ),
+            "salary_median": salary,
+            "clean_text": texts,
+        },
+        # Non-contiguous index, like the sampled production parquet
+        index=np.arange(n) * 3 + 5,
+    ).assign(work_type=lambda df: df["formatted_work_type"])
+
+
+@pytest.fixture(scope="session")
+def synthetic_store(tfidf_corpus, synthetic_jobs):
+    """VectorStore populated in memory from the synthetic corpus."""
+    from src.vector_store import VectorStore
+
+    vectorizer, matrix, _ = tfidf_corpus
+    store = VectorStore()
+    store.tfidf_vectorizer = vectorizer
+    store.tfidf_matrix = matrix
+    # Index rows in shuffled order so row i != job_data row i
+    rng = np.random.default_rng(3)
+    order = rng.permutation(len(synthetic_jobs))
+    store.job_data = synthetic_jobs
+    store.sample_indices = synthetic_jobs.index[order].tolist()
+    store.tfidf_matrix = matrix[order]
+    store.build_index()
+    store.build_filter_index()
+    return store
+
+
+@pytest.fixture
+def synthetic_recommender(synthetic_store, tmp_path):
+    """JobRecommender wrapping the synthetic store."""
+    from src.recommender import JobRecommender
+
+    rec = JobRecommender(
+        auto_load=False, pass_rates_path=tmp_path / "filter_pass_rates.json"
+    )
+    rec.vector_store = synthetic_store
+    return rec
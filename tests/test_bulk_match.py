@@ -0,0 +1,96 @@
+"""
+Unit Tests for offline bulk matching (synthetic corpus)
+
+Run with: pytest tests/test_bulk_match.py -v
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import save_npz
+
+from src.bulk_match import iter_documents, match_file, plan_memory
+from src.scoring import InvertedIndex
+
+
+@pytest.fixture(scope="module")
+def models_dir(tfidf_corpus, tmp_path_factory):
+    """TF-IDF artifacts of the synthetic corpus, as written by vectorize.py."""
+    vectorizer, matrix, _ = tfidf_corpus
+    path = tmp_path_factory.mktemp("models")
+    with open(path / "tfidf_vectorizer.pkl", "wb") as f:
+        pickle.dump(vectorizer, f)
+    save_npz(path / "tfidf_matrix.npz", matrix)
+    with open(path / "sample_indices.pkl", "wb") as f:
+        pickle.dump(list(range(100, 100 + matrix.shape[0])), f)
+    return path
+
+
+@pytest.fixture(scope="module")
+def documents(tfidf_corpus):
+    _, _, texts = tfidf_corpus
+    return pd.DataFrame(
+        {"doc": [f"d{i}" for i in range(250)], "text": texts[::12][:249] + ["zzz"]}
+    )
+
+
+def expected_matches(tfidf_corpus, texts, top_k):
+    vectorizer, matrix, _ = tfidf_corpus
+    index = InvertedIndex(matrix)
+    return [
+        index.search(vectorizer.transform([text]), top_k, pad=False) for text in texts
+    ]
+
+
+class TestBulkMatch:
+    """Chunked, pooled matching must equal per-document search."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_single_queries(
+        self, tfidf_corpus, models_dir, documents, tmp_path, workers
+    ):
+        source = tmp_path / "docs.parquet"
+        documents.to_parquet(source)
+        output = tmp_path / "matches.parquet"
+
+        stats = match_file(
+            source,
+            output,
+            models_dir=models_dir,
+            top_k=5,
+            chunk_size=40,
+            workers=workers,
+            memory_limit_mb=512,
+            id_column="doc",
+        )
+        matches = pd.read_parquet(output)
+
+        assert stats["documents"] == len(documents)
+        assert stats["chunks"] == 7
+        assert len(matches) == stats["rows"]
+        expected = expected_matches(tfidf_corpus, documents["text"], 5)
+        for doc, (indices, scores) in zip(documents["doc"], expected):
+            rows = matches[matches["input_id"] == doc]
+            assert rows["rank"].tolist() == list(range(1, len(indices) + 1))
+            np.testing.assert_array_equal(rows["row"], indices)
+            np.testing.assert_array_equal(rows["job_id"], indices + 100)
+            np.testing.assert_array_equal(rows["score"], scores)
+
+    def test_text_and_csv_inputs(self, documents, tmp_path):
+        (tmp_path / "docs.txt").write_text("\n".join(documents["text"]) + "\n")
+        documents.to_csv(tmp_path / "docs.csv", index=False)
+
+        lines = list(iter_documents(tmp_path / "docs.txt", chunk_size=100))
+        rows = list(iter_documents(tmp_path / "docs.csv", 100, id_column="doc"))
+
+        assert [len(ids) for ids, _ in lines] == [100, 100, 50]
+        assert lines[2][0][-1] == "249"
+        assert rows[0][0][0] == "d0"
+        assert sum((texts for _, texts in rows), []) == documents["text"].tolist()
+
+    def test_memory_ceiling(self):
+        assert plan_memory(100 * 1024**2, 1024, 4) == 156 * 1024**2 // 32
+        with pytest.raises(ValueError):
+            plan_memory(300 * 1024**2, 1024, 4)
@@ -0,0 +1,217 @@
+"""
+Unit Tests for the recommendation result cache
+
+Run with: pytest tests/test_cache.py -v
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scipy.sparse import csr_matrix
+
+from src.cache import DocumentCache, ResultCache, canonical_filters
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(n=3):
+    return pd.DataFrame({"title": [f"job {i}" for i in range(n)]})
+
+
+class TestResultCache:
+    """LRU, TTL and version invalidation."""
+
+    def test_canonical_filters(self):
+        assert canonical_filters(
+            {"location": ["LA", "Austin"], "remote_allowed": False, "work_type": ""}
+        ) == canonical_filters({"location": ["Austin", "LA"]})
+        assert canonical_filters({"location": "LA"}) != canonical_filters(
+            {"location": "LA "}
+        )
+        assert canonical_filters({"min_salary": 0}) != canonical_filters({})
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.put(key, frame())
+        cache.get("a")
+        cache.put("c", frame())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        size = int(frame().memory_usage(index=True, deep=True).sum())
+        cache = ResultCache(max_entries=100, max_bytes=size * 2)
+        for key in "abc":
+            cache.put(key, frame())
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["bytes"] <= size * 2
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.put("a", frame())
+
+        clock.now = 9
+        assert cache.get("a") is not None
+        clock.now = 11
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_version_change_invalidates(self):
+        cache = ResultCache()
+        cache.put("a", frame(), version="v1")
+        assert cache.get("a", version="v1") is not None
+        assert cache.get("a", version="v2") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_hits_are_copies(self):
+        cache = ResultCache()
+        cache.put("a", frame())
+        hit = cache.get("a")
+        hit.loc[0, "title"] = "changed"
+
+        assert hit.attrs["cache"] == "hit"
+        assert cache.get("a").loc[0, "title"] == "job 0"
+
+    def test_concurrent_access(self):
+        cache = ResultCache(max_entries=8)
+
+        def worker(offset):
+            for i in range(200):
+                key = (offset + i) % 16
+                if cache.get(key) is None:
+                    cache.put(key, frame(1))
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert stats["entries"] <= 8
+        assert stats["hits"] + stats["misses"] == 8 * 200
+
+
+class TestCachedRecommendations:
+    """get_recommendations is served from the cache on repeats."""
+
+    @pytest.mark.parametrize(
+        "filters", [None, {"location": ["LA", "Austin"], "min_salary": 50000}]
+    )
+    def test_repeat_is_hit(self, synthetic_recommender, filters):
+        first = synthetic_recommender.get_recommendations(
+            "Senior Python Engineer", top_k=10, filters=filters
+        )
+        again = synthetic_recommender.get_recommendations(
+            "senior python engineer!", top_k=10, filters=filters
+        )
+
+        assert first.attrs["cache"] == "miss"
+        assert again.attrs["cache"] == "hit"
+        pd.testing.assert_frame_equal(first, again)
+        assert synthetic_recommender.cache_stats()["exact"]["hits"] == 1
+
+    def test_index_rebuild_invalidates(self, synthetic_recommender):
+        store = synthetic_recommender.vector_store
+        synthetic_recommender.get_recommendations("data analyst", top_k=5)
+        store.build_filter_index()
+        results = synthetic_recommender.get_recommendations("data analyst", top_k=5)
+
+        assert results.attrs["cache"] == "miss"
+        assert synthetic_recommender.cache_stats()["exact"]["invalidations"] == 1
+
+
+class TestSemanticCache:
+    """Second tier keyed on the TF-IDF query vector."""
+
+    QUERY = "senior python engineer"
+
+    def test_identical_vector_reuses_results(self, synthetic_recommender):
+        first = synthetic_recommender.get_recommendations(self.QUERY, top_k=10)
+        # Stop words and out-of-vocabulary words leave the vector unchanged
+        again = synthetic_recommender.get_recommendations(
+            "the senior python engineer xyzzy", top_k=10
+        )
+
+        assert again.attrs["cache"] == "semantic"
+        pd.testing.assert_frame_equal(first, again)
+        stats = synthetic_recommender.cache_stats()
+        assert stats["semantic"]["hits"] == 1
+        assert stats["exact"]["hits"] == 0
+
+    def test_near_duplicate_is_rescored(self, synthetic_recommender):
+        store = synthetic_recommender.vector_store
+        cache = synthetic_recommender.semantic_cache
+        cache.threshold = 0.5
+
+        first = synthetic_recommender.get_recommendations(self.QUERY, top_k=10)
+        near_query = self.QUERY + " python"
+        similarity = (
+            store.vectorize_query(self.QUERY)
+            .multiply(store.vectorize_query(near_query))
+            .sum()
+        )
+        near = synthetic_recommender.get_recommendations(near_query, top_k=10)
+
+        assert 0.5 <= similarity < 1
+        assert near.attrs["cache"] == "semantic"
+        assert set(near.index) == set(first.index)
+        assert near["similarity_score"].is_monotonic_decreasing
+        rows = store.row_positions(near.index)
+        expected = store.tfidf_matrix[rows] @ store.vectorize_query(near_query).T
+        np.testing.assert_allclose(
+            near["similarity_score"], expected.toarray().ravel(), rtol=1e-6
+        )
+        assert synthetic_recommender.cache_stats()["semantic"]["near_hits"] == 1
+
+        # The approximate answer is not promoted to an exact cache entry
+        again = synthetic_recommender.get_recommendations(near_query, top_k=10)
+        assert again.attrs["cache"] == "semantic"
+        stats = synthetic_recommender.cache_stats()
+        assert stats["exact"]["hits"] == 0
+        assert stats["semantic"]["near_hits"] == 2
+
+    def test_threshold_and_filters_respected(self, synthetic_recommender):
+        synthetic_recommender.get_recommendations(self.QUERY, top_k=10)
+        other_filters = synthetic_recommender.get_recommendations(
+            "the senior python engineer", top_k=10, filters={"work_type": "Contract"}
+        )
+        unrelated = synthetic_recommender.get_recommendations("nurse", top_k=10)
+
+        assert other_filters.attrs["cache"] == "miss"
+        assert unrelated.attrs["cache"] == "miss"
+
+
+class TestDocumentCache:
+    """Document vectors keyed on a content hash."""
+
+    def test_vectors_by_content_and_version(self):
+        clock = FakeClock()
+        cache = DocumentCache(max_entries=2, ttl=10, clock=clock)
+        key = cache.make_document_key("Senior nurse, 10 years ICU")
+        vector = csr_matrix(np.array([[0.0, 0.6, 0.8]], dtype=np.float32))
+
+        cache.put(key, vector, version="v1")
+        vector.data[:] = 0
+        hit = cache.get(key, version="v1")
+        assert hit.nnz == 2 and hit.data.tolist() == pytest.approx([0.6, 0.8])
+        assert key != cache.make_document_key("Senior nurse, 10 years ICU ")
+        assert cache.stats()["bytes"] == 2 * 4 + 2 * 4 + 2 * 4
+
+        clock.now = 11
+        assert cache.get(key, version="v1") is None
+        cache.put(key, hit, version="v1")
+        assert cache.get(key, version="v2") is None
@@ -0,0 +1,160 @@
+"""
+Unit Tests for cluster-pruned approximate search (synthetic corpus)
+
+Run with: pytest tests/test_clusters.py -v
+"""
+
+import numpy as np
+import pytest
+
+from src.clusters import ClusterIndex
+from src.index_eval import compare_indexes
+from src.recommender import JobRecommender
+from src.scoring import InvertedIndex
+from src.vector_store import VectorStore
+
+
+@pytest.fixture(scope="module")
+def clusters(tfidf_corpus):
+    _, matrix, _ = tfidf_corpus
+    return ClusterIndex.build(matrix, 32)
+
+
+@pytest.fixture
+def cluster_store(tfidf_corpus, synthetic_jobs):
+    """Fresh in-memory store over the first 2000 jobs with clusters built."""
+    vectorizer, matrix, _ = tfidf_corpus
+    store = VectorStore()
+    store.tfidf_vectorizer = vectorizer
+    store.tfidf_matrix = matrix[:2000]
+    store.job_data = synthetic_jobs.iloc[:2000].copy()
+    store.sample_indices = synthetic_jobs.index[:2000].tolist()
+    store.build_index()
+    store.build_filter_index()
+    store.build_clusters(16)
+    yield store
+    if store.segment_writer is not None:
+        store.segment_writer.close()
+
+
+class Probed:
+    """compare_indexes adapter for one nprobe setting."""
+
+    def __init__(self, clusters, index, nprobe):
+        self.clusters, self.index, self.nprobe = clusters, index, nprobe
+        self.nbytes = clusters.nbytes
+
+    def search(self, query_vec, top_k, pad=True):
+        return self.clusters.search(self.index, query_vec, top_k, self.nprobe, pad)
+
+
+class TestClusterIndex:
+    """IVF partition and probing."""
+
+    def test_every_row_in_one_cell(self, tfidf_corpus, clusters):
+        _, matrix, _ = tfidf_corpus
+        np.testing.assert_array_equal(
+            np.sort(clusters.cell_rows), np.arange(matrix.shape[0])
+        )
+        assert clusters.stats()["rows"] == matrix.shape[0]
+        np.testing.assert_allclose(np.linalg.norm(clusters.centroids, axis=1), 1, 1e-5)
+
+    def test_probing_all_cells_is_exact(self, tfidf_corpus, clusters):
+        vectorizer, matrix, texts = tfidf_corpus
+        index = InvertedIndex(matrix)
+        mask = np.random.default_rng(4).random(matrix.shape[0]) < 0.5
+
+        for query in ["python developer", "nurse care", "zzz"] + texts[:10]:
+            query_vec = vectorizer.transform([query])
+            for kwargs in ({}, {"mask": mask}):
+                expected = index.search(query_vec, 10, **kwargs)
+                actual = clusters.search(index, query_vec, 10, 32, **kwargs)
+                np.testing.assert_array_equal(actual[0], expected[0])
+                np.testing.assert_array_equal(actual[1], expected[1])
+
+    def test_results_come_from_probed_cells(self, tfidf_corpus, clusters):
+        vectorizer, matrix, texts = tfidf_corpus
+        index = InvertedIndex(matrix)
+        query_vec = vectorizer.transform([texts[0]])
+
+        indices, scores = clusters.search(index, query_vec, 20, 2)
+
+        probed = clusters.rows(clusters.probe(query_vec, 2))
+        assert np.isin(indices, probed).all()
+        assert (np.diff(scores) <= 0).all()
+
+    def test_recall_rises_with_nprobe(self, tfidf_corpus, clusters):
+        vectorizer, matrix, texts = tfidf_corpus
+        index = InvertedIndex(matrix)
+        query_vecs = [vectorizer.transform([text]) for text in texts[:40]]
+
+        recalls = [
+            compare_indexes(index, Probed(clusters, index, n), query_vecs, (10,))[
+                "recall@10"
+            ]
+            for n in (1, 4, 16, 32)
+        ]
+        assert recalls == sorted(recalls)
+        assert recalls[-1] == 1.0
+
+    def test_save_and_load(self, tfidf_corpus, clusters, tmp_path):
+        vectorizer, matrix, _ = tfidf_corpus
+        clusters.save(tmp_path / "clusters.bundle")
+        loaded = ClusterIndex.load(tmp_path / "clusters.bundle")
+
+        assert loaded.n_clusters == clusters.n_clusters
+        assert loaded.n_docs == clusters.n_docs
+        query_vec = vectorizer.transform(["senior data engineer"])
+        np.testing.assert_array_equal(
+            loaded.probe(query_vec, 4), clusters.probe(query_vec, 4)
+        )
+
+
+class TestApproximateStore:
+    """VectorStore and JobRecommender with ``nprobe``."""
+
+    def test_store_search(self, cluster_store, tmp_path):
+        exact = cluster_store.search_tfidf("python developer", 10)
+        full = cluster_store.search_tfidf("python developer", 10, nprobe=16)
+        np.testing.assert_array_equal(full[0], exact[0])
+
+        cluster_store.cluster_index.save(tmp_path / "clusters.bundle")
+        cluster_store.cluster_index = None
+        with pytest.raises(ValueError):
+            cluster_store.search_tfidf("python developer", 10, nprobe=4)
+        cluster_store.load_clusters(tmp_path / "clusters.bundle")
+        results = cluster_store.search("python developer", top_k=5, nprobe=4)
+        assert len(results) == 5
+
+    def test_mask_respected(self, cluster_store):
+        mask, _ = cluster_store.filter_mask({"work_type": "Contract"})
+        indices, _ = cluster_store.search_tfidf(
+            "sales manager", 20, mask=mask, nprobe=4
+        )
+        assert mask[indices].all()
+
+    def test_added_jobs_always_probed(self, cluster_store, synthetic_jobs):
+        new_jobs = synthetic_jobs.iloc[2000:2010].drop(columns=["clean_text"])
+        new_jobs = new_jobs.assign(title="Nurse", description="Nurse care nurse")
+        rows = cluster_store.add_jobs(new_jobs)
+
+        indices, _ = cluster_store.search_tfidf("nurse nurse care", 10, nprobe=1)
+        assert set(rows) <= set(indices)
+
+    def test_recommender(self, cluster_store, tmp_path):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json"
+        )
+        recommender.vector_store = cluster_store
+
+        results = recommender.get_recommendations("data analyst", 5, nprobe=2)
+        again = recommender.get_recommendations("data analyst", 5, nprobe=2)
+        exact = recommender.get_recommendations("data analyst", 5)
+
+        assert results.attrs["approximate"] is True
+        assert again.attrs["cache"] == "miss"
+        assert "approximate" not in exact.attrs
+        filtered = recommender.get_recommendations(
+            "data analyst", 5, {"work_type": "Contract"}, nprobe=2
+        )
+        assert "approximate" not in filtered.attrs
@@ -0,0 +1,115 @@
+"""
+Unit Tests for compressed postings (synthetic corpus)
+
+Run with: pytest tests/test_compressed.py -v
+"""
+
+import numpy as np
+import pytest
+
+from src.compressed import CompressedIndex, pack_postings, unpack_blocks
+from src.index_bundle import load_tfidf_bundle, write_tfidf_bundle
+from src.scoring import InvertedIndex, ScoringPool
+from src.vector_store import VectorStore
+
+QUERIES = ["python developer", "senior data engineer remote", "nurse", "zzz"]
+
+
+def test_pack_round_trip():
+    rng = np.random.default_rng(0)
+    # Dense runs (width 0), wide gaps and single-posting terms
+    lists = [
+        np.arange(300),
+        np.sort(rng.choice(2**30, size=500, replace=False)),
+        np.array([7]),
+        np.array([], dtype=np.int64),
+        np.sort(rng.choice(10_000, size=129, replace=False)),
+    ]
+    indptr = np.concatenate([[0], np.cumsum([len(docs) for docs in lists])])
+    doc_ids = np.concatenate(lists)
+    arrays = pack_postings(indptr, doc_ids, pack_size=128)
+
+    decoded = unpack_blocks(arrays, np.arange(len(arrays["block_first"])))
+    np.testing.assert_array_equal(decoded, doc_ids)
+    assert arrays["block_widths"][0] == 0
+    assert arrays["block_widths"].max() <= 31
+    starts = arrays["block_starts"]
+    np.testing.assert_array_equal(
+        unpack_blocks(arrays, np.array([4, 0])),
+        np.concatenate([doc_ids[starts[4] : starts[5]], doc_ids[: starts[1]]]),
+    )
+
+
+@pytest.fixture(scope="module")
+def indexes(tfidf_corpus):
+    _, matrix, _ = tfidf_corpus
+    return InvertedIndex(matrix), CompressedIndex(matrix, pack_size=32)
+
+
+class TestCompressedIndex:
+    """Compressed postings must score exactly like the raw index."""
+
+    def test_postings_and_size(self, indexes):
+        raw, compressed = indexes
+        np.testing.assert_array_equal(compressed.decode_all(), raw.doc_ids)
+        for term in (0, 5, raw.n_terms - 1):
+            for doc_range in (None, (1000, 2000)):
+                expected = raw.postings(term, doc_range)
+                actual = compressed.postings(term, doc_range)
+                np.testing.assert_array_equal(actual[0], expected[0])
+                np.testing.assert_array_equal(actual[1], expected[1])
+        positions = np.random.default_rng(1).integers(0, raw.nnz, 200)
+        np.testing.assert_array_equal(
+            compressed.docs_at(positions), raw.doc_ids[positions]
+        )
+        assert compressed.doc_id_bytes < 0.5 * raw.doc_ids.nbytes
+        assert not hasattr(compressed, "doc_ids")
+
+    def test_search_matches_raw(self, indexes, tfidf_corpus):
+        vectorizer, matrix, texts = tfidf_corpus
+        raw, compressed = indexes
+        mask = np.random.default_rng(2).random(matrix.shape[0]) < 0.3
+        pool = ScoringPool(workers=3, min_postings=0)
+
+        for query in QUERIES + texts[:5]:
+            query_vec = vectorizer.transform([query])
+            for strategy in ("exhaustive", "wand", "block_max"):
+                for kwargs in ({}, {"mask": mask}, {"pool": pool}):
+                    expected = raw.search(query_vec, 10, strategy=strategy, **kwargs)
+                    actual = compressed.search(
+                        query_vec, 10, strategy=strategy, **kwargs
+                    )
+                    np.testing.assert_array_equal(actual[0], expected[0])
+                    np.testing.assert_array_equal(actual[1], expected[1])
+        pool.close()
+
+        query_matrix = vectorizer.transform(QUERIES)
+        for expected, actual in zip(
+            raw.search_batch(query_matrix, 5), compressed.search_batch(query_matrix, 5)
+        ):
+            np.testing.assert_array_equal(actual[0], expected[0])
+            np.testing.assert_array_equal(actual[1], expected[1])
+
+    def test_bundle_format(self, tfidf_corpus, tmp_path):
+        vectorizer, matrix, _ = tfidf_corpus
+        row_ids = np.arange(matrix.shape[0])
+        write_tfidf_bundle(tmp_path / "raw.bundle", vectorizer, matrix, row_ids)
+        path = tmp_path / "tfidf_index.bundle"
+        write_tfidf_bundle(path, vectorizer, matrix, row_ids, postings="compressed")
+
+        _, _, index, _ = load_tfidf_bundle(path)
+        assert isinstance(index, CompressedIndex)
+        assert not index.packed["packed"].flags.writeable
+        assert path.stat().st_size < (tmp_path / "raw.bundle").stat().st_size
+
+        store = VectorStore(models_dir=tmp_path)
+        store.load_bundle(path)
+        built = InvertedIndex(matrix)
+        for query in QUERIES:
+            got = store.search_tfidf(query, 10)
+            expected = built.search(store.vectorize_query(query), 10)
+            np.testing.assert_array_equal(got[0], expected[0])
+            np.testing.assert_array_equal(got[1], expected[1])
+
+        with pytest.raises(ValueError, match="postings format"):
+            write_tfidf_bundle(path, vectorizer, matrix, row_ids, postings="zip")
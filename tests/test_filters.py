@@ -0,0 +1,302 @@
+"""
+Unit Tests for the filter bitmap index (synthetic corpus)
+
+Run with: pytest tests/test_filters.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filters import ColumnBitmaps, FilterIndex
+from src.planner import (
+    DEEPENING_SLACK,
+    DICTIONARY_COST,
+    ROW_FILTER_COST,
+    SAVE_EVERY,
+    FilterPassRates,
+)
+from src.recommender import JobRecommender
+
+FILTER_CASES = [
+    {"location": "New York"},
+    {"location": ["LA", "Austin"], "work_type": "Part-time"},
+    {"work_type": ["Full-time", "Contract"], "experience_level": "Entry level"},
+    {"remote_allowed": True, "experience_level": "Entry", "min_salary": 50000},
+    {"min_salary": 80000, "max_salary": 150000},
+    {"industries": "software", "skills": ["Engineering"]},
+    {"remote_allowed": False, "location": ""},
+    # List columns match the whole string, like _apply_filters
+    {"skills": "Technology, Engineering", "industries": "^Software"},
+    {"skills": ["^Eng", "Sales"], "industries": "Software.*Services"},
+]
+
+
+def reference_mask(recommender, filters):
+    """Eligibility computed by the DataFrame post-filter over every row."""
+    store = recommender.vector_store
+    rows = store.job_data.loc[store.sample_indices].copy()
+    rows["row"] = np.arange(len(rows))
+    kept = recommender._apply_filters(rows, filters)
+    mask = np.zeros(len(rows), dtype=bool)
+    mask[kept["row"].to_numpy()] = True
+    return mask
+
+
+class TestFilterIndex:
+    """Bitmap evaluation must agree with _apply_filters."""
+
+    @pytest.mark.parametrize("filters", FILTER_CASES)
+    def test_mask_matches_post_filter(self, synthetic_recommender, filters):
+        mask, residual = synthetic_recommender.vector_store.filter_mask(filters)
+        expected = reference_mask(synthetic_recommender, filters)
+
+        assert residual == {}
+        if mask is None:
+            assert expected.all()
+        else:
+            np.testing.assert_array_equal(mask, expected)
+
+    def test_unknown_filter_is_residual(self, synthetic_store):
+        mask, residual = synthetic_store.filter_index.evaluate(
+            {"work_type": "Contract", "benefits": "401(K)"}
+        )
+        assert residual == {"benefits": "401(K)"}
+        assert mask is not None and mask.any()
+
+    def test_containers_are_compact(self):
+        column = pd.Series(["a"] * 900 + ["b"] * 100 + ["c"])
+        bitmaps = ColumnBitmaps(column)
+
+        # "a" is stored as packed bits, "b" and "c" as row-id arrays
+        assert bitmaps.nbytes - bitmaps.codes.nbytes < len(column)
+        np.testing.assert_array_equal(
+            bitmaps.mask(bitmaps.values == "c"), (column == "c").to_numpy()
+        )
+
+    def test_appended_rows_match_rebuild(self, synthetic_store):
+        rows = synthetic_store.job_data.loc[synthetic_store.sample_indices]
+        base = FilterIndex(rows.iloc[:1500])
+        appended = base.with_rows(rows.iloc[1500:1900]).with_rows(rows.iloc[1900:])
+        rebuilt = FilterIndex(rows)
+
+        assert appended.n_docs == rebuilt.n_docs == len(rows)
+        for filters in FILTER_CASES:
+            np.testing.assert_array_equal(
+                appended.evaluate(filters)[0], rebuilt.evaluate(filters)[0]
+            )
+        np.testing.assert_array_equal(appended.salary.rows, rebuilt.salary.rows)
+        assert base.n_docs == 1500 and len(base.columns["location"].codes) == 1500
+
+        # Unseen values extend the dictionary; rare values turn into bitmaps
+        column = pd.Series(["a"] * 10 + ["b"])
+        bitmaps = ColumnBitmaps(column).with_rows(pd.Series(["b"] * 40 + ["c", None]))
+        np.testing.assert_array_equal(bitmaps.values, ["a", "b", "c"])
+        np.testing.assert_array_equal(bitmaps.counts, [10, 41, 1])
+        assert bitmaps._containers[1].dtype == np.uint8
+        np.testing.assert_array_equal(
+            bitmaps.mask(bitmaps.values == "b"), np.isin(np.arange(53), range(10, 51))
+        )
+        np.testing.assert_array_equal(bitmaps.codes[-3:], [1, 2, -1])
+
+
+class TestPreFilteredRecommendations:
+    """Filtered queries return the exact filtered top-K."""
+
+    @pytest.mark.parametrize("filters", FILTER_CASES)
+    def test_fills_top_k(self, synthetic_recommender, filters):
+        top_k = 15
+        store = synthetic_recommender.vector_store
+        mask = reference_mask(synthetic_recommender, filters)
+
+        results = synthetic_recommender.get_recommendations(
+            "senior python engineer", top_k=top_k, filters=filters
+        )
+        assert len(results) == min(top_k, mask.sum())
+        assert results["rank"].tolist() == list(range(1, len(results) + 1))
+
+        query_vec = store.tfidf_vectorizer.transform(["senior python engineer"])
+        candidates, scores = store.inverted_index.score(query_vec)
+        eligible = mask[candidates]
+        expected = np.sort(scores[eligible])[::-1][:top_k]
+        np.testing.assert_allclose(
+            results["similarity_score"].to_numpy()[: len(expected)], expected
+        )
+
+
+class TestQueryPlanner:
+    """Cost-based choice between pre- and post-filter scoring."""
+
+    QUERY = "senior python engineer"
+
+    def test_selective_filters_prefilter(self, synthetic_recommender):
+        results = synthetic_recommender.get_recommendations(
+            self.QUERY,
+            top_k=10,
+            filters={
+                "remote_allowed": True,
+                "experience_level": "Entry level",
+                "min_salary": 50000,
+            },
+        )
+        plan = results.attrs["plan"]
+
+        assert plan["strategy"] == "prefilter"
+        assert plan["actual"]["eligible_rows"] <= plan["estimated"]["eligible_rows"] * 3
+        assert plan["actual"]["score_cost"] < plan["estimated"]["postfilter_cost"]
+
+    def test_broad_filter_postfilter(self, synthetic_recommender):
+        results = synthetic_recommender.get_recommendations(
+            "nurse", top_k=10, filters={"work_type": "Full-time"}
+        )
+        assert results.attrs["plan"]["strategy"] == "postfilter"
+
+    def test_predicates_ordered_by_rank(self, synthetic_store):
+        planner = synthetic_store.get_planner()
+        query_vec = synthetic_store.vectorize_query(self.QUERY)
+        plan = planner.plan(
+            {"work_type": "Full-time", "remote_allowed": True, "location": "Austin"},
+            query_vec,
+        )
+
+        ranks = [
+            p["dictionary_cost"] / (1 - p["selectivity"]) for p in plan["predicates"]
+        ]
+        assert ranks == sorted(ranks)
+        assert plan["predicates"][-1]["filter"] == "work_type"
+
+    @pytest.mark.parametrize("filters", FILTER_CASES)
+    def test_strategies_agree(self, synthetic_store, filters):
+        planner = synthetic_store.get_planner()
+        query_vec = synthetic_store.vectorize_query(self.QUERY)
+
+        outputs = []
+        for strategy in ("prefilter", "postfilter"):
+            plan = planner.plan(filters, query_vec)
+            if plan["strategy"] != "unfiltered":
+                plan["strategy"] = strategy
+            outputs.append(planner.execute(plan, query_vec, top_k=20))
+
+        np.testing.assert_array_equal(outputs[0][0], outputs[1][0])
+        np.testing.assert_array_equal(outputs[0][1], outputs[1][1])
+
+
+class TestAdaptiveDeepening:
+    """Post-filtering ranked windows sized from learned pass rates."""
+
+    @pytest.fixture
+    def postfilter_everything(self, monkeypatch):
+        """Make dictionary scans look expensive so filters go post-filter."""
+        import src.planner
+
+        monkeypatch.setattr(src.planner, "DICTIONARY_COST", 1e9)
+
+    @pytest.mark.parametrize("filters", FILTER_CASES[:5])
+    def test_matches_bitmap_results(
+        self, synthetic_recommender, postfilter_everything, filters
+    ):
+        query = "senior python engineer"
+        deepened = synthetic_recommender.get_recommendations(query, 10, filters)
+        plan = deepened.attrs["plan"]
+
+        mask = reference_mask(synthetic_recommender, filters)
+        store = synthetic_recommender.vector_store
+        indices, _ = store.search_vector(store.vectorize_query(query), 10, mask=mask)
+        expected = [store.sample_indices[i] for i in indices]
+
+        assert deepened.index.tolist() == expected
+        assert deepened["rank"].tolist() == list(range(1, len(deepened) + 1))
+        if plan["residual"]:
+            assert plan["actual"]["candidates_examined"] >= len(deepened)
+
+    @pytest.mark.parametrize("filters", FILTER_CASES[-2:])
+    def test_bitmaps_and_post_filter_agree(
+        self, synthetic_store, monkeypatch, tmp_path, filters
+    ):
+        outputs = []
+        for dictionary_cost in (DICTIONARY_COST, 1e9):
+            monkeypatch.setattr("src.planner.DICTIONARY_COST", dictionary_cost)
+            recommender = JobRecommender(
+                auto_load=False, pass_rates_path=tmp_path / "rates.json", cache_size=0
+            )
+            recommender.vector_store = synthetic_store
+            outputs.append(
+                recommender.get_recommendations("sales engineer", 10, filters)
+            )
+
+        bitmaps, deepened = outputs
+        assert bitmaps.attrs["plan"]["residual"] == {}
+        assert deepened.attrs["plan"]["residual"] == filters
+        assert bitmaps.index.tolist() == deepened.index.tolist()
+        assert len(bitmaps) == 10
+
+    def test_pass_rates_learned_and_persisted(
+        self, synthetic_recommender, postfilter_everything
+    ):
+        rates = synthetic_recommender.pass_rates
+        before = rates.multiplier("work_type")
+        for _ in range(5):
+            synthetic_recommender.get_recommendations(
+                "data analyst", 10, {"work_type": "Full-time"}
+            )
+        synthetic_recommender.save_pass_rates()
+
+        # Full-time passes ~70%, far better than the 1/12 prior
+        assert rates.multiplier("work_type") < before / 3
+        reloaded = type(rates)(rates.path)
+        assert reloaded.counts == rates.counts
+
+    def test_plan_uses_combination_pass_rate(self, synthetic_store, monkeypatch):
+        monkeypatch.setattr("src.planner.DICTIONARY_COST", 1250.0)
+        planner = synthetic_store.get_planner()
+        query_vec = synthetic_store.vectorize_query("sales manager")
+        filters = {"location": "Austin", "skills": "Sales"}
+
+        # Prior rate: a window costs more than either 4-value dictionary scan
+        rates = FilterPassRates()
+        assert planner.plan(filters, query_vec, 10, rates)["residual"] == {}
+
+        # A rate learned for one key only defers that key
+        rates.update("location", 1000, 900)
+        plan = planner.plan(filters, query_vec, 10, rates)
+        assert plan["residual"] == {"location": "Austin"}
+
+        # The pair's rate (what _deepen records) defers both
+        rates.update("location+skills", 1000, 900)
+        plan = planner.plan(filters, query_vec, 10, rates)
+        assert plan["residual"] == filters
+        window = 10 * rates.multiplier("location+skills") * DEEPENING_SLACK
+        assert [p["cost"] for p in plan["postfilters"]] == [
+            window * ROW_FILTER_COST
+        ] * 2
+
+    def test_pass_rate_file_errors_are_not_fatal(self, tmp_path):
+        path = tmp_path / "rates.json"
+        path.write_text('{"work_type": {"seen": 3', encoding="utf-8")
+        assert FilterPassRates(path).counts == {}
+
+        # Parent "directory" is a file: saves fail without raising
+        rates = FilterPassRates(path / "rates.json")
+        for _ in range(SAVE_EVERY):
+            rates.update("work_type", 10, 7)
+        assert rates.counts["work_type"] == {
+            "seen": 10 * SAVE_EVERY,
+            "passed": 7 * SAVE_EVERY,
+        }
+
+        rates.path = tmp_path / "saved.json"
+        rates.save()
+        assert FilterPassRates(rates.path).counts == rates.counts
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "rates.json",
+            "saved.json",
+        ]
+
+    def test_no_match_falls_back_to_bitmaps(
+        self, synthetic_recommender, postfilter_everything
+    ):
+        results = synthetic_recommender.get_recommendations(
+            "nurse", 10, {"location": "Nowhere"}
+        )
+        assert results.empty
+        assert results.attrs["plan"]["actual"]["fallback"] == "bitmap"
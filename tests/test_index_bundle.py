@@ -0,0 +1,90 @@
+"""
+Unit Tests for the memory-mapped index bundle (synthetic corpus)
+
+Run with: pytest tests/test_index_bundle.py -v
+"""
+
+import numpy as np
+import pytest
+
+from src.index_bundle import (
+    ALIGNMENT,
+    load_tfidf_bundle,
+    read_bundle,
+    write_bundle,
+    write_tfidf_bundle,
+)
+from src.preprocessing import clean_text
+from src.scoring import InvertedIndex
+from src.vector_store import VectorStore
+
+QUERIES = ["senior python engineer", "nurse remote", "zzz", ""]
+
+
+@pytest.fixture(scope="module")
+def bundle_path(tfidf_corpus, tmp_path_factory):
+    vectorizer, matrix, _ = tfidf_corpus
+    path = tmp_path_factory.mktemp("models") / "tfidf_index.bundle"
+    write_tfidf_bundle(path, vectorizer, matrix, np.arange(matrix.shape[0]) * 3 + 5)
+    return path
+
+
+class TestIndexBundle:
+    """Bundled index must behave exactly like the pickled artifacts."""
+
+    def test_arrays_are_mapped_and_aligned(self, bundle_path):
+        arrays, metadata = read_bundle(bundle_path)
+
+        for name, array in arrays.items():
+            assert isinstance(array, np.memmap), name
+            assert not array.flags.writeable
+            assert array.ctypes.data % ALIGNMENT == 0
+        assert metadata["vectorizer"]["ngram_range"] == [1, 2]
+
+    def test_round_trip(self, tfidf_corpus, bundle_path):
+        vectorizer, matrix, texts = tfidf_corpus
+        loaded_vectorizer, loaded_matrix, index, job_ids = load_tfidf_bundle(
+            bundle_path
+        )
+
+        assert (loaded_matrix != matrix).nnz == 0
+        assert job_ids[:3].tolist() == [5, 8, 11]
+        for text in QUERIES + texts[:5]:
+            expected = vectorizer.transform([text])
+            assert (loaded_vectorizer.transform([text]) != expected).nnz == 0
+
+        # Matrix and postings wrap the read-only mapping (a copy is writeable)
+        for array in (
+            loaded_matrix.data,
+            loaded_matrix.indices,
+            loaded_matrix.indptr,
+            index.weights,
+            index.doc_ids,
+            index.block_max.data,
+            index.block_max.indices,
+        ):
+            assert not array.flags.writeable
+
+    def test_store_search_matches_built_index(self, tfidf_corpus, bundle_path):
+        vectorizer, matrix, _ = tfidf_corpus
+        built = InvertedIndex(matrix)
+        store = VectorStore(models_dir=bundle_path.parent)
+        store.load_bundle(bundle_path)
+
+        for query in QUERIES:
+            for strategy in ("exhaustive", "block_max"):
+                got = store.search_tfidf(query, 10, strategy=strategy)
+                vec = vectorizer.transform([clean_text(query)])
+                expected = built.search(vec, 10, strategy=strategy)
+                np.testing.assert_array_equal(got[0], expected[0])
+                np.testing.assert_array_equal(got[1], expected[1])
+
+    def test_rejects_unknown_version(self, tmp_path):
+        path = tmp_path / "bad.bundle"
+        write_bundle(path, {"x": np.arange(3)}, {})
+        raw = bytearray(path.read_bytes())
+        raw[8] = 99
+        path.write_bytes(bytes(raw))
+
+        with pytest.raises(ValueError, match="version"):
+            read_bundle(path)
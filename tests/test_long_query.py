@@ -0,0 +1,202 @@
+"""
+Unit Tests for long-query mode (synthetic corpus)
+
+Run with: pytest tests/test_long_query.py -v
+"""
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+from src.index_eval import compare_indexes
+from src.long_query import LongQueryPolicy, prune_query
+from src.recommender import JobRecommender
+from src.scoring import InvertedIndex
+from src.vector_store import VectorStore
+
+
+@pytest.fixture(scope="module")
+def long_queries(tfidf_corpus):
+    """Queries made of three job texts each (100+ terms)."""
+    vectorizer, _, texts = tfidf_corpus
+    return [
+        vectorizer.transform([" ".join(texts[i : i + 3])]) for i in range(0, 120, 3)
+    ]
+
+
+class PolicyIndex:
+    """compare_indexes adapter for a LongQueryPolicy over an index."""
+
+    def __init__(self, policy, index):
+        self.policy = policy
+        self.index = index
+        self.nbytes = index.nbytes
+
+    def search(self, query_vec, top_k, pad=True):
+        return self.policy.search(self.index, query_vec, top_k, pad)[:2]
+
+
+class TestPruneQuery:
+    """Term selection by budget and weight share."""
+
+    def test_budget_and_share(self):
+        weights = np.array([0.1, 0.6, 0.3, 0.6, 0.4], dtype=np.float32)
+        query = csr_matrix(weights.reshape(1, -1))
+
+        kept = prune_query(query, 3)
+        np.testing.assert_array_equal(kept.indices, [1, 3, 4])
+        np.testing.assert_array_equal(kept.data, weights[[1, 3, 4]])
+        # Ties are broken by term id
+        np.testing.assert_array_equal(prune_query(query, 1).indices, [1])
+
+        # 0.36 + 0.36 of 0.98 squared weight, then 0.16 more
+        np.testing.assert_array_equal(prune_query(query, None, 0.7).indices, [1, 3])
+        np.testing.assert_array_equal(prune_query(query, None, 0.8).indices, [1, 3, 4])
+        assert prune_query(query, 2, 0.99).nnz == 2
+        assert prune_query(query, None, 1.0).nnz == 5
+        assert prune_query(csr_matrix((1, 5)), 3, 0.9).nnz == 0
+
+    def test_invalid_arguments(self):
+        query = csr_matrix(np.ones((1, 4)))
+        with pytest.raises(ValueError):
+            prune_query(query, 2, 0.0)
+        with pytest.raises(ValueError):
+            LongQueryPolicy(max_terms=None, weight_share=None)
+
+
+class TestLongQuerySearch:
+    """Pruned candidate search followed by an exact re-rank."""
+
+    def test_reranked_scores_are_exact(self, tfidf_corpus, long_queries):
+        _, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix)
+        policy = LongQueryPolicy(rerank=100)
+
+        report = compare_indexes(index, PolicyIndex(policy, index), long_queries, (10,))
+        assert report["recall@10"] > 0.95
+
+        for query_vec in long_queries[:5]:
+            indices, scores, stats = policy.search(index, query_vec, 10)
+            expected = (matrix[indices] @ query_vec.T).toarray().ravel()
+            np.testing.assert_allclose(scores, expected, rtol=1e-5)
+            assert stats["kept_terms"] < stats["terms"]
+            assert stats["reranked"] == 100
+
+    def test_without_rerank_and_with_mask(self, tfidf_corpus, long_queries):
+        _, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix)
+        policy = LongQueryPolicy(rerank=0)
+        query_vec = long_queries[0]
+        mask = np.random.default_rng(3).random(matrix.shape[0]) < 0.2
+
+        indices, scores, stats = policy.search(index, query_vec, 10)
+        expected = index.search(policy.prune(query_vec), 10)
+        np.testing.assert_array_equal(indices, expected[0])
+        np.testing.assert_allclose(scores, expected[1])
+        assert "reranked" not in stats
+
+        indices, _, _ = LongQueryPolicy().search(index, query_vec, 30, mask=mask)
+        assert len(indices) == 30 and mask[indices].all()
+
+
+class TestAutoMode:
+    """Selection by query nnz in VectorStore and QueryPlanner."""
+
+    def test_store_switches_on_query_nnz(self, synthetic_store, long_queries):
+        policy = synthetic_store.long_query
+        index = synthetic_store.inverted_index
+        short = synthetic_store.vectorize_query("python developer")
+        assert not policy.applies(short) and policy.applies(long_queries[0])
+
+        for query_vec in (short, long_queries[0]):
+            expected = (
+                policy.search(index, query_vec, 10)[:2]
+                if policy.applies(query_vec)
+                else index.search(query_vec, 10)
+            )
+            served = synthetic_store.search_vector(query_vec, 10)
+            np.testing.assert_array_equal(served[0], expected[0])
+
+        # Explicit strategies are never pruned
+        served = synthetic_store.search_vector(long_queries[0], 10, "exhaustive")
+        exact = index.search(long_queries[0], 10, strategy="exhaustive")
+        np.testing.assert_array_equal(served[0], exact[0])
+
+    def test_planner_records_pruning(self, synthetic_store, long_queries):
+        planner = synthetic_store.get_planner()
+        assert planner.long_query is synthetic_store.long_query
+
+        plan = planner.plan({}, long_queries[0], top_k=10)
+        indices, _ = planner.execute(plan, long_queries[0], 10)
+        stats = plan["actual"]["long_query"]
+        assert stats["kept_terms"] < stats["terms"] == long_queries[0].nnz
+        np.testing.assert_array_equal(
+            indices, synthetic_store.search_vector(long_queries[0], 10)[0]
+        )
+
+        plan = planner.plan({}, synthetic_store.vectorize_query("nurse"), top_k=10)
+        planner.execute(plan, synthetic_store.vectorize_query("nurse"), 10)
+        assert "long_query" not in plan["actual"]
+
+    def test_padding_skips_deleted_and_old_rows(
+        self, synthetic_store, tfidf_corpus, tmp_path
+    ):
+        _, _, texts = tfidf_corpus
+        now, day = 1_713_398_000_000.0, 86_400_000
+        store = VectorStore(models_dir=tmp_path)
+        for name in ("tfidf_vectorizer", "tfidf_matrix", "sample_indices"):
+            setattr(store, name, getattr(synthetic_store, name))
+        n = len(store.sample_indices)
+        listed = now - np.random.default_rng(4).uniform(0, 60, n) * day
+        store.job_data = synthetic_store.job_data.copy()
+        store.job_data.loc[store.sample_indices, "listed_time"] = listed
+        store.clock = lambda: now
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json", cache_size=0
+        )
+        recommender.vector_store = store
+        resume = " ".join(texts[:3])
+        assert store.long_query.applies(store.vectorize_query(resume))
+
+        # Asking for every row forces padding with unscored rows
+        results = recommender.get_recommendations(
+            resume, top_k=n, filters={"posted_within_days": 2}
+        )
+        assert len(results) == int((listed >= now - 2 * day).sum())
+        assert (results["listed_time"] >= now - 2 * day).all()
+
+        deleted = list(store.sample_indices[:50])
+        store.delete_jobs(deleted)
+        for results in (
+            recommender.get_recommendations(resume, top_k=n),
+            store.search(resume, top_k=n),
+        ):
+            assert len(results) == n - 50
+            assert not set(deleted) & set(results.index)
+        store.segment_writer.close()
+
+
+class TestMatchDocument:
+    """JobRecommender.match_document with the document vector cache."""
+
+    def test_match_and_refine(self, synthetic_recommender, tfidf_corpus, monkeypatch):
+        _, _, texts = tfidf_corpus
+        store = synthetic_recommender.vector_store
+        resume = " ".join(texts[:3])
+        query_vec = store.vectorize_query(resume)
+        exact, _ = store.inverted_index.search(query_vec, 10, strategy="exhaustive")
+
+        results = synthetic_recommender.match_document(resume, top_k=10)
+
+        assert results.attrs["document_cache"] == "miss"
+        assert results.attrs["plan"]["actual"]["long_query"]["reranked"] == 400
+        assert len(set(store.row_positions(results.index)) & set(exact)) >= 9
+
+        # Refinements reuse the analyzed document
+        monkeypatch.setattr(store, "vectorize_query", None)
+        refined = synthetic_recommender.match_document(
+            resume, top_k=5, filters={"work_type": "Contract"}
+        )
+        assert refined.attrs["document_cache"] == "hit"
+        assert len(refined) == 5 and (refined["work_type"] == "Contract").all()
+        assert synthetic_recommender.cache_stats()["document"]["hits"] == 1
@@ -0,0 +1,174 @@
+"""
+Unit Tests for dense LSA search (synthetic corpus)
+
+Run with: pytest tests/test_lsa.py -v
+"""
+
+import numpy as np
+import pytest
+
+from src.index_eval import compare_indexes, recall_at_k
+from src.lsa import LsaIndex, fit_projection
+from src.recommender import JobRecommender
+from src.scoring import InvertedIndex
+from src.vector_store import VectorStore
+
+
+@pytest.fixture(scope="module")
+def projection(tfidf_corpus):
+    _, matrix, _ = tfidf_corpus
+    return fit_projection(matrix, 32)
+
+
+@pytest.fixture
+def lsa_store(tfidf_corpus, synthetic_jobs):
+    """Fresh in-memory store over the first 2000 jobs with LSA built."""
+    vectorizer, matrix, _ = tfidf_corpus
+    store = VectorStore()
+    store.tfidf_vectorizer = vectorizer
+    store.tfidf_matrix = matrix[:2000]
+    store.job_data = synthetic_jobs.iloc[:2000].copy()
+    store.sample_indices = synthetic_jobs.index[:2000].tolist()
+    store.build_index()
+    store.build_filter_index()
+    store.build_lsa(32)
+    yield store
+    if store.segment_writer is not None:
+        store.segment_writer.close()
+
+
+class TestLsaIndex:
+    """Projection, encodings and dense scoring."""
+
+    def test_scores_are_latent_cosines(self, tfidf_corpus, projection):
+        vectorizer, matrix, texts = tfidf_corpus
+        lsa = LsaIndex(projection[0], matrix)
+        query_vec = vectorizer.transform([texts[0]])
+
+        indices, scores = lsa.search(query_vec, 10)
+
+        expected = lsa.project(matrix) @ lsa.project(query_vec)[0]
+        order = np.argsort(-expected, kind="stable")[:10]
+        np.testing.assert_array_equal(indices, order)
+        np.testing.assert_allclose(scores, expected[order], rtol=1e-5)
+        assert indices[0] == 0
+        assert lsa.vectors.dtype == np.float32 and lsa.vectors.flags.c_contiguous
+
+    def test_int8_close_to_float32(self, tfidf_corpus, projection):
+        vectorizer, matrix, texts = tfidf_corpus
+        full = LsaIndex(projection[0], matrix, "float32")
+        small = LsaIndex(projection[0], matrix, "int8")
+        query_vecs = [vectorizer.transform([text]) for text in texts[:30]]
+
+        recall = np.mean(
+            [
+                recall_at_k(full.search(q, 10)[0], small.search(q, 10)[0], 10)
+                for q in query_vecs
+            ]
+        )
+
+        assert small.vectors.dtype == np.int8
+        assert small.vectors.nbytes * 4 == full.vectors.nbytes
+        assert recall > 0.9
+        with pytest.raises(ValueError):
+            LsaIndex(projection[0], matrix, "int4")
+
+    def test_batch_mask_and_empty_query(self, tfidf_corpus, projection):
+        vectorizer, matrix, texts = tfidf_corpus
+        lsa = LsaIndex(projection[0], matrix, "int8")
+        query_matrix = vectorizer.transform(texts[:7] + ["zzz"])
+        mask = np.random.default_rng(5).random(matrix.shape[0]) < 0.3
+
+        batch = lsa.search_batch(query_matrix, 10, max_block_nnz=3 * matrix.shape[0])
+
+        for row, (indices, scores) in enumerate(batch[:7]):
+            expected = lsa.search(query_matrix[row], 10)
+            np.testing.assert_array_equal(indices, expected[0])
+            np.testing.assert_allclose(scores, expected[1], rtol=1e-6)
+        assert (batch[7][1] == 0).all() and len(batch[7][0]) == 10
+        assert len(lsa.search(query_matrix[7], 10, pad=False)[0]) == 0
+        indices, _ = lsa.search(query_matrix[0], 20, mask=mask)
+        assert mask[indices].all()
+
+    def test_save_and_load(self, tfidf_corpus, projection, tmp_path):
+        vectorizer, matrix, _ = tfidf_corpus
+        lsa = LsaIndex(projection[0], matrix, "int8", projection[1])
+        lsa.save(tmp_path / "lsa.bundle")
+        loaded = LsaIndex.load(tmp_path / "lsa.bundle")
+
+        assert loaded.stats() == lsa.stats()
+        query_vec = vectorizer.transform(["senior data engineer"])
+        np.testing.assert_array_equal(
+            loaded.search(query_vec, 10)[0], lsa.search(query_vec, 10)[0]
+        )
+
+
+class TestDenseStore:
+    """VectorStore and JobRecommender with ``lsa=True``."""
+
+    def test_store_search_and_batch(self, lsa_store, tmp_path):
+        results = lsa_store.search("python developer", top_k=5, lsa=True)
+        batch = lsa_store.search_tfidf_batch(["python developer"], 5, lsa=True)
+        assert list(results.index) == list(lsa_store.results_frame(*batch[0]).index)
+
+        lsa_store.lsa_index.save(tmp_path / "lsa.bundle")
+        lsa_store.lsa_index = None
+        with pytest.raises(ValueError):
+            lsa_store.search_tfidf("python developer", 5, lsa=True)
+        lsa_store.load_lsa(tmp_path / "lsa.bundle")
+        assert len(lsa_store.search_tfidf("python developer", 5, lsa=True)[0]) == 5
+
+    def test_ingest_and_delete(self, lsa_store, synthetic_jobs):
+        new_jobs = synthetic_jobs.iloc[2000:2010].drop(columns=["clean_text"])
+        new_jobs = new_jobs.assign(title="Nurse", description="Nurse care nurse")
+        rows = lsa_store.add_jobs(new_jobs)
+
+        assert lsa_store.lsa_index.n_docs == 2010
+        indices, _ = lsa_store.search_tfidf("nurse nurse care", 20, lsa=True)
+        assert set(rows) <= set(indices)
+
+        lsa_store.delete_jobs(new_jobs.index[:5])
+        indices, _ = lsa_store.search_tfidf("nurse nurse care", 20, lsa=True)
+        assert not set(rows[:5]) & set(indices)
+
+    def test_recommender(self, lsa_store, tmp_path):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json"
+        )
+        recommender.vector_store = lsa_store
+
+        exact = recommender.get_recommendations("data analyst", 5)
+        dense = recommender.get_recommendations("data analyst", 5, lsa=True)
+
+        assert dense.attrs["approximate"] is True
+        assert dense.attrs["cache"] == "miss"
+        assert "approximate" not in exact.attrs
+        filtered = recommender.get_recommendations(
+            "data analyst", 5, {"work_type": "Contract"}, lsa=True
+        )
+        assert "approximate" not in filtered.attrs
+
+    def test_built_after_first_query(self, lsa_store, tmp_path):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json"
+        )
+        lsa_store.lsa_index = None
+        recommender.vector_store = lsa_store
+        recommender.get_recommendations("data analyst", 5)
+
+        # Building swaps the index for new queries (no stale snapshot)
+        lsa_store.build_lsa(32)
+        dense = recommender.get_recommendations("data analyst", 5, lsa=True)
+        assert dense.attrs["approximate"] is True
+
+
+def test_rows_match_tfidf_neighbourhood(tfidf_corpus, projection):
+    vectorizer, matrix, texts = tfidf_corpus
+    report = compare_indexes(
+        InvertedIndex(matrix),
+        LsaIndex(projection[0], matrix),
+        [vectorizer.transform([text]) for text in texts[:30]],
+        (10,),
+    )
+    # The document itself and close paraphrases rank on top in both spaces
+    assert report["ndcg@10"] > 0.5
@@ -0,0 +1,165 @@
+"""
+Unit Tests for the precomputed nearest-neighbor table (synthetic corpus)
+
+Run with: pytest tests/test_neighbors.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.neighbors import NeighborTable
+from src.recommender import JobRecommender
+from src.scoring import InvertedIndex, ScoringPool
+from src.vector_store import VectorStore
+
+
+@pytest.fixture(scope="module")
+def table(tfidf_corpus):
+    _, matrix, _ = tfidf_corpus
+    return NeighborTable.build(InvertedIndex(matrix), matrix, 8, block_rows=700)
+
+
+@pytest.fixture
+def neighbor_store(tfidf_corpus, synthetic_jobs):
+    """Fresh in-memory store over the first 2000 jobs with the table built."""
+    vectorizer, matrix, _ = tfidf_corpus
+    store = VectorStore()
+    store.tfidf_vectorizer = vectorizer
+    store.tfidf_matrix = matrix[:2000]
+    store.job_data = synthetic_jobs.iloc[:2000].copy()
+    store.sample_indices = synthetic_jobs.index[:2000].tolist()
+    store.build_index()
+    store.build_neighbors(10)
+    yield store
+    if store.segment_writer is not None:
+        store.segment_writer.close()
+
+
+def exact_neighbors(index, matrix, row, top_k):
+    mask = np.ones(matrix.shape[0], dtype=bool)
+    mask[row] = False
+    return index.search(matrix[row], top_k, pad=False, mask=mask)
+
+
+class TestNeighborTable:
+    """Offline build and O(k) lookups."""
+
+    def test_matches_exact_search(self, tfidf_corpus, table):
+        _, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix)
+
+        for row in [0, 1, 699, 700, 2999] + list(range(100, 3000, 97)):
+            indices, scores = table.lookup(row, 8)
+            expected = exact_neighbors(index, matrix, row, 8)
+            np.testing.assert_array_equal(indices, expected[0])
+            np.testing.assert_allclose(scores, expected[1], rtol=1e-6)
+            assert row not in indices
+
+    def test_pool_build_is_identical(self, tfidf_corpus, table):
+        _, matrix, _ = tfidf_corpus
+        pool = ScoringPool(workers=3)
+        try:
+            done = []
+            pooled = NeighborTable.build(
+                InvertedIndex(matrix),
+                matrix,
+                8,
+                block_rows=700,
+                pool=pool,
+                progress=lambda rows, total: done.append(rows),
+            )
+        finally:
+            pool.close()
+
+        np.testing.assert_array_equal(pooled.ids, table.ids)
+        np.testing.assert_array_equal(pooled.scores, table.scores)
+        assert done == [2100, 3000]
+
+    def test_lookup_limits_and_mask(self, tfidf_corpus, table):
+        _, matrix, _ = tfidf_corpus
+        assert table.lookup(matrix.shape[0], 5) is None
+        assert table.lookup(0, 9) is None
+
+        mask = np.ones(matrix.shape[0], dtype=bool)
+        mask[table.ids[0, :3]] = False
+        indices, _ = table.lookup(0, 5, mask)
+        np.testing.assert_array_equal(indices, table.ids[0, 3:8])
+        # Not enough eligible neighbors left in a full row: cannot answer
+        assert table.lookup(0, 6, mask) is None
+
+    def test_short_rows_are_complete(self):
+        ids = np.array([[1, -1, -1], [0, -1, -1]], dtype=np.int32)
+        scores = np.array([[0.5, 0, 0], [0.5, 0, 0]], dtype=np.float32)
+        table = NeighborTable(ids, scores)
+
+        indices, row_scores = table.lookup(0, 3)
+        assert list(indices) == [1] and list(row_scores) == [0.5]
+        assert len(table.lookup(0, 3, np.array([True, False]))[0]) == 0
+
+    def test_save_and_load(self, table, tmp_path):
+        table.save(tmp_path / "neighbors.bundle")
+        loaded = NeighborTable.load(tmp_path / "neighbors.bundle")
+
+        assert (loaded.n_docs, loaded.k) == (table.n_docs, table.k)
+        np.testing.assert_array_equal(loaded.ids, table.ids)
+        assert loaded.nbytes == table.nbytes
+
+
+class TestSimilarJobs:
+    """VectorStore.similar_rows and JobRecommender.search_similar_jobs."""
+
+    def test_table_and_fallback_agree(self, neighbor_store, tfidf_corpus):
+        _, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix[:2000])
+
+        for row in (0, 17, 1999):
+            served = neighbor_store.similar_rows(row, 10)
+            computed = neighbor_store.similar_rows(row, 15)
+            expected = exact_neighbors(index, matrix[:2000], row, 15)
+            np.testing.assert_array_equal(served[0], computed[0][:10])
+            np.testing.assert_array_equal(computed[0], expected[0])
+
+    def test_ingested_and_deleted_rows(self, neighbor_store, synthetic_jobs):
+        new_jobs = synthetic_jobs.iloc[2000:2003].drop(columns=["clean_text"])
+        new_jobs = new_jobs.assign(title="Nurse", description="Nurse care nurse")
+        rows = neighbor_store.add_jobs(new_jobs)
+
+        indices, scores = neighbor_store.similar_rows(int(rows[0]), 5)
+        assert set(rows[1:]) <= set(indices[:2])
+        assert np.isclose(scores[0], 1.0)
+
+        neighbor_store.delete_jobs(new_jobs.index[1:])
+        indices, _ = neighbor_store.similar_rows(int(rows[0]), 5)
+        assert not set(rows[1:]) & set(indices)
+        first = neighbor_store.neighbor_table.ids[0, :2]
+        neighbor_store.delete_jobs(
+            [neighbor_store.sample_indices[row] for row in first]
+        )
+        indices, _ = neighbor_store.similar_rows(0, 10)
+        assert len(indices) == 10 and not set(first) & set(indices)
+
+    def test_recommender(self, neighbor_store, synthetic_jobs, tmp_path):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json"
+        )
+        recommender.vector_store = neighbor_store
+        # A job outside the index (known to job_data only)
+        outside = synthetic_jobs.iloc[[2500]]
+        neighbor_store.job_data = pd.concat([neighbor_store.job_data, outside])
+        job_id = neighbor_store.sample_indices[5]
+        expected = neighbor_store.neighbor_table.ids[5, :5]
+
+        results = recommender.search_similar_jobs(job_id, top_k=5)
+
+        assert job_id not in results.index
+        assert list(results.index) == [
+            neighbor_store.sample_indices[row] for row in expected
+        ]
+        assert list(results["rank"]) == [1, 2, 3, 4, 5]
+        with pytest.raises(ValueError):
+            recommender.search_similar_jobs(-1)
+
+        # Jobs outside the index are matched by their text
+        results = recommender.search_similar_jobs(outside.index[0], top_k=5)
+        assert len(results) == 5
@@ -0,0 +1,75 @@
+"""
+Unit Tests for static index pruning (synthetic corpus)
+
+Run with: pytest tests/test_pruning.py -v
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.index_eval import replay_titles
+from src.pruning import prune_matrix, pruning_report
+
+
+class TestPruneMatrix:
+    """Pruning hits the target size and keeps the strongest postings."""
+
+    def test_term_centric(self, tfidf_corpus):
+        _, matrix, _ = tfidf_corpus
+        pruned = prune_matrix(matrix, 0.4, "term", top_k=5)
+
+        assert pruned.shape == matrix.shape
+        assert pruned.dtype == matrix.dtype
+        assert abs(pruned.nnz / matrix.nnz - 0.4) < 0.01
+        # Every surviving posting exists in the full matrix with its weight
+        assert (pruned.multiply(pruned != matrix)).nnz == 0
+        # The best posting of every term survives
+        full_max = matrix.max(axis=0).toarray().ravel()
+        np.testing.assert_array_equal(pruned.max(axis=0).toarray().ravel(), full_max)
+
+    def test_document_centric(self, tfidf_corpus):
+        _, matrix, _ = tfidf_corpus
+        pruned = prune_matrix(matrix, 0.5, "document")
+
+        full_nnz = np.diff(matrix.indptr)
+        np.testing.assert_array_equal(
+            np.diff(pruned.indptr), np.maximum(1, np.ceil(0.5 * full_nnz))
+        )
+        np.testing.assert_array_equal(
+            pruned.max(axis=1).toarray(), matrix.max(axis=1).toarray()
+        )
+
+    def test_keep_all_and_invalid(self, tfidf_corpus):
+        _, matrix, _ = tfidf_corpus
+        assert (prune_matrix(matrix, 1.0) != matrix).nnz == 0
+        with pytest.raises(ValueError):
+            prune_matrix(matrix, 0.0)
+        with pytest.raises(ValueError):
+            prune_matrix(matrix, 0.5, "random")
+
+    def test_report_quality_improves_with_size(self, tfidf_corpus):
+        vectorizer, matrix, texts = tfidf_corpus
+        query_vecs = [vectorizer.transform([text]) for text in texts[:40]]
+
+        small = pruning_report(matrix, prune_matrix(matrix, 0.3), query_vecs, (10,))
+        large = pruning_report(matrix, prune_matrix(matrix, 0.8), query_vecs, (10,))
+
+        assert small["candidate_postings"] < large["candidate_postings"]
+        assert small["candidate_bytes"] < large["candidate_bytes"]
+        assert small["recall@10"] <= large["recall@10"]
+        assert large["ndcg@10"] > 0.95
+
+
+def test_replay_titles(tmp_path):
+    log = tmp_path / "query_history.json"
+    log.write_text(json.dumps([{"query": "nurse"}, {"query": ""}, {"query": "nurse"}]))
+    titles = pd.Series(["Data Engineer", None, "Sales Manager", "Driver"])
+
+    queries = replay_titles(titles, log, n_queries=3)
+
+    assert queries[0] == "nurse"
+    assert len(queries) == 3
+    assert set(queries[1:]) <= {"Data Engineer", "Sales Manager", "Driver"}
@@ -0,0 +1,77 @@
+"""
+Unit Tests for the quantized index and index evaluation (synthetic corpus)
+
+Run with: pytest tests/test_quantized.py -v
+"""
+
+import numpy as np
+import pytest
+
+from src.index_eval import compare_indexes, ndcg_at_k, recall_at_k
+from src.quantized import QuantizedIndex
+from src.recommender import JobRecommender
+from src.scoring import InvertedIndex
+
+QUERIES = ["python developer", "senior data engineer remote", "nurse", "zzz"]
+
+
+class TestQuantizedIndex:
+    """Quantized candidates re-ranked exactly against full-precision rows."""
+
+    @pytest.mark.parametrize("codes", ["uint8", "float16"])
+    def test_full_rerank_is_exact(self, tfidf_corpus, codes):
+        vectorizer, matrix, texts = tfidf_corpus
+        exact = InvertedIndex(matrix)
+        quantized = QuantizedIndex(matrix, codes, rerank=matrix.shape[0])
+        mask = np.random.default_rng(2).random(matrix.shape[0]) < 0.3
+
+        for query in QUERIES + texts[:10]:
+            query_vec = vectorizer.transform([query])
+            for kwargs in ({}, {"mask": mask}, {"mask": mask, "strategy": "subset"}):
+                expected = exact.search(query_vec, 10, **kwargs)
+                actual = quantized.search(query_vec, 10, **kwargs)
+                np.testing.assert_array_equal(actual[0], expected[0])
+                np.testing.assert_array_equal(actual[1], expected[1])
+            expected = exact.score(query_vec, mask=mask)
+            actual = quantized.score(query_vec, mask=mask)
+            np.testing.assert_array_equal(actual[0], expected[0])
+            np.testing.assert_array_equal(actual[1], expected[1])
+
+    def test_recall_and_memory(self, tfidf_corpus):
+        vectorizer, matrix, texts = tfidf_corpus
+        exact = InvertedIndex(matrix)
+        quantized = QuantizedIndex(matrix, "uint8", rerank=50)
+        query_vecs = [vectorizer.transform([text]) for text in texts[:50]]
+
+        report = compare_indexes(exact, quantized, query_vecs, ks=(10,))
+
+        assert report["recall@10"] > 0.95
+        assert report["ndcg@10"] > 0.99
+        assert report["candidate_bytes"] < 0.7 * report["reference_bytes"]
+        assert quantized.codes.dtype == np.uint8
+
+    def test_store_and_recommender(self, synthetic_store, tmp_path):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json", cache_size=0
+        )
+        recommender.vector_store = synthetic_store
+        filters = {"work_type": "Part-time"}
+        expected = recommender.get_recommendations("sales manager", 5, filters)
+        exact = synthetic_store.inverted_index
+
+        try:
+            synthetic_store.quantize_index("uint8")
+            actual = recommender.get_recommendations("sales manager", 5, filters)
+            assert list(actual.index) == list(expected.index)
+        finally:
+            synthetic_store.inverted_index = exact
+
+
+def test_metrics():
+    expected = np.array([1, 2, 3, 4])
+    assert recall_at_k(expected, np.array([4, 2, 9, 8]), 4) == 0.5
+    assert recall_at_k(expected, np.array([2, 1]), 2) == 1.0
+    ideal = np.array([0.9, 0.5, 0.1])
+    assert ndcg_at_k(ideal, ideal, 3) == 1.0
+    assert ndcg_at_k(ideal, np.array([0.5, 0.9, 0.1]), 3) < 1.0
+    assert ndcg_at_k(np.zeros(0), np.zeros(0), 3) == 1.0
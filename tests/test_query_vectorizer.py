@@ -0,0 +1,73 @@
+"""
+Parity Tests for the sklearn-free query vectorizer
+
+Run with: pytest tests/test_query_vectorizer.py -v
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.query_vectorizer import QueryVectorizer
+
+WORDS = (
+    "the Python java SQL data engineer analyst café naïve résumé and of "
+    "remote-work C++ senior junior it's a an 2024 Ünïcode x"
+).split()
+
+CONFIGS = [
+    # Production settings (src/vectorize.py)
+    dict(
+        max_features=50,
+        ngram_range=(1, 2),
+        min_df=2,
+        max_df=0.8,
+        stop_words="english",
+        dtype=np.float32,
+    ),
+    dict(sublinear_tf=True, norm="l1"),
+    dict(binary=True, strip_accents="unicode", ngram_range=(2, 3)),
+    dict(strip_accents="ascii", use_idf=False, lowercase=False),
+    dict(norm=None, dtype=np.float32, ngram_range=(1, 3), stop_words=["data", "x"]),
+]
+
+
+@pytest.fixture(scope="module")
+def documents():
+    rng = np.random.default_rng(3)
+    docs = [" ".join(rng.choice(WORDS, size=rng.integers(0, 60))) for _ in range(400)]
+    return docs + ["", "zzz unknown", "DATA data Data!", "senior   python\nengineer"]
+
+
+@pytest.mark.parametrize("params", CONFIGS)
+def test_vectors_identical(documents, params):
+    fitted = TfidfVectorizer(**params).fit(documents[:300])
+    expected = fitted.transform(documents)
+    vectors = QueryVectorizer.from_fitted(fitted).transform(documents)
+
+    assert vectors.dtype == expected.dtype
+    assert vectors.shape == expected.shape
+    np.testing.assert_array_equal(vectors.indptr, expected.indptr)
+    np.testing.assert_array_equal(vectors.indices, expected.indices)
+    np.testing.assert_array_equal(vectors.data, expected.data)
+
+
+def test_params_round_trip(documents):
+    fitted = TfidfVectorizer(**CONFIGS[0]).fit(documents)
+    query = QueryVectorizer.from_fitted(fitted)
+    rebuilt = QueryVectorizer(
+        query.get_feature_names_out(), query.idf_, **query.get_params()
+    )
+
+    assert (rebuilt.transform(documents) != fitted.transform(documents)).nnz == 0
+
+
+def test_query_path_does_not_import_sklearn():
+    code = (
+        "import sys, src.recommender, src.bulk_match; "
+        "assert not [m for m in sys.modules if m.startswith('sklearn')]"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
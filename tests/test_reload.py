@@ -0,0 +1,171 @@
+"""
+Unit Tests for versioned artifacts and hot reload (synthetic corpus)
+
+Run with: pytest tests/test_reload.py -v
+"""
+
+import threading
+
+import pytest
+
+from src.artifacts import ReadWriteLock, publish_version, version_dir
+from src.index_bundle import write_tfidf_bundle
+from src.recommender import JobRecommender
+from src.shards import ShardedIndex
+from src.vector_store import VectorStore
+
+
+def write_version(models_root, name, vectorizer, matrix, jobs):
+    directory = version_dir(models_root, name)
+    directory.mkdir(parents=True)
+    write_tfidf_bundle(directory / "tfidf_index.bundle", vectorizer, matrix, jobs.index)
+    jobs.to_parquet(directory / "clean_jobs.parquet")
+
+
+@pytest.fixture
+def models_root(tfidf_corpus, synthetic_jobs, tmp_path):
+    """Two published-ready versions: all jobs (v1) and the first 1000 (v2)."""
+    vectorizer, matrix, _ = tfidf_corpus
+    root = tmp_path / "models"
+    write_version(root, "v1", vectorizer, matrix, synthetic_jobs)
+    write_version(root, "v2", vectorizer, matrix[:1000], synthetic_jobs.iloc[:1000])
+    publish_version(root, "v1")
+    return root
+
+
+class TestHotReload:
+    """Reloads swap versions without disturbing pinned queries."""
+
+    def test_current_pointer_selects_version(self, models_root):
+        store = VectorStore(models_dir=models_root)
+        store.load_all()
+
+        assert store.artifact_version == "v1"
+        assert store.tfidf_matrix.shape[0] == 3000
+        assert store.data_dir == version_dir(models_root, "v1")
+
+    def test_pinned_snapshot_survives_swap(self, models_root):
+        store = VectorStore(models_dir=models_root)
+        store.load_all()
+
+        with store.acquire() as pinned:
+            publish_version(models_root, "v2")
+            assert store.reload().result(timeout=30) == "v2"
+
+            # The in-flight query still sees v1 and can keep scoring
+            assert pinned.tfidf_matrix.shape[0] == 3000
+            indices, _ = pinned.search_tfidf("senior python engineer", 5)
+            assert len(indices) == 5
+            assert store.tfidf_matrix.shape[0] == 1000
+            assert store.retired_snapshots == [pinned]
+
+        # Released once the last query using it finished
+        assert store.retired_snapshots == []
+        assert pinned.tfidf_matrix is None
+        with store.acquire() as current:
+            assert current.artifact_version == "v2"
+            assert current.index_version == store.index_version
+
+    def test_failed_reload_keeps_serving(self, models_root):
+        store = VectorStore(models_dir=models_root)
+        store.load_all()
+        version = store.index_version
+
+        error = store.reload("missing").exception(timeout=30)
+
+        assert error is not None
+        assert store.artifact_version == "v1"
+        assert store.index_version == version
+
+    def test_queries_during_reload(self, models_root):
+        recommender = JobRecommender(
+            models_dir=models_root,
+            pass_rates_path=models_root / "rates.json",
+            cache_size=0,
+        )
+        errors = []
+        stop = threading.Event()
+
+        def query():
+            while not stop.is_set():
+                try:
+                    results = recommender.get_recommendations(
+                        "data engineer", top_k=5, filters={"work_type": "Contract"}
+                    )
+                    assert len(results) == 5
+                except Exception as exc:  # pragma: no cover - reported below
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        recommender.vector_store.reload("v2").result(timeout=30)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        results = recommender.get_recommendations("data engineer", top_k=5)
+        assert results.index.max() < 5 + 3 * 1000
+
+    def test_sharded_store_is_resharded(self, models_root):
+        store = VectorStore(models_dir=models_root)
+        store.load_all()
+        old = store.enable_shards(2)
+
+        try:
+            with store.acquire() as pinned:
+                publish_version(models_root, "v2")
+                store.reload().result(timeout=60)
+
+                new = store.inverted_index
+                assert isinstance(new, ShardedIndex) and new is not old
+                assert (new.n_docs, len(new.workers)) == (1000, 2)
+                # Still serving the pinned query
+                assert len(pinned.search_tfidf("senior python engineer", 5)[0]) == 5
+                assert all(worker.process.is_alive() for worker in old.workers)
+
+            store._reloader.submit(lambda: None).result(timeout=30)
+            assert not any(worker.process.is_alive() for worker in old.workers)
+            assert len(store.search_tfidf("senior python engineer", 5)[0]) == 5
+        finally:
+            store.close_shards()
+
+    def test_segmented_store_keeps_writer_settings(self, models_root, synthetic_jobs):
+        store = VectorStore(models_dir=models_root)
+        store.load_all()
+        old = store.enable_segments(flush_rows=50, merge_factor=4)
+        old.close = lambda close=old.close: closed.append(old) or close()
+        closed = []
+
+        publish_version(models_root, "v2")
+        store.reload().result(timeout=30)
+        store._reloader.submit(lambda: None).result(timeout=30)
+
+        writer = store.segment_writer
+        assert closed == [old] and writer is not old
+        assert (writer.flush_rows, writer.merge_factor) == (50, 4)
+        # Merges of the new writer publish to this store
+        new_jobs = synthetic_jobs.iloc[2000:2200].drop(columns=["clean_text"])
+        for start in range(0, 200, 50):
+            store.add_jobs(new_jobs.iloc[start : start + 50])
+        writer.wait_for_merges()
+        assert writer.merges > 0
+        assert store.inverted_index.n_docs == 1200
+        assert len(store.inverted_index.segments) == len(writer.segments)
+        writer.close()
+
+
+def test_read_write_lock_excludes_writer():
+    lock = ReadWriteLock()
+    events = []
+
+    with lock.read():
+        writer = threading.Thread(target=lambda: lock.write().__enter__())
+        writer.start()
+        writer.join(timeout=0.2)
+        events.append(writer.is_alive())
+
+    writer.join(timeout=5)
+    assert events == [True]
+    assert not writer.is_alive()
@@ -0,0 +1,177 @@
+"""
+Unit Tests for the TF-IDF scoring engine (synthetic corpus)
+
+Run with: pytest tests/test_scoring.py -v
+"""
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.scoring import InvertedIndex, ScoringPool, select_top_k
+from src.vector_store import VectorStore
+
+QUERIES = ["python developer", "senior data engineer remote", "nurse", "zzz"]
+
+
+def brute_force(vectorizer, matrix, query, top_k):
+    """Reference ranking: full cosine similarity, ties by ascending id."""
+    scores = cosine_similarity(vectorizer.transform([query]), matrix).ravel()
+    order = np.lexsort((np.arange(len(scores)), -scores))[:top_k]
+    return order, scores[order]
+
+
+class TestInvertedIndex:
+    """Test term-at-a-time scoring against brute force."""
+
+    def test_matches_cosine_similarity(self, tfidf_corpus):
+        vectorizer, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix)
+
+        for query in QUERIES[:3]:
+            indices, scores = index.search(vectorizer.transform([query]), top_k=20)
+            expected_idx, expected_scores = brute_force(vectorizer, matrix, query, 20)
+
+            np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+            assert set(indices[scores > 0]) <= set(
+                np.flatnonzero(
+                    cosine_similarity(vectorizer.transform([query]), matrix).ravel()
+                )
+            )
+
+    def test_postings_layout(self, tfidf_corpus):
+        _, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix)
+
+        assert index.nnz == matrix.nnz
+        docs, weights = index.postings(0)
+        assert np.all(np.diff(docs) > 0)
+        np.testing.assert_allclose(weights, matrix[docs, 0].toarray().ravel())
+
+    def test_padding_keeps_top_k_contract(self, tfidf_corpus):
+        vectorizer, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix)
+
+        indices, scores = index.search(vectorizer.transform(["zzz"]), top_k=5)
+        assert len(indices) == 5
+        assert np.all(scores == 0)
+
+        indices, _ = index.search(vectorizer.transform(["nurse"]), top_k=10**6)
+        assert len(indices) == matrix.shape[0]
+        assert len(np.unique(indices)) == matrix.shape[0]
+
+
+def test_select_top_k_breaks_ties_by_id():
+    ids = np.array([9, 3, 5, 1, 7])
+    scores = np.array([0.5, 0.9, 0.5, 0.5, 0.1])
+
+    top_ids, top_scores = select_top_k(ids, scores, 3)
+
+    assert top_ids.tolist() == [3, 1, 5]
+    assert top_scores.tolist() == [0.9, 0.5, 0.5]
+
+
+class TestPrunedSearch:
+    """Block-max / WAND pruning must be identical to exhaustive scoring."""
+
+    def test_identical_to_exhaustive(self, tfidf_corpus):
+        vectorizer, matrix, texts = tfidf_corpus
+        index = InvertedIndex(matrix, block_size=64)
+        queries = QUERIES + texts[:20] + ["data", "remote remote nurse"]
+
+        for query in queries:
+            query_vec = vectorizer.transform([query])
+            for top_k in (1, 5, 20, 100):
+                expected = index.search(query_vec, top_k, strategy="exhaustive")
+                for strategy in ("wand", "block_max"):
+                    indices, scores = index.search(query_vec, top_k, strategy=strategy)
+                    np.testing.assert_array_equal(indices, expected[0])
+                    np.testing.assert_array_equal(scores, expected[1])
+
+    def test_skips_blocks(self, tfidf_corpus):
+        vectorizer, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix, block_size=64)
+
+        _, _, stats = index.pruned_search(
+            vectorizer.transform(["senior python engineer"]), top_k=5
+        )
+        assert stats["blocks_scored"] < stats["blocks_total"]
+
+
+class TestBatchSearch:
+    """Batched matrix-product scoring must equal per-query search."""
+
+    def test_identical_to_single_queries(self, tfidf_corpus):
+        vectorizer, matrix, texts = tfidf_corpus
+        index = InvertedIndex(matrix)
+        queries = QUERIES + texts[:30]
+
+        # A tiny block budget forces many blocks, including single queries
+        for max_block_nnz in (1, 5000, 1 << 24):
+            batch = index.search_batch(
+                vectorizer.transform(queries), top_k=15, max_block_nnz=max_block_nnz
+            )
+            assert len(batch) == len(queries)
+            for query, (indices, scores) in zip(queries, batch):
+                expected = index.search(
+                    vectorizer.transform([query]), 15, strategy="exhaustive"
+                )
+                np.testing.assert_array_equal(indices, expected[0])
+                np.testing.assert_array_equal(scores, expected[1])
+
+    def test_store_batch_matches_search(self, synthetic_store):
+        queries = ["Senior Python Engineer", "nurse", "", "zzz"]
+        batch = synthetic_store.search_tfidf_batch(queries, top_k=5)
+        for query, (indices, scores) in zip(queries, batch):
+            expected = synthetic_store.search_tfidf(query, top_k=5)
+            np.testing.assert_array_equal(indices, expected[0])
+            np.testing.assert_array_equal(scores, expected[1])
+
+
+class TestParallelSearch:
+    """Row ranges searched on a thread pool must equal one serial search."""
+
+    def test_identical_to_serial(self, tfidf_corpus):
+        vectorizer, matrix, texts = tfidf_corpus
+        index = InvertedIndex(matrix, block_size=64)
+        pool = ScoringPool(workers=3, min_postings=0)
+        mask = np.random.default_rng(1).random(matrix.shape[0]) < 0.2
+
+        try:
+            for query in QUERIES + texts[:10]:
+                query_vec = vectorizer.transform([query])
+                for strategy in ("exhaustive", "wand", "block_max", "subset"):
+                    expected = index.search(query_vec, 10, strategy=strategy, mask=mask)
+                    actual = index.search(
+                        query_vec, 10, strategy=strategy, mask=mask, pool=pool
+                    )
+                    np.testing.assert_array_equal(actual[0], expected[0])
+                    np.testing.assert_array_equal(actual[1], expected[1])
+        finally:
+            pool.close()
+
+    def test_ranges_and_crossover(self, tfidf_corpus):
+        vectorizer, matrix, _ = tfidf_corpus
+        index = InvertedIndex(matrix, block_size=64)
+        query_vec = vectorizer.transform(["senior data engineer remote"])
+
+        ranges = ScoringPool(workers=4, min_postings=0).ranges(index, query_vec)
+        assert len(ranges) == 4
+        assert ranges[0][0] == 0 and ranges[-1][1] == index.n_docs
+        assert all(start % 64 == 0 for start, _ in ranges)
+        assert all(a[1] == b[0] for a, b in zip(ranges[:-1], ranges[1:]))
+
+        assert ScoringPool(workers=4).ranges(index, query_vec) is None
+        assert ScoringPool(workers=1, min_postings=0).ranges(index, query_vec) is None
+
+    def test_store_workers(self, tfidf_corpus, synthetic_store):
+        store = VectorStore(search_workers=2, parallel_min_postings=0)
+        for name in ("tfidf_vectorizer", "tfidf_matrix", "job_data", "sample_indices"):
+            setattr(store, name, getattr(synthetic_store, name))
+        store.build_index()
+
+        for query in QUERIES:
+            expected = synthetic_store.search_tfidf(query, top_k=10)
+            actual = store.search_tfidf(query, top_k=10)
+            np.testing.assert_array_equal(actual[0], expected[0])
+            np.testing.assert_array_equal(actual[1], expected[1])
+        store.scoring_pool.close()
@@ -0,0 +1,324 @@
+"""
+Unit Tests for the segmented index and live ingest (synthetic corpus)
+
+Run with: pytest tests/test_segments.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filters import FilterIndex
+from src.recommender import JobRecommender
+from src.scoring import InvertedIndex, ScoringPool
+from src.segments import SegmentWriter
+from src.vector_store import VectorStore
+
+
+def assert_same(expected, actual):
+    np.testing.assert_array_equal(expected[0], actual[0])
+    np.testing.assert_array_equal(expected[1], actual[1])
+
+
+@pytest.fixture
+def segmented(tfidf_corpus):
+    """Writer over the first 1000 rows; the rest ingested in 100-row batches."""
+    vectorizer, matrix, _ = tfidf_corpus
+    writer = SegmentWriter(InvertedIndex(matrix[:1000]), flush_rows=200, merge_factor=3)
+    for start in range(1000, matrix.shape[0], 100):
+        writer.add(matrix[start : start + 100])
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def live_store(tfidf_corpus, synthetic_jobs):
+    """Fresh in-memory store over the first 2000 jobs (ingest mutates it)."""
+    vectorizer, matrix, _ = tfidf_corpus
+    store = VectorStore()
+    store.tfidf_vectorizer = vectorizer
+    store.tfidf_matrix = matrix[:2000]
+    store.job_data = synthetic_jobs.iloc[:2000].copy()
+    store.sample_indices = synthetic_jobs.index[:2000].tolist()
+    store.build_index()
+    store.build_filter_index()
+    yield store
+    if store.segment_writer is not None:
+        store.segment_writer.close()
+
+
+class TestSegmentedIndex:
+    """Fan-out search equals a single index over the same rows."""
+
+    @pytest.mark.parametrize("strategy", ["exhaustive", "wand", "block_max"])
+    def test_search_matches_single_index(self, tfidf_corpus, segmented, strategy):
+        vectorizer, matrix, _ = tfidf_corpus
+        segmented.wait_for_merges()
+        reader = segmented.reader()
+        query = vectorizer.transform(["senior python data engineer remote"])
+
+        assert len(reader.segments) > 1
+        assert_same(
+            InvertedIndex(matrix).search(query, 10, strategy=strategy),
+            reader.search(query, 10, strategy=strategy),
+        )
+
+    def test_masks_and_batches(self, tfidf_corpus, segmented):
+        vectorizer, matrix, texts = tfidf_corpus
+        full = InvertedIndex(matrix)
+        reader = segmented.reader()
+        query = vectorizer.transform(["nurse health care"])
+        mask = np.random.default_rng(0).random(matrix.shape[0]) < 0.1
+
+        assert_same(
+            full.search(query, 10, strategy="subset", mask=mask),
+            reader.search(query, 10, strategy="subset", mask=mask),
+        )
+        assert_same(full.score(query, mask=mask), reader.score(query, mask=mask))
+        queries = vectorizer.transform(texts[:20])
+        for expected, actual in zip(
+            full.search_batch(queries, 5), reader.search_batch(queries, 5)
+        ):
+            assert_same(expected, actual)
+
+    def test_tombstones_hide_rows(self, tfidf_corpus, segmented):
+        vectorizer, matrix, _ = tfidf_corpus
+        full = InvertedIndex(matrix)
+        query = vectorizer.transform(["warehouse driver logistics"])
+        top, _ = full.search(query, 5)
+
+        assert segmented.delete(top[:2]) == 2
+        assert segmented.delete(top[:2]) == 0
+        reader = segmented.reader()
+        live = np.ones(matrix.shape[0], dtype=bool)
+        live[top[:2]] = False
+
+        expected = full.search(query, 5, mask=live)
+        assert_same(expected, reader.search(query, 5))
+        assert_same(expected, reader.search_batch(query, 5)[0])
+        # Views are point-in-time: deletes only show up in new readers
+        assert segmented.reader().n_deleted == 2
+
+    def test_merges_compact_and_drop_deleted(self, tfidf_corpus, segmented):
+        _, matrix, _ = tfidf_corpus
+        segmented.wait_for_merges()
+        stats = segmented.stats()
+        assert stats["merges"] > 0
+        assert stats["segments"] < 1 + (matrix.shape[0] - 1000) // 200
+        assert sum(stats["segment_rows"]) == matrix.shape[0]
+
+        # A mostly deleted segment is rewritten without its deleted rows
+        smallest = min(segmented.segments, key=lambda segment: segment.n_docs)
+        segmented.delete(smallest.doc_ids[: smallest.n_docs // 2 + 1])
+        segmented.wait_for_merges()
+        assert sum(segmented.stats()["segment_rows"]) == (
+            matrix.shape[0] - (smallest.n_docs // 2 + 1)
+        )
+
+
+class TestLiveIngest:
+    """VectorStore.add_jobs / delete_jobs and the recommender on top."""
+
+    def test_added_jobs_are_searchable(self, live_store, synthetic_jobs):
+        new_jobs = synthetic_jobs.iloc[2000:2100].drop(columns=["clean_text"])
+        new_jobs = new_jobs.assign(
+            title="Nurse",
+            description="<p>Nurse <b>care</b></p>",
+        )
+        version = live_store.index_version
+
+        rows = live_store.add_jobs(new_jobs)
+
+        np.testing.assert_array_equal(rows, np.arange(2000, 2100))
+        assert live_store.index_version != version
+        assert live_store.job_rows([new_jobs.index[0]])["clean_text"].iloc[0] == (
+            "nurse nurse care"
+        )
+        results = live_store.search("nurse nurse care", top_k=5)
+        assert set(results.index) <= set(new_jobs.index)
+        assert (results["similarity_score"] > 0).all()
+
+    def test_same_results_as_full_rebuild(
+        self, live_store, tfidf_corpus, synthetic_jobs
+    ):
+        vectorizer, matrix, _ = tfidf_corpus
+        live_store.add_jobs(synthetic_jobs.iloc[2000:])
+        query = vectorizer.transform(["java backend developer cloud"])
+
+        assert_same(
+            InvertedIndex(matrix).search(query, 10),
+            live_store.search_vector(query, 10),
+        )
+
+    def test_delete_and_update(self, live_store, synthetic_jobs):
+        results = live_store.search("python engineer", top_k=3)
+        job_id = results.index[0]
+
+        assert live_store.delete_jobs([job_id]) == 1
+        assert job_id not in live_store.search("python engineer", top_k=3).index
+
+        # Re-adding the job indexes its new text under a new row
+        updated = synthetic_jobs.loc[[job_id]].assign(clean_text="<b>Nurse</b>")
+        live_store.add_jobs(updated)
+        assert live_store.row_positions([job_id])[0] == 2000
+        assert live_store.search("nurse", top_k=1).index[0] == job_id
+        assert job_id not in live_store.search("python engineer", top_k=3).index
+
+    def test_ingest_keeps_new_rows_aside(self, live_store, synthetic_jobs):
+        job_data = live_store.job_data
+        live_store.enable_segments(flush_rows=150)
+        live_store.add_jobs(synthetic_jobs.iloc[2000:2050])
+        live_store.add_jobs(synthetic_jobs.iloc[2050:2100])
+
+        assert live_store.job_data is job_data
+        assert len(live_store.ingested_jobs) == 100
+        updated = synthetic_jobs.iloc[[2010]].assign(clean_text="<b>Nurse</b>")
+        live_store.add_jobs(updated)
+        assert len(live_store.ingested_jobs) == 100
+        assert live_store.search("nurse", top_k=1).index[0] == updated.index[0]
+
+        # A write segment's worth of rows is folded into job_data at once
+        live_store.add_jobs(synthetic_jobs.iloc[2100:2150])
+        assert live_store.ingested_jobs is None
+        assert len(live_store.job_data) == 2150
+        live_store.add_jobs(synthetic_jobs.iloc[2150:2200])
+        assert len(live_store.ingested_jobs) == 50
+
+        rebuilt = FilterIndex(live_store.job_rows(live_store.sample_indices))
+        assert live_store.filter_index.n_docs == rebuilt.n_docs == 2201
+        for filters in (
+            {"work_type": "Contract", "location": "Austin"},
+            {"skills": "Sales", "min_salary": 60000},
+        ):
+            np.testing.assert_array_equal(
+                live_store.filter_index.evaluate(filters)[0],
+                rebuilt.evaluate(filters)[0],
+            )
+
+    def test_recommender_filters_see_new_jobs(
+        self, live_store, synthetic_jobs, tmp_path
+    ):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json"
+        )
+        recommender.vector_store = live_store
+        filters = {"work_type": "Contract", "location": "Austin"}
+        before = recommender.get_recommendations("sales manager", 5, filters)
+
+        new_jobs = pd.DataFrame(
+            {
+                "title": ["Sales Manager"],
+                "description": ["sales manager sales manager retail"],
+                "formatted_work_type": ["Contract"],
+                "location": ["Austin, TX"],
+            },
+            index=[10**7],
+        )
+        live_store.add_jobs(new_jobs)
+        after = recommender.get_recommendations("sales manager", 5, filters)
+
+        assert after.attrs["cache"] == "miss"
+        assert after.index[0] == 10**7
+        assert list(after.index[1:]) == list(before.index[:4])
+
+        live_store.delete_jobs([10**7])
+        assert (
+            10**7
+            not in recommender.get_recommendations("sales manager", 5, filters).index
+        )
+
+
+NOW = 1_713_398_000_000.0  # epoch ms, mid-April 2024 like the raw postings
+DAY = 86_400_000
+
+
+@pytest.fixture
+def timed_store(live_store):
+    """live_store whose jobs were listed over the last year, open 30-90 days."""
+    rng = np.random.default_rng(5)
+    n = len(live_store.job_data)
+    listed = NOW - rng.uniform(0, 365, size=n) * DAY
+    live_store.job_data["listed_time"] = listed
+    live_store.job_data["expiry"] = listed + rng.uniform(30, 90, size=n) * DAY
+    live_store.clock = lambda: NOW
+    return live_store
+
+
+class TestListingPartitions:
+    """Listing-time partitions, recency views and expiry."""
+
+    def test_partitions_keep_results(self, timed_store, tfidf_corpus):
+        vectorizer, matrix, _ = tfidf_corpus
+        query = vectorizer.transform(["senior data analyst finance"])
+        expected = InvertedIndex(matrix[:2000]).search(query, 10)
+
+        writer = timed_store.enable_segments(partition_days=30)
+
+        assert len(writer.segments) >= 12
+        for segment in writer.segments:
+            assert segment.listed_max - segment.listed_min < 30 * DAY
+        assert_same(expected, timed_store.search_vector(query, 10))
+
+    @pytest.mark.parametrize("partitioned", [False, True])
+    def test_recent_view_skips_old_partitions(
+        self, timed_store, tfidf_corpus, partitioned
+    ):
+        vectorizer, matrix, _ = tfidf_corpus
+        if partitioned:
+            timed_store.enable_segments(partition_days=7)
+        query = vectorizer.transform(["python developer cloud"])
+        listed = timed_store.job_data["listed_time"].to_numpy()
+
+        view = timed_store.recent(14)
+
+        expected = InvertedIndex(matrix[:2000]).search(
+            query, 10, mask=listed >= NOW - 14 * DAY
+        )
+        assert_same(expected, view.search_vector(query, 10))
+        if partitioned:
+            assert len(view.inverted_index.segments) <= 3
+        assert timed_store.inverted_index is not view.inverted_index
+
+    def test_expired_jobs_hidden_then_evicted(self, timed_store):
+        expiry = timed_store.job_data["expiry"].to_numpy()
+        open_now = expiry > NOW
+        writer = timed_store.enable_segments(partition_days=30, expire=True)
+
+        results = timed_store.search("sales manager retail", top_k=50)
+        assert (results["expiry"] > NOW).all()
+        assert len(results) == 50
+
+        # A month later: evict what expired meanwhile; merges drop the rows
+        later = NOW + 30 * DAY
+        assert timed_store.evict_expired(now=later) == int((expiry <= later).sum())
+        writer.wait_for_merges()
+        assert sum(writer.stats()["segment_rows"]) < int(open_now.sum())
+        results = timed_store.search("sales manager retail", top_k=50)
+        assert (results["expiry"] > later).all()
+
+    def test_recommender_posted_within_days(self, timed_store, tmp_path):
+        recommender = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "rates.json"
+        )
+        recommender.vector_store = timed_store
+        timed_store.enable_segments(partition_days=7)
+        filters = {"posted_within_days": 30, "work_type": "Full-time"}
+
+        results = recommender.get_recommendations("nurse health care", 5, filters)
+
+        assert len(results) == 5
+        assert (results["listed_time"] >= NOW - 30 * DAY).all()
+        assert (results["formatted_work_type"] == "Full-time").all()
+        assert "posted_within_days" not in results.attrs["plan"]["residual"]
+
+
+def test_segments_share_scoring_pool(tfidf_corpus, segmented):
+    vectorizer, matrix, _ = tfidf_corpus
+    pool = ScoringPool(workers=2, min_postings=0)
+    query = vectorizer.transform(["senior python data engineer remote"])
+
+    assert_same(
+        InvertedIndex(matrix).search(query, 10),
+        segmented.reader().search(query, 10, pool=pool),
+    )
+    pool.close()
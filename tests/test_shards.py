@@ -0,0 +1,311 @@
+"""
+Unit Tests for the multi-process sharded index (synthetic corpus)
+
+Run with: pytest tests/test_shards.py -v
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.recommender import JobRecommender, ShardCoordinator
+from src.scoring import InvertedIndex
+from src.shard_server import (
+    MAX_PAYLOAD_BYTES,
+    ShardServer,
+    recv_message,
+    send_message,
+)
+from src.shards import ShardedIndex, write_shards
+from src.vector_store import VectorStore
+
+
+def assert_same(expected, actual):
+    np.testing.assert_array_equal(expected[0], actual[0])
+    np.testing.assert_array_equal(expected[1], actual[1])
+
+
+@pytest.fixture(scope="module")
+def sharded(tfidf_corpus, tmp_path_factory):
+    """Three shards of uneven content, one worker process each."""
+    _, matrix, _ = tfidf_corpus
+    paths = write_shards(tmp_path_factory.mktemp("shards"), matrix, 3)
+    index = ShardedIndex(paths)
+    yield index
+    index.close()
+
+
+class TestShardedIndex:
+    """Scatter-gather search equals a single index over the same rows."""
+
+    @pytest.mark.parametrize("strategy", ["exhaustive", "wand", "block_max"])
+    def test_search_matches_single_index(self, tfidf_corpus, sharded, strategy):
+        vectorizer, matrix, texts = tfidf_corpus
+        full = InvertedIndex(matrix)
+
+        assert sharded.stats()["shard_rows"] == [1000, 1000, 1000]
+        for query in ["senior python data engineer remote", "nurse", "zzz", texts[0]]:
+            query_vec = vectorizer.transform([query])
+            assert_same(
+                full.search(query_vec, 10, strategy=strategy),
+                sharded.search(query_vec, 10, strategy=strategy),
+            )
+
+    def test_masks_scores_and_batches(self, tfidf_corpus, sharded):
+        vectorizer, matrix, texts = tfidf_corpus
+        full = InvertedIndex(matrix)
+        query = vectorizer.transform(["sales manager retail"])
+        mask = np.random.default_rng(3).random(matrix.shape[0]) < 0.05
+        mask[:1000] = False
+
+        assert_same(
+            full.search(query, 10, strategy="subset", mask=mask),
+            sharded.search(query, 10, strategy="subset", mask=mask),
+        )
+        assert_same(full.score(query, mask=mask), sharded.score(query, mask=mask))
+        rows = np.flatnonzero(mask)
+        assert_same(full.score_subset(query, rows), sharded.score_subset(query, rows))
+        assert full.postings_length([1, 2, 3]) == sharded.postings_length([1, 2, 3])
+        assert full.rows_nnz(rows) == sharded.rows_nnz(rows)
+
+        queries = vectorizer.transform(texts[:20])
+        for expected, actual in zip(
+            full.search_batch(queries, 5), sharded.search_batch(queries, 5)
+        ):
+            assert_same(expected, actual)
+
+    def test_filter_match_counts(self, tfidf_corpus, sharded):
+        vectorizer, matrix, _ = tfidf_corpus
+        full = InvertedIndex(matrix)
+        query = vectorizer.transform(["warehouse driver"])
+        mask = np.random.default_rng(4).random(matrix.shape[0]) < 0.3
+
+        indices, scores, counts = sharded.search_counted(query, 5, mask=mask)
+
+        assert_same(full.search(query, 5, pad=False, mask=mask), (indices, scores))
+        assert counts["eligible"] == int(mask.sum())
+        assert counts["matched"] == len(full.score(query, mask=mask)[0])
+
+    def test_crashed_worker_is_restarted(self, tfidf_corpus, sharded):
+        vectorizer, matrix, _ = tfidf_corpus
+        query = vectorizer.transform(["java backend developer cloud"])
+        expected = InvertedIndex(matrix).search(query, 10)
+        old_pid = sharded.workers[1].process.pid
+
+        sharded.workers[1].process.kill()
+        sharded.workers[1].process.join()
+
+        assert_same(expected, sharded.search(query, 10))
+        assert sharded.stats()["restarts"] == 1
+        assert sharded.workers[1].process.pid != old_pid
+
+
+def test_store_and_recommender_on_shards(synthetic_store, tmp_path):
+    store = VectorStore(models_dir=tmp_path)
+    for name in ("tfidf_vectorizer", "tfidf_matrix", "job_data", "sample_indices"):
+        setattr(store, name, getattr(synthetic_store, name))
+    recommender = JobRecommender(
+        auto_load=False, pass_rates_path=tmp_path / "rates.json", cache_size=0
+    )
+    recommender.vector_store = store
+    filters = {"work_type": "Contract", "location": "Austin"}
+    expected = recommender.get_recommendations("sales manager", 5, filters)
+
+    index = store.enable_shards(2)
+    try:
+        assert len(list((tmp_path / "shards").glob("*.bundle"))) == 2
+        actual = recommender.get_recommendations("sales manager", 5, filters)
+        assert list(actual.index) == list(expected.index)
+        assert_same(
+            synthetic_store.search_tfidf("python engineer", 10),
+            store.search_tfidf("python engineer", 10),
+        )
+    finally:
+        store.close_shards()
+    assert not any(worker.process.is_alive() for worker in index.workers)
+    assert isinstance(store.inverted_index, InvertedIndex)
+
+
+@pytest.fixture(scope="module")
+def shard_servers(synthetic_store, tmp_path_factory):
+    """Three shard servers over synthetic_store's rows, served from threads."""
+    matrix = synthetic_store.tfidf_matrix
+    paths = write_shards(tmp_path_factory.mktemp("tcp_shards"), matrix, 3)
+    servers = [ShardServer(path) for path in paths]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestShardServers:
+    """Scatter-gather over TCP shard servers, with per-shard deadlines."""
+
+    def test_search_matches_single_index(self, synthetic_store, shard_servers):
+        vectorizer, matrix = (
+            synthetic_store.tfidf_vectorizer,
+            synthetic_store.tfidf_matrix,
+        )
+        full = InvertedIndex(matrix)
+        # Any order: shards are sorted by their row ranges
+        coordinator = ShardCoordinator([s.address for s in reversed(shard_servers)])
+        query = vectorizer.transform(["senior data analyst finance"])
+        mask = np.random.default_rng(5).random(matrix.shape[0]) < 0.2
+
+        indices, scores, status = coordinator.search(query, 10, mask=mask)
+
+        assert_same(full.search(query, 10, mask=mask), (indices, scores))
+        assert status["degraded"] is False
+        assert status["eligible"] == int(mask.sum())
+        assert status["matched"] == len(full.score(query, mask=mask)[0])
+        candidates, candidate_scores, _, _ = coordinator.score(query, mask)
+        assert_same(full.score(query, mask=mask), (candidates, candidate_scores))
+        coordinator.close()
+
+    def test_recommender_fans_out(self, synthetic_store, shard_servers, tmp_path):
+        local = JobRecommender(auto_load=False, pass_rates_path=tmp_path / "a.json")
+        local.vector_store = synthetic_store
+        remote = JobRecommender(
+            auto_load=False,
+            pass_rates_path=tmp_path / "b.json",
+            shard_addresses=[server.address for server in shard_servers],
+        )
+        remote.vector_store = synthetic_store
+
+        for filters in [None, {"work_type": "Contract"}, {"skills": "Sales"}]:
+            expected = local.get_recommendations("sales manager", 5, filters)
+            actual = remote.get_recommendations("sales manager", 5, filters)
+            assert list(actual.index) == list(expected.index)
+            assert actual.attrs["degraded"] is False
+        remote.shards.close()
+
+    def test_recency_and_deletes_reach_shards(
+        self, synthetic_store, shard_servers, tmp_path
+    ):
+        now, day = 1_713_398_000_000.0, 86_400_000
+        store = VectorStore(models_dir=tmp_path)
+        for name in ("tfidf_vectorizer", "tfidf_matrix", "sample_indices"):
+            setattr(store, name, getattr(synthetic_store, name))
+        listed = now - np.random.default_rng(2).uniform(
+            0, 60, len(store.sample_indices)
+        )
+        store.job_data = synthetic_store.job_data.copy()
+        store.job_data.loc[store.sample_indices, "listed_time"] = listed
+        store.clock = lambda: now
+        local = JobRecommender(
+            auto_load=False, pass_rates_path=tmp_path / "a.json", cache_size=0
+        )
+        remote = JobRecommender(
+            auto_load=False,
+            pass_rates_path=tmp_path / "b.json",
+            cache_size=0,
+            shard_addresses=[server.address for server in shard_servers],
+        )
+        local.vector_store = remote.vector_store = store
+
+        cases = [
+            {"posted_within_days": 7},
+            {"posted_within_days": 30, "skills": "Sales"},
+        ]
+        for filters in cases:
+            expected = local.get_recommendations("sales manager", 5, filters)
+            actual = remote.get_recommendations("sales manager", 5, filters)
+            assert list(actual.index) == list(expected.index)
+            cutoff = now - filters["posted_within_days"] * day
+            assert (actual["listed_time"] >= cutoff).all()
+
+        deleted = list(actual.index[:2])
+        store.delete_jobs(deleted)
+        for filters in [None] + cases:
+            expected = local.get_recommendations("sales manager", 5, filters)
+            actual = remote.get_recommendations("sales manager", 5, filters)
+            assert list(actual.index) == list(expected.index)
+            assert not set(deleted) & set(actual.index)
+        remote.shards.close()
+        store.segment_writer.close()
+
+    def test_late_shard_degrades(self, synthetic_store, shard_servers):
+        vectorizer, matrix = (
+            synthetic_store.tfidf_vectorizer,
+            synthetic_store.tfidf_matrix,
+        )
+        slow = shard_servers[1]
+        coordinator = ShardCoordinator([s.address for s in shard_servers], 0.3)
+        query = vectorizer.transform(["nurse health care"])
+
+        answer = slow.answer
+        slow.answer = lambda *args: time.sleep(1.0) or answer(*args)
+        try:
+            indices, scores, status = coordinator.search(query, 10)
+        finally:
+            del slow.answer
+
+        assert status["degraded"] is True
+        assert status["missing_shards"] == [slow.address]
+        assert not ((indices >= 1000) & (indices < 2000)).any()
+        mask = np.ones(matrix.shape[0], dtype=bool)
+        mask[1000:2000] = False
+        assert_same(
+            InvertedIndex(matrix).search(query, 10, mask=mask), (indices, scores)
+        )
+
+        # The shard's connection was dropped; the next query is complete again
+        time.sleep(1.0)
+        assert coordinator.search(query, 10)[2]["degraded"] is False
+        coordinator.close()
+
+    def test_server_process(self, synthetic_store, shard_servers):
+        vectorizer, matrix = (
+            synthetic_store.tfidf_vectorizer,
+            synthetic_store.tfidf_matrix,
+        )
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.shard_server"]
+            + [str(shard_servers[0].path), "--port", str(port)],
+            cwd=Path(__file__).resolve().parents[1],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert "Serving" in process.stdout.readline()
+            addresses = [f"127.0.0.1:{port}"]
+            addresses += [server.address for server in shard_servers[1:]]
+            coordinator = ShardCoordinator(addresses)
+            query = vectorizer.transform(["java backend developer cloud"])
+            indices, scores, _ = coordinator.search(query, 10)
+            assert_same(InvertedIndex(matrix).search(query, 10), (indices, scores))
+            coordinator.close()
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def test_oversized_frames_are_rejected():
+    left, right = socket.socketpair()
+    try:
+        send_message(left, {"method": "info"}, {"rows": np.arange(3)})
+        header, arrays = recv_message(right)
+        assert header["method"] == "info" and list(arrays["rows"]) == [0, 1, 2]
+
+        # A header claiming huge arrays is refused before any payload is read
+        for shape in ([MAX_PAYLOAD_BYTES // 8 + 1], [1 << 40, 1 << 40], [-1, 4]):
+            header = {"arrays": [["rows", "<i8", shape]]}
+            encoded = json.dumps(header).encode("utf-8")
+            left.sendall(len(encoded).to_bytes(4, "big") + encoded)
+            with pytest.raises(ValueError):
+                recv_message(right)
+    finally:
+        left.close()
+        right.close()